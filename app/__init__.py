@@ -4,6 +4,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI
+from .lifecycle import lifespan, drain_middleware, on_shutdown
+from .database.mysql_manager import MySQLManager
+from .database.mongo_manager import MongoManager
 # delete next line, solo es usada en desarrollo
 from fastapi.middleware.cors import CORSMiddleware ## alert -> delete this line or not commit it
 
@@ -30,6 +33,7 @@ app = FastAPI(
     openapi_url="/v1/api/openapi.json",
     docs_url="/v1/api/docs",
     redoc_url="/v1/api/redoc",
+    lifespan=lifespan,
 )
 default_origin = "https://antillean.app"
 
@@ -47,6 +51,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id", "X-Profile-Summary"],
 )
 
+from .diagnostics.request_profiling import profile_request_middleware
+app.middleware("http")(profile_request_middleware)
+# Registrado al final para ser el middleware más externo: rechaza requests durante el apagado
+app.middleware("http")(drain_middleware)
+
+on_shutdown(MySQLManager.close_all_connections)
+on_shutdown(MongoManager.close_shared_client)
+
 from .views import *
\ No newline at end of file
@@ -1,12 +1,16 @@
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
 from urllib.parse import urlparse
-from motor.motor_asyncio import AsyncIOMotorClient
 
 load_dotenv()
 
 class MongoManager:
+    # Un cliente (y su pool de conexiones) compartido por worker; se cierra en el apagado
+    _shared_client = None
+    _shared_loop = None
+
     def __init__(self):
         self.mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017/testdb")
         # parsed = urlparse(self.mongo_url)
@@ -16,17 +20,36 @@ class MongoManager:
 
     async def create_connection(self):
         try:
-            self.client = AsyncIOMotorClient(self.mongo_url)
+            loop = asyncio.get_running_loop()
+            if MongoManager._shared_client is None or MongoManager._shared_loop is not loop:
+                # motor/pymongo tardan ~100 ms en importarse; se cargan con la primera consulta
+                from motor.motor_asyncio import AsyncIOMotorClient
+                client = AsyncIOMotorClient(self.mongo_url)
+                await client.admin.command('ping')
+                if MongoManager._shared_client is not None and MongoManager._shared_loop is loop:
+                    # Otra corrutina creó el cliente mientras esperábamos el ping
+                    client.close()
+                else:
+                    MongoManager._shared_client = client
+                    MongoManager._shared_loop = loop
+                    print("Conexión exitosa a la base de datos MongoDB")
+            self.client = MongoManager._shared_client
             self.db = self.client[self.database_name]
-            await self.client.admin.command('ping')
-            print("Conexión exitosa a la base de datos MongoDB")
         except Exception as e:
             logging.error(f"Unexpected error in connect_mongo: {str(e)}")
 
     async def close_connection(self):
+        # El cliente compartido sigue abierto; solo se libera la referencia de esta instancia
+        self.client = None
+        self.db = None
+
+    @classmethod
+    async def close_shared_client(cls):
         try:
-            if self.client is not None:
-                self.client.close()
+            if cls._shared_client is not None:
+                cls._shared_client.close()
+                cls._shared_client = None
+                cls._shared_loop = None
                 print("Conexión cerrada")
         except Exception as e:
             logging.error(f"Unexpected error in close_mongo: {str(e)}")
@@ -34,4 +57,4 @@ class MongoManager:
     async def get_collection(self, collection_name):
         if self.db is None:
             raise Exception("Database connection is not established.")
-        return self.db[collection_name]
\ No newline at end of file
+        return self.db[collection_name]
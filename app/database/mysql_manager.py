@@ -8,6 +8,9 @@ from mysql.connector import Error
 load_dotenv()
 
 class MySQLManager:
+    # Conexiones abiertas en este worker, para cerrarlas en el apagado si una request no terminó
+    _open_connections = set()
+
     def __init__(self):
         mysql_url = os.getenv("MYSQL_URL", "mysql://root:@localhost:3306/testdb")
         parsed = urlparse(mysql_url)
@@ -20,6 +23,7 @@ class MySQLManager:
         self.database = parsed.path.lstrip('/') or "antillean_app"
         self.autocommit = query_params.get('autocommit', ['true'])[0].lower() == 'true'
         self.connection = None
+        self.in_transaction = False
 
     async def create_connection(self):
         # logging.info(f"Attempting to connect to MySQL database {self.database} at {self.host}:{self.port} with user {self.user}, database={self.database} and password={self.password}")
@@ -32,6 +36,7 @@ class MySQLManager:
                 database=self.database,
                 autocommit=self.autocommit
             )
+            MySQLManager._open_connections.add(self.connection)
             if await self.connection.is_connected():
                 logging.info("Conexión exitosa a la base de datos MySQL")
         except Error as e:
@@ -40,12 +45,51 @@ class MySQLManager:
 
     async def close_connection(self):
         try:
+            self.in_transaction = False
+            if self.connection is not None:
+                MySQLManager._open_connections.discard(self.connection)
             if self.connection is not None and await self.connection.is_connected():
                 await self.connection.close()
                 logging.info("Conexión cerrada")
         except Error as e:
             logging.error(f"Unexpected error in close_db: {str(e)}")
 
+    @classmethod
+    async def close_all_connections(cls) -> int:
+        pending = list(cls._open_connections)
+        cls._open_connections.clear()
+        for connection in pending:
+            try:
+                if await connection.is_connected():
+                    await connection.close()
+            except Error as e:
+                logging.error(f"Unexpected error in close_db: {str(e)}")
+        if pending:
+            logging.info(f"Cerradas {len(pending)} conexiones MySQL abiertas durante el apagado")
+        return len(pending)
+
+    async def is_connected(self) -> bool:
+        return self.connection is not None and await self.connection.is_connected()
+
+    async def begin(self):
+        if not await self.is_connected():
+            raise Exception("Database connection is not established.")
+        await self.connection.start_transaction()
+        self.in_transaction = True
+
+    async def commit(self):
+        try:
+            await self.connection.commit()
+        finally:
+            self.in_transaction = False
+
+    async def rollback(self):
+        try:
+            if await self.is_connected():
+                await self.connection.rollback()
+        finally:
+            self.in_transaction = False
+
     async def execute(self, query, params=None):
         if self.connection is None or not await self.connection.is_connected():
             raise Exception("Database connection is not established.")
@@ -58,7 +102,7 @@ class MySQLManager:
                 logging.info(f"Query executed successfully | query={query} params={params or ()} autocommit={self.autocommit}")
                 return rows
             else:
-                if not self.autocommit:
+                if not self.autocommit and not self.in_transaction:
                     await self.connection.commit()
                 meta = {
                     'rowcount': cursor.rowcount,
@@ -74,4 +118,28 @@ class MySQLManager:
             logging.error(f"Error executing query: {e}")
             raise
         finally:
-            await cursor.close()
\ No newline at end of file
+            await cursor.close()
+
+    async def executemany(self, query, seq_params):
+        """
+        Ejecuta la misma sentencia para varias filas. Para INSERT ... VALUES el conector
+        la reescribe como un único INSERT multi-fila (un solo round trip).
+        """
+        if self.connection is None or not await self.connection.is_connected():
+            raise Exception("Database connection is not established.")
+        cursor = await self.connection.cursor(dictionary=True)
+        try:
+            await cursor.executemany(query, seq_params)
+            if not self.autocommit and not self.in_transaction:
+                await self.connection.commit()
+            meta = {
+                'rowcount': cursor.rowcount,
+                'last_insert_id': cursor.lastrowid,
+            }
+            logging.info(f"Batch executed successfully | query={query} rows={len(seq_params)} autocommit={self.autocommit}")
+            return [meta]
+        except Error as e:
+            logging.error(f"Error executing batch: {e}")
+            raise
+        finally:
+            await cursor.close()
@@ -0,0 +1,53 @@
+import json
+import logging
+import os
+import secrets
+
+from fastapi import Request
+
+from app.diagnostics.sampling_profiler import (
+    SamplingProfiler,
+    ProfilerBusyError,
+    current_task_scope,
+    acquire_session,
+    release_session,
+    request_profiles,
+)
+
+PROFILE_HEADER = "X-Profile-Request"
+# Sin token configurado el profiling por request queda deshabilitado
+_REQUEST_TOKEN = os.getenv("PROFILER_REQUEST_TOKEN", "")
+
+
+async def profile_request_middleware(request: Request, call_next):
+    """
+    Perfila una sola request cuando trae el header X-Profile-Request con el token correcto.
+    Adjunta un resumen en X-Profile-Summary y el id del profile completo en X-Profile-Id
+    (descargable en /diagnostics/profile/requests/{id}). Solo cuenta el código de esta request
+    en el event loop; el trabajo que delega a hilos (to_thread, endpoints síncronos) no aparece.
+    """
+    token = request.headers.get(PROFILE_HEADER)
+    if not token or not _REQUEST_TOKEN or not secrets.compare_digest(token, _REQUEST_TOKEN):
+        return await call_next(request)
+
+    try:
+        acquire_session()
+    except ProfilerBusyError:
+        response = await call_next(request)
+        response.headers["X-Profile-Summary"] = "busy"
+        return response
+
+    profiler = SamplingProfiler(task_scope=current_task_scope()).start()
+    try:
+        response = await call_next(request)
+    finally:
+        profile = profiler.stop()
+        release_session()
+
+    try:
+        profile_id = request_profiles.add(request.url.path, profile)
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["X-Profile-Summary"] = json.dumps(profile.summary(limit=5), separators=(",", ":"))
+    except Exception as e:
+        logging.error(f"Error attaching request profile: {str(e)}")
+    return response
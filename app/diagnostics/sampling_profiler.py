@@ -0,0 +1,218 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+MAX_PROFILE_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
+MAX_STACK_DEPTH = int(os.getenv("PROFILER_MAX_STACK_DEPTH", "128"))
+STORED_REQUEST_PROFILES = int(os.getenv("PROFILER_STORED_REQUEST_PROFILES", "50"))
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    module = frame.f_globals.get("__name__") or os.path.basename(filename)
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+class TaskScope:
+    """
+    Tareas asyncio de una request: la que la atiende y las que se crean desde ella (heredan el
+    contexto). Permite al muestreador quedarse solo con los instantes en que el event loop
+    ejecuta código de esa request y no de otras concurrentes.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+
+    def add(self, task: Optional[asyncio.Task]):
+        if task is not None:
+            self.tasks.add(task)
+
+    def running(self) -> bool:
+        # Se consulta desde el hilo del muestreador: lectura puntual del task en curso del loop
+        return asyncio.current_task(self.loop) in self.tasks
+
+
+_task_scope: ContextVar[Optional[TaskScope]] = ContextVar("profiled_task_scope", default=None)
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop):
+    """Envuelve la task factory del loop para apuntar las tareas creadas dentro de un TaskScope."""
+    previous = loop.get_task_factory()
+    if getattr(previous, "tracks_task_scopes", False):
+        return
+
+    def factory(loop, coro, context=None):
+        if previous is not None:
+            task = previous(loop, coro) if context is None else previous(loop, coro, context=context)
+        else:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        scope = _task_scope.get() if context is None else context.get(_task_scope)
+        if scope is not None:
+            scope.add(task)
+        return task
+
+    factory.tracks_task_scopes = True
+    loop.set_task_factory(factory)
+
+
+def current_task_scope() -> TaskScope:
+    """
+    Abre un TaskScope para la tarea actual y las que cree a partir de ahora (el middleware de
+    profiling corre en una tarea propia de la request, así que dura lo que dura la request).
+    """
+    loop = asyncio.get_running_loop()
+    _install_task_factory(loop)
+    scope = TaskScope(loop)
+    scope.add(asyncio.current_task(loop))
+    _task_scope.set(scope)
+    return scope
+
+
+class Profile:
+    """Resultado de un muestreo: stacks colapsados (raíz primero) y su conteo."""
+
+    def __init__(self, stacks: Counter, samples: int, duration: float, interval: float):
+        self.stacks = stacks
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+
+    def collapsed(self) -> str:
+        # Formato "frame;frame;frame N", listo para flamegraph.pl / speedscope
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_frames(self, limit: int = 10) -> List[Tuple[str, int]]:
+        # Tiempo "self": el último frame de cada stack es el que estaba ejecutando
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def summary(self, limit: int = 10) -> Dict:
+        total = sum(self.stacks.values()) or 1
+        return {
+            "samples": self.samples,
+            "duration_s": round(self.duration, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "top": [
+                {"frame": frame, "samples": count, "percent": round(100.0 * count / total, 1)}
+                for frame, count in self.top_frames(limit)
+            ],
+        }
+
+
+class SamplingProfiler:
+    """
+    Profiler estadístico de bajo overhead: un hilo daemon toma sys._current_frames()
+    cada `interval` segundos y acumula los stacks de los hilos observados.
+    No instrumenta el código, por lo que el coste es proporcional a la frecuencia de muestreo.
+    Con `task_scope` solo muestrea el hilo del event loop mientras ejecuta una tarea de ese
+    scope; sin él es de todo el proceso (incluye las requests concurrentes).
+    """
+
+    def __init__(
+            self,
+            interval: float = DEFAULT_INTERVAL_MS / 1000.0,
+            thread_ids: Optional[Iterable[int]] = None,
+            max_depth: int = MAX_STACK_DEPTH,
+            task_scope: Optional[TaskScope] = None
+    ):
+        self.interval = max(interval, 0.0005)
+        self.task_scope = task_scope
+        if task_scope is not None:
+            thread_ids = [task_scope.thread_id]
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.max_depth = max_depth
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._stopped_at = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._stopped_at = time.perf_counter()
+        return Profile(self._stacks, self._samples, self._stopped_at - self._started_at, self.interval)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_id)
+
+    def _sample(self, own_id: int):
+        self._samples += 1
+        if self.task_scope is not None and not self.task_scope.running():
+            return
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if self.thread_ids is not None and thread_id not in self.thread_ids:
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                labels.reverse()
+                self._stacks[";".join(labels)] += 1
+
+
+# Un único profile "largo" por worker para no sumar overhead de varios muestreadores
+_session_lock = threading.Lock()
+
+
+def acquire_session() -> None:
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profiling session is already running on this worker")
+
+
+def release_session() -> None:
+    _session_lock.release()
+
+
+class RequestProfileStore:
+    """Guarda los últimos profiles por request (LRU acotado) para descargarlos después."""
+
+    def __init__(self, capacity: int = STORED_REQUEST_PROFILES):
+        self.capacity = capacity
+        self._profiles: "OrderedDict[str, Tuple[str, Profile]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, path: str, profile: Profile) -> str:
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = (path, profile)
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Tuple[str, Profile]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+request_profiles = RequestProfileStore()
@@ -0,0 +1,93 @@
+import math
+from typing import List, Optional, Sequence
+
+# Campo GeoJSON mantenido en HoopoMessages para el índice 2dsphere
+GEO_FIELD = "GeoPoint"
+
+
+def point_from_location(location: Optional[dict]) -> Optional[dict]:
+    """Construye un Point GeoJSON a partir de LocationDetails; None si no hay coordenadas válidas."""
+    if not location:
+        return None
+    lat = location.get("Latitude")
+    lon = location.get("Longitude")
+    if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
+        return None
+    if not -90.0 <= lat <= 90.0 or not -180.0 <= lon <= 180.0:
+        return None
+    return {"type": "Point", "coordinates": [float(lon), float(lat)]}
+
+
+# Los lados de un Polygon GeoJSON son geodésicas, no paralelos: se densifican cada
+# BBOX_STEP_DEGREES de longitud (a 1° la geodésica se separa del paralelo < 0.002°) y la
+# latitud se amplía BBOX_PAD_DEGREES para cubrir esa separación; el filtro exacto lo hace
+# bbox_location_filter. Cada trozo abarca como mucho BBOX_MAX_WIDTH_DEGREES de longitud para
+# no pasar de un hemisferio (Mongo tomaría el complementario)
+BBOX_STEP_DEGREES = 1.0
+BBOX_PAD_DEGREES = 0.01
+BBOX_MAX_WIDTH_DEGREES = 90.0
+MERIDIAN_STEP_DEGREES = 30.0
+
+
+def _steps(start: float, end: float, step: float) -> List[float]:
+    count = max(1, math.ceil((end - start) / step))
+    return [start + (end - start) * i / count for i in range(count + 1)]
+
+
+def _box_ring(min_lat: float, west: float, max_lat: float, east: float) -> List[List[float]]:
+    """Anillo antihorario de una caja densificada; los vértices en un polo se funden en uno."""
+    lons = _steps(west, east, BBOX_STEP_DEGREES)
+    lats = _steps(min_lat, max_lat, MERIDIAN_STEP_DEGREES)
+    points = (
+        [[lon, min_lat] for lon in lons]
+        + [[east, lat] for lat in lats[1:]]
+        + [[lon, max_lat] for lon in reversed(lons[:-1])]
+        + [[west, lat] for lat in reversed(lats[:-1])]
+    )
+    ring = []
+    for lon, lat in points:
+        point = [0.0, lat] if abs(lat) == 90.0 else [lon, lat]
+        if not ring or ring[-1] != point:
+            ring.append(point)
+    return close_ring(ring[:-1] if ring[0] == ring[-1] else ring)
+
+
+def bbox_polygons(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[dict]:
+    """
+    Polygons que cubren el rectángulo lat/lon. min_lon > max_lon es una caja que cruza el
+    antimeridiano; min_lon = -180 y max_lon = 180 es la vuelta completa.
+    """
+    east = max_lon if max_lon > min_lon else max_lon + 360.0
+    cuts = {min_lon, east}
+    if min_lon < 180.0 < east:
+        cuts.add(180.0)
+    edge = min_lon + BBOX_MAX_WIDTH_DEGREES
+    while edge < east:
+        cuts.add(edge)
+        edge += BBOX_MAX_WIDTH_DEGREES
+    cuts = sorted(cuts)
+    south = max(-90.0, min_lat - BBOX_PAD_DEGREES)
+    north = min(90.0, max_lat + BBOX_PAD_DEGREES)
+    polygons = []
+    for west, piece_east in zip(cuts, cuts[1:]):
+        if west >= 180.0:
+            west, piece_east = west - 360.0, piece_east - 360.0
+        polygons.append({"type": "Polygon", "coordinates": [_box_ring(south, west, north, piece_east)]})
+    return polygons
+
+
+def bbox_location_filter(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> dict:
+    """Filtro exacto del rectángulo sobre LocationDetails, complemento de bbox_polygons."""
+    query = {"Location.Latitude": {"$gte": min_lat, "$lte": max_lat}}
+    if min_lon > max_lon:
+        query["$or"] = [{"Location.Longitude": {"$gte": min_lon}}, {"Location.Longitude": {"$lte": max_lon}}]
+    elif min_lon > -180.0 or max_lon < 180.0:
+        query["Location.Longitude"] = {"$gte": min_lon, "$lte": max_lon}
+    return query
+
+
+def close_ring(ring: Sequence[Sequence[float]]) -> List[List[float]]:
+    ring = [list(point) for point in ring]
+    if ring and ring[0] != ring[-1]:
+        ring.append(list(ring[0]))
+    return ring
@@ -0,0 +1,107 @@
+import heapq
+import math
+from typing import List, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+
+# (latitud, longitud) en grados
+LatLon = Tuple[float, float]
+
+
+def _project(points: Sequence[LatLon]) -> Tuple[List[float], List[float]]:
+    """
+    Proyección equirectangular local a metros, centrada en la latitud media del tramo.
+    Para trayectorias de un tracker el error es despreciable frente a la tolerancia
+    y permite trabajar con distancias euclídeas.
+    """
+    mean_lat = math.radians(sum(p[0] for p in points) / len(points))
+    kx = EARTH_RADIUS_M * math.cos(mean_lat) * math.pi / 180.0
+    ky = EARTH_RADIUS_M * math.pi / 180.0
+    return [p[1] * kx for p in points], [p[0] * ky for p in points]
+
+
+def douglas_peucker(points: Sequence[LatLon], tolerance_m: float) -> List[int]:
+    """
+    Devuelve los índices de los puntos que se conservan. Implementación iterativa
+    (sin recursión) para soportar trayectorias de cientos de miles de puntos.
+    """
+    n = len(points)
+    if n <= 2 or tolerance_m <= 0:
+        return list(range(n))
+    xs, ys = _project(points)
+    keep = bytearray(n)
+    keep[0] = keep[n - 1] = 1
+    tolerance_sq = tolerance_m * tolerance_m
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        length_sq = dx * dx + dy * dy
+        max_dist_sq = -1.0
+        index = -1
+        for i in range(first + 1, last):
+            px, py = xs[i] - ax, ys[i] - ay
+            if length_sq == 0.0:
+                dist_sq = px * px + py * py
+            else:
+                # Distancia al segmento (no a la recta) para no descartar retrocesos
+                t = (px * dx + py * dy) / length_sq
+                if t < 0.0:
+                    t = 0.0
+                elif t > 1.0:
+                    t = 1.0
+                ex, ey = px - t * dx, py - t * dy
+                dist_sq = ex * ex + ey * ey
+            if dist_sq > max_dist_sq:
+                max_dist_sq = dist_sq
+                index = i
+        if max_dist_sq > tolerance_sq:
+            keep[index] = 1
+            if index - first > 1:
+                stack.append((first, index))
+            if last - index > 1:
+                stack.append((index, last))
+    return [i for i in range(n) if keep[i]]
+
+
+def visvalingam_whyatt(points: Sequence[LatLon], target_count: int) -> List[int]:
+    """
+    Elimina repetidamente el punto cuyo triángulo con sus vecinos tiene menor área
+    hasta quedar con `target_count` puntos. Devuelve los índices conservados.
+    """
+    n = len(points)
+    target_count = max(target_count, 2)
+    if n <= target_count:
+        return list(range(n))
+    xs, ys = _project(points)
+
+    def area(a: int, b: int, c: int) -> float:
+        return abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])) / 2.0
+
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    areas = [math.inf] * n
+    heap = []
+    for i in range(1, n - 1):
+        areas[i] = area(i - 1, i, i + 1)
+        heap.append((areas[i], i))
+    heapq.heapify(heap)
+
+    removed = bytearray(n)
+    remaining = n
+    while remaining > target_count and heap:
+        value, i = heapq.heappop(heap)
+        if removed[i] or value != areas[i]:
+            continue  # entrada obsoleta
+        removed[i] = 1
+        remaining -= 1
+        p, q = prev[i], nxt[i]
+        nxt[p] = q
+        prev[q] = p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                # El área de un vecino nunca baja de la del punto eliminado (preserva el orden de eliminación)
+                areas[j] = max(area(prev[j], j, nxt[j]), value)
+                heapq.heappush(heap, (areas[j], j))
+    return [i for i in range(n) if not removed[i]]
@@ -0,0 +1,83 @@
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from app.geo.distance import haversine_m, point_in_ring, METERS_PER_DEGREE_LAT
+
+# Más celdas que esto por geocerca y se trata como "grande" (se evalúa siempre)
+MAX_CELLS_PER_FENCE = 400
+
+
+class Geofence:
+    """Círculo (centro + radio) o polígono GeoJSON asociado a una location."""
+
+    def __init__(
+            self,
+            location_id: int,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None,
+            radius_m: Optional[float] = None,
+            polygon: Optional[Sequence[Sequence[float]]] = None
+    ):
+        self.location_id = location_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_m = radius_m
+        self.polygon = [list(p) for p in polygon] if polygon else None
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        if self.polygon:
+            lons = [p[0] for p in self.polygon]
+            lats = [p[1] for p in self.polygon]
+            return min(lats), min(lons), max(lats), max(lons)
+        dlat = self.radius_m / METERS_PER_DEGREE_LAT
+        dlon = self.radius_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(self.latitude)), 0.01))
+        return self.latitude - dlat, self.longitude - dlon, self.latitude + dlat, self.longitude + dlon
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if self.polygon:
+            return point_in_ring(lat, lon, self.polygon)
+        return haversine_m(self.latitude, self.longitude, lat, lon) <= self.radius_m
+
+
+class GridIndex:
+    """
+    Índice espacial en rejilla regular: cada geocerca se registra en las celdas que cubre su
+    bounding box y una consulta solo evalúa las geocercas de la celda del punto.
+    """
+
+    def __init__(self, fences: Sequence[Geofence] = (), cell_deg: float = 0.25):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], List[Geofence]] = {}
+        self._large: List[Geofence] = []
+        self.location_ids: Set[int] = set()
+        for fence in fences:
+            self.add(fence)
+
+    @property
+    def size(self) -> int:
+        return len(self.location_ids)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def add(self, fence: Geofence):
+        min_lat, min_lon, max_lat, max_lon = fence.bounds()
+        lat0, lon0 = self._cell(min_lat, min_lon)
+        lat1, lon1 = self._cell(max_lat, max_lon)
+        self.location_ids.add(fence.location_id)
+        if (lat1 - lat0 + 1) * (lon1 - lon0 + 1) > MAX_CELLS_PER_FENCE:
+            self._large.append(fence)
+            return
+        for i in range(lat0, lat1 + 1):
+            for j in range(lon0, lon1 + 1):
+                self._cells.setdefault((i, j), []).append(fence)
+
+    def containing(self, lat: float, lon: float) -> Set[int]:
+        """Ids de las locations cuya geocerca contiene el punto."""
+        candidates = self._cells.get(self._cell(lat, lon), [])
+        return {
+            fence.location_id
+            for group in (candidates, self._large)
+            for fence in group
+            if fence.contains(lat, lon)
+        }
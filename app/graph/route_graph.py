@@ -0,0 +1,217 @@
+import heapq
+import statistics
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+HOPS = "hops"
+DURATION = "duration"
+METRICS = (HOPS, DURATION)
+
+# Duración de un tramo sin viajes completados cuando tampoco hay ninguno en la red
+DEFAULT_LEG_HOURS = 24.0
+# Cambios acumulados fuera del CSR antes de recompactarlo (mínimo y fracción de las aristas)
+COMPACT_MIN_CHANGES = 64
+COMPACT_RATIO = 0.05
+# Árboles de caminos mínimos guardados (uno por origen y métrica)
+TREE_CACHE_SIZE = 1024
+
+_UNREACHED = float("inf")
+
+
+class RouteGraph:
+    """
+    Grafo dirigido de locations cuyas aristas son las routes, en formato CSR: las aristas que
+    salen del nodo u son targets[offsets[u]:offsets[u + 1]], con el id de la route y su peso en
+    arrays paralelos. Los ids de location se traducen a índices densos.
+
+    Las altas y bajas no reconstruyen los arrays: las altas van a una lista por nodo y las bajas a
+    un conjunto que se salta al recorrer; cuando se acumulan suficientes se recompacta. Los árboles
+    de caminos mínimos se cachean por origen y se descartan con cualquier cambio.
+    """
+
+    def __init__(self, routes: Iterable[Tuple[int, int, int]] = (), durations: Optional[Mapping[int, float]] = None):
+        # route_id -> (origen, destino) como ids de location
+        self._routes: Dict[int, Tuple[int, int]] = {}
+        self._index: Dict[int, int] = {}
+        self._locations: List[int] = []
+        self._durations: Dict[int, float] = {}
+        self._default_hours = DEFAULT_LEG_HOURS
+        self._trees: "OrderedDict[Tuple[int, str], Tuple[array, array]]" = OrderedDict()
+        for route_id, origin, destination in routes:
+            self._routes[route_id] = (origin, destination)
+        self.set_durations(durations or {})
+        self._compact()
+
+    @property
+    def node_count(self) -> int:
+        return len(self._locations)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._routes)
+
+    def _node(self, location_id: int) -> int:
+        node = self._index.get(location_id)
+        if node is None:
+            node = len(self._locations)
+            self._index[location_id] = node
+            self._locations.append(location_id)
+        return node
+
+    def _compact(self):
+        for origin, destination in self._routes.values():
+            self._node(origin)
+            self._node(destination)
+        edges = sorted(
+            (self._index[origin], self._index[destination], route_id)
+            for route_id, (origin, destination) in self._routes.items()
+        )
+        offsets = array("l", [0] * (len(self._locations) + 1))
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for node in range(len(self._locations)):
+            offsets[node + 1] += offsets[node]
+        self._offsets = offsets
+        self._targets = array("l", (target for _, target, _ in edges))
+        self._route_ids = array("q", (route_id for _, _, route_id in edges))
+        self._base_nodes = len(self._locations)
+        self._added: Dict[int, List[Tuple[int, int]]] = {}
+        self._added_ids: Set[int] = set()
+        self._removed: Set[int] = set()
+
+    def _changed(self):
+        self._trees.clear()
+        if len(self._added_ids) + len(self._removed) > max(COMPACT_MIN_CHANGES, len(self._routes) * COMPACT_RATIO):
+            self._compact()
+
+    def add_route(self, route_id: int, origin: int, destination: int):
+        """Alta o cambio de una route (un cambio es baja + alta)."""
+        if route_id in self._routes:
+            self._discard(route_id)
+        self._routes[route_id] = (origin, destination)
+        source = self._node(origin)
+        self._added.setdefault(source, []).append((self._node(destination), route_id))
+        self._added_ids.add(route_id)
+        self._changed()
+
+    def remove_route(self, route_id: int):
+        if route_id in self._routes:
+            self._discard(route_id)
+            self._changed()
+
+    def _discard(self, route_id: int):
+        origin, _ = self._routes.pop(route_id)
+        if route_id in self._added_ids:
+            self._added_ids.discard(route_id)
+            source = self._index[origin]
+            self._added[source] = [edge for edge in self._added[source] if edge[1] != route_id]
+        else:
+            self._removed.add(route_id)
+
+    def set_durations(self, durations: Mapping[int, float]):
+        """Duración media en horas por route; las que no tienen historial usan la mediana de la red."""
+        self._durations = dict(durations)
+        self._default_hours = statistics.median(self._durations.values()) if self._durations else DEFAULT_LEG_HOURS
+        self._trees = OrderedDict((key, tree) for key, tree in self._trees.items() if key[1] != DURATION)
+
+    def route(self, route_id: int) -> Tuple[int, int]:
+        return self._routes[route_id]
+
+    def leg_hours(self, route_id: int) -> Tuple[float, bool]:
+        """(horas, estimada): estimada si la route no tiene viajes completados."""
+        hours = self._durations.get(route_id)
+        if hours is None:
+            return self._default_hours, True
+        return hours, False
+
+    def _neighbors(self, node: int) -> Iterator[Tuple[int, int]]:
+        if node < self._base_nodes:
+            removed = self._removed
+            for position in range(self._offsets[node], self._offsets[node + 1]):
+                route_id = self._route_ids[position]
+                if route_id not in removed:
+                    yield self._targets[position], route_id
+        yield from self._added.get(node, ())
+
+    def _tree(self, origin: int, metric: str) -> Tuple[array, array]:
+        """Distancias desde el origen y route por la que se llega a cada nodo (-1 si ninguna)."""
+        key = (origin, metric)
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+        size = len(self._locations)
+        distance = array("d", [_UNREACHED]) * size
+        parent = array("q", [-1]) * size
+        distance[origin] = 0.0
+        if metric == HOPS:
+            queue = deque([origin])
+            while queue:
+                node = queue.popleft()
+                next_distance = distance[node] + 1
+                for target, route_id in self._neighbors(node):
+                    if distance[target] == _UNREACHED:
+                        distance[target] = next_distance
+                        parent[target] = route_id
+                        queue.append(target)
+        else:
+            heap = [(0.0, origin)]
+            while heap:
+                current, node = heapq.heappop(heap)
+                if current > distance[node]:
+                    continue
+                for target, route_id in self._neighbors(node):
+                    candidate = current + self.leg_hours(route_id)[0]
+                    if candidate < distance[target]:
+                        distance[target] = candidate
+                        parent[target] = route_id
+                        heapq.heappush(heap, (candidate, target))
+        self._trees[key] = (distance, parent)
+        if len(self._trees) > TREE_CACHE_SIZE:
+            self._trees.popitem(last=False)
+        return distance, parent
+
+    def shortest_path(self, origin: int, destination: int, metric: str = HOPS) -> Optional[List[int]]:
+        """Routes del camino mínimo entre dos locations; None si no hay camino."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}. Allowed: {', '.join(METRICS)}")
+        if origin == destination:
+            return []
+        source = self._index.get(origin)
+        target = self._index.get(destination)
+        if source is None or target is None:
+            return None
+        distance, parent = self._tree(source, metric)
+        if distance[target] == _UNREACHED:
+            return None
+        path = []
+        node = target
+        while node != source:
+            route_id = parent[node]
+            path.append(route_id)
+            node = self._index[self._routes[route_id][0]]
+        path.reverse()
+        return path
+
+    def itinerary(self, stops: Sequence[int], metric: str = HOPS) -> Optional[List[int]]:
+        """Camino que pasa por las locations en orden: el mínimo entre cada par consecutivo."""
+        path: List[int] = []
+        for origin, destination in zip(stops, stops[1:]):
+            leg = self.shortest_path(origin, destination, metric)
+            if leg is None:
+                return None
+            path.extend(leg)
+        return path
+
+    def reachable(self, origin: int, max_hops: Optional[int] = None) -> Dict[int, int]:
+        """Locations alcanzables desde el origen (sin él) con el número mínimo de tramos."""
+        source = self._index.get(origin)
+        if source is None:
+            return {}
+        distance, _ = self._tree(source, HOPS)
+        return {
+            self._locations[node]: int(hops)
+            for node, hops in enumerate(distance)
+            if node != source and hops != _UNREACHED and (max_hops is None or hops <= max_hops)
+        }
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Debe ser menor que el graceful timeout del servidor (GRACEFUL_TIMEOUT en server.py)
+DRAIN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "25"))
+
+Hook = Callable[[], Awaitable[None]]
+
+_startup_hooks: List[Hook] = []
+_shutdown_hooks: List[Hook] = []
+
+
+def on_startup(hook: Hook) -> Hook:
+    """Registra una corrutina a ejecutar al arrancar el worker."""
+    _startup_hooks.append(hook)
+    return hook
+
+
+def on_shutdown(hook: Hook) -> Hook:
+    """Registra una corrutina a ejecutar al apagar el worker, después de drenar las requests."""
+    _shutdown_hooks.append(hook)
+    return hook
+
+
+# Señales con las que uvicorn (y gunicorn, que se las reenvía al worker) inicia el apagado ordenado
+DRAIN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+class InFlightTracker:
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self.completed_while_draining = 0
+        self.rejected = 0
+        self.in_flight_at_shutdown = 0
+        self._drain_started: Optional[float] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Se activa al empezar el drenaje; los streams largos (SSE) lo esperan para cerrar
+        self.shutting_down = asyncio.Event()
+
+    def enter(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def exit(self):
+        self.in_flight -= 1
+        if self.draining:
+            self.completed_while_draining += 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    def begin_drain(self):
+        """A partir de aquí las requests nuevas reciben 503 y las en curso cuentan como drenadas."""
+        if self.draining:
+            return
+        self.draining = True
+        self.in_flight_at_shutdown = self.in_flight
+        self._drain_started = time.monotonic()
+        self.shutting_down.set()
+
+    async def drain(self, timeout: float) -> dict:
+        # Normalmente ya empezó con la señal y uvicorn ha esperado a las conexiones abiertas;
+        # sin señal (tests, apagado programático) empieza y espera aquí
+        self.begin_drain()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return {
+            "in_flight_at_shutdown": self.in_flight_at_shutdown,
+            "drained": self.completed_while_draining,
+            "aborted": self.in_flight,
+            "rejected": self.rejected,
+            "drain_seconds": round(time.monotonic() - self._drain_started, 3),
+        }
+
+
+tracker = InFlightTracker()
+
+
+def install_drain_signal_handlers():
+    """
+    Encadena el drenaje delante del manejador de SIGTERM/SIGINT que ya instaló el servidor.
+    uvicorn solo ejecuta el lifespan de apagado después de cerrar los sockets y esperar (o
+    cancelar) las requests en curso, así que el drenaje tiene que empezar al recibir la señal.
+    """
+    # Las señales solo se pueden instalar desde el hilo principal (no aplica al TestClient)
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in DRAIN_SIGNALS:
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            # El manejador corre entre dos instrucciones del hilo del loop: se delega en el loop
+            loop.call_soon_threadsafe(tracker.begin_drain)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+async def drain_middleware(request: Request, call_next):
+    if tracker.draining:
+        # Requests que llegan por conexiones keep-alive durante el apagado
+        tracker.rejected += 1
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is shutting down"},
+            headers={"Connection": "close", "Retry-After": "1"},
+        )
+    tracker.enter()
+    try:
+        return await call_next(request)
+    finally:
+        tracker.exit()
+
+
+async def _run_hooks(hooks: List[Hook], phase: str):
+    for hook in hooks:
+        try:
+            await hook()
+        except Exception as e:
+            logging.error(f"Error in {phase} hook {getattr(hook, '__name__', hook)}: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    install_drain_signal_handlers()
+    await _run_hooks(_startup_hooks, "startup")
+    yield
+    report = await tracker.drain(DRAIN_TIMEOUT_SECONDS)
+    # Los hooks de apagado se ejecutan en orden inverso: lo último que se registró se cierra primero
+    await _run_hooks(list(reversed(_shutdown_hooks)), "shutdown")
+    logging.info(f"Shutdown complete | {report}")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, PositiveInt
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 from enum import Enum
 
@@ -79,3 +79,28 @@ class AssetResponse(AssetBase):
 class AssetIdParam(BaseModel):
     id: int
 
+
+
+class AssetUtilizationGroup(BaseModel):
+    # Dimensión -> valor del grupo (p. ej. {"size": "40ft", "status": "full"})
+    dimensions: Dict[str, Any]
+    total: int
+    # Contenedores en algún item de un envío cuyo viaje está en curso
+    on_voyage: int
+    utilization: float
+
+
+class AssetUtilizationResponse(BaseModel):
+    group_by: List[str]
+    computed_at: Optional[datetime] = None
+    total: int
+    on_voyage: int
+    groups: List[AssetUtilizationGroup]
+
+
+class InspectionScheduleResult(BaseModel):
+    scanned: int
+    # Assets cuya próxima inspección (o últimas fechas) cambió
+    updated: int
+    seconds: float
+    dry_run: bool = False
@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
 
 class AssetTypeBase(BaseModel):
     type_name: str
+    # Meses entre inspecciones para este tipo (None: el intervalo por defecto del programador)
+    inspection_interval_months: Optional[int] = Field(None, ge=1, le=120)
 
 
 class AssetTypeCreate(AssetTypeBase):
@@ -13,6 +15,7 @@ class AssetTypeCreate(AssetTypeBase):
 
 class AssetTypeUpdate(BaseModel):
     type_name: Optional[str] = None
+    inspection_interval_months: Optional[int] = Field(None, ge=1, le=120)
 
 
 class AssetTypeResponse(AssetTypeBase):
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class GeofenceRunResult(BaseModel):
+    positions: int
+    trackers: int
+    enters: int
+    exits: int
+    # Transiciones sin shipment asociado (BL/Booking desconocido): actualizan el estado pero no generan evento
+    unmatched: int
+    # Posiciones con EventTime anterior al último procesado del tracker
+    stale: int
+    fences: int
+    watermark: Optional[str] = None
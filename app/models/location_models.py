@@ -1,8 +1,11 @@
-from pydantic import BaseModel
-from typing import Optional
+import json
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
+from app.geo.geojson import close_ring
+
 
 class LocationType(str, Enum):
     port = "port"
@@ -10,12 +13,32 @@ class LocationType(str, Enum):
     customer_facility = "customer_facility"
 
 
+def _parse_polygon(value):
+    # La columna JSON de MySQL llega como texto
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    if value is None:
+        return None
+    ring = close_ring(value)
+    if len(ring) < 4 or any(len(point) != 2 for point in ring):
+        raise ValueError("geofence_polygon must be a ring of at least 3 [longitude, latitude] points")
+    return ring
+
+
 class LocationBase(BaseModel):
     location_name: str
     address: Optional[str] = None
     city: Optional[str] = None
     country: Optional[str] = None
     location_type: LocationType
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    # Geocerca: círculo de radio geofence_radius_m alrededor de (latitude, longitude)
+    # o un anillo de polígono en coordenadas GeoJSON [longitud, latitud]
+    geofence_radius_m: Optional[float] = Field(None, gt=0)
+    geofence_polygon: Optional[List[List[float]]] = None
+
+    parse_polygon = field_validator("geofence_polygon", mode="before")(_parse_polygon)
 
 
 class LocationCreate(LocationBase):
@@ -28,6 +51,12 @@ class LocationUpdate(BaseModel):
     city: Optional[str] = None
     country: Optional[str] = None
     location_type: Optional[LocationType] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    geofence_radius_m: Optional[float] = Field(None, gt=0)
+    geofence_polygon: Optional[List[List[float]]] = None
+
+    parse_polygon = field_validator("geofence_polygon", mode="before")(_parse_polygon)
 
 
 class LocationResponse(LocationBase):
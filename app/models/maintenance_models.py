@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
@@ -60,3 +60,24 @@ class MaintenanceResponse(MaintenanceBase):
 
 class MaintenanceIdParam(BaseModel):
     id: int
+
+
+class MaintenanceCostGroup(BaseModel):
+    # Dimensión -> valor del grupo (p. ej. {"asset_type": 3, "month": "2025-01-01"})
+    dimensions: Dict[str, Any]
+    labor_cost: Decimal
+    # Repuestos: quantity_used * cost_at_consumption
+    parts_cost: Decimal
+    total_cost: Decimal
+    maintenance_count: int
+
+
+class MaintenanceCostResponse(BaseModel):
+    group_by: List[str]
+    labor_cost: Decimal
+    parts_cost: Decimal
+    total_cost: Decimal
+    maintenance_count: int
+    # True si hay más grupos que `limit`; los totales de arriba incluyen también los no devueltos
+    truncated: bool = False
+    groups: List[MaintenanceCostGroup]
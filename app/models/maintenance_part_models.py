@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -12,11 +12,12 @@ class MaintenancePartBase(BaseModel):
 
 
 class MaintenancePartCreate(MaintenancePartBase):
-    pass
+    # Se descuenta de spare_parts.quantity al registrar el consumo
+    quantity_used: int = Field(..., gt=0)
 
 
 class MaintenancePartUpdate(BaseModel):
-    quantity_used: Optional[int] = None
+    quantity_used: Optional[int] = Field(None, gt=0)
     cost_at_consumption: Optional[Decimal] = None
 
 
@@ -26,3 +27,14 @@ class MaintenancePartResponse(MaintenancePartBase):
     class Config:
         from_attributes = True
 
+
+class MaintenanceKitItem(BaseModel):
+    spare_part_id: int
+    quantity_used: int = Field(..., gt=0)
+    # Sin precio se usa el unit_cost actual del repuesto
+    cost_at_consumption: Optional[Decimal] = None
+
+
+class MaintenanceKitCreate(BaseModel):
+    maintenance_id: int
+    parts: List[MaintenanceKitItem] = Field(..., min_length=1, max_length=500)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -29,3 +29,37 @@ class RouteResponse(RouteBase):
 class RouteIdParam(BaseModel):
     id: int
 
+
+
+class RouteLeg(BaseModel):
+    route_id: int
+    origin_location_id: int
+    destination_location_id: int
+    # Duración media de los viajes completados por la route
+    duration_hours: float
+    # True si la route no tiene viajes completados y se usa la mediana de la red
+    estimated: bool = False
+
+
+class RoutePathResponse(BaseModel):
+    origin_location_id: int
+    destination_location_id: int
+    # Locations intermedias por las que pasa el itinerario, en orden
+    via: List[int] = []
+    # hops o duration
+    metric: str
+    hops: int
+    duration_hours: float
+    estimated: bool = False
+    legs: List[RouteLeg]
+
+
+class ReachableLocation(BaseModel):
+    location_id: int
+    hops: int
+
+
+class ReachabilityResponse(BaseModel):
+    origin_location_id: int
+    max_hops: Optional[int] = None
+    locations: List[ReachableLocation]
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchResult(BaseModel):
+    # shipment, customer, vessel o asset
+    type: str
+    id: int
+    label: str
+    detail: Optional[str] = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    # index (en memoria) o fulltext (MySQL)
+    source: str
+    took_ms: float
+    results: List[SearchResult]
+
+
+class AutocompleteSuggestion(BaseModel):
+    id: int
+    # Valor del campo que coincide con el prefijo
+    value: str
+    # Dato que acompaña a la sugerencia (IMO del buque, nombre si se busca por IMO, ciudad)
+    detail: Optional[str] = None
+
+
+class AutocompleteResponse(BaseModel):
+    field: str
+    prefix: str
+    # index (en memoria) o sql (LIKE 'prefijo%' mientras se construye el índice)
+    source: str
+    took_ms: float
+    results: List[AutocompleteSuggestion]
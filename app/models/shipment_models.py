@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from datetime import datetime, date
 from decimal import Decimal
+from app.models.shipment_item_models import ShipmentItemResponse
+from app.models.bill_of_lading_models import BillOfLadingResponse
 
 
 class ShipmentBase(BaseModel):
@@ -42,3 +44,57 @@ class ShipmentResponse(ShipmentBase):
 class ShipmentIdParam(BaseModel):
     id: int
 
+
+class ShipmentCompositeItem(BaseModel):
+    asset_id: int
+    description: Optional[str] = None
+    weight_kg: Optional[Decimal] = None
+    dimensions: Optional[str] = None
+
+
+class ShipmentCompositeBillOfLading(BaseModel):
+    bol_number: str
+    issue_date: date
+    terms_and_conditions: Optional[str] = None
+    shipper_details: Optional[str] = None
+    consignee_details: Optional[str] = None
+    is_hazardous: bool = False
+
+
+class ShipmentCompositeCreate(BaseModel):
+    shipment: ShipmentCreate
+    items: List[ShipmentCompositeItem] = Field(default_factory=list, max_length=1000)
+    bill_of_lading: Optional[ShipmentCompositeBillOfLading] = None
+
+    @model_validator(mode="after")
+    def check_unique_assets(self):
+        asset_ids = [item.asset_id for item in self.items]
+        if len(asset_ids) != len(set(asset_ids)):
+            raise ValueError("Each asset can only appear once per shipment")
+        return self
+
+
+class ShipmentCompositeResponse(ShipmentResponse):
+    items: List[ShipmentItemResponse] = []
+    bill_of_lading: Optional[BillOfLadingResponse] = None
+
+
+class ShipmentTimelineEntry(BaseModel):
+    # "tracking_event" (MySQL tracking_events) o "tracker_event" (HoopoMessages en Mongo)
+    source: str
+    id: str
+    event_time: datetime
+    event_type: Optional[str] = None
+    location_id: Optional[int] = None
+    location_name: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    tracker_id: Optional[str] = None
+    alert: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class ShipmentTimelinePage(BaseModel):
+    shipment_id: int
+    items: List[ShipmentTimelineEntry]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, List
 from datetime import datetime
 
 
@@ -50,6 +50,85 @@ class TrackerEventCreate(TrackerEventBase):
     pass
 
 
+class TrackerEventIngest(TrackerEventCreate):
+    # Clave de idempotencia de la ingesta
+    TrackerId: str
+    EventTime: datetime
+
+
+class TrackerEventBatchResult(BaseModel):
+    received: int
+    accepted: int
+    duplicates: int
+    queued: bool = False
+    # Presente si la ingesta está degradada (p. ej. sin índice único no se detectan duplicados)
+    warning: Optional[str] = None
+
+
+class TrackerTrackResponse(BaseModel):
+    tracker_id: str
+    start: datetime
+    end: datetime
+    algorithm: str
+    raw_points: int
+    points: int
+    encoding: str
+    # Encoded Polyline (precisión 5) o GeoJSON LineString según `encoding`
+    polyline: Optional[str] = None
+    geometry: Optional[Dict[str, Any]] = None
+    timestamps: Optional[List[datetime]] = None
+
+
+class TrackerEventPosition(BaseModel):
+    # Forma reducida para pintar en mapa
+    id: str = Field(alias="_id")
+    TrackerId: Optional[str] = None
+    AssetName: Optional[str] = None
+    EventTime: Optional[datetime] = None
+    Latitude: float
+    Longitude: float
+    distance_m: Optional[float] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class GeoPolygonQuery(BaseModel):
+    # Anillos GeoJSON en orden [longitud, latitud]; el primero es el exterior
+    coordinates: List[List[List[float]]] = Field(..., min_length=1)
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    tracker_ids: Optional[List[str]] = None
+    limit: int = Field(1000, ge=1, le=5000)
+
+
+class TrackerRollupRunResult(BaseModel):
+    events: int
+    hourly_buckets: int
+    daily_buckets: int
+    # True si se repitió un lote que quedó a medias (los buckets ya aplicados se saltan)
+    replayed: bool = False
+    # True si otro worker tiene la concesión y esta pasada no hizo nada
+    skipped: bool = False
+    watermark: Optional[str] = None
+
+
+class RollupHistogramPoint(BaseModel):
+    bucket_start: datetime
+    # Valor de la dimensión agrupada (tracker, tipo de evento o alerta); None sin agrupar
+    key: Optional[str] = None
+    count: int
+
+
+class RollupHistogram(BaseModel):
+    interval: str
+    group_by: Optional[str] = None
+    start: datetime
+    end: datetime
+    total: int
+    points: List[RollupHistogramPoint]
+
+
 class TrackerIdParam(BaseModel):
     tracker_id: str
 
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class TrackingEventBase(BaseModel):
+    shipment_id: int
+    location_id: Optional[int] = None
+    event_datetime: datetime
+    event_type: str = Field(..., max_length=100)
+    notes: Optional[str] = None
+
+
+class TrackingEventCreate(TrackingEventBase):
+    pass
+
+
+class TrackingEventUpdate(BaseModel):
+    location_id: Optional[int] = None
+    event_datetime: Optional[datetime] = None
+    event_type: Optional[str] = Field(None, max_length=100)
+    notes: Optional[str] = None
+
+
+class TrackingEventResponse(TrackingEventBase):
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TrackingEventBatchResult(BaseModel):
+    inserted: int
+
+
+class TrackingEventPage(BaseModel):
+    shipment_id: int
+    items: List[TrackingEventResponse]
+    # Pasar como `cursor` para obtener la página siguiente; None cuando no hay más
+    next_cursor: Optional[str] = None
+
+
+class ShipmentTimelines(BaseModel):
+    # Claves: shipment_id; los shipments sin eventos aparecen con lista vacía
+    timelines: Dict[int, List[TrackingEventResponse]]
+    limit_per_shipment: int
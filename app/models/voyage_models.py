@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -35,3 +35,30 @@ class VoyageResponse(VoyageBase):
 class VoyageIdParam(BaseModel):
     id: int
 
+
+
+class VoyageEta(BaseModel):
+    voyage_id: int
+    route_id: int
+    vessel_id: int
+    status: str
+    departure_datetime: Optional[datetime] = None
+    # arrival_datetime del viaje: la llegada programada mientras está en curso
+    scheduled_arrival_datetime: Optional[datetime] = None
+    eta: Optional[datetime] = None
+    # position (última posición + velocidad histórica), history (salida + duración media),
+    # scheduled (llegada programada) o none
+    method: str
+    # Viajes completados de la route usados en la estimación
+    route_voyages: int = 0
+    # Desviación típica de la duración de la route, escalada a lo que queda de viaje
+    spread_hours: Optional[float] = None
+    remaining_distance_km: Optional[float] = None
+    last_position_at: Optional[datetime] = None
+    last_latitude: Optional[float] = None
+    last_longitude: Optional[float] = None
+
+
+class FleetEtaResponse(BaseModel):
+    computed_at: datetime
+    voyages: List[VoyageEta]
@@ -1,11 +1,15 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.models.user_models import UserResponse
 from app.security.jwt_utils import get_current_user
-from app.services.asset_service import AssetService
-from app.models.asset_models import AssetCreate, AssetUpdate, AssetResponse
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.asset_analytics_service import AssetAnalyticsService, DIMENSIONS, parse_group_by
+from app.services.asset_service import AssetService, ASSET_QUERY_SPEC
+from app.services.inspection_scheduler_service import InspectionSchedulerService
+from app.models.asset_models import AssetCreate, AssetUpdate, AssetResponse, AssetUtilizationResponse
 
 
 router = APIRouter(
@@ -34,16 +38,72 @@ async def create_asset(asset: AssetCreate):
         )
 
 
+@router.get(
+    path="/utilization",
+    summary="Container utilization analytics",
+    description=(
+        "Container counts and the share currently on open voyages, grouped by the requested "
+        "dimensions. Served from an in-memory aggregate kept up to date with asset writes; "
+        "on-voyage counts are refreshed every few seconds."
+    ),
+    response_model=AssetUtilizationResponse
+)
+async def get_asset_utilization(
+    group_by: Optional[str] = Query(
+        None, description=f"Comma-separated dimensions (default size,status): {', '.join(DIMENSIONS)}"
+    )
+):
+    try:
+        dimensions = parse_group_by(group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        asset_analytics_service = AssetAnalyticsService()
+        return await asset_analytics_service.get_utilization(dimensions)
+    except Exception as e:
+        logging.error(f"Error computing asset utilization: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing asset utilization: {str(e)}"
+        )
+
+
+@router.get(
+    path="/inspections/due",
+    summary="Get assets due for inspection",
+    description="Retrieves assets whose next inspection is overdue or due within the given number of days, earliest first",
+    response_model=List[AssetResponse],
+    responses=sparse_responses(AssetResponse, many=True)
+)
+async def get_assets_due_for_inspection(
+    days: int = Query(30, ge=0, le=3650, description="Include inspections due within this many days"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(AssetResponse))
+):
+    try:
+        inspection_scheduler_service = InspectionSchedulerService()
+        result = await inspection_scheduler_service.get_due_assets(days, limit, offset, fields=fields)
+        return sparse_response(result, fields)
+    except Exception as e:
+        logging.error(f"Error retrieving assets due for inspection: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving assets due for inspection: {str(e)}"
+        )
+
+
 @router.get(
     path="/{asset_id}",
     summary="Get asset by ID",
     description="Retrieves an asset by its ID",
-    response_model=AssetResponse
+    response_model=AssetResponse,
+    responses=sparse_responses(AssetResponse)
 )
-async def get_asset(asset_id: int):
+async def get_asset(asset_id: int, fields: Optional[List[str]] = Depends(fieldset(AssetResponse))):
     try:
         asset_service = AssetService()
-        asset = await asset_service.get_asset_by_id(asset_id)
+        asset = await asset_service.get_asset_by_id(asset_id, fields=fields)
 
         if not asset:
             raise HTTPException(
@@ -51,7 +111,7 @@ async def get_asset(asset_id: int):
                 detail=f"Asset with ID {asset_id} not found"
             )
 
-        return asset
+        return sparse_response(asset, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,15 +126,19 @@ async def get_asset(asset_id: int):
     path="",
     summary="Get all assets",
     description="Retrieves a paginated list of assets",
-    response_model=List[AssetResponse]
+    response_model=List[AssetResponse],
+    responses=sparse_responses(AssetResponse, many=True)
 )
 async def get_all_assets(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(AssetResponse)),
+    list_query: ListQuery = Depends(query_params(ASSET_QUERY_SPEC))
 ):
     try:
         asset_service = AssetService()
-        return await asset_service.get_all_assets(limit, offset)
+        result = await asset_service.get_all_assets(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving assets: {str(e)}")
         raise HTTPException(
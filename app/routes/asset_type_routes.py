@@ -1,9 +1,11 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
-from app.services.asset_type_service import AssetTypeService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.asset_type_service import AssetTypeService, ASSET_TYPE_QUERY_SPEC
 from app.models.asset_type_models import AssetTypeCreate, AssetTypeUpdate, AssetTypeResponse
 
 
@@ -37,12 +39,13 @@ async def create_asset_type(asset_type: AssetTypeCreate):
     path="/{asset_type_id}",
     summary="Get asset type by ID",
     description="Retrieves an asset type by its ID",
-    response_model=AssetTypeResponse
+    response_model=AssetTypeResponse,
+    responses=sparse_responses(AssetTypeResponse)
 )
-async def get_asset_type(asset_type_id: int):
+async def get_asset_type(asset_type_id: int, fields: Optional[List[str]] = Depends(fieldset(AssetTypeResponse))):
     try:
         asset_type_service = AssetTypeService()
-        asset_type = await asset_type_service.get_asset_type_by_id(asset_type_id)
+        asset_type = await asset_type_service.get_asset_type_by_id(asset_type_id, fields=fields)
 
         if not asset_type:
             raise HTTPException(
@@ -50,7 +53,7 @@ async def get_asset_type(asset_type_id: int):
                 detail=f"Asset type with ID {asset_type_id} not found"
             )
 
-        return asset_type
+        return sparse_response(asset_type, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -65,15 +68,19 @@ async def get_asset_type(asset_type_id: int):
     path="",
     summary="Get all asset types",
     description="Retrieves all asset types with pagination",
-    response_model=List[AssetTypeResponse]
+    response_model=List[AssetTypeResponse],
+    responses=sparse_responses(AssetTypeResponse, many=True)
 )
 async def get_all_asset_types(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(AssetTypeResponse)),
+    list_query: ListQuery = Depends(query_params(ASSET_TYPE_QUERY_SPEC))
 ):
     try:
         asset_type_service = AssetTypeService()
-        return await asset_type_service.get_all_asset_types(limit, offset)
+        result = await asset_type_service.get_all_asset_types(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving asset types: {str(e)}")
         raise HTTPException(
@@ -85,7 +92,10 @@ async def get_all_asset_types(
 @router.put(
     path="/{asset_type_id}",
     summary="Update asset type",
-    description="Updates an existing asset type",
+    description=(
+        "Updates an existing asset type. Send inspection_interval_months as null to go back to the default "
+        "interval; changing it recalculates the next inspection date of every asset of this type in the background"
+    ),
     response_model=AssetTypeResponse
 )
 async def update_asset_type(asset_type_id: int, asset_type: AssetTypeUpdate):
@@ -1,10 +1,12 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.bill_of_lading_service import BillOfLadingService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.bill_of_lading_service import BillOfLadingService, BILL_OF_LADING_QUERY_SPEC
 from app.models.bill_of_lading_models import BillOfLadingCreate, BillOfLadingUpdate, BillOfLadingResponse
 
 
@@ -38,12 +40,13 @@ async def create_bill_of_lading(bill: BillOfLadingCreate):
     path="/{bill_id}",
     summary="Get bill of lading by ID",
     description="Retrieves a bill of lading by its ID",
-    response_model=BillOfLadingResponse
+    response_model=BillOfLadingResponse,
+    responses=sparse_responses(BillOfLadingResponse)
 )
-async def get_bill_of_lading(bill_id: int):
+async def get_bill_of_lading(bill_id: int, fields: Optional[List[str]] = Depends(fieldset(BillOfLadingResponse))):
     try:
         bill_service = BillOfLadingService()
-        bill = await bill_service.get_bill_of_lading_by_id(bill_id)
+        bill = await bill_service.get_bill_of_lading_by_id(bill_id, fields=fields)
 
         if not bill:
             raise HTTPException(
@@ -51,7 +54,7 @@ async def get_bill_of_lading(bill_id: int):
                 detail=f"Bill of lading with ID {bill_id} not found"
             )
 
-        return bill
+        return sparse_response(bill, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,12 +69,13 @@ async def get_bill_of_lading(bill_id: int):
     path="/bol-number/{bol_number}",
     summary="Get bill of lading by BOL number",
     description="Retrieves a bill of lading by its BOL number",
-    response_model=BillOfLadingResponse
+    response_model=BillOfLadingResponse,
+    responses=sparse_responses(BillOfLadingResponse)
 )
-async def get_bill_of_lading_by_number(bol_number: str):
+async def get_bill_of_lading_by_number(bol_number: str, fields: Optional[List[str]] = Depends(fieldset(BillOfLadingResponse))):
     try:
         bill_service = BillOfLadingService()
-        bill = await bill_service.get_bill_of_lading_by_bol_number(bol_number)
+        bill = await bill_service.get_bill_of_lading_by_bol_number(bol_number, fields=fields)
 
         if not bill:
             raise HTTPException(
@@ -79,7 +83,7 @@ async def get_bill_of_lading_by_number(bol_number: str):
                 detail=f"Bill of lading with BOL number {bol_number} not found"
             )
 
-        return bill
+        return sparse_response(bill, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -94,12 +98,13 @@ async def get_bill_of_lading_by_number(bol_number: str):
     path="/shipment/{shipment_id}",
     summary="Get bill of lading by shipment",
     description="Retrieves a bill of lading for a specific shipment",
-    response_model=BillOfLadingResponse
+    response_model=BillOfLadingResponse,
+    responses=sparse_responses(BillOfLadingResponse)
 )
-async def get_bill_of_lading_by_shipment(shipment_id: int):
+async def get_bill_of_lading_by_shipment(shipment_id: int, fields: Optional[List[str]] = Depends(fieldset(BillOfLadingResponse))):
     try:
         bill_service = BillOfLadingService()
-        bill = await bill_service.get_bill_of_lading_by_shipment(shipment_id)
+        bill = await bill_service.get_bill_of_lading_by_shipment(shipment_id, fields=fields)
 
         if not bill:
             raise HTTPException(
@@ -107,7 +112,7 @@ async def get_bill_of_lading_by_shipment(shipment_id: int):
                 detail=f"Bill of lading for shipment {shipment_id} not found"
             )
 
-        return bill
+        return sparse_response(bill, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -122,15 +127,19 @@ async def get_bill_of_lading_by_shipment(shipment_id: int):
     path="",
     summary="Get all bills of lading",
     description="Retrieves all bills of lading with pagination",
-    response_model=List[BillOfLadingResponse]
+    response_model=List[BillOfLadingResponse],
+    responses=sparse_responses(BillOfLadingResponse, many=True)
 )
 async def get_all_bills_of_lading(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(BillOfLadingResponse)),
+    list_query: ListQuery = Depends(query_params(BILL_OF_LADING_QUERY_SPEC))
 ):
     try:
         bill_service = BillOfLadingService()
-        return await bill_service.get_all_bills_of_lading(limit, offset)
+        result = await bill_service.get_all_bills_of_lading(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving bills of lading: {str(e)}")
         raise HTTPException(
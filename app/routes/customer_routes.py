@@ -1,10 +1,12 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.customer_service import CustomerService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.customer_service import CustomerService, CUSTOMER_QUERY_SPEC
 from app.models.customer_models import CustomerCreate, CustomerUpdate, CustomerResponse
 
 
@@ -38,12 +40,13 @@ async def create_customer(customer: CustomerCreate):
     path="/{customer_id}",
     summary="Get customer by ID",
     description="Retrieves a customer by their ID",
-    response_model=CustomerResponse
+    response_model=CustomerResponse,
+    responses=sparse_responses(CustomerResponse)
 )
-async def get_customer(customer_id: int):
+async def get_customer(customer_id: int, fields: Optional[List[str]] = Depends(fieldset(CustomerResponse))):
     try:
         customer_service = CustomerService()
-        customer = await customer_service.get_customer_by_id(customer_id)
+        customer = await customer_service.get_customer_by_id(customer_id, fields=fields)
 
         if not customer:
             raise HTTPException(
@@ -51,7 +54,7 @@ async def get_customer(customer_id: int):
                 detail=f"Customer with ID {customer_id} not found"
             )
 
-        return customer
+        return sparse_response(customer, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,15 +69,19 @@ async def get_customer(customer_id: int):
     path="",
     summary="Get all customers",
     description="Retrieves a paginated list of customers",
-    response_model=List[CustomerResponse]
+    response_model=List[CustomerResponse],
+    responses=sparse_responses(CustomerResponse, many=True)
 )
 async def get_all_customers(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(CustomerResponse)),
+    list_query: ListQuery = Depends(query_params(CUSTOMER_QUERY_SPEC))
 ):
     try:
         customer_service = CustomerService()
-        return await customer_service.get_all_customers(limit, offset)
+        result = await customer_service.get_all_customers(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving customers: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.security.jwt_utils import get_current_admin
+
+from app.diagnostics.sampling_profiler import (
+    SamplingProfiler,
+    ProfilerBusyError,
+    MAX_PROFILE_SECONDS,
+    DEFAULT_INTERVAL_MS,
+    acquire_session,
+    release_session,
+    request_profiles,
+)
+
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["Diagnostics"],
+    dependencies=[Depends(get_current_admin)]
+)
+
+
+@router.get(
+    path="/profile",
+    summary="Profile this worker",
+    description=(
+        "Runs a statistical sampling profiler on the current worker for N seconds and returns "
+        "the profile as collapsed stacks (flamegraph.pl / speedscope format) or as a JSON summary"
+    )
+)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS, description="Sampling duration in seconds"),
+    interval_ms: float = Query(DEFAULT_INTERVAL_MS, ge=0.5, le=1000, description="Sampling interval in milliseconds"),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$", description="Output format")
+):
+    try:
+        acquire_session()
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    try:
+        profiler = SamplingProfiler(interval=interval_ms / 1000.0).start()
+        try:
+            # El event loop sigue atendiendo requests mientras el hilo muestrea
+            await asyncio.sleep(seconds)
+        finally:
+            profile = profiler.stop()
+    except Exception as e:
+        logging.error(f"Error profiling worker: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error profiling worker: {str(e)}"
+        )
+    finally:
+        release_session()
+
+    if format == "json":
+        return profile.summary(limit=50)
+    return PlainTextResponse(profile.collapsed())
+
+
+@router.get(
+    path="/profile/requests/{profile_id}",
+    summary="Get a request profile",
+    description="Returns the collapsed-stack profile captured for a request sent with the X-Profile-Request header"
+)
+async def get_request_profile(
+    profile_id: str,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$", description="Output format")
+):
+    stored = request_profiles.get(profile_id)
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Request profile {profile_id} not found"
+        )
+    path, profile = stored
+    if format == "json":
+        return {"path": path, **profile.summary(limit=50)}
+    return PlainTextResponse(profile.collapsed())
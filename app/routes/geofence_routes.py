@@ -0,0 +1,36 @@
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Query, Depends
+
+from app.security.jwt_utils import get_current_admin
+
+from app.services.geofence_service import GeofenceService
+from app.models.geofence_models import GeofenceRunResult
+
+
+router = APIRouter(
+    prefix="/geofences",
+    tags=["Geofences"],
+    dependencies=[Depends(get_current_admin)]
+)
+
+
+@router.post(
+    path="/run",
+    summary="Run a geofence pass",
+    description=(
+        "Processes the next batch of tracker positions against the location geofences and records "
+        "geofence_enter/geofence_exit tracking events. Safe to call while the background engine runs."
+    ),
+    response_model=GeofenceRunResult
+)
+async def run_geofence_pass(batch_size: Optional[int] = Query(None, ge=1, le=50000)):
+    try:
+        geofence_service = GeofenceService()
+        return await geofence_service.process_new_positions(batch_size)
+    except Exception as e:
+        logging.error(f"Error running geofence pass: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error running geofence pass: {str(e)}"
+        )
@@ -1,10 +1,14 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.location_service import LocationService
+from app.services.autocomplete_service import AutocompleteService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.location_service import LocationService, LOCATION_QUERY_SPEC
+from app.models.search_models import AutocompleteResponse
 from app.models.location_models import LocationCreate, LocationUpdate, LocationResponse
 
 
@@ -34,16 +38,43 @@ async def create_location(location: LocationCreate):
         )
 
 
+@router.get(
+    path="/autocomplete",
+    summary="Autocomplete locations",
+    description=(
+        "Top matches for a location name prefix, for pickers that query on every keystroke. Names also "
+        "match from any word after those that start with the prefix."
+    ),
+    response_model=AutocompleteResponse
+)
+async def autocomplete_locations(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    try:
+        autocomplete_service = AutocompleteService()
+        return await autocomplete_service.complete("location", "location_name", q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error autocompleting locations: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error autocompleting locations: {str(e)}"
+        )
+
+
 @router.get(
     path="/{location_id}",
     summary="Get location by ID",
     description="Retrieves a location by its ID",
-    response_model=LocationResponse
+    response_model=LocationResponse,
+    responses=sparse_responses(LocationResponse)
 )
-async def get_location(location_id: int):
+async def get_location(location_id: int, fields: Optional[List[str]] = Depends(fieldset(LocationResponse))):
     try:
         location_service = LocationService()
-        location = await location_service.get_location_by_id(location_id)
+        location = await location_service.get_location_by_id(location_id, fields=fields)
 
         if not location:
             raise HTTPException(
@@ -51,7 +82,7 @@ async def get_location(location_id: int):
                 detail=f"Location with ID {location_id} not found"
             )
 
-        return location
+        return sparse_response(location, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,15 +97,19 @@ async def get_location(location_id: int):
     path="",
     summary="Get all locations",
     description="Retrieves a paginated list of locations",
-    response_model=List[LocationResponse]
+    response_model=List[LocationResponse],
+    responses=sparse_responses(LocationResponse, many=True)
 )
 async def get_all_locations(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(LocationResponse)),
+    list_query: ListQuery = Depends(query_params(LOCATION_QUERY_SPEC))
 ):
     try:
         location_service = LocationService()
-        return await location_service.get_all_locations(limit, offset)
+        result = await location_service.get_all_locations(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving locations: {str(e)}")
         raise HTTPException(
@@ -86,7 +121,10 @@ async def get_all_locations(
 @router.put(
     path="/{location_id}",
     summary="Update location",
-    description="Updates an existing location",
+    description=(
+        "Updates an existing location. Send latitude, longitude, geofence_radius_m or geofence_polygon as null "
+        "to clear them; omitted fields are left unchanged"
+    ),
     response_model=LocationResponse
 )
 async def update_location(location_id: int, location: LocationUpdate):
@@ -1,16 +1,26 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
-from app.services.maintenance_part_service import MaintenancePartService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.maintenance_part_service import (
+    InsufficientStockError,
+    MaintenancePartService,
+    MAINTENANCE_PART_QUERY_SPEC,
+)
 from app.models.maintenance_part_models import (
+    MaintenanceKitCreate,
     MaintenancePartCreate,
     MaintenancePartUpdate,
     MaintenancePartResponse,
 )
 
 
+# Las filas de maintenance_parts se identifican por la clave compuesta
+maintenance_part_fields = fieldset(MaintenancePartResponse, ("maintenance_id", "spare_part_id"))
+
 router = APIRouter(
     prefix="/maintenance-parts",
     tags=["Maintenance Parts"],
@@ -29,6 +39,10 @@ async def create_maintenance_part(item: MaintenancePartCreate):
     try:
         service = MaintenancePartService()
         return await service.create_maintenance_part(item)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logging.error(f"Error creating maintenance part: {str(e)}")
         raise HTTPException(
@@ -37,20 +51,50 @@ async def create_maintenance_part(item: MaintenancePartCreate):
         )
 
 
+@router.post(
+    path="/kit",
+    summary="Consume a kit of spare parts",
+    description=(
+        "Records the consumption of several spare parts for one maintenance in a single transaction, "
+        "decrementing stock atomically. Either every part is consumed or none is; parts without a "
+        "cost use the spare part's current unit cost."
+    ),
+    response_model=List[MaintenancePartResponse],
+    status_code=status.HTTP_201_CREATED
+)
+async def consume_maintenance_kit(kit: MaintenanceKitCreate):
+    try:
+        service = MaintenancePartService()
+        return await service.consume_kit(kit)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error consuming maintenance kit: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error consuming maintenance kit: {str(e)}"
+        )
+
+
 @router.get(
     path="/maintenance/{maintenance_id}",
     summary="Get parts consumed by maintenance",
     description="Retrieves all maintenance part consumptions for a maintenance",
-    response_model=List[MaintenancePartResponse]
+    response_model=List[MaintenancePartResponse],
+    responses=sparse_responses(MaintenancePartResponse, many=True)
 )
 async def get_by_maintenance(
     maintenance_id: int,
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(maintenance_part_fields)
 ):
     try:
         service = MaintenancePartService()
-        return await service.get_maintenance_parts_by_maintenance(maintenance_id, limit, offset)
+        result = await service.get_maintenance_parts_by_maintenance(maintenance_id, limit, offset, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenance parts by maintenance: {str(e)}")
         raise HTTPException(
@@ -63,16 +107,19 @@ async def get_by_maintenance(
     path="/spare-part/{spare_part_id}",
     summary="Get maintenance consumptions by spare part",
     description="Retrieves all maintenance part consumptions for a spare part",
-    response_model=List[MaintenancePartResponse]
+    response_model=List[MaintenancePartResponse],
+    responses=sparse_responses(MaintenancePartResponse, many=True)
 )
 async def get_by_spare_part(
     spare_part_id: int,
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(maintenance_part_fields)
 ):
     try:
         service = MaintenancePartService()
-        return await service.get_maintenance_parts_by_spare_part(spare_part_id, limit, offset)
+        result = await service.get_maintenance_parts_by_spare_part(spare_part_id, limit, offset, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenance parts by spare part: {str(e)}")
         raise HTTPException(
@@ -85,15 +132,19 @@ async def get_by_spare_part(
     path="",
     summary="Get all maintenance part consumptions",
     description="Retrieves all maintenance part consumptions with pagination",
-    response_model=List[MaintenancePartResponse]
+    response_model=List[MaintenancePartResponse],
+    responses=sparse_responses(MaintenancePartResponse, many=True)
 )
 async def get_all(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(maintenance_part_fields),
+    list_query: ListQuery = Depends(query_params(MAINTENANCE_PART_QUERY_SPEC))
 ):
     try:
         service = MaintenancePartService()
-        return await service.get_all_maintenance_parts(limit, offset)
+        result = await service.get_all_maintenance_parts(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenance parts: {str(e)}")
         raise HTTPException(
@@ -122,6 +173,10 @@ async def update_maintenance_part(maintenance_id: int, spare_part_id: int, item:
         return updated
     except HTTPException:
         raise
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logging.error(f"Error updating maintenance part: {str(e)}")
         raise HTTPException(
@@ -152,12 +207,13 @@ async def delete_maintenance_part(maintenance_id: int, spare_part_id: int):
     path="/{maintenance_id}/{spare_part_id}",
     summary="Get maintenance part by IDs",
     description="Retrieves a maintenance part consumption by maintenance and spare part IDs",
-    response_model=MaintenancePartResponse
+    response_model=MaintenancePartResponse,
+    responses=sparse_responses(MaintenancePartResponse)
 )
-async def get_maintenance_part(maintenance_id: int, spare_part_id: int):
+async def get_maintenance_part(maintenance_id: int, spare_part_id: int, fields: Optional[List[str]] = Depends(maintenance_part_fields)):
     try:
         service = MaintenancePartService()
-        item = await service.get_maintenance_part(maintenance_id, spare_part_id)
+        item = await service.get_maintenance_part(maintenance_id, spare_part_id, fields=fields)
 
         if not item:
             raise HTTPException(
@@ -165,7 +221,7 @@ async def get_maintenance_part(maintenance_id: int, spare_part_id: int):
                 detail=f"Maintenance part with maintenance_id={maintenance_id} and spare_part_id={spare_part_id} not found"
             )
 
-        return item
+        return sparse_response(item, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,11 +1,15 @@
 import logging
-from typing import List
+from datetime import date
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.maintenance_service import MaintenanceService
-from app.models.maintenance_models import MaintenanceCreate, MaintenanceUpdate, MaintenanceResponse
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.maintenance_cost_service import MaintenanceCostService, DIMENSIONS, parse_group_by
+from app.services.maintenance_service import MaintenanceService, MAINTENANCE_QUERY_SPEC
+from app.models.maintenance_models import MaintenanceCreate, MaintenanceUpdate, MaintenanceResponse, MaintenanceCostResponse
 
 
 router = APIRouter(
@@ -34,16 +38,56 @@ async def create_maintenance(maintenance: MaintenanceCreate):
         )
 
 
+@router.get(
+    path="/costs",
+    summary="Maintenance cost rollup",
+    description=(
+        "Total maintenance cost (labor plus consumed parts) grouped by asset, asset type, provider "
+        "and/or month. Served from summary tables maintained on every maintenance and part write; "
+        "without an asset filter or asset grouping it reads a per-asset-type summary. "
+        "Totals cover every matching group; truncated is true when more groups than limit exist."
+    ),
+    response_model=MaintenanceCostResponse
+)
+async def get_maintenance_costs(
+    group_by: Optional[str] = Query(
+        None, description=f"Comma-separated dimensions (default month): {', '.join(DIMENSIONS)}"
+    ),
+    date_from: Optional[date] = Query(None, alias="from", description="First month to include (any day of the month)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last month to include (any day of the month)"),
+    asset_id: Optional[int] = Query(None),
+    asset_type_id: Optional[int] = Query(None),
+    service_provider: Optional[str] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of groups to return")
+):
+    try:
+        dimensions = parse_group_by(group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        maintenance_cost_service = MaintenanceCostService()
+        return await maintenance_cost_service.get_costs(
+            dimensions, date_from, date_to, asset_id, asset_type_id, service_provider, limit
+        )
+    except Exception as e:
+        logging.error(f"Error retrieving maintenance costs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving maintenance costs: {str(e)}"
+        )
+
+
 @router.get(
     path="/{maintenance_id}",
     summary="Get maintenance by ID",
     description="Retrieves a maintenance record by its ID",
-    response_model=MaintenanceResponse
+    response_model=MaintenanceResponse,
+    responses=sparse_responses(MaintenanceResponse)
 )
-async def get_maintenance(maintenance_id: int):
+async def get_maintenance(maintenance_id: int, fields: Optional[List[str]] = Depends(fieldset(MaintenanceResponse))):
     try:
         maintenance_service = MaintenanceService()
-        maintenance = await maintenance_service.get_maintenance_by_id(maintenance_id)
+        maintenance = await maintenance_service.get_maintenance_by_id(maintenance_id, fields=fields)
 
         if not maintenance:
             raise HTTPException(
@@ -51,7 +95,7 @@ async def get_maintenance(maintenance_id: int):
                 detail=f"Maintenance with ID {maintenance_id} not found"
             )
 
-        return maintenance
+        return sparse_response(maintenance, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,16 +110,19 @@ async def get_maintenance(maintenance_id: int):
     path="/asset/{asset_id}",
     summary="Get maintenances by asset",
     description="Retrieves all maintenance records for a specific asset",
-    response_model=List[MaintenanceResponse]
+    response_model=List[MaintenanceResponse],
+    responses=sparse_responses(MaintenanceResponse, many=True)
 )
 async def get_maintenances_by_asset(
     asset_id: int,
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(MaintenanceResponse))
 ):
     try:
         maintenance_service = MaintenanceService()
-        return await maintenance_service.get_maintenances_by_asset(asset_id, limit, offset)
+        result = await maintenance_service.get_maintenances_by_asset(asset_id, limit, offset, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenances: {str(e)}")
         raise HTTPException(
@@ -88,16 +135,19 @@ async def get_maintenances_by_asset(
     path="/status/{status}",
     summary="Get maintenances by status",
     description="Retrieves all maintenance records with a specific status",
-    response_model=List[MaintenanceResponse]
+    response_model=List[MaintenanceResponse],
+    responses=sparse_responses(MaintenanceResponse, many=True)
 )
 async def get_maintenances_by_status(
     status: str,
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(MaintenanceResponse))
 ):
     try:
         maintenance_service = MaintenanceService()
-        return await maintenance_service.get_maintenances_by_status(status, limit, offset)
+        result = await maintenance_service.get_maintenances_by_status(status, limit, offset, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenances by status: {str(e)}")
         raise HTTPException(
@@ -110,16 +160,19 @@ async def get_maintenances_by_status(
     path="/type/{maintenance_type}",
     summary="Get maintenances by type",
     description="Retrieves all maintenance records of a specific type",
-    response_model=List[MaintenanceResponse]
+    response_model=List[MaintenanceResponse],
+    responses=sparse_responses(MaintenanceResponse, many=True)
 )
 async def get_maintenances_by_type(
     maintenance_type: str,
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(MaintenanceResponse))
 ):
     try:
         maintenance_service = MaintenanceService()
-        return await maintenance_service.get_maintenances_by_type(maintenance_type, limit, offset)
+        result = await maintenance_service.get_maintenances_by_type(maintenance_type, limit, offset, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenances by type: {str(e)}")
         raise HTTPException(
@@ -132,15 +185,19 @@ async def get_maintenances_by_type(
     path="",
     summary="Get all maintenances",
     description="Retrieves a paginated list of maintenance records",
-    response_model=List[MaintenanceResponse]
+    response_model=List[MaintenanceResponse],
+    responses=sparse_responses(MaintenanceResponse, many=True)
 )
 async def get_all_maintenances(
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(MaintenanceResponse)),
+    list_query: ListQuery = Depends(query_params(MAINTENANCE_QUERY_SPEC))
 ):
     try:
         maintenance_service = MaintenanceService()
-        return await maintenance_service.get_all_maintenances(limit, offset)
+        result = await maintenance_service.get_all_maintenances(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving maintenances: {str(e)}")
         raise HTTPException(
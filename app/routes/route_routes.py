@@ -1,11 +1,20 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.route_service import RouteService
-from app.models.route_models import RouteCreate, RouteUpdate, RouteResponse
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.route_graph_service import RouteGraphService
+from app.services.route_service import RouteService, ROUTE_QUERY_SPEC
+from app.models.route_models import (
+    RouteCreate,
+    RouteUpdate,
+    RouteResponse,
+    RoutePathResponse,
+    ReachabilityResponse,
+)
 
 
 router = APIRouter(
@@ -34,16 +43,77 @@ async def create_route(route: RouteCreate):
         )
 
 
+@router.get(
+    path="/path",
+    summary="Shortest itinerary between two locations",
+    description=(
+        "Shortest path over the route network, by number of legs (metric=hops) or by the average "
+        "duration of completed voyages (metric=duration). Optional via= locations turn it into a "
+        "multi-leg itinerary visited in order. Returns 404 when the destination is not reachable."
+    ),
+    response_model=RoutePathResponse
+)
+async def get_route_path(
+    origin: int = Query(..., alias="from", description="Origin location ID"),
+    destination: int = Query(..., alias="to", description="Destination location ID"),
+    via: Optional[List[int]] = Query(None, description="Intermediate location IDs, in order (repeatable)"),
+    metric: str = Query("hops", description="hops or duration")
+):
+    try:
+        route_graph_service = RouteGraphService()
+        path = await route_graph_service.find_path(origin, destination, via, metric)
+
+        if path is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No route from location {origin} to location {destination}"
+            )
+
+        return path
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error finding route path: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding route path: {str(e)}"
+        )
+
+
+@router.get(
+    path="/reachable",
+    summary="Locations reachable from an origin",
+    description="Locations reachable over the route network from an origin, with the minimum number of legs",
+    response_model=ReachabilityResponse
+)
+async def get_reachable_locations(
+    origin: int = Query(..., alias="from", description="Origin location ID"),
+    max_hops: Optional[int] = Query(None, ge=1, le=50)
+):
+    try:
+        route_graph_service = RouteGraphService()
+        return await route_graph_service.get_reachable(origin, max_hops)
+    except Exception as e:
+        logging.error(f"Error retrieving reachable locations: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving reachable locations: {str(e)}"
+        )
+
+
 @router.get(
     path="/{route_id}",
     summary="Get route by ID",
     description="Retrieves a route by its ID",
-    response_model=RouteResponse
+    response_model=RouteResponse,
+    responses=sparse_responses(RouteResponse)
 )
-async def get_route(route_id: int):
+async def get_route(route_id: int, fields: Optional[List[str]] = Depends(fieldset(RouteResponse))):
     try:
         route_service = RouteService()
-        route = await route_service.get_route_by_id(route_id)
+        route = await route_service.get_route_by_id(route_id, fields=fields)
 
         if not route:
             raise HTTPException(
@@ -51,7 +121,7 @@ async def get_route(route_id: int):
                 detail=f"Route with ID {route_id} not found"
             )
 
-        return route
+        return sparse_response(route, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,15 +136,19 @@ async def get_route(route_id: int):
     path="",
     summary="Get all routes",
     description="Retrieves a paginated list of routes",
-    response_model=List[RouteResponse]
+    response_model=List[RouteResponse],
+    responses=sparse_responses(RouteResponse, many=True)
 )
 async def get_all_routes(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(RouteResponse)),
+    list_query: ListQuery = Depends(query_params(ROUTE_QUERY_SPEC))
 ):
     try:
         route_service = RouteService()
-        return await route_service.get_all_routes(limit, offset)
+        result = await route_service.get_all_routes(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving routes: {str(e)}")
         raise HTTPException(
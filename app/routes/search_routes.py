@@ -0,0 +1,49 @@
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Query, Depends
+
+from app.security.jwt_utils import get_current_user
+
+from app.services.search_service import SearchService, SearchUnavailableError
+from app.models.search_models import SearchResponse
+
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"],
+    dependencies=[Depends(get_current_user)]
+)
+
+
+@router.get(
+    path="",
+    summary="Search shipments, customers, vessels and assets",
+    description=(
+        "Ranked search by tracking code, customer name or identification, vessel name, IMO/MMSI or "
+        "container code. Every word must match, either whole or as a prefix (e.g. 'MSC 93' or 'TRK-20')."
+    ),
+    response_model=SearchResponse
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(None, description="Comma-separated types: shipment, customer, vessel, asset"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else None
+    try:
+        search_service = SearchService()
+        return await search_service.search(q, kinds, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except SearchUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except Exception as e:
+        logging.error(f"Error searching: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching: {str(e)}"
+        )
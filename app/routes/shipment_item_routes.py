@@ -1,10 +1,12 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.shipment_item_service import ShipmentItemService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.shipment_item_service import ShipmentItemService, SHIPMENT_ITEM_QUERY_SPEC
 from app.models.shipment_item_models import ShipmentItemCreate, ShipmentItemUpdate, ShipmentItemResponse
 
 
@@ -38,12 +40,13 @@ async def create_shipment_item(item: ShipmentItemCreate):
     path="/{item_id}",
     summary="Get shipment item by ID",
     description="Retrieves a shipment item by its ID",
-    response_model=ShipmentItemResponse
+    response_model=ShipmentItemResponse,
+    responses=sparse_responses(ShipmentItemResponse)
 )
-async def get_shipment_item(item_id: int):
+async def get_shipment_item(item_id: int, fields: Optional[List[str]] = Depends(fieldset(ShipmentItemResponse))):
     try:
         item_service = ShipmentItemService()
-        item = await item_service.get_shipment_item_by_id(item_id)
+        item = await item_service.get_shipment_item_by_id(item_id, fields=fields)
 
         if not item:
             raise HTTPException(
@@ -51,7 +54,7 @@ async def get_shipment_item(item_id: int):
                 detail=f"Shipment item with ID {item_id} not found"
             )
 
-        return item
+        return sparse_response(item, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,12 +69,14 @@ async def get_shipment_item(item_id: int):
     path="/shipment/{shipment_id}",
     summary="Get shipment items by shipment",
     description="Retrieves all items for a specific shipment",
-    response_model=List[ShipmentItemResponse]
+    response_model=List[ShipmentItemResponse],
+    responses=sparse_responses(ShipmentItemResponse, many=True)
 )
-async def get_shipment_items_by_shipment(shipment_id: int):
+async def get_shipment_items_by_shipment(shipment_id: int, fields: Optional[List[str]] = Depends(fieldset(ShipmentItemResponse))):
     try:
         item_service = ShipmentItemService()
-        return await item_service.get_shipment_items_by_shipment(shipment_id)
+        result = await item_service.get_shipment_items_by_shipment(shipment_id, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving shipment items: {str(e)}")
         raise HTTPException(
@@ -84,12 +89,14 @@ async def get_shipment_items_by_shipment(shipment_id: int):
     path="/asset/{asset_id}",
     summary="Get shipment items by asset",
     description="Retrieves all shipment items for a specific asset",
-    response_model=List[ShipmentItemResponse]
+    response_model=List[ShipmentItemResponse],
+    responses=sparse_responses(ShipmentItemResponse, many=True)
 )
-async def get_shipment_items_by_asset(asset_id: int):
+async def get_shipment_items_by_asset(asset_id: int, fields: Optional[List[str]] = Depends(fieldset(ShipmentItemResponse))):
     try:
         item_service = ShipmentItemService()
-        return await item_service.get_shipment_items_by_asset(asset_id)
+        result = await item_service.get_shipment_items_by_asset(asset_id, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving shipment items: {str(e)}")
         raise HTTPException(
@@ -102,15 +109,19 @@ async def get_shipment_items_by_asset(asset_id: int):
     path="",
     summary="Get all shipment items",
     description="Retrieves all shipment items with pagination",
-    response_model=List[ShipmentItemResponse]
+    response_model=List[ShipmentItemResponse],
+    responses=sparse_responses(ShipmentItemResponse, many=True)
 )
 async def get_all_shipment_items(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(ShipmentItemResponse)),
+    list_query: ListQuery = Depends(query_params(SHIPMENT_ITEM_QUERY_SPEC))
 ):
     try:
         item_service = ShipmentItemService()
-        return await item_service.get_all_shipment_items(limit, offset)
+        result = await item_service.get_all_shipment_items(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving shipment items: {str(e)}")
         raise HTTPException(
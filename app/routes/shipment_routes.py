@@ -1,11 +1,21 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.shipment_service import ShipmentService
-from app.models.shipment_models import ShipmentCreate, ShipmentUpdate, ShipmentResponse
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.shipment_service import ShipmentService, SHIPMENT_QUERY_SPEC
+from app.services.shipment_timeline_service import ShipmentTimelineService
+from app.models.shipment_models import (
+    ShipmentCreate,
+    ShipmentUpdate,
+    ShipmentResponse,
+    ShipmentCompositeCreate,
+    ShipmentCompositeResponse,
+    ShipmentTimelinePage,
+)
 
 
 router = APIRouter(
@@ -34,16 +44,39 @@ async def create_shipment(shipment: ShipmentCreate):
         )
 
 
+@router.post(
+    path="/composite",
+    summary="Create a shipment with its items and bill of lading",
+    description=(
+        "Creates a shipment, all of its items and (optionally) its bill of lading in a single "
+        "transaction. If any part fails nothing is written"
+    ),
+    response_model=ShipmentCompositeResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_shipment_composite(composite: ShipmentCompositeCreate):
+    try:
+        shipment_service = ShipmentService()
+        return await shipment_service.create_shipment_composite(composite)
+    except Exception as e:
+        logging.error(f"Error creating composite shipment: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating composite shipment: {str(e)}"
+        )
+
+
 @router.get(
     path="/{shipment_id}",
     summary="Get shipment by ID",
     description="Retrieves a shipment by its ID",
-    response_model=ShipmentResponse
+    response_model=ShipmentResponse,
+    responses=sparse_responses(ShipmentResponse)
 )
-async def get_shipment(shipment_id: int):
+async def get_shipment(shipment_id: int, fields: Optional[List[str]] = Depends(fieldset(ShipmentResponse))):
     try:
         shipment_service = ShipmentService()
-        shipment = await shipment_service.get_shipment_by_id(shipment_id)
+        shipment = await shipment_service.get_shipment_by_id(shipment_id, fields=fields)
 
         if not shipment:
             raise HTTPException(
@@ -51,7 +84,7 @@ async def get_shipment(shipment_id: int):
                 detail=f"Shipment with ID {shipment_id} not found"
             )
 
-        return shipment
+        return sparse_response(shipment, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -62,16 +95,54 @@ async def get_shipment(shipment_id: int):
         )
 
 
+@router.get(
+    path="/{shipment_id}/timeline",
+    summary="Get shipment timeline",
+    description=(
+        "Returns the shipment's tracking events and the tracker messages linked to its bill of lading "
+        "or booking as a single chronological timeline, paginated with `next_cursor`"
+    ),
+    response_model=ShipmentTimelinePage
+)
+async def get_shipment_timeline(
+    shipment_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None)
+):
+    try:
+        timeline_service = ShipmentTimelineService()
+        timeline = await timeline_service.get_timeline(shipment_id, limit, cursor)
+
+        if not timeline:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Shipment with ID {shipment_id} not found"
+            )
+
+        return timeline
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error retrieving shipment timeline: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving shipment timeline: {str(e)}"
+        )
+
+
 @router.get(
     path="/tracking/{tracking_code}",
     summary="Get shipment by tracking code",
     description="Retrieves a shipment by its tracking code",
-    response_model=ShipmentResponse
+    response_model=ShipmentResponse,
+    responses=sparse_responses(ShipmentResponse)
 )
-async def get_shipment_by_tracking(tracking_code: str):
+async def get_shipment_by_tracking(tracking_code: str, fields: Optional[List[str]] = Depends(fieldset(ShipmentResponse))):
     try:
         shipment_service = ShipmentService()
-        shipment = await shipment_service.get_shipment_by_tracking_code(tracking_code)
+        shipment = await shipment_service.get_shipment_by_tracking_code(tracking_code, fields=fields)
 
         if not shipment:
             raise HTTPException(
@@ -79,7 +150,7 @@ async def get_shipment_by_tracking(tracking_code: str):
                 detail=f"Shipment with tracking code {tracking_code} not found"
             )
 
-        return shipment
+        return sparse_response(shipment, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -94,12 +165,14 @@ async def get_shipment_by_tracking(tracking_code: str):
     path="/customer/{customer_id}",
     summary="Get shipments by customer",
     description="Retrieves all shipments for a specific customer",
-    response_model=List[ShipmentResponse]
+    response_model=List[ShipmentResponse],
+    responses=sparse_responses(ShipmentResponse, many=True)
 )
-async def get_shipments_by_customer(customer_id: int):
+async def get_shipments_by_customer(customer_id: int, fields: Optional[List[str]] = Depends(fieldset(ShipmentResponse))):
     try:
         shipment_service = ShipmentService()
-        return await shipment_service.get_shipments_by_customer(customer_id)
+        result = await shipment_service.get_shipments_by_customer(customer_id, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving shipments: {str(e)}")
         raise HTTPException(
@@ -112,12 +185,14 @@ async def get_shipments_by_customer(customer_id: int):
     path="/voyage/{voyage_id}",
     summary="Get shipments by voyage",
     description="Retrieves all shipments for a specific voyage",
-    response_model=List[ShipmentResponse]
+    response_model=List[ShipmentResponse],
+    responses=sparse_responses(ShipmentResponse, many=True)
 )
-async def get_shipments_by_voyage(voyage_id: int):
+async def get_shipments_by_voyage(voyage_id: int, fields: Optional[List[str]] = Depends(fieldset(ShipmentResponse))):
     try:
         shipment_service = ShipmentService()
-        return await shipment_service.get_shipments_by_voyage(voyage_id)
+        result = await shipment_service.get_shipments_by_voyage(voyage_id, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving shipments by voyage: {str(e)}")
         raise HTTPException(
@@ -130,15 +205,19 @@ async def get_shipments_by_voyage(voyage_id: int):
     path="",
     summary="Get all shipments",
     description="Retrieves a paginated list of shipments",
-    response_model=List[ShipmentResponse]
+    response_model=List[ShipmentResponse],
+    responses=sparse_responses(ShipmentResponse, many=True)
 )
 async def get_all_shipments(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(ShipmentResponse)),
+    list_query: ListQuery = Depends(query_params(SHIPMENT_QUERY_SPEC))
 ):
     try:
         shipment_service = ShipmentService()
-        return await shipment_service.get_all_shipments(limit, offset)
+        result = await shipment_service.get_all_shipments(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving shipments: {str(e)}")
         raise HTTPException(
@@ -1,9 +1,11 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
-from app.services.spare_part_service import SparePartService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.spare_part_service import SparePartService, SPARE_PART_QUERY_SPEC
 from app.models.spare_part_models import SparePartCreate, SparePartUpdate, SparePartResponse
 
 
@@ -33,16 +35,42 @@ async def create_spare_part(part: SparePartCreate):
         )
 
 
+@router.get(
+    path="/low-stock",
+    summary="Get low stock spare parts",
+    description="Retrieves spare parts whose quantity is at or below the threshold, lowest stock first",
+    response_model=List[SparePartResponse],
+    responses=sparse_responses(SparePartResponse, many=True)
+)
+async def get_low_stock_spare_parts(
+    threshold: int = Query(default=5, ge=0, description="Include parts with quantity at or below this value"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(SparePartResponse))
+):
+    try:
+        service = SparePartService()
+        result = await service.get_low_stock_spare_parts(threshold, limit, offset, fields=fields)
+        return sparse_response(result, fields)
+    except Exception as e:
+        logging.error(f"Error retrieving low stock spare parts: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving low stock spare parts: {str(e)}"
+        )
+
+
 @router.get(
     path="/{part_id}",
     summary="Get spare part by ID",
     description="Retrieves a spare part by its ID",
-    response_model=SparePartResponse
+    response_model=SparePartResponse,
+    responses=sparse_responses(SparePartResponse)
 )
-async def get_spare_part(part_id: int):
+async def get_spare_part(part_id: int, fields: Optional[List[str]] = Depends(fieldset(SparePartResponse))):
     try:
         service = SparePartService()
-        part = await service.get_spare_part_by_id(part_id)
+        part = await service.get_spare_part_by_id(part_id, fields=fields)
 
         if not part:
             raise HTTPException(
@@ -50,7 +78,7 @@ async def get_spare_part(part_id: int):
                 detail=f"Spare part with ID {part_id} not found"
             )
 
-        return part
+        return sparse_response(part, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -65,15 +93,19 @@ async def get_spare_part(part_id: int):
     path="",
     summary="Get all spare parts",
     description="Retrieves all spare parts with pagination",
-    response_model=List[SparePartResponse]
+    response_model=List[SparePartResponse],
+    responses=sparse_responses(SparePartResponse, many=True)
 )
 async def get_all_spare_parts(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(SparePartResponse)),
+    list_query: ListQuery = Depends(query_params(SPARE_PART_QUERY_SPEC))
 ):
     try:
         service = SparePartService()
-        return await service.get_all_spare_parts(limit, offset)
+        result = await service.get_all_spare_parts(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving spare parts: {str(e)}")
         raise HTTPException(
@@ -1,12 +1,39 @@
 import logging
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Query, Depends
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Body, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.security.jwt_utils import get_current_user
+from app.security.jwt_utils import get_current_user, get_current_admin
+
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.geo_point_service import GEO_POINT_INTERVAL_SECONDS
+from app.services.tracker_event_service import TrackerEventService, TRACKER_EVENT_QUERY_SPEC
+from app.services.tracker_event_storage import is_timeseries
+from app.services.tracker_event_writer import IngestOverloadedError
+from app.services.tracker_rollup_service import TrackerRollupService
+from app.models.tracker_event_models import (
+    TrackerEventResponse,
+    TrackerEventIngest,
+    TrackerEventBatchResult,
+    TrackerTrackResponse,
+    TrackerEventPosition,
+    GeoPolygonQuery,
+    TrackerRollupRunResult,
+    RollupHistogram,
+)
+from app.geo.geojson import close_ring
 
-from app.services.tracker_event_service import TrackerEventService
-from app.models.tracker_event_models import TrackerEventResponse
 
+# Las colecciones time-series no admiten índices únicos: el descarte de duplicados es por
+# lectura previa y dos workers que ingieren el mismo evento a la vez pueden guardarlo dos veces
+INGEST_IDEMPOTENCY_NOTE = (
+    "Ingestion is deduplicated on (TrackerId, EventTime) on a best-effort basis: events already stored are "
+    "counted as duplicates, but the same event sent concurrently to different workers may be stored twice. "
+    if is_timeseries() else
+    "Ingestion is idempotent on (TrackerId, EventTime): events already stored are counted as duplicates. "
+)
 
 router = APIRouter(
     prefix="/tracker-events",
@@ -15,20 +42,86 @@ router = APIRouter(
 )
 
 
+@router.post(
+    path="/batch",
+    summary="Ingest a batch of tracker events",
+    description=(
+        "Validates an array of tracker events and writes them through a buffered bulk insert. "
+        + INGEST_IDEMPOTENCY_NOTE
+        + "With wait=false the events are only queued and 202 is returned. "
+        "warning is set while ingestion is degraded (for example, duplicates cannot be detected)"
+    ),
+    response_model=TrackerEventBatchResult,
+    status_code=status.HTTP_201_CREATED
+)
+async def ingest_tracker_events(
+    events: List[TrackerEventIngest] = Body(..., max_length=10000),
+    wait: bool = Query(True, description="Wait until the events are written to report duplicates")
+):
+    try:
+        tracker_event_service = TrackerEventService()
+        result = await tracker_event_service.ingest_tracker_events(events, wait)
+        if not wait:
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=result.model_dump())
+        return result
+    except IngestOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logging.error(f"Error ingesting tracker events: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error ingesting tracker events: {str(e)}"
+        )
+
+
+@router.get(
+    path="/stream",
+    summary="Stream new tracker events",
+    description=(
+        "Server-Sent Events feed of newly stored tracker events, for a comma-separated list of "
+        "TrackerIds or for the whole fleet when tracker_ids is omitted. Reconnecting with the "
+        "Last-Event-ID header replays the events missed in between"
+    )
+)
+async def stream_tracker_events(
+    tracker_ids: Optional[str] = Query(None, description="Comma-separated TrackerIds (omit for the whole fleet)"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    ids = _split_ids(tracker_ids)
+    if ids is not None and len(ids) > 500:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At most 500 tracker_ids can be streamed at once"
+        )
+    tracker_event_service = TrackerEventService()
+    return StreamingResponse(
+        tracker_event_service.stream_tracker_events(ids, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get(
     path="",
     summary="Get all tracker events",
     description="Retrieves a paginated list of all tracker events from MongoDB",
-    response_model=List[TrackerEventResponse]
+    response_model=List[TrackerEventResponse],
+    responses=sparse_responses(TrackerEventResponse, many=True)
 )
 async def get_all_tracker_events(
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(TrackerEventResponse)),
+    list_query: ListQuery = Depends(query_params(TRACKER_EVENT_QUERY_SPEC))
 ):
     try:
         tracker_event_service = TrackerEventService()
-        events = await tracker_event_service.get_all_tracker_events(limit, offset)
-        return events
+        events = await tracker_event_service.get_all_tracker_events(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(events, fields)
     except Exception as e:
         logging.error(f"Error retrieving tracker events: {str(e)}")
         raise HTTPException(
@@ -41,16 +134,18 @@ async def get_all_tracker_events(
     path="/tracker/{tracker_id}",
     summary="Get tracker events by TrackerId",
     description="Retrieves all tracker events for a specific TrackerId, sorted by EventTime (most recent first)",
-    response_model=List[TrackerEventResponse]
+    response_model=List[TrackerEventResponse],
+    responses=sparse_responses(TrackerEventResponse, many=True)
 )
 async def get_tracker_events_by_tracker_id(
     tracker_id: str,
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(TrackerEventResponse))
 ):
     try:
         tracker_event_service = TrackerEventService()
-        events = await tracker_event_service.get_tracker_events_by_tracker_id(tracker_id, limit, offset)
+        events = await tracker_event_service.get_tracker_events_by_tracker_id(tracker_id, limit, offset, fields=fields)
 
         if not events:
             raise HTTPException(
@@ -58,7 +153,7 @@ async def get_tracker_events_by_tracker_id(
                 detail=f"No events found for TrackerId: {tracker_id}"
             )
 
-        return events
+        return sparse_response(events, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -72,26 +167,28 @@ async def get_tracker_events_by_tracker_id(
     path="/tracker/{tracker_id}/date-range",
     summary="Get tracker events by TrackerId and date range",
     description="Retrieves tracker events for a specific TrackerId within a date range, sorted by EventTime (most recent first)",
-    response_model=List[TrackerEventResponse]
+    response_model=List[TrackerEventResponse],
+    responses=sparse_responses(TrackerEventResponse, many=True)
 )
 async def get_tracker_events_by_date_range(
     tracker_id: str,
     start_date: str = Query(None, description="Start date in YYYY-MM-DD format (defaults to today)"),
     end_date: str = Query(None, description="End date in YYYY-MM-DD format (defaults to today)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip")
+    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    fields: Optional[List[str]] = Depends(fieldset(TrackerEventResponse))
 ):
     try:
         tracker_event_service = TrackerEventService()
         events = await tracker_event_service.get_tracker_events_by_date_range(
-            tracker_id, start_date, end_date, limit, offset
+            tracker_id, start_date, end_date, limit, offset, fields=fields
         )
         if not events:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No events found for TrackerId: {tracker_id} in the specified date range"
             )
-        return events
+        return sparse_response(events, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -101,16 +198,222 @@ async def get_tracker_events_by_date_range(
             detail=f"Error retrieving tracker events: {str(e)}"
         )
 
+@router.get(
+    path="/tracker/{tracker_id}/track",
+    summary="Get simplified track of a tracker",
+    description=(
+        "Returns the path of a TrackerId within a date range, simplified server-side with Douglas-Peucker "
+        "(tolerance_m) and/or Visvalingam-Whyatt (max_points), as an Encoded Polyline or a GeoJSON LineString"
+    ),
+    response_model=TrackerTrackResponse,
+    response_model_exclude_none=True
+)
+async def get_tracker_track(
+    tracker_id: str,
+    start_date: str = Query(None, description="Start date in YYYY-MM-DD format (defaults to today)"),
+    end_date: str = Query(None, description="End date in YYYY-MM-DD format (defaults to today)"),
+    tolerance_m: Optional[float] = Query(25, ge=0, le=100000, description="Douglas-Peucker tolerance in meters (0 disables it)"),
+    max_points: Optional[int] = Query(None, ge=2, le=100000, description="Target number of points (Visvalingam-Whyatt)"),
+    encoding: str = Query("polyline", pattern="^(polyline|geojson)$", description="Output encoding"),
+    include_timestamps: bool = Query(False, description="Include the EventTime of every returned point")
+):
+    try:
+        tracker_event_service = TrackerEventService()
+        track = await tracker_event_service.get_tracker_track(
+            tracker_id, start_date, end_date, tolerance_m, max_points, encoding, include_timestamps
+        )
+        if not track.raw_points:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No positions found for TrackerId: {tracker_id} in the specified date range"
+            )
+        return track
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error retrieving tracker track: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving tracker track: {str(e)}"
+        )
+
+
+def _split_ids(tracker_ids: Optional[str]) -> Optional[List[str]]:
+    return [t.strip() for t in tracker_ids.split(",") if t.strip()] if tracker_ids else None
+
+
+GEO_LAG_NOTE = (
+    f". Positions written by the Hoopo relay are indexed asynchronously and may take up to "
+    f"{GEO_POINT_INTERVAL_SECONDS:g}s to appear"
+)
+
+
+@router.get(
+    path="/geo/near",
+    summary="Get tracker positions near a point",
+    description=(
+        "Returns tracker positions within radius_km of a point, closest first, optionally restricted to a time "
+        "range and to some TrackerIds. latest_per_tracker=true answers 'which trackers were near X'"
+        + GEO_LAG_NOTE
+    ),
+    response_model=List[TrackerEventPosition],
+    response_model_exclude_none=True
+)
+async def get_tracker_events_near(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=5000, description="Search radius in kilometers"),
+    start_time: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    end_time: Optional[datetime] = Query(None, description="Only events at or before this time"),
+    tracker_ids: Optional[str] = Query(None, description="Comma-separated TrackerIds"),
+    latest_per_tracker: bool = Query(False, description="Return only the latest position of each tracker"),
+    limit: int = Query(1000, ge=1, le=5000, description="Number of records to return")
+):
+    try:
+        tracker_event_service = TrackerEventService()
+        return await tracker_event_service.find_events_near(
+            latitude, longitude, radius_km, start_time, end_time, _split_ids(tracker_ids), limit, latest_per_tracker
+        )
+    except Exception as e:
+        logging.error(f"Error retrieving tracker events near point: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving tracker events: {str(e)}"
+        )
+
+
+@router.get(
+    path="/geo/bbox",
+    summary="Get tracker positions inside a bounding box",
+    description=(
+        "Returns tracker positions inside a map viewport, most recent first. A box with min_lon greater "
+        "than max_lon crosses the antimeridian; min_lon=-180 and max_lon=180 covers every longitude"
+        + GEO_LAG_NOTE
+    ),
+    response_model=List[TrackerEventPosition],
+    response_model_exclude_none=True
+)
+async def get_tracker_events_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    start_time: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    end_time: Optional[datetime] = Query(None, description="Only events at or before this time"),
+    tracker_ids: Optional[str] = Query(None, description="Comma-separated TrackerIds"),
+    limit: int = Query(1000, ge=1, le=5000, description="Number of records to return")
+):
+    if min_lat >= max_lat or min_lon == max_lon:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_lat must be lower than max_lat and min_lon must differ from max_lon"
+        )
+    try:
+        tracker_event_service = TrackerEventService()
+        return await tracker_event_service.find_events_in_bbox(
+            min_lat, min_lon, max_lat, max_lon, start_time, end_time, _split_ids(tracker_ids), limit
+        )
+    except Exception as e:
+        logging.error(f"Error retrieving tracker events in bbox: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving tracker events: {str(e)}"
+        )
+
+
+@router.post(
+    path="/geo/within",
+    summary="Get tracker positions inside a polygon",
+    description="Returns tracker positions inside a GeoJSON polygon ([longitude, latitude] rings), most recent first" + GEO_LAG_NOTE,
+    response_model=List[TrackerEventPosition],
+    response_model_exclude_none=True
+)
+async def get_tracker_events_within(query: GeoPolygonQuery):
+    rings = [close_ring(ring) for ring in query.coordinates]
+    if any(len(ring) < 4 for ring in rings):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each polygon ring needs at least 3 distinct positions"
+        )
+    try:
+        tracker_event_service = TrackerEventService()
+        return await tracker_event_service.find_events_within(
+            {"type": "Polygon", "coordinates": rings},
+            query.start_time, query.end_time, query.tracker_ids, query.limit
+        )
+    except Exception as e:
+        logging.error(f"Error retrieving tracker events within polygon: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving tracker events: {str(e)}"
+        )
+
+
+@router.get(
+    path="/rollups/histogram",
+    summary="Get tracker event histogram",
+    description=(
+        "Event counts per hour or day between start and end, served from the rollup buckets. "
+        "Optionally grouped by tracker, event type or alert and filtered by comma-separated tracker ids "
+        "and event types"
+    ),
+    response_model=RollupHistogram
+)
+async def get_rollup_histogram(
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    interval: str = Query("day", pattern="^(hour|day)$"),
+    group_by: Optional[str] = Query(None, pattern="^(tracker|event_type|alert)$"),
+    tracker_ids: Optional[str] = Query(None, description="Comma-separated tracker ids"),
+    event_types: Optional[str] = Query(None, description="Comma-separated event types")
+):
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end must be after start")
+    try:
+        rollup_service = TrackerRollupService()
+        return await rollup_service.get_histogram(
+            start, end, interval, group_by, _split_ids(tracker_ids), _split_ids(event_types)
+        )
+    except Exception as e:
+        logging.error(f"Error retrieving rollup histogram: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving rollup histogram: {str(e)}"
+        )
+
+
+@router.post(
+    path="/rollups/run",
+    summary="Run a rollup pass",
+    description="Applies the next batch of tracker events to the hourly and daily rollup buckets",
+    response_model=TrackerRollupRunResult,
+    dependencies=[Depends(get_current_admin)]
+)
+async def run_rollup_pass(batch_size: Optional[int] = Query(None, ge=1, le=100000)):
+    try:
+        rollup_service = TrackerRollupService()
+        return await rollup_service.process_new_events(batch_size)
+    except Exception as e:
+        logging.error(f"Error running rollup pass: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error running rollup pass: {str(e)}"
+        )
+
+
 @router.get(
     path="/event/{event_id}",
     summary="Get tracker event by ID",
     description="Retrieves a specific tracker event by its MongoDB _id",
-    response_model=TrackerEventResponse
+    response_model=TrackerEventResponse,
+    responses=sparse_responses(TrackerEventResponse)
 )
-async def get_tracker_event_by_id(event_id: str):
+async def get_tracker_event_by_id(event_id: str, fields: Optional[List[str]] = Depends(fieldset(TrackerEventResponse))):
     try:
         tracker_event_service = TrackerEventService()
-        event = await tracker_event_service.get_tracker_event_by_id(event_id)
+        event = await tracker_event_service.get_tracker_event_by_id(event_id, fields=fields)
 
         if not event:
             raise HTTPException(
@@ -118,7 +421,7 @@ async def get_tracker_event_by_id(event_id: str):
                 detail=f"Tracker event with ID {event_id} not found"
             )
 
-        return event
+        return sparse_response(event, fields)
     except HTTPException:
         raise
     except Exception as e:
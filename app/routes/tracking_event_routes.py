@@ -0,0 +1,197 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Body
+
+from app.security.jwt_utils import get_current_user
+
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.tracking_event_service import TrackingEventService
+from app.models.tracking_event_models import (
+    TrackingEventCreate,
+    TrackingEventUpdate,
+    TrackingEventResponse,
+    TrackingEventBatchResult,
+    TrackingEventPage,
+    ShipmentTimelines,
+)
+
+
+router = APIRouter(
+    prefix="/tracking-events",
+    tags=["Tracking Events"],
+    dependencies=[Depends(get_current_user)]
+)
+
+MAX_BATCH_EVENTS = 10000
+MAX_TIMELINE_SHIPMENTS = 500
+
+
+@router.post(
+    path="",
+    summary="Create a new tracking event",
+    description="Creates a new tracking event for a shipment",
+    response_model=TrackingEventResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_tracking_event(event: TrackingEventCreate):
+    try:
+        tracking_event_service = TrackingEventService()
+        return await tracking_event_service.create_tracking_event(event)
+    except Exception as e:
+        logging.error(f"Error creating tracking event: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating tracking event: {str(e)}"
+        )
+
+
+@router.post(
+    path="/batch",
+    summary="Create tracking events in bulk",
+    description=f"Inserts up to {MAX_BATCH_EVENTS} tracking events in a single transaction using multi-row inserts",
+    response_model=TrackingEventBatchResult,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_tracking_events(events: List[TrackingEventCreate] = Body(..., min_length=1, max_length=MAX_BATCH_EVENTS)):
+    try:
+        tracking_event_service = TrackingEventService()
+        return await tracking_event_service.create_tracking_events(events)
+    except Exception as e:
+        logging.error(f"Error creating tracking events: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating tracking events: {str(e)}"
+        )
+
+
+@router.get(
+    path="/timelines",
+    summary="Get timelines for several shipments",
+    description=(
+        "Returns the first events of each shipment in chronological order, for up to "
+        f"{MAX_TIMELINE_SHIPMENTS} comma-separated shipment ids, using a single query"
+    ),
+    response_model=ShipmentTimelines
+)
+async def get_shipment_timelines(
+    shipment_ids: str = Query(..., description="Comma-separated shipment ids"),
+    limit_per_shipment: int = Query(100, ge=1, le=1000)
+):
+    try:
+        ids = [int(part) for part in shipment_ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="shipment_ids must be comma-separated integers")
+    if not ids or len(ids) > MAX_TIMELINE_SHIPMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"shipment_ids must contain between 1 and {MAX_TIMELINE_SHIPMENTS} ids"
+        )
+    try:
+        tracking_event_service = TrackingEventService()
+        return await tracking_event_service.get_shipment_timelines(ids, limit_per_shipment)
+    except Exception as e:
+        logging.error(f"Error retrieving shipment timelines: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving shipment timelines: {str(e)}"
+        )
+
+
+@router.get(
+    path="/shipment/{shipment_id}",
+    summary="Get shipment timeline",
+    description="Retrieves the tracking events of a shipment in chronological order, paginated with `next_cursor`",
+    response_model=TrackingEventPage
+)
+async def get_shipment_timeline(
+    shipment_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None)
+):
+    try:
+        tracking_event_service = TrackingEventService()
+        return await tracking_event_service.get_shipment_timeline(shipment_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error retrieving shipment timeline: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving shipment timeline: {str(e)}"
+        )
+
+
+@router.get(
+    path="/{event_id}",
+    summary="Get tracking event by ID",
+    description="Retrieves a tracking event by its ID",
+    response_model=TrackingEventResponse,
+    responses=sparse_responses(TrackingEventResponse)
+)
+async def get_tracking_event(event_id: int, fields: Optional[List[str]] = Depends(fieldset(TrackingEventResponse))):
+    try:
+        tracking_event_service = TrackingEventService()
+        event = await tracking_event_service.get_tracking_event_by_id(event_id, fields=fields)
+
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tracking event with ID {event_id} not found"
+            )
+
+        return sparse_response(event, fields)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error retrieving tracking event: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving tracking event: {str(e)}"
+        )
+
+
+@router.put(
+    path="/{event_id}",
+    summary="Update tracking event",
+    description="Updates an existing tracking event",
+    response_model=TrackingEventResponse
+)
+async def update_tracking_event(event_id: int, event: TrackingEventUpdate):
+    try:
+        tracking_event_service = TrackingEventService()
+        updated_event = await tracking_event_service.update_tracking_event(event_id, event)
+
+        if not updated_event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tracking event with ID {event_id} not found"
+            )
+
+        return updated_event
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error updating tracking event: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating tracking event: {str(e)}"
+        )
+
+
+@router.delete(
+    path="/{event_id}",
+    summary="Delete tracking event",
+    description="Deletes a tracking event from the system",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_tracking_event(event_id: int):
+    try:
+        tracking_event_service = TrackingEventService()
+        await tracking_event_service.delete_tracking_event(event_id)
+        return None
+    except Exception as e:
+        logging.error(f"Error deleting tracking event: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting tracking event: {str(e)}"
+        )
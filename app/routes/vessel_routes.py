@@ -1,10 +1,14 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.vessel_service import VesselService
+from app.services.autocomplete_service import AutocompleteService
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.vessel_service import VesselService, VESSEL_QUERY_SPEC
+from app.models.search_models import AutocompleteResponse
 from app.models.vessel_models import VesselCreate, VesselUpdate, VesselResponse
 
 
@@ -34,16 +38,44 @@ async def create_vessel(vessel: VesselCreate):
         )
 
 
+@router.get(
+    path="/autocomplete",
+    summary="Autocomplete vessels",
+    description=(
+        "Top matches for a name or IMO prefix, for pickers that query on every keystroke. Names also "
+        "match from any word ('osc' finds 'MSC Oscar') after those that start with the prefix."
+    ),
+    response_model=AutocompleteResponse
+)
+async def autocomplete_vessels(
+    q: str = Query(..., min_length=1, max_length=100),
+    field: str = Query("vessel_name", description="vessel_name or imo_number"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    try:
+        autocomplete_service = AutocompleteService()
+        return await autocomplete_service.complete("vessel", field, q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error autocompleting vessels: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error autocompleting vessels: {str(e)}"
+        )
+
+
 @router.get(
     path="/{vessel_id}",
     summary="Get vessel by ID",
     description="Retrieves a vessel by its ID",
-    response_model=VesselResponse
+    response_model=VesselResponse,
+    responses=sparse_responses(VesselResponse)
 )
-async def get_vessel(vessel_id: int):
+async def get_vessel(vessel_id: int, fields: Optional[List[str]] = Depends(fieldset(VesselResponse))):
     try:
         vessel_service = VesselService()
-        vessel = await vessel_service.get_vessel_by_id(vessel_id)
+        vessel = await vessel_service.get_vessel_by_id(vessel_id, fields=fields)
 
         if not vessel:
             raise HTTPException(
@@ -51,7 +83,7 @@ async def get_vessel(vessel_id: int):
                 detail=f"Vessel with ID {vessel_id} not found"
             )
 
-        return vessel
+        return sparse_response(vessel, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,15 +98,19 @@ async def get_vessel(vessel_id: int):
     path="",
     summary="Get all vessels",
     description="Retrieves a paginated list of vessels",
-    response_model=List[VesselResponse]
+    response_model=List[VesselResponse],
+    responses=sparse_responses(VesselResponse, many=True)
 )
 async def get_all_vessels(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(VesselResponse)),
+    list_query: ListQuery = Depends(query_params(VESSEL_QUERY_SPEC))
 ):
     try:
         vessel_service = VesselService()
-        return await vessel_service.get_all_vessels(limit, offset)
+        result = await vessel_service.get_all_vessels(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving vessels: {str(e)}")
         raise HTTPException(
@@ -1,11 +1,14 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 
 from app.security.jwt_utils import get_current_user
 
-from app.services.voyage_service import VoyageService
-from app.models.voyage_models import VoyageCreate, VoyageUpdate, VoyageResponse
+from app.services.fieldsets import fieldset, sparse_response, sparse_responses
+from app.services.query_builder import ListQuery, query_params
+from app.services.voyage_eta_service import VoyageEtaService
+from app.services.voyage_service import VoyageService, VOYAGE_QUERY_SPEC
+from app.models.voyage_models import VoyageCreate, VoyageUpdate, VoyageResponse, VoyageEta, FleetEtaResponse
 
 
 router = APIRouter(
@@ -34,16 +37,39 @@ async def create_voyage(voyage: VoyageCreate):
         )
 
 
+@router.get(
+    path="/eta",
+    summary="ETA for all open voyages",
+    description=(
+        "Predicted arrival for every voyage that has not arrived yet. The ETA is derived from the "
+        "latest tracker position, the remaining great-circle distance and the route's historical "
+        "speed, falling back to departure plus average duration. Cached for a short time."
+    ),
+    response_model=FleetEtaResponse
+)
+async def get_fleet_etas():
+    try:
+        voyage_eta_service = VoyageEtaService()
+        return await voyage_eta_service.get_fleet_etas()
+    except Exception as e:
+        logging.error(f"Error computing voyage ETAs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing voyage ETAs: {str(e)}"
+        )
+
+
 @router.get(
     path="/{voyage_id}",
     summary="Get voyage by ID",
     description="Retrieves a voyage by its ID",
-    response_model=VoyageResponse
+    response_model=VoyageResponse,
+    responses=sparse_responses(VoyageResponse)
 )
-async def get_voyage(voyage_id: int):
+async def get_voyage(voyage_id: int, fields: Optional[List[str]] = Depends(fieldset(VoyageResponse))):
     try:
         voyage_service = VoyageService()
-        voyage = await voyage_service.get_voyage_by_id(voyage_id)
+        voyage = await voyage_service.get_voyage_by_id(voyage_id, fields=fields)
 
         if not voyage:
             raise HTTPException(
@@ -51,7 +77,7 @@ async def get_voyage(voyage_id: int):
                 detail=f"Voyage with ID {voyage_id} not found"
             )
 
-        return voyage
+        return sparse_response(voyage, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -66,12 +92,14 @@ async def get_voyage(voyage_id: int):
     path="/vessel/{vessel_id}",
     summary="Get voyages by vessel",
     description="Retrieves all voyages for a specific vessel",
-    response_model=List[VoyageResponse]
+    response_model=List[VoyageResponse],
+    responses=sparse_responses(VoyageResponse, many=True)
 )
-async def get_voyages_by_vessel(vessel_id: int):
+async def get_voyages_by_vessel(vessel_id: int, fields: Optional[List[str]] = Depends(fieldset(VoyageResponse))):
     try:
         voyage_service = VoyageService()
-        return await voyage_service.get_voyages_by_vessel(vessel_id)
+        result = await voyage_service.get_voyages_by_vessel(vessel_id, fields=fields)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving voyages: {str(e)}")
         raise HTTPException(
@@ -84,15 +112,19 @@ async def get_voyages_by_vessel(vessel_id: int):
     path="",
     summary="Get all voyages",
     description="Retrieves a paginated list of voyages",
-    response_model=List[VoyageResponse]
+    response_model=List[VoyageResponse],
+    responses=sparse_responses(VoyageResponse, many=True)
 )
 async def get_all_voyages(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    fields: Optional[List[str]] = Depends(fieldset(VoyageResponse)),
+    list_query: ListQuery = Depends(query_params(VOYAGE_QUERY_SPEC))
 ):
     try:
         voyage_service = VoyageService()
-        return await voyage_service.get_all_voyages(limit, offset)
+        result = await voyage_service.get_all_voyages(limit, offset, fields=fields, list_query=list_query)
+        return sparse_response(result, fields)
     except Exception as e:
         logging.error(f"Error retrieving voyages: {str(e)}")
         raise HTTPException(
@@ -101,6 +133,34 @@ async def get_all_voyages(
         )
 
 
+@router.get(
+    path="/{voyage_id}/eta",
+    summary="Get voyage ETA",
+    description="Predicted arrival of an open voyage (see GET /voyages/eta)",
+    response_model=VoyageEta
+)
+async def get_voyage_eta(voyage_id: int):
+    try:
+        voyage_eta_service = VoyageEtaService()
+        eta = await voyage_eta_service.get_voyage_eta(voyage_id)
+
+        if not eta:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No open voyage with ID {voyage_id}"
+            )
+
+        return eta
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error computing voyage ETA: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing voyage ETA: {str(e)}"
+        )
+
+
 @router.put(
     path="/{voyage_id}",
     summary="Update voyage",
@@ -0,0 +1,137 @@
+import heapq
+import re
+import unicodedata
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Prefijos (edge n-grams) que se indexan por token: más cortos devuelven demasiado y más
+# largos apenas filtran; una consulta más larga se resuelve con el prefijo máximo y se verifica
+MIN_PREFIX = 2
+MAX_PREFIX = 12
+# Una coincidencia de token completo puntúa más que cualquier prefijo del mismo campo
+PREFIX_FACTOR = 0.5
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+DocKey = Tuple[str, Hashable]
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin acentos, para que "Peña" y "pena" coincidan."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def words(text: Optional[str]) -> List[str]:
+    """Palabras alfanuméricas normalizadas, sin los tokens combinados de tokenize()."""
+    return _TOKEN_RE.findall(normalize(str(text))) if text else []
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Tokens alfanuméricos. Los códigos con separadores ("TRK-2024-0001") también se indexan
+    juntos para que se encuentren escritos con o sin guiones.
+    """
+    tokens = words(text)
+    if len(tokens) > 1 and not re.search(r"\s", str(text).strip()):
+        tokens.append("".join(tokens))
+    return tokens
+
+
+class SearchHit:
+    __slots__ = ("key", "score", "label", "detail")
+
+    def __init__(self, key: DocKey, score: float, label: str, detail: Optional[str]):
+        self.key = key
+        self.score = score
+        self.label = label
+        self.detail = detail
+
+
+class InvertedIndex:
+    """
+    Índice invertido en memoria sobre documentos de varios tipos (clave (tipo, id)). Cada
+    término apunta a los documentos que lo contienen con su peso: el token completo con el
+    boost del campo y sus prefijos con un peso menor, así una búsqueda "por el principio"
+    es una sola consulta a un dict. Las consultas exigen todos los términos (AND).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[DocKey, float]] = {}
+        self._doc_terms: Dict[DocKey, Set[str]] = {}
+        self._doc_tokens: Dict[DocKey, Set[str]] = {}
+        self._doc_labels: Dict[DocKey, Tuple[str, Optional[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._postings)
+
+    def add(self, key: DocKey, fields: Mapping[str, Tuple[Optional[str], float]], label: str, detail: Optional[str] = None):
+        """Indexa (o reemplaza) un documento; `fields` es nombre -> (texto, boost)."""
+        if key in self._doc_terms:
+            self.remove(key)
+        weights: Dict[str, float] = {}
+        tokens: Set[str] = set()
+        for text, boost in fields.values():
+            for token in tokenize(text):
+                tokens.add(token)
+                if weights.get(token, 0) < boost:
+                    weights[token] = boost
+                for length in range(MIN_PREFIX, min(len(token) - 1, MAX_PREFIX) + 1):
+                    prefix = token[:length]
+                    weight = boost * PREFIX_FACTOR * length / len(token)
+                    if weights.get(prefix, 0) < weight:
+                        weights[prefix] = weight
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[key] = weight
+        self._doc_terms[key] = set(weights)
+        self._doc_tokens[key] = tokens
+        self._doc_labels[key] = (label, detail)
+
+    def remove(self, key: DocKey):
+        for term in self._doc_terms.pop(key, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._doc_tokens.pop(key, None)
+        self._doc_labels.pop(key, None)
+
+    def _matches(self, term: str) -> Dict[DocKey, float]:
+        if len(term) <= MAX_PREFIX:
+            return self._postings.get(term, {})
+        # Más largo que los prefijos indexados: candidatos por el prefijo máximo y verificación
+        candidates = self._postings.get(term[:MAX_PREFIX], {})
+        matches = {}
+        for key, weight in candidates.items():
+            tokens = self._doc_tokens[key]
+            if term in tokens:
+                matches[key] = self._postings[term][key]
+            elif any(token.startswith(term) for token in tokens):
+                matches[key] = weight
+        return matches
+
+    def search(self, query: str, limit: int = 20, types: Optional[Iterable[str]] = None) -> List[SearchHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        postings = sorted((self._matches(term) for term in terms), key=len)
+        allowed = set(types) if types else None
+        scores: Dict[DocKey, float] = {}
+        for key, weight in postings[0].items():
+            if allowed is not None and key[0] not in allowed:
+                continue
+            total = weight
+            for other in postings[1:]:
+                extra = other.get(key)
+                if extra is None:
+                    break
+                total += extra
+            else:
+                scores[key] = total
+        # Empate: etiqueta más corta primero (la coincidencia cubre más del texto)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -len(self._doc_labels[item[0]][0])))
+        return [SearchHit(key, score, *self._doc_labels[key]) for key, score in best]
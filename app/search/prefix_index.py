@@ -0,0 +1,130 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.search.inverted_index import words
+
+
+def completion_key(text: Optional[str]) -> str:
+    """Clave normalizada: minúsculas, sin acentos y con un solo espacio entre palabras."""
+    return " ".join(words(text))
+
+
+class SortedKeys:
+    """
+    Array ordenado de claves con el id de su documento en un array paralelo de enteros. Un
+    prefijo es un rango contiguo: bisect encuentra el inicio en O(log n) y se recorre hasta k.
+    """
+
+    __slots__ = ("keys", "ids")
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.ids = array("q")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def load(self, pairs: Iterable[Tuple[str, int]]):
+        ordered = sorted(pairs)
+        self.keys = [key for key, _ in ordered]
+        self.ids = array("q", (doc_id for _, doc_id in ordered))
+
+    def insert(self, key: str, doc_id: int):
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key and self.ids[position] < doc_id:
+            position += 1
+        self.keys.insert(position, key)
+        self.ids.insert(position, doc_id)
+
+    def delete(self, key: str, doc_id: int):
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.ids[position] == doc_id:
+                del self.keys[position]
+                del self.ids[position]
+                return
+            position += 1
+
+    def scan(self, prefix: str) -> Iterator[int]:
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            yield self.ids[position]
+            position += 1
+
+
+class PrefixIndex:
+    """
+    Autocompletado de un campo. El texto completo va en un array y cada palabra interior en
+    otro, de modo que "osc" encuentra "MSC Oscar" pero detrás de los que empiezan por "osc".
+    Dentro de cada grupo el orden es alfabético.
+    """
+
+    def __init__(self):
+        self._whole = SortedKeys()
+        self._inner = SortedKeys()
+        # id -> (valor indexado, etiqueta a mostrar)
+        self._values: Dict[int, Tuple[str, Optional[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _keys(value: str) -> Tuple[str, List[str]]:
+        key = completion_key(value)
+        parts = key.split(" ")
+        inner = [" ".join(parts[i:]) for i in range(1, len(parts))]
+        return key, inner
+
+    def load(self, entries: Iterable[Tuple[int, Optional[str], Optional[str]]]):
+        """Carga completa (id, valor, etiqueta); ordenar una vez es mucho más barato que insertar."""
+        whole, inner = [], []
+        self._values = {}
+        for doc_id, value, label in entries:
+            if not value:
+                continue
+            key, inner_keys = self._keys(value)
+            if not key:
+                continue
+            self._values[doc_id] = (value, label)
+            whole.append((key, doc_id))
+            inner.extend((inner_key, doc_id) for inner_key in inner_keys)
+        self._whole.load(whole)
+        self._inner.load(inner)
+
+    def add(self, doc_id: int, value: Optional[str], label: Optional[str] = None):
+        self.remove(doc_id)
+        if not value:
+            return
+        key, inner_keys = self._keys(value)
+        if not key:
+            return
+        self._values[doc_id] = (value, label)
+        self._whole.insert(key, doc_id)
+        for inner_key in inner_keys:
+            self._inner.insert(inner_key, doc_id)
+
+    def remove(self, doc_id: int):
+        entry = self._values.pop(doc_id, None)
+        if entry is None:
+            return
+        key, inner_keys = self._keys(entry[0])
+        self._whole.delete(key, doc_id)
+        for inner_key in inner_keys:
+            self._inner.delete(inner_key, doc_id)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[int, str, Optional[str]]]:
+        key = completion_key(prefix)
+        if not key:
+            return []
+        seen = set()
+        results = []
+        for keys in (self._whole, self._inner):
+            for doc_id in keys.scan(key):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                results.append((doc_id, *self._values[doc_id]))
+                if len(results) >= limit:
+                    return results
+        return results
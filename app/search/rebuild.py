@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+RETRY_SECONDS = 30
+# Intentos de reconstrucción de un índice sin reaplicación (replay_writes = False) mientras sigan
+# llegando escrituras durante la lectura
+REBUILD_ATTEMPTS = 3
+
+
+class RebuildableIndex:
+    """
+    Índice en memoria que se reconstruye entero sin dejar de servir el anterior. Las subclases
+    definen cómo se construye (`build`), cómo se aplica un cambio (`apply`) y cómo se activa
+    (`activate`); los cambios se notifican con `record` y tienen la forma que defina la subclase.
+
+    Las escrituras recibidas durante la reconstrucción pueden ser posteriores a lo que se leyó:
+    - replay_writes = True: se guardan y se reaplican sobre el índice nuevo. Solo vale si aplicar
+      un cambio que ya estaba en la lectura no lo cuenta dos veces (altas y bajas por id).
+    - replay_writes = False (contadores): si hubo escrituras durante la lectura no se sabe cuáles
+      entraron en ella, así que se vuelve a leer; si siguen llegando se conserva el índice actual,
+      que se ha mantenido con los cambios, hasta la próxima reconstrucción.
+    """
+
+    name = "index"
+    replay_writes = True
+
+    def __init__(self):
+        self.ready = False
+        self.built_at: Optional[float] = None
+        self.version = 0
+        self._building = False
+        self._pending: List[Tuple[Any, ...]] = []
+
+    def apply(self, *change: Any):
+        """Aplica un cambio al índice activo o, si se pasa como último argumento, al índice en construcción."""
+        raise NotImplementedError
+
+    async def build(self) -> Any:
+        """Construye y devuelve un índice nuevo desde la base de datos, sin activarlo."""
+        raise NotImplementedError
+
+    def activate(self, target: Any):
+        raise NotImplementedError
+
+    def describe(self, target: Any) -> str:
+        return ""
+
+    def record(self, *change: Any):
+        self.version += 1
+        if self.replay_writes or self.ready:
+            self.apply(*change)
+        if self._building and self.replay_writes:
+            self._pending.append(change)
+
+    async def rebuild(self):
+        started = time.monotonic()
+        for _ in range(REBUILD_ATTEMPTS):
+            version = self.version
+            self._building = True
+            self._pending = []
+            try:
+                target = await self.build()
+                for change in self._pending:
+                    self.apply(*change, target)
+            finally:
+                self._building = False
+                self._pending = []
+            if self.replay_writes or self.version == version:
+                break
+        else:
+            if self.ready:
+                logging.warning(f"{self.name} rebuild skipped: writes kept arriving while it was read")
+                self.built_at = time.time()
+                return
+        self.activate(target)
+        self.ready = True
+        self.built_at = time.time()
+        logging.info(f"{self.name} built ({self.describe(target)}) in {time.monotonic() - started:.2f}s")
+
+
+class PeriodicRebuilder:
+    """Construye el índice al arrancar (en segundo plano) y lo reconstruye cada `refresh_seconds` (0: nunca)."""
+
+    def __init__(self, index: RebuildableIndex, refresh_seconds: float):
+        self.index = index
+        self.refresh_seconds = refresh_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.index.rebuild()
+                if self.refresh_seconds <= 0:
+                    return
+                await asyncio.sleep(self.refresh_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"{self.index.name} build failed: {str(e)}")
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -1,7 +1,5 @@
 import os
 import base64
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import unpad, pad
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -24,6 +22,10 @@ def _decode_key() -> bytes:
 
 
 def encrypt_text(plaintext: str) -> str:
+    # pycryptodome se importa en el primer uso para no penalizar el arranque
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+
     key = _decode_key()
 
     if not isinstance(plaintext, str):
@@ -41,6 +43,9 @@ def encrypt_text(plaintext: str) -> str:
 
 
 def decrypt_text(encrypted_b64: str) -> str:
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import unpad
+
     key = None
     try:
         key = _decode_key()
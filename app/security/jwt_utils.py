@@ -12,6 +12,8 @@ load_dotenv()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change_me_in_env")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "60"))
+# Emails con acceso a los endpoints administrativos (separados por coma)
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/antillean/api/auth/login")
 
@@ -51,3 +53,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if not user:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
     return user
+
+
+async def get_current_admin(user=Depends(get_current_user)):
+    if user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Acceso restringido a administradores")
+    return user
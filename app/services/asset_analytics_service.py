@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.models.asset_models import AssetResponse, AssetUtilizationGroup, AssetUtilizationResponse
+from app.search.rebuild import RebuildableIndex
+from app.services.database_service import DatabaseService
+
+# El cubo de assets se relee entero cada tanto (recoge las escrituras de otros workers y corrige
+# cualquier deriva); entre medias se mantiene con los deltas de AssetService
+ASSET_ANALYTICS_REBUILD_SECONDS = float(os.getenv("ASSET_ANALYTICS_REBUILD_SECONDS", "600"))
+# Los contenedores en viaje salen de los viajes abiertos, pocos: se recalculan con este TTL
+ASSET_ANALYTICS_ON_VOYAGE_SECONDS = float(os.getenv("ASSET_ANALYTICS_ON_VOYAGE_SECONDS", "30"))
+
+# Dimensión -> columna de assets (en el orden del índice assets_analytics_index)
+DIMENSIONS: Dict[str, str] = {
+    "size": "size",
+    "status": "status",
+    "condition": "`condition`",
+    "ownership": "ownership",
+    "category": "category",
+    "asset_type_id": "asset_type_id",
+}
+DEFAULT_GROUP_BY = ("size", "status")
+
+_SELECT_DIMENSIONS = ", ".join(f"a.{column}" for column in DIMENSIONS.values())
+
+CUBE_QUERY = f"""
+    SELECT {_SELECT_DIMENSIONS}, COUNT(*) AS total
+    FROM assets a
+    GROUP BY {_SELECT_DIMENSIONS}
+"""
+
+# Un contenedor está en viaje si algún item de un envío de un viaje abierto lo usa
+ON_VOYAGE_QUERY = f"""
+    SELECT {_SELECT_DIMENSIONS}, COUNT(DISTINCT a.id) AS on_voyage
+    FROM voyages v
+    JOIN shipments s ON s.voyage_id = v.id
+    JOIN shipment_items si ON si.shipment_id = s.id
+    JOIN assets a ON a.id = si.asset_id
+    WHERE v.departure_datetime <= %s AND (v.arrival_datetime IS NULL OR v.arrival_datetime > %s)
+    GROUP BY {_SELECT_DIMENSIONS}
+"""
+
+CubeKey = Tuple[Any, ...]
+
+
+def _value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _cube_key(row: Dict[str, Any]) -> CubeKey:
+    return tuple(_value(row.get(name)) for name in DIMENSIONS)
+
+
+def parse_group_by(group_by: Optional[str]) -> List[str]:
+    """Dimensiones pedidas (coma-separadas); ValueError si alguna no existe."""
+    names = [name.strip() for name in group_by.split(",") if name.strip()] if group_by else list(DEFAULT_GROUP_BY)
+    unknown = [name for name in names if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {', '.join(unknown)}. Allowed: {', '.join(DIMENSIONS)}")
+    return list(dict.fromkeys(names))
+
+
+class AssetCube(RebuildableIndex):
+    """
+    Número de assets por combinación de todas las dimensiones. Son pocas combinaciones (tamaños x
+    estados x condiciones x propiedad x categorías x tipos), así que cualquier agrupación que se
+    pida se resuelve sumando el cubo en memoria sin volver a MySQL. Los deltas son contadores, así
+    que no se reaplican sobre una lectura que quizá ya los incluye (ver RebuildableIndex).
+    """
+
+    name = "Asset cube"
+    replay_writes = False
+
+    def __init__(self):
+        super().__init__()
+        self.totals: Dict[CubeKey, int] = {}
+        self.on_voyage: Dict[CubeKey, int] = {}
+        self.on_voyage_at: Optional[float] = None
+        self.computed_at: Optional[datetime] = None
+
+    def apply(self, before: Optional[CubeKey], after: Optional[CubeKey], totals: Optional[Dict[CubeKey, int]] = None):
+        if totals is None:
+            totals = self.totals
+        if before == after:
+            return
+        if before is not None:
+            remaining = totals.get(before, 0) - 1
+            if remaining > 0:
+                totals[before] = remaining
+            else:
+                totals.pop(before, None)
+        if after is not None:
+            totals[after] = totals.get(after, 0) + 1
+
+    async def build(self) -> Dict[CubeKey, int]:
+        db_service = DatabaseService()
+        try:
+            await db_service.connect()
+            rows = await db_service.execute(CUBE_QUERY)
+        finally:
+            await db_service.disconnect()
+        return {_cube_key(row): row["total"] for row in rows}
+
+    def activate(self, target: Dict[CubeKey, int]):
+        self.totals = target
+
+    def describe(self, target: Dict[CubeKey, int]) -> str:
+        return f"{len(target)} combinations"
+
+    def rollup(self, group_by: Sequence[str]) -> List[AssetUtilizationGroup]:
+        positions = [list(DIMENSIONS).index(name) for name in group_by]
+        groups: Dict[CubeKey, List[int]] = {}
+        for source, column in ((self.totals, 0), (self.on_voyage, 1)):
+            for key, count in source.items():
+                group = tuple(key[position] for position in positions)
+                groups.setdefault(group, [0, 0])[column] += count
+        return [
+            AssetUtilizationGroup(
+                dimensions=dict(zip(group_by, group)),
+                total=total,
+                on_voyage=on_voyage,
+                utilization=round(on_voyage / total, 4) if total else 0.0
+            )
+            for group, (total, on_voyage) in sorted(
+                groups.items(), key=lambda item: tuple("" if value is None else str(value) for value in item[0])
+            )
+        ]
+
+
+_cube = AssetCube()
+_cube_lock = asyncio.Lock()
+
+
+def asset_analytics_changed(before: Optional[AssetResponse], after: Optional[AssetResponse]):
+    """Delta del cubo tras crear (before=None), modificar o borrar (after=None) un asset."""
+    _cube.record(
+        _cube_key(before.model_dump()) if before is not None else None,
+        _cube_key(after.model_dump()) if after is not None else None,
+    )
+
+
+class AssetAnalyticsService:
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def _refresh_on_voyage(self, now: datetime):
+        rows = await self.db_service.execute(ON_VOYAGE_QUERY, (now, now))
+        _cube.on_voyage = {_cube_key(row): row["on_voyage"] for row in rows}
+        _cube.on_voyage_at = time.monotonic()
+
+    async def get_utilization(self, group_by: Sequence[str]) -> AssetUtilizationResponse:
+        async with _cube_lock:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            rebuild = not _cube.ready or time.time() - _cube.built_at > ASSET_ANALYTICS_REBUILD_SECONDS
+            on_voyage = _cube.on_voyage_at is None or time.monotonic() - _cube.on_voyage_at > ASSET_ANALYTICS_ON_VOYAGE_SECONDS
+            if rebuild or on_voyage:
+                try:
+                    await self.db_service.connect()
+                    if rebuild:
+                        await _cube.rebuild()
+                    if on_voyage:
+                        await self._refresh_on_voyage(now)
+                    _cube.computed_at = now
+                except Exception as e:
+                    logging.error(f"Error computing asset utilization: {str(e)}")
+                    raise
+                finally:
+                    await self.db_service.disconnect()
+        groups = _cube.rollup(group_by)
+        return AssetUtilizationResponse(
+            group_by=list(group_by),
+            computed_at=_cube.computed_at,
+            total=sum(group.total for group in groups),
+            on_voyage=sum(group.on_voyage for group in groups),
+            groups=groups
+        )
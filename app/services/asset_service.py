@@ -1,9 +1,20 @@
 import logging
 from typing import List, Optional
+from app.services.asset_analytics_service import asset_analytics_changed
+from app.services.maintenance_cost_service import move_asset_costs
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.search_service import index_document, remove_document
 from app.models.asset_models import AssetCreate, AssetUpdate, AssetResponse
 
 
+ASSET_QUERY_SPEC = QuerySpec(
+    AssetResponse,
+    indexed={"id": (), "asset_code": (), "asset_type_id": (), "status": (), "condition": (), "next_inspection_due_at": ()},
+)
+
+
 class AssetService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -29,7 +40,10 @@ class AssetService:
             result = await self.db_service.execute(select_query, (asset.asset_code,))
 
             if result:
-                return AssetResponse(**result[0])
+                created = AssetResponse(**result[0])
+                index_document("asset", created)
+                asset_analytics_changed(None, created)
+                return created
             raise ValueError("Asset creation failed")
         except Exception as e:
             logging.error(f"Error creating asset: {str(e)}")
@@ -37,14 +51,14 @@ class AssetService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_asset_by_id(self, asset_id: int) -> Optional[AssetResponse]:
+    async def get_asset_by_id(self, asset_id: int, fields: Optional[List[str]] = None) -> Optional[AssetResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM assets WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM assets WHERE id = %s"
             result = await self.db_service.execute(query, (asset_id,))
 
             if result:
-                return AssetResponse(**result[0])
+                return build(AssetResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving asset: {str(e)}")
@@ -52,13 +66,13 @@ class AssetService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_assets(self, limit: int = 100, offset: int = 0) -> List[AssetResponse]:
+    async def get_all_assets(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[AssetResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM assets LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("assets", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [AssetResponse(**row) for row in result]
+            return [build(AssetResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving assets: {str(e)}")
             raise
@@ -115,10 +129,22 @@ class AssetService:
             update_fields.append("updated_at = NOW()")
             params.append(asset_id)
 
+            previous = await self.get_asset_by_id(asset_id)
             query = f"UPDATE assets SET {', '.join(update_fields)} WHERE id = %s"
-            await self.db_service.execute(query, tuple(params))
 
-            return await self.get_asset_by_id(asset_id)
+            async def work(uow):
+                await uow.execute(query, tuple(params))
+                if asset.asset_type_id is not None:
+                    # El resumen de costes por tipo cambia junto con el asset o no cambia
+                    move_asset_costs(uow, asset_id, asset.asset_type_id)
+
+            await self.db_service.run_in_transaction(work)
+
+            updated = await self.get_asset_by_id(asset_id)
+            index_document("asset", updated)
+            if previous is not None and updated is not None:
+                asset_analytics_changed(previous, updated)
+            return updated
         except Exception as e:
             logging.error(f"Error updating asset: {str(e)}")
             raise
@@ -128,8 +154,12 @@ class AssetService:
     async def delete_asset(self, asset_id: int) -> bool:
         try:
             await self.db_service.connect()
+            previous = await self.get_asset_by_id(asset_id)
             query = "DELETE FROM assets WHERE id = %s"
             await self.db_service.execute(query, (asset_id,))
+            remove_document("asset", asset_id)
+            if previous is not None:
+                asset_analytics_changed(previous, None)
             return True
         except Exception as e:
             logging.error(f"Error deleting asset: {str(e)}")
@@ -1,9 +1,15 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.inspection_scheduler_service import inspection_scheduler_engine
 from app.models.asset_type_models import AssetTypeCreate, AssetTypeUpdate, AssetTypeResponse
 
 
+ASSET_TYPE_QUERY_SPEC = QuerySpec(AssetTypeResponse, indexed={"id": (), "type_name": ()})
+
+
 class AssetTypeService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -12,10 +18,10 @@ class AssetTypeService:
         try:
             await self.db_service.connect()
             query = """
-                INSERT INTO asset_types (type_name, created_at, updated_at)
-                VALUES (%s, NOW(), NOW())
+                INSERT INTO asset_types (type_name, inspection_interval_months, created_at, updated_at)
+                VALUES (%s, %s, NOW(), NOW())
             """
-            params = (asset_type.type_name,)
+            params = (asset_type.type_name, asset_type.inspection_interval_months)
             await self.db_service.execute(query, params)
 
             select_query = "SELECT * FROM asset_types WHERE type_name = %s ORDER BY id DESC LIMIT 1"
@@ -30,14 +36,14 @@ class AssetTypeService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_asset_type_by_id(self, asset_type_id: int) -> Optional[AssetTypeResponse]:
+    async def get_asset_type_by_id(self, asset_type_id: int, fields: Optional[List[str]] = None) -> Optional[AssetTypeResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM asset_types WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM asset_types WHERE id = %s"
             result = await self.db_service.execute(query, (asset_type_id,))
 
             if result:
-                return AssetTypeResponse(**result[0])
+                return build(AssetTypeResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving asset type: {str(e)}")
@@ -45,13 +51,13 @@ class AssetTypeService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_asset_types(self, limit: int = 100, offset: int = 0) -> List[AssetTypeResponse]:
+    async def get_all_asset_types(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[AssetTypeResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM asset_types LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("asset_types", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [AssetTypeResponse(**row) for row in result]
+            return [build(AssetTypeResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving asset types: {str(e)}")
             raise
@@ -68,17 +74,30 @@ class AssetTypeService:
             if asset_type.type_name is not None:
                 update_fields.append("type_name = %s")
                 params.append(asset_type.type_name)
+            # null explícito vuelve al intervalo por defecto; omitido no lo toca
+            if "inspection_interval_months" in asset_type.model_fields_set:
+                update_fields.append("inspection_interval_months = %s")
+                params.append(asset_type.inspection_interval_months)
 
             if not update_fields:
                 return await self.get_asset_type_by_id(asset_type_id)
 
+            previous = await self.get_asset_type_by_id(asset_type_id)
+            if previous is None:
+                return None
+
             update_fields.append("updated_at = NOW()")
             params.append(asset_type_id)
 
             query = f"UPDATE asset_types SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
 
-            return await self.get_asset_type_by_id(asset_type_id)
+            updated = await self.get_asset_type_by_id(asset_type_id)
+            if updated is not None and updated.inspection_interval_months != previous.inspection_interval_months:
+                # Las fechas de inspección de los assets de este tipo dependen del intervalo; con
+                # muchos assets la pasada tarda, así que se hace en segundo plano
+                inspection_scheduler_engine.schedule_asset_type(asset_type_id)
+            return updated
         except Exception as e:
             logging.error(f"Error updating asset type: {str(e)}")
             raise
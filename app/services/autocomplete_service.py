@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.lifecycle import on_startup, on_shutdown
+from app.models.search_models import AutocompleteResponse, AutocompleteSuggestion
+from app.search.prefix_index import PrefixIndex
+from app.search.rebuild import PeriodicRebuilder, RebuildableIndex
+from app.services.database_service import DatabaseService
+
+AUTOCOMPLETE_INDEX_ENABLED = os.getenv("AUTOCOMPLETE_INDEX_ENABLED", "true").lower() == "true"
+# Cada worker aplica sus escrituras al momento y la reconstrucción periódica recoge las de los
+# demás (0 la desactiva). Las tablas son pequeñas (buques, ubicaciones) y reconstruir es barato,
+# así que el intervalo es corto: un nombre creado en otro worker tarda como mucho esto en salir
+AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "60"))
+AUTOCOMPLETE_BUILD_CHUNK_SIZE = int(os.getenv("AUTOCOMPLETE_BUILD_CHUNK_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class AutocompleteField:
+    kind: str
+    table: str
+    column: str
+    # Columna que se devuelve como detalle de cada sugerencia
+    detail: str
+
+
+AUTOCOMPLETE_FIELDS: Dict[str, AutocompleteField] = {
+    "vessel_name": AutocompleteField("vessel", "vessels", "vessel_name", detail="imo_number"),
+    "imo_number": AutocompleteField("vessel", "vessels", "imo_number", detail="vessel_name"),
+    "location_name": AutocompleteField("location", "locations", "location_name", detail="city"),
+}
+
+
+def _fields_of(kind: str) -> List[Tuple[str, AutocompleteField]]:
+    return [(name, field) for name, field in AUTOCOMPLETE_FIELDS.items() if field.kind == kind]
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class AutocompleteState(RebuildableIndex):
+    """Un PrefixIndex por campo."""
+
+    name = "Autocomplete indexes"
+
+    def __init__(self):
+        super().__init__()
+        self.indexes: Dict[str, PrefixIndex] = {name: PrefixIndex() for name in AUTOCOMPLETE_FIELDS}
+
+    def apply(self, kind: str, document_id: int, row: Optional[Dict[str, Any]], indexes: Optional[Dict[str, PrefixIndex]] = None):
+        if indexes is None:
+            indexes = self.indexes
+        for name, field in _fields_of(kind):
+            if row is None:
+                indexes[name].remove(document_id)
+            else:
+                indexes[name].add(document_id, _text(row.get(field.column)), _text(row.get(field.detail)))
+
+    async def build(self) -> Dict[str, PrefixIndex]:
+        """Lee cada tabla una vez por bloques y ordena los arrays de cada campo."""
+        rows_by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        db_service = DatabaseService()
+        try:
+            await db_service.connect()
+            for kind in dict.fromkeys(field.kind for field in AUTOCOMPLETE_FIELDS.values()):
+                fields = _fields_of(kind)
+                table = fields[0][1].table
+                columns = ["id"]
+                for _, field in fields:
+                    columns.extend(column for column in (field.column, field.detail) if column not in columns)
+                column_list = ", ".join(f"`{column}`" for column in columns)
+                rows: List[Dict[str, Any]] = []
+                last_id = 0
+                while True:
+                    chunk = await db_service.execute(
+                        f"SELECT {column_list} FROM {table} WHERE id > %s ORDER BY id LIMIT %s",
+                        (last_id, AUTOCOMPLETE_BUILD_CHUNK_SIZE)
+                    )
+                    rows.extend(chunk)
+                    if len(chunk) < AUTOCOMPLETE_BUILD_CHUNK_SIZE:
+                        break
+                    last_id = chunk[-1]["id"]
+                    await asyncio.sleep(0)
+                rows_by_kind[kind] = rows
+        finally:
+            await db_service.disconnect()
+
+        indexes: Dict[str, PrefixIndex] = {}
+        for name, field in AUTOCOMPLETE_FIELDS.items():
+            index = PrefixIndex()
+            index.load(
+                (row["id"], _text(row.get(field.column)), _text(row.get(field.detail)))
+                for row in rows_by_kind[field.kind]
+            )
+            indexes[name] = index
+        return indexes
+
+    def activate(self, indexes: Dict[str, PrefixIndex]):
+        self.indexes = indexes
+
+    def describe(self, indexes: Dict[str, PrefixIndex]) -> str:
+        return ", ".join(f"{name}={len(index)}" for name, index in indexes.items())
+
+
+autocomplete_state = AutocompleteState()
+
+
+def refresh_autocomplete(kind: str, document: BaseModel):
+    """Actualiza los campos de autocompletado tras crear o modificar un documento."""
+    if AUTOCOMPLETE_INDEX_ENABLED and document is not None:
+        autocomplete_state.record(kind, document.id, document.model_dump())
+
+
+def remove_autocomplete(kind: str, document_id: int):
+    if AUTOCOMPLETE_INDEX_ENABLED:
+        autocomplete_state.record(kind, document_id, None)
+
+
+class AutocompleteService:
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def complete(self, kind: str, field: str, prefix: str, limit: int = 10) -> AutocompleteResponse:
+        """ValueError si el campo no admite autocompletado para ese tipo."""
+        allowed = [name for name, _ in _fields_of(kind)]
+        if field not in allowed:
+            raise ValueError(f"Unknown field: {field}. Allowed: {', '.join(allowed)}")
+        started = time.perf_counter()
+        if AUTOCOMPLETE_INDEX_ENABLED and autocomplete_state.ready:
+            matches = autocomplete_state.indexes[field].complete(prefix, limit)
+            results = [AutocompleteSuggestion(id=doc_id, value=value, detail=detail) for doc_id, value, detail in matches]
+            source = "index"
+        else:
+            # Mientras se construye: solo coincidencias desde el principio, que usan el índice de la columna
+            results = await self._complete_sql(AUTOCOMPLETE_FIELDS[field], prefix, limit)
+            source = "sql"
+        return AutocompleteResponse(
+            field=field,
+            prefix=prefix,
+            source=source,
+            took_ms=round((time.perf_counter() - started) * 1000, 3),
+            results=results
+        )
+
+    async def _complete_sql(self, field: AutocompleteField, prefix: str, limit: int) -> List[AutocompleteSuggestion]:
+        pattern = re.sub(r"([\\%_])", r"\\\1", prefix.strip()) + "%"
+        try:
+            await self.db_service.connect()
+            rows = await self.db_service.execute(
+                f"SELECT id, `{field.column}` AS value, `{field.detail}` AS detail FROM {field.table} "
+                f"WHERE `{field.column}` LIKE %s ORDER BY `{field.column}` LIMIT %s",
+                (pattern, limit)
+            )
+        except Exception as e:
+            logging.error(f"Error autocompleting {field.column}: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+        return [AutocompleteSuggestion(id=row["id"], value=str(row["value"]), detail=_text(row["detail"])) for row in rows]
+
+
+autocomplete_indexer = PeriodicRebuilder(autocomplete_state, AUTOCOMPLETE_REFRESH_SECONDS)
+if AUTOCOMPLETE_INDEX_ENABLED:
+    on_startup(autocomplete_indexer.start)
+on_shutdown(autocomplete_indexer.close)
@@ -1,9 +1,18 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.shipment_timeline_service import invalidate_shipment_timeline_keys
 from app.models.bill_of_lading_models import BillOfLadingCreate, BillOfLadingUpdate, BillOfLadingResponse
 
 
+BILL_OF_LADING_QUERY_SPEC = QuerySpec(
+    BillOfLadingResponse,
+    indexed={"id": (), "bol_number": (), "shipment_id": (), "issue_date": ()},
+)
+
+
 class BillOfLadingService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -26,6 +35,7 @@ class BillOfLadingService:
                 bill.is_hazardous
             )
             await self.db_service.execute(query, params)
+            invalidate_shipment_timeline_keys(bill.shipment_id)
 
             select_query = "SELECT * FROM bills_of_lading WHERE bol_number = %s"
             result = await self.db_service.execute(select_query, (bill.bol_number,))
@@ -39,14 +49,14 @@ class BillOfLadingService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_bill_of_lading_by_id(self, bill_id: int) -> Optional[BillOfLadingResponse]:
+    async def get_bill_of_lading_by_id(self, bill_id: int, fields: Optional[List[str]] = None) -> Optional[BillOfLadingResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM bills_of_lading WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM bills_of_lading WHERE id = %s"
             result = await self.db_service.execute(query, (bill_id,))
 
             if result:
-                return BillOfLadingResponse(**result[0])
+                return build(BillOfLadingResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving bill of lading: {str(e)}")
@@ -54,14 +64,14 @@ class BillOfLadingService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_bill_of_lading_by_bol_number(self, bol_number: str) -> Optional[BillOfLadingResponse]:
+    async def get_bill_of_lading_by_bol_number(self, bol_number: str, fields: Optional[List[str]] = None) -> Optional[BillOfLadingResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM bills_of_lading WHERE bol_number = %s"
+            query = f"SELECT {sql_columns(fields)} FROM bills_of_lading WHERE bol_number = %s"
             result = await self.db_service.execute(query, (bol_number,))
 
             if result:
-                return BillOfLadingResponse(**result[0])
+                return build(BillOfLadingResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving bill of lading by number: {str(e)}")
@@ -69,14 +79,14 @@ class BillOfLadingService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_bill_of_lading_by_shipment(self, shipment_id: int) -> Optional[BillOfLadingResponse]:
+    async def get_bill_of_lading_by_shipment(self, shipment_id: int, fields: Optional[List[str]] = None) -> Optional[BillOfLadingResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM bills_of_lading WHERE shipment_id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM bills_of_lading WHERE shipment_id = %s"
             result = await self.db_service.execute(query, (shipment_id,))
 
             if result:
-                return BillOfLadingResponse(**result[0])
+                return build(BillOfLadingResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving bill of lading by shipment: {str(e)}")
@@ -84,13 +94,13 @@ class BillOfLadingService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_bills_of_lading(self, limit: int = 100, offset: int = 0) -> List[BillOfLadingResponse]:
+    async def get_all_bills_of_lading(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[BillOfLadingResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM bills_of_lading LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("bills_of_lading", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [BillOfLadingResponse(**row) for row in result]
+            return [build(BillOfLadingResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving bills of lading: {str(e)}")
             raise
@@ -129,11 +139,16 @@ class BillOfLadingService:
             if not update_fields:
                 return await self.get_bill_of_lading_by_id(bill_id)
 
+            # El timeline del shipment anterior y el del nuevo dependen del bol_number
+            previous = await self.get_bill_of_lading_by_id(bill_id, fields=["id", "shipment_id"])
+
             update_fields.append("updated_at = NOW()")
             params.append(bill_id)
 
             query = f"UPDATE bills_of_lading SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
+            if previous is not None:
+                invalidate_shipment_timeline_keys(previous.shipment_id, bill.shipment_id)
 
             return await self.get_bill_of_lading_by_id(bill_id)
         except Exception as e:
@@ -145,8 +160,11 @@ class BillOfLadingService:
     async def delete_bill_of_lading(self, bill_id: int) -> bool:
         try:
             await self.db_service.connect()
+            previous = await self.get_bill_of_lading_by_id(bill_id, fields=["id", "shipment_id"])
             query = "DELETE FROM bills_of_lading WHERE id = %s"
             await self.db_service.execute(query, (bill_id,))
+            if previous is not None:
+                invalidate_shipment_timeline_keys(previous.shipment_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting bill of lading: {str(e)}")
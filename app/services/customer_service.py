@@ -1,9 +1,18 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.search_service import index_document, remove_document
 from app.models.customer_models import CustomerCreate, CustomerUpdate, CustomerResponse
 
 
+CUSTOMER_QUERY_SPEC = QuerySpec(
+    CustomerResponse,
+    indexed={"id": (), "identification_number": (), "email": (), "full_name": ()},
+)
+
+
 class CustomerService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -23,7 +32,9 @@ class CustomerService:
             result = await self.db_service.execute(select_query, (customer.identification_number,))
 
             if result:
-                return CustomerResponse(**result[0])
+                created = CustomerResponse(**result[0])
+                index_document("customer", created)
+                return created
             raise ValueError("Customer creation failed")
         except Exception as e:
             logging.error(f"Error creating customer: {str(e)}")
@@ -31,14 +42,14 @@ class CustomerService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_customer_by_id(self, customer_id: int) -> Optional[CustomerResponse]:
+    async def get_customer_by_id(self, customer_id: int, fields: Optional[List[str]] = None) -> Optional[CustomerResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM customers WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM customers WHERE id = %s"
             result = await self.db_service.execute(query, (customer_id,))
 
             if result:
-                return CustomerResponse(**result[0])
+                return build(CustomerResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving customer: {str(e)}")
@@ -46,13 +57,13 @@ class CustomerService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_customers(self, limit: int = 100, offset: int = 0) -> List[CustomerResponse]:
+    async def get_all_customers(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[CustomerResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM customers LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("customers", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [CustomerResponse(**row) for row in result]
+            return [build(CustomerResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving customers: {str(e)}")
             raise
@@ -89,7 +100,9 @@ class CustomerService:
             query = f"UPDATE customers SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
 
-            return await self.get_customer_by_id(customer_id)
+            updated = await self.get_customer_by_id(customer_id)
+            index_document("customer", updated)
+            return updated
         except Exception as e:
             logging.error(f"Error updating customer: {str(e)}")
             raise
@@ -101,6 +114,7 @@ class CustomerService:
             await self.db_service.connect()
             query = "DELETE FROM customers WHERE id = %s"
             await self.db_service.execute(query, (customer_id,))
+            remove_document("customer", customer_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting customer: {str(e)}")
@@ -1,16 +1,74 @@
+import asyncio
 import logging
+import os
+import random
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple, TypeVar
+from mysql.connector import Error, errorcode
 from app.database.mysql_manager import MySQLManager
 
+T = TypeVar("T")
+
+TRANSACTION_RETRIES = int(os.getenv("MYSQL_TRANSACTION_RETRIES", "3"))
+TRANSACTION_BACKOFF_SECONDS = float(os.getenv("MYSQL_TRANSACTION_BACKOFF_SECONDS", "0.05"))
+_RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+
+class UnitOfWork:
+    """
+    Agrupa sentencias sobre una única conexión dentro de una transacción.
+    `execute` corre en el momento (para lecturas o cuando se necesita el id insertado);
+    `add` encola escrituras que se envían juntas en `flush` o al confirmar, y las
+    sentencias consecutivas iguales se mandan con executemany.
+    """
+
+    def __init__(self, db_manager: MySQLManager):
+        self.db_manager = db_manager
+        self._pending: List[Tuple[str, tuple]] = []
+
+    def add(self, query: str, params: tuple = None):
+        self._pending.append((query, params or ()))
+
+    async def execute(self, query: str, params: tuple = None):
+        await self.flush()
+        return await self.db_manager.execute(query, params)
+
+    async def executemany(self, query: str, seq_params: Sequence[tuple]):
+        await self.flush()
+        if not seq_params:
+            return [{'rowcount': 0, 'last_insert_id': None}]
+        return await self.db_manager.executemany(query, list(seq_params))
+
+    async def flush(self):
+        pending, self._pending = self._pending, []
+        index = 0
+        while index < len(pending):
+            query = pending[index][0]
+            batch = []
+            while index < len(pending) and pending[index][0] == query:
+                batch.append(pending[index][1])
+                index += 1
+            if len(batch) == 1:
+                await self.db_manager.execute(query, batch[0])
+            else:
+                await self.db_manager.executemany(query, batch)
+
 
 class DatabaseService:
     def __init__(self):
         self.db_manager = MySQLManager()
+        # connect/disconnect anidados (un método que llama a otro del mismo servicio) reutilizan la conexión
+        self._depth = 0
 
     async def connect(self):
-        await self.db_manager.create_connection()
+        if self._depth == 0 or not await self.db_manager.is_connected():
+            await self.db_manager.create_connection()
+        self._depth += 1
 
     async def disconnect(self):
-        await self.db_manager.close_connection()
+        self._depth = max(self._depth - 1, 0)
+        if self._depth == 0:
+            await self.db_manager.close_connection()
 
     async def execute(self, query: str, params: tuple = None):
         try:
@@ -20,3 +78,60 @@ class DatabaseService:
             logging.error(f"Error executing query: {str(e)}")
             raise
 
+    async def executemany(self, query: str, seq_params: Sequence[tuple]):
+        try:
+            return await self.db_manager.executemany(query, list(seq_params))
+        except Exception as e:
+            logging.error(f"Error executing batch: {str(e)}")
+            raise
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        """
+        Fija una conexión, abre una transacción y confirma una sola vez al salir.
+        Si el bloque lanza una excepción se hace rollback de todo.
+        """
+        await self.connect()
+        try:
+            if self.db_manager.in_transaction:
+                # Anidado: participa en la transacción exterior, que es la que confirma
+                uow = UnitOfWork(self.db_manager)
+                yield uow
+                await uow.flush()
+                return
+            await self.db_manager.begin()
+            uow = UnitOfWork(self.db_manager)
+            try:
+                yield uow
+                await uow.flush()
+                await self.db_manager.commit()
+            except BaseException:
+                await self.db_manager.rollback()
+                raise
+        finally:
+            await self.disconnect()
+
+    async def run_in_transaction(
+            self,
+            work: Callable[[UnitOfWork], Awaitable[T]],
+            retries: Optional[int] = None,
+            backoff: Optional[float] = None
+    ) -> T:
+        """
+        Ejecuta `work(uow)` en una transacción y la reintenta con backoff exponencial
+        si MySQL la aborta por deadlock o lock wait timeout.
+        """
+        retries = TRANSACTION_RETRIES if retries is None else retries
+        backoff = TRANSACTION_BACKOFF_SECONDS if backoff is None else backoff
+        attempt = 0
+        while True:
+            try:
+                async with self.unit_of_work() as uow:
+                    return await work(uow)
+            except Error as e:
+                if e.errno not in _RETRYABLE_ERRORS or attempt >= retries:
+                    raise
+                delay = backoff * (2 ** attempt) * (1 + random.random())
+                attempt += 1
+                logging.warning(f"Transaction aborted ({e.errno}), retry {attempt}/{retries} in {delay:.3f}s")
+                await asyncio.sleep(delay)
@@ -0,0 +1,124 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, create_model
+
+# Campos que siempre se devuelven (si el modelo los tiene) para que el cliente pueda
+# identificar cada fila aunque pida solo columnas descriptivas
+IDENTITY_FIELDS = ("id",)
+FIELDS_DESCRIPTION = "Comma-separated list of fields to return (sparse fieldset); defaults to all fields"
+SPARSE_RESPONSE_DESCRIPTION = (
+    "Successful Response. With `fields`, only the requested fields and the identity fields are returned"
+)
+
+
+def parse_fields(
+        fields: Optional[str],
+        model: Type[BaseModel],
+        identity: Sequence[str] = IDENTITY_FIELDS
+) -> Optional[List[str]]:
+    """
+    Convierte `fields=a,b,c` en la lista de campos del modelo a leer. Acepta el nombre del campo
+    o su alias (p. ej. `_id`). None si no se pidió nada (se lee el documento/fila completo);
+    ValueError si algún campo no pertenece al modelo.
+    """
+    if fields is None or not fields.strip():
+        return None
+    by_name = {}
+    for name, info in model.model_fields.items():
+        by_name[name] = name
+        if info.alias:
+            by_name[info.alias] = name
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in by_name]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(model.model_fields)}"
+        )
+    selected = [name for name in identity if name in model.model_fields]
+    for field in requested:
+        name = by_name[field]
+        if name not in selected:
+            selected.append(name)
+    return selected
+
+
+def sql_columns(fields: Optional[Iterable[str]]) -> str:
+    """Lista explícita de columnas para el SELECT; los nombres ya vienen validados contra el modelo."""
+    if fields is None:
+        return "*"
+    return ", ".join(f"`{field}`" for field in fields)
+
+
+def mongo_projection(fields: Optional[Iterable[str]], model: Type[BaseModel]) -> Optional[Dict[str, int]]:
+    """Proyección de Mongo equivalente; los campos con alias (id -> _id) se proyectan por el alias."""
+    if fields is None:
+        return None
+    projection = {}
+    for field in fields:
+        alias = model.model_fields[field].alias or field
+        projection[alias] = 1
+    if "_id" not in projection:
+        projection["_id"] = 0
+    return projection
+
+
+@lru_cache(maxsize=None)
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Variante del modelo de respuesta con todos los campos opcionales: es el esquema de las
+    respuestas recortadas. Hereda del completo para conservar alias, configuración y validadores.
+    """
+    definitions: Dict[str, Any] = {}
+    for name, info in model.model_fields.items():
+        default = None if info.alias is None else Field(default=None, alias=info.alias)
+        definitions[name] = (Optional[info.annotation], default)
+    return create_model(
+        f"{model.__name__}Fields",
+        __base__=model,
+        **definitions
+    )
+
+
+def build(model: Type[BaseModel], row: Dict[str, Any], fields: Optional[Sequence[str]]) -> BaseModel:
+    """Instancia el modelo completo o, si hay fieldset, su variante parcial con solo esos campos."""
+    if fields is None:
+        return model(**row)
+    return partial_model(model)(**row)
+
+
+def sparse_response(result: Any, fields: Optional[Sequence[str]]) -> Any:
+    """
+    Con fieldset serializa el resultado omitiendo los campos no pedidos y lo devuelve como
+    respuesta ya hecha, para que FastAPI no lo valide contra el response_model completo.
+    """
+    if fields is None:
+        return result
+    return JSONResponse(content=jsonable_encoder(result, by_alias=True, exclude_unset=True))
+
+
+def sparse_responses(model: Type[BaseModel], many: bool = False) -> Dict[int, Dict[str, Any]]:
+    """
+    `responses=` de las rutas con fieldset: el esquema de la respuesta 200 pasa a ser la variante
+    parcial del modelo, ya que con `fields=` no llegan todos los campos obligatorios del completo.
+    """
+    partial = partial_model(model)
+    return {200: {"model": List[partial] if many else partial, "description": SPARSE_RESPONSE_DESCRIPTION}}
+
+
+def fieldset(model: Type[BaseModel], identity: Sequence[str] = IDENTITY_FIELDS):
+    """Dependencia de FastAPI que lee `fields=` y lo valida contra el modelo (400 si no es válido)."""
+    allowed = ", ".join(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"{FIELDS_DESCRIPTION}. Allowed: {allowed}")
+    ) -> Optional[List[str]]:
+        try:
+            return parse_fields(fields, model, identity)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return dependency
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from app.database.mongo_manager import MongoManager
+from app.geo.geojson import GEO_FIELD
+from app.lifecycle import on_startup, on_shutdown
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION, check_timeseries_support, is_timeseries
+
+# El ingest por lotes escribe GeoPoint, pero el relay de Hoopo inserta directamente en Mongo sin
+# él: este motor lo rellena cada GEO_POINT_INTERVAL_SECONDS, así que las consultas geográficas
+# pueden tardar hasta ese intervalo en ver las posiciones del relay. Varios workers pueden
+# ejecutarlo a la vez: la actualización solo toca documentos sin GeoPoint y es idempotente
+GEO_POINT_ENGINE_ENABLED = os.getenv("GEO_POINT_ENGINE_ENABLED", "true").lower() == "true"
+GEO_POINT_INTERVAL_SECONDS = float(os.getenv("GEO_POINT_INTERVAL_SECONDS", "10"))
+GEO_POINT_BATCH_SIZE = int(os.getenv("GEO_POINT_BATCH_SIZE", "5000"))
+# Al arrancar el motor solo mira esta ventana hacia atrás; el histórico anterior se rellena
+# una vez con scripts/backfill_geo_points.py
+GEO_POINT_LOOKBACK_SECONDS = float(os.getenv("GEO_POINT_LOOKBACK_SECONDS", "3600"))
+# Cada pasada empieza este margen antes del inicio de la anterior: los _id los genera el
+# cliente y pueden llegar ligeramente desordenados
+GEO_POINT_SETTLE_SECONDS = float(os.getenv("GEO_POINT_SETTLE_SECONDS", "60"))
+RETRY_SECONDS = 30.0
+
+PENDING_FILTER = {
+    GEO_FIELD: {"$exists": False},
+    "Location.Latitude": {"$type": "number", "$gte": -90, "$lte": 90},
+    "Location.Longitude": {"$type": "number", "$gte": -180, "$lte": 180},
+}
+
+SET_POINT = [{"$set": {GEO_FIELD: {
+    "type": "Point",
+    "coordinates": ["$Location.Longitude", "$Location.Latitude"],
+}}}]
+
+
+async def fill_geo_points(collection, batch_size: int, after_id=None) -> Tuple[int, object]:
+    """
+    Rellena un lote de documentos sin GeoPoint con _id mayor que `after_id`. Devuelve los
+    documentos actualizados y el último _id visto (None si no había pendientes).
+    """
+    query = dict(PENDING_FILTER)
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    cursor = collection.find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)
+    ids = [document["_id"] for document in await cursor.to_list(length=batch_size)]
+    if not ids:
+        return 0, None
+    result = await collection.update_many({"_id": {"$in": ids}}, SET_POINT)
+    return result.modified_count, ids[-1]
+
+
+class GeoPointEngine:
+    """Rellena GeoPoint en los eventos escritos fuera del ingest, avanzando por la fecha del _id."""
+
+    def __init__(self, collection_name: str = TRACKER_EVENTS_COLLECTION):
+        self.collection_name = collection_name
+        self.mongo_manager = MongoManager()
+        self._task: Optional[asyncio.Task] = None
+        self._since: Optional[datetime] = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def run_once(self, batch_size: int = GEO_POINT_BATCH_SIZE) -> int:
+        from bson import ObjectId
+
+        started = datetime.now(timezone.utc)
+        since = self._since or started - timedelta(seconds=GEO_POINT_LOOKBACK_SECONDS)
+        after_id = ObjectId.from_datetime(since)
+        await self.mongo_manager.create_connection()
+        collection = await self.mongo_manager.get_collection(self.collection_name)
+        updated = 0
+        while True:
+            count, last_id = await fill_geo_points(collection, batch_size, after_id)
+            if last_id is None:
+                break
+            updated += count
+            after_id = last_id
+        self._since = started - timedelta(seconds=GEO_POINT_SETTLE_SECONDS)
+        return updated
+
+    async def _run(self):
+        if is_timeseries():
+            try:
+                await self.mongo_manager.create_connection()
+                await check_timeseries_support(self.mongo_manager.db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"GeoPoint engine disabled: {str(e)}")
+                return
+        while True:
+            try:
+                updated = await self.run_once()
+                if updated:
+                    logging.info(f"GeoPoint engine: {updated} tracker events updated")
+                await asyncio.sleep(GEO_POINT_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"GeoPoint engine pass failed: {str(e)}")
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+geo_point_engine = GeoPointEngine()
+if GEO_POINT_ENGINE_ENABLED:
+    on_startup(geo_point_engine.start)
+on_shutdown(geo_point_engine.close)
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set
+
+from app.database.mongo_manager import MongoManager
+from app.geo.geojson import close_ring
+from app.geo.spatial_index import Geofence, GridIndex
+from app.lifecycle import on_startup, on_shutdown
+from app.models.geofence_models import GeofenceRunResult
+from app.services.database_service import DatabaseService, UnitOfWork
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION
+from app.services.tracking_event_service import INSERT_TRACKING_EVENT
+
+GEOFENCE_ENGINE_ENABLED = os.getenv("GEOFENCE_ENGINE_ENABLED", "false").lower() == "true"
+GEOFENCE_BATCH_SIZE = int(os.getenv("GEOFENCE_BATCH_SIZE", "5000"))
+GEOFENCE_INTERVAL_SECONDS = float(os.getenv("GEOFENCE_INTERVAL_SECONDS", "5"))
+GEOFENCE_REFRESH_SECONDS = float(os.getenv("GEOFENCE_REFRESH_SECONDS", "300"))
+# Los _id se generan en el cliente: un documento puede llegar algo después que otro con _id mayor.
+# Solo se procesan los que tienen más antigüedad que esto para que la marca de agua no se los salte
+GEOFENCE_SETTLE_SECONDS = float(os.getenv("GEOFENCE_SETTLE_SECONDS", "10"))
+RETRY_SECONDS = 5.0
+
+ENGINE_NAME = "geofence"
+EVENT_ENTER = "geofence_enter"
+EVENT_EXIT = "geofence_exit"
+POSITION_PROJECTION = {"TrackerId": 1, "EventTime": 1, "BL": 1, "Booking": 1, "Location.Latitude": 1, "Location.Longitude": 1}
+
+UPSERT_STATE = """
+    INSERT INTO geofence_tracker_states (tracker_id, inside_location_ids, last_event_time, updated_at)
+    VALUES (%s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE inside_location_ids = VALUES(inside_location_ids),
+        last_event_time = VALUES(last_event_time), updated_at = NOW()
+"""
+
+_fence_index: Optional[GridIndex] = None
+_fence_index_loaded_at = 0.0
+
+
+def invalidate_geofences():
+    """Fuerza a recargar las geocercas en la próxima pasada (llamado al escribir locations)."""
+    global _fence_index
+    _fence_index = None
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class GeofenceService:
+    """
+    Motor incremental de geocercas: lee las posiciones de HoopoMessages posteriores a la marca
+    de agua, las evalúa contra un índice espacial en memoria y emite eventos de entrada/salida
+    en tracking_events. Los eventos, el estado por tracker y la marca de agua se confirman en la
+    misma transacción, de modo que cada posición se procesa exactamente una vez.
+    """
+
+    def __init__(self):
+        self.db_service = DatabaseService()
+        self.mongo_manager = MongoManager()
+        self.collection_name = TRACKER_EVENTS_COLLECTION
+
+    async def get_index(self) -> GridIndex:
+        global _fence_index, _fence_index_loaded_at
+        if _fence_index is None or time.monotonic() - _fence_index_loaded_at > GEOFENCE_REFRESH_SECONDS:
+            try:
+                await self.db_service.connect()
+                rows = await self.db_service.execute("""
+                    SELECT id, latitude, longitude, geofence_radius_m, geofence_polygon FROM locations
+                    WHERE geofence_polygon IS NOT NULL
+                       OR (geofence_radius_m IS NOT NULL AND latitude IS NOT NULL AND longitude IS NOT NULL)
+                """)
+            finally:
+                await self.db_service.disconnect()
+            fences = []
+            for row in rows:
+                polygon = row["geofence_polygon"]
+                if isinstance(polygon, (str, bytes)):
+                    polygon = json.loads(polygon)
+                if polygon:
+                    fences.append(Geofence(row["id"], polygon=close_ring(polygon)))
+                else:
+                    fences.append(Geofence(
+                        row["id"],
+                        latitude=float(row["latitude"]),
+                        longitude=float(row["longitude"]),
+                        radius_m=float(row["geofence_radius_m"])
+                    ))
+            _fence_index = GridIndex(fences)
+            _fence_index_loaded_at = time.monotonic()
+        return _fence_index
+
+    async def _fetch_positions(self, watermark: Optional[str], batch_size: int) -> List[dict]:
+        from bson import ObjectId
+
+        settled = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=GEOFENCE_SETTLE_SECONDS))
+        id_range = {"$lt": settled}
+        if watermark:
+            id_range["$gt"] = ObjectId(watermark)
+        query = {
+            "_id": id_range,
+            "TrackerId": {"$type": "string"},
+            "EventTime": {"$type": "date"},
+            "Location.Latitude": {"$type": "number"},
+            "Location.Longitude": {"$type": "number"},
+        }
+        try:
+            await self.mongo_manager.create_connection()
+            collection = await self.mongo_manager.get_collection(self.collection_name)
+            cursor = collection.find(query, POSITION_PROJECTION).sort("_id", 1).limit(batch_size)
+            return await cursor.to_list(length=batch_size)
+        finally:
+            await self.mongo_manager.close_connection()
+
+    @staticmethod
+    async def _load_states(uow: UnitOfWork, tracker_ids: Sequence[str]) -> Dict[str, dict]:
+        placeholders = ", ".join(["%s"] * len(tracker_ids))
+        rows = await uow.execute(
+            f"SELECT tracker_id, inside_location_ids, last_event_time FROM geofence_tracker_states "
+            f"WHERE tracker_id IN ({placeholders})",
+            tuple(tracker_ids)
+        )
+        states = {}
+        for row in rows:
+            inside = row["inside_location_ids"]
+            if isinstance(inside, (str, bytes)):
+                inside = json.loads(inside)
+            states[row["tracker_id"]] = {"inside": set(inside or []), "last_event_time": row["last_event_time"]}
+        return states
+
+    @staticmethod
+    async def _resolve_shipments(uow: UnitOfWork, documents: Sequence[dict]) -> Dict[str, Dict[str, int]]:
+        """Mapea BL -> shipment_id (bills_of_lading) y Booking -> shipment_id (tracking_code) en dos consultas."""
+        bls = sorted({d["BL"] for d in documents if d.get("BL")})
+        bookings = sorted({d["Booking"] for d in documents if d.get("Booking")})
+        by_bl: Dict[str, int] = {}
+        by_booking: Dict[str, int] = {}
+        if bls:
+            rows = await uow.execute(
+                f"SELECT bol_number, shipment_id FROM bills_of_lading WHERE bol_number IN ({', '.join(['%s'] * len(bls))})",
+                tuple(bls)
+            )
+            by_bl = {row["bol_number"]: row["shipment_id"] for row in rows}
+        if bookings:
+            rows = await uow.execute(
+                f"SELECT tracking_code, id FROM shipments WHERE tracking_code IN ({', '.join(['%s'] * len(bookings))})",
+                tuple(bookings)
+            )
+            by_booking = {row["tracking_code"]: row["id"] for row in rows}
+        return {"BL": by_bl, "Booking": by_booking}
+
+    async def process_new_positions(self, batch_size: Optional[int] = None) -> GeofenceRunResult:
+        """Procesa un lote de posiciones nuevas y devuelve el resumen de la pasada."""
+        batch_size = batch_size or GEOFENCE_BATCH_SIZE
+        index = await self.get_index()
+
+        async def work(uow: UnitOfWork) -> GeofenceRunResult:
+            await uow.execute(
+                "INSERT IGNORE INTO geofence_watermarks (name, last_object_id, updated_at) VALUES (%s, NULL, NOW())",
+                (ENGINE_NAME,)
+            )
+            # FOR UPDATE serializa las pasadas entre workers: la segunda espera y lee la marca ya avanzada
+            rows = await uow.execute(
+                "SELECT last_object_id FROM geofence_watermarks WHERE name = %s FOR UPDATE", (ENGINE_NAME,)
+            )
+            watermark = rows[0]["last_object_id"] if rows else None
+            documents = await self._fetch_positions(watermark, batch_size)
+            result = GeofenceRunResult(
+                positions=len(documents), trackers=0, enters=0, exits=0, unmatched=0, stale=0,
+                fences=index.size, watermark=watermark
+            )
+            if not documents:
+                return result
+
+            by_tracker: Dict[str, List[dict]] = {}
+            for document in documents:
+                by_tracker.setdefault(document["TrackerId"], []).append(document)
+            result.trackers = len(by_tracker)
+            states = await self._load_states(uow, list(by_tracker))
+            shipments = await self._resolve_shipments(uow, documents)
+
+            for tracker_id, positions in by_tracker.items():
+                state = states.get(tracker_id, {"inside": set(), "last_event_time": None})
+                inside: Set[int] = state["inside"] & index.location_ids
+                last_event_time = state["last_event_time"]
+                positions.sort(key=lambda d: (d["EventTime"], d["_id"]))
+                for document in positions:
+                    event_time = _naive_utc(document["EventTime"])
+                    if last_event_time is not None and event_time <= last_event_time:
+                        result.stale += 1
+                        continue
+                    location = document["Location"]
+                    now_inside = index.containing(location["Latitude"], location["Longitude"])
+                    transitions = [(EVENT_ENTER, i) for i in sorted(now_inside - inside)]
+                    transitions += [(EVENT_EXIT, i) for i in sorted(inside - now_inside)]
+                    if transitions:
+                        shipment_id = (
+                            shipments["BL"].get(document.get("BL"))
+                            or shipments["Booking"].get(document.get("Booking"))
+                        )
+                        for event_type, location_id in transitions:
+                            if event_type == EVENT_ENTER:
+                                result.enters += 1
+                            else:
+                                result.exits += 1
+                            if shipment_id is None:
+                                result.unmatched += 1
+                                continue
+                            uow.add(INSERT_TRACKING_EVENT, (
+                                shipment_id, location_id, event_time, event_type,
+                                f"Tracker {tracker_id}"
+                            ))
+                    inside = now_inside
+                    last_event_time = event_time
+                uow.add(UPSERT_STATE, (tracker_id, json.dumps(sorted(inside)), last_event_time))
+
+            result.watermark = str(documents[-1]["_id"])
+            uow.add(
+                "UPDATE geofence_watermarks SET last_object_id = %s, updated_at = NOW() WHERE name = %s",
+                (result.watermark, ENGINE_NAME)
+            )
+            return result
+
+        try:
+            return await self.db_service.run_in_transaction(work)
+        except Exception as e:
+            logging.error(f"Error processing geofences: {str(e)}")
+            raise
+
+
+class GeofenceEngine:
+    """Bucle en segundo plano que encadena pasadas mientras haya posiciones pendientes."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        service = GeofenceService()
+        while True:
+            try:
+                result = await service.process_new_positions()
+                if result.positions < GEOFENCE_BATCH_SIZE:
+                    await asyncio.sleep(GEOFENCE_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Geofence engine pass failed: {str(e)}")
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+geofence_engine = GeofenceEngine()
+if GEOFENCE_ENGINE_ENABLED:
+    on_startup(geofence_engine.start)
+on_shutdown(geofence_engine.close)
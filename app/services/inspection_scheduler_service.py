@@ -0,0 +1,285 @@
+import asyncio
+import calendar
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.lifecycle import on_startup, on_shutdown
+from app.models.asset_models import AssetResponse, InspectionScheduleResult
+from app.services.database_service import DatabaseService, UnitOfWork
+from app.services.fieldsets import build, sql_columns
+
+# Pasada completa periódica dentro del servidor; en despliegues con varios workers es mejor
+# dejarlo desactivado y lanzar scripts/schedule_inspections.py desde cron
+INSPECTION_SCHEDULER_ENABLED = os.getenv("INSPECTION_SCHEDULER_ENABLED", "false").lower() == "true"
+INSPECTION_SCHEDULER_INTERVAL_SECONDS = float(os.getenv("INSPECTION_SCHEDULER_INTERVAL_SECONDS", "86400"))
+INSPECTION_CHUNK_SIZE = int(os.getenv("INSPECTION_CHUNK_SIZE", "5000"))
+# Filas por UPDATE ... CASE: cada una son 12 parámetros
+INSPECTION_UPDATE_BATCH_SIZE = int(os.getenv("INSPECTION_UPDATE_BATCH_SIZE", "1000"))
+# Convenio CSC: primer examen como máximo 5 años después de la fabricación y después cada 30 meses;
+# asset_types.inspection_interval_months sustituye el intervalo para un tipo
+INITIAL_INSPECTION_MONTHS = int(os.getenv("INITIAL_INSPECTION_MONTHS", "60"))
+INSPECTION_INTERVAL_MONTHS = int(os.getenv("INSPECTION_INTERVAL_MONTHS", "30"))
+RETRY_SECONDS = 300
+
+ASSETS_CHUNK_QUERY = """
+    SELECT a.id, a.manufactured_at, a.last_inspection_at, a.last_maintenance_at, a.next_inspection_due_at,
+           t.inspection_interval_months
+    FROM assets a
+    LEFT JOIN asset_types t ON t.id = a.asset_type_id
+    WHERE a.id > %s {condition}
+    ORDER BY a.id
+    LIMIT %s
+"""
+
+# Última inspección y último mantenimiento completados de un rango de assets (índice
+# maintenances_asset_id_status_type_completed_at_index, en migrations/001_maintenances_inspection_index.sql)
+COMPLETED_MAINTENANCES_QUERY = """
+    SELECT asset_id,
+           MAX(CASE WHEN maintenance_type = 'inspection' THEN completed_at END) AS inspected_at,
+           MAX(completed_at) AS maintained_at
+    FROM maintenances
+    WHERE asset_id BETWEEN %s AND %s AND status = 'completed' AND completed_at IS NOT NULL
+    GROUP BY asset_id
+"""
+
+# Columnas leídas de las que depende el cálculo: el UPDATE solo escribe si siguen igual
+READ_COLUMNS = ("manufactured_at", "next_inspection_due_at", "last_inspection_at", "last_maintenance_at")
+
+# (id, próxima inspección, última inspección, último mantenimiento, valores leídos de READ_COLUMNS)
+Change = Tuple[int, date, Optional[date], Optional[date], tuple]
+
+
+def add_months(value: date, months: int) -> date:
+    """Suma meses ajustando al último día del mes cuando no existe (31 ene + 1 mes = 28/29 feb)."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def _as_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _latest(*values: Optional[date]) -> Optional[date]:
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def next_inspection_due(manufactured_at: date, last_inspection_at: Optional[date], interval_months: Optional[int]) -> date:
+    if last_inspection_at is None:
+        return add_months(manufactured_at, INITIAL_INSPECTION_MONTHS)
+    return add_months(last_inspection_at, interval_months or INSPECTION_INTERVAL_MONTHS)
+
+
+def plan_changes(assets: Sequence[dict], completed: Dict[int, dict]) -> List[Change]:
+    """Fechas nuevas de cada asset; solo devuelve los que cambian algo."""
+    changes = []
+    for asset in assets:
+        maintenances = completed.get(asset["id"], {})
+        last_inspection = _latest(asset["last_inspection_at"], _as_date(maintenances.get("inspected_at")))
+        last_maintenance = _latest(asset["last_maintenance_at"], _as_date(maintenances.get("maintained_at")))
+        due = next_inspection_due(asset["manufactured_at"], last_inspection, asset["inspection_interval_months"])
+        if (due, last_inspection, last_maintenance) != (
+                asset["next_inspection_due_at"], asset["last_inspection_at"], asset["last_maintenance_at"]):
+            read = tuple(asset[column] for column in READ_COLUMNS)
+            changes.append((asset["id"], due, last_inspection, last_maintenance, read))
+    return changes
+
+
+def batch_update(changes: Sequence[Change]) -> Tuple[str, tuple]:
+    """
+    Un UPDATE con CASE por columna para todas las filas del lote. Cada fila solo se escribe si
+    READ_COLUMNS siguen con los valores leídos: si un update_asset concurrente las cambió, la
+    fila se salta en lugar de pisarlo y la recalcula la siguiente pasada.
+    """
+    cases = {column: [] for column in ("next_inspection_due_at", "last_inspection_at", "last_maintenance_at")}
+    params: Dict[str, list] = {column: [] for column in cases}
+    unchanged, unchanged_params = [], []
+    for asset_id, *values, read in changes:
+        for column, value in zip(cases, values):
+            cases[column].append("WHEN %s THEN %s")
+            params[column].extend((asset_id, value))
+        unchanged.append(f"WHEN %s THEN {' AND '.join(f'{column} <=> %s' for column in READ_COLUMNS)}")
+        unchanged_params.extend((asset_id, *read))
+    assignments = [f"{column} = CASE id {' '.join(whens)} END" for column, whens in cases.items()]
+    ids = [change[0] for change in changes]
+    query = (
+        f"UPDATE assets SET {', '.join(assignments)}, updated_at = NOW() "
+        f"WHERE id IN ({', '.join(['%s'] * len(ids))}) AND CASE id {' '.join(unchanged)} END"
+    )
+    return query, (
+        *params["next_inspection_due_at"], *params["last_inspection_at"], *params["last_maintenance_at"],
+        *ids, *unchanged_params
+    )
+
+
+async def apply_schedule(executor, assets: Sequence[dict], dry_run: bool = False) -> int:
+    """
+    Recalcula y escribe un bloque de assets con `executor` (DatabaseService o UnitOfWork);
+    devuelve las filas que cambian.
+    """
+    rows = await executor.execute(COMPLETED_MAINTENANCES_QUERY, (assets[0]["id"], assets[-1]["id"]))
+    changes = plan_changes(assets, {row["asset_id"]: row for row in rows})
+    if dry_run:
+        return len(changes)
+    updated = 0
+    for start in range(0, len(changes), INSPECTION_UPDATE_BATCH_SIZE):
+        query, params = batch_update(changes[start:start + INSPECTION_UPDATE_BATCH_SIZE])
+        result = await executor.execute(query, params)
+        updated += result[0]["rowcount"]
+    return updated
+
+
+class InspectionSchedulerService:
+    """
+    Recalcula next_inspection_due_at a partir de la fabricación, la última inspección (la del
+    asset o la última maintenance de tipo inspection completada) y el intervalo del tipo de asset.
+    Recorre los assets por bloques de id y escribe solo las filas que cambian, con un UPDATE por
+    lote, así que una pasada sobre un parque ya al día apenas escribe.
+    """
+
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def run(
+            self,
+            asset_type_id: Optional[int] = None,
+            chunk_size: Optional[int] = None,
+            dry_run: bool = False,
+            progress: Optional[Callable[[InspectionScheduleResult], None]] = None
+    ) -> InspectionScheduleResult:
+        """Pasada completa (o solo los assets de un tipo, tras cambiar su intervalo)."""
+        chunk_size = chunk_size or INSPECTION_CHUNK_SIZE
+        started = time.monotonic()
+        result = InspectionScheduleResult(scanned=0, updated=0, seconds=0.0, dry_run=dry_run)
+        condition, params = ("AND a.asset_type_id = %s", (asset_type_id,)) if asset_type_id is not None else ("", ())
+        query = ASSETS_CHUNK_QUERY.format(condition=condition)
+        last_id = 0
+        try:
+            await self.db_service.connect()
+            while True:
+                assets = await self.db_service.execute(query, (last_id, *params, chunk_size))
+                if not assets:
+                    break
+                result.scanned += len(assets)
+                result.updated += await apply_schedule(self.db_service, assets, dry_run)
+                last_id = assets[-1]["id"]
+                result.seconds = round(time.monotonic() - started, 2)
+                if progress is not None:
+                    progress(result)
+                if len(assets) < chunk_size:
+                    break
+        except Exception as e:
+            logging.error(f"Error scheduling inspections: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+        result.seconds = round(time.monotonic() - started, 2)
+        return result
+
+    async def get_due_assets(self, days: int, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[AssetResponse]:
+        """Assets con inspección vencida o que vence en los próximos `days` días, por fecha."""
+        try:
+            await self.db_service.connect()
+            query = (
+                f"SELECT {sql_columns(fields)} FROM assets WHERE next_inspection_due_at <= %s "
+                f"ORDER BY next_inspection_due_at, id LIMIT %s OFFSET %s"
+            )
+            rows = await self.db_service.execute(query, (date.today() + timedelta(days=days), limit, offset))
+            return [build(AssetResponse, row, fields) for row in rows]
+        except Exception as e:
+            logging.error(f"Error retrieving assets due for inspection: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+
+async def reschedule_after_maintenance(uow: UnitOfWork, asset_id: Optional[int], completed: bool) -> int:
+    """
+    Llamado por MaintenanceService dentro de su transacción: las fechas del asset se confirman o
+    se deshacen junto con el mantenimiento, sin depender de la pasada periódica. El asset se lee
+    con FOR UPDATE para que nadie lo cambie entre el cálculo y la escritura.
+    """
+    if asset_id is None or not completed:
+        return 0
+    query = ASSETS_CHUNK_QUERY.format(condition="AND a.id = %s") + " FOR UPDATE"
+    assets = await uow.execute(query, (0, asset_id, 1))
+    if not assets:
+        return 0
+    return await apply_schedule(uow, assets)
+
+
+class InspectionSchedulerEngine:
+    """
+    Pasada completa al arrancar y después cada INSPECTION_SCHEDULER_INTERVAL_SECONDS. Las pasadas
+    de un solo tipo de asset (tras cambiar su intervalo) se lanzan aparte con `schedule_asset_type`.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._type_tasks: Dict[int, asyncio.Task] = {}
+        self._type_reruns: Set[int] = set()
+
+    def schedule_asset_type(self, asset_type_id: int):
+        """Recalcula en segundo plano los assets de un tipo; no espera a que termine."""
+        running = self._type_tasks.get(asset_type_id)
+        if running is not None and not running.done():
+            # La pasada en curso puede haber leído el intervalo anterior: se repite una vez al terminar
+            self._type_reruns.add(asset_type_id)
+            return
+        self._type_tasks[asset_type_id] = asyncio.get_running_loop().create_task(self._run_asset_type(asset_type_id))
+
+    async def _run_asset_type(self, asset_type_id: int):
+        while True:
+            try:
+                result = await InspectionSchedulerService().run(asset_type_id=asset_type_id)
+                logging.info(
+                    f"Inspection scheduler: asset type {asset_type_id}, {result.scanned} assets scanned, "
+                    f"{result.updated} updated in {result.seconds:.2f}s"
+                )
+            except Exception as e:
+                # Si falla, la pasada periódica lo corrige
+                logging.error(f"Inspection scheduler run for asset type {asset_type_id} failed: {str(e)}")
+            if asset_type_id not in self._type_reruns:
+                break
+            self._type_reruns.discard(asset_type_id)
+        self._type_tasks.pop(asset_type_id, None)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                result = await InspectionSchedulerService().run()
+                logging.info(
+                    f"Inspection scheduler: {result.scanned} assets scanned, {result.updated} updated "
+                    f"in {result.seconds:.2f}s"
+                )
+                await asyncio.sleep(INSPECTION_SCHEDULER_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Inspection scheduler run failed: {str(e)}")
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._type_tasks.values():
+            task.cancel()
+        self._type_tasks = {}
+        self._type_reruns = set()
+
+
+inspection_scheduler_engine = InspectionSchedulerEngine()
+if INSPECTION_SCHEDULER_ENABLED:
+    on_startup(inspection_scheduler_engine.start)
+on_shutdown(inspection_scheduler_engine.close)
@@ -1,9 +1,20 @@
+import json
 import logging
 from typing import List, Optional
+from app.services.autocomplete_service import refresh_autocomplete, remove_autocomplete
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.geofence_service import invalidate_geofences
 from app.models.location_models import LocationCreate, LocationUpdate, LocationResponse
 
 
+LOCATION_QUERY_SPEC = QuerySpec(
+    LocationResponse,
+    indexed={"id": (), "location_name": (), "location_type": ()},
+)
+
+
 class LocationService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -12,17 +23,25 @@ class LocationService:
         try:
             await self.db_service.connect()
             query = """
-                INSERT INTO locations (location_name, address, city, country, location_type, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
+                INSERT INTO locations (location_name, address, city, country, location_type,
+                                       latitude, longitude, geofence_radius_m, geofence_polygon, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
             """
-            params = (location.location_name, location.address, location.city, location.country, location.location_type.value)
+            params = (
+                location.location_name, location.address, location.city, location.country, location.location_type.value,
+                location.latitude, location.longitude, location.geofence_radius_m,
+                json.dumps(location.geofence_polygon) if location.geofence_polygon is not None else None
+            )
             await self.db_service.execute(query, params)
+            invalidate_geofences()
 
             select_query = "SELECT * FROM locations WHERE location_name = %s ORDER BY id DESC LIMIT 1"
             result = await self.db_service.execute(select_query, (location.location_name,))
 
             if result:
-                return LocationResponse(**result[0])
+                created = LocationResponse(**result[0])
+                refresh_autocomplete("location", created)
+                return created
             raise ValueError("Location creation failed")
         except Exception as e:
             logging.error(f"Error creating location: {str(e)}")
@@ -30,14 +49,14 @@ class LocationService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_location_by_id(self, location_id: int) -> Optional[LocationResponse]:
+    async def get_location_by_id(self, location_id: int, fields: Optional[List[str]] = None) -> Optional[LocationResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM locations WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM locations WHERE id = %s"
             result = await self.db_service.execute(query, (location_id,))
 
             if result:
-                return LocationResponse(**result[0])
+                return build(LocationResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving location: {str(e)}")
@@ -45,13 +64,13 @@ class LocationService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_locations(self, limit: int = 100, offset: int = 0) -> List[LocationResponse]:
+    async def get_all_locations(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[LocationResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM locations LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("locations", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [LocationResponse(**row) for row in result]
+            return [build(LocationResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving locations: {str(e)}")
             raise
@@ -80,6 +99,19 @@ class LocationService:
             if location.location_type is not None:
                 update_fields.append("location_type = %s")
                 params.append(location.location_type.value)
+            # Coordenadas y geocerca: null explícito las borra (la ubicación deja de tener geocerca); omitido no las toca
+            if "latitude" in location.model_fields_set:
+                update_fields.append("latitude = %s")
+                params.append(location.latitude)
+            if "longitude" in location.model_fields_set:
+                update_fields.append("longitude = %s")
+                params.append(location.longitude)
+            if "geofence_radius_m" in location.model_fields_set:
+                update_fields.append("geofence_radius_m = %s")
+                params.append(location.geofence_radius_m)
+            if "geofence_polygon" in location.model_fields_set:
+                update_fields.append("geofence_polygon = %s")
+                params.append(json.dumps(location.geofence_polygon) if location.geofence_polygon is not None else None)
 
             if not update_fields:
                 return await self.get_location_by_id(location_id)
@@ -89,8 +121,11 @@ class LocationService:
 
             query = f"UPDATE locations SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
+            invalidate_geofences()
 
-            return await self.get_location_by_id(location_id)
+            updated = await self.get_location_by_id(location_id)
+            refresh_autocomplete("location", updated)
+            return updated
         except Exception as e:
             logging.error(f"Error updating location: {str(e)}")
             raise
@@ -102,6 +137,8 @@ class LocationService:
             await self.db_service.connect()
             query = "DELETE FROM locations WHERE id = %s"
             await self.db_service.execute(query, (location_id,))
+            invalidate_geofences()
+            remove_autocomplete("location", location_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting location: {str(e)}")
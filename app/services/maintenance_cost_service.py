@@ -0,0 +1,362 @@
+import logging
+import os
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.models.maintenance_models import MaintenanceCostGroup, MaintenanceCostResponse
+from app.services.database_service import DatabaseService, UnitOfWork
+
+MAINTENANCE_COST_BACKFILL_CHUNK_SIZE = int(os.getenv("MAINTENANCE_COST_BACKFILL_CHUNK_SIZE", "2000"))
+
+# Dimensión pública -> columna de maintenance_cost_summary
+DIMENSIONS: Dict[str, str] = {
+    "asset": "asset_id",
+    "asset_type": "asset_type_id",
+    "provider": "service_provider",
+    "month": "month",
+}
+DEFAULT_GROUP_BY = ("month",)
+
+# Fecha que decide el mes: el cierre o, si aún no lo hay, la más avanzada que tenga
+_COST_DATE = "COALESCE(m.completed_at, m.started_at, m.scheduled_at, m.created_at)"
+
+# Coste actual de cada maintenance: mano de obra (maintenances.cost) más repuestos consumidos.
+# FOR UPDATE OF m serializa las escrituras concurrentes sobre el mismo maintenance
+CONTRIBUTIONS_QUERY = f"""
+    SELECT m.id AS maintenance_id,
+           DATE_SUB(DATE({_COST_DATE}), INTERVAL DAYOFMONTH({_COST_DATE}) - 1 DAY) AS month,
+           m.asset_id, a.asset_type_id,
+           COALESCE(m.service_provider, '') AS service_provider,
+           COALESCE(m.cost, 0) AS labor_cost,
+           COALESCE((
+               SELECT SUM(mp.quantity_used * mp.cost_at_consumption)
+               FROM maintenance_parts mp
+               WHERE mp.maintenance_id = m.id
+           ), 0) AS parts_cost
+    FROM maintenances m
+    LEFT JOIN assets a ON a.id = m.asset_id
+    WHERE m.id IN ({{placeholders}})
+    FOR UPDATE OF m
+"""
+
+UPSERT_SUMMARY = """
+    INSERT INTO maintenance_cost_summary (month, asset_id, service_provider, asset_type_id,
+                                          labor_cost, parts_cost, maintenance_count, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        asset_type_id = VALUES(asset_type_id),
+        labor_cost = labor_cost + VALUES(labor_cost),
+        parts_cost = parts_cost + VALUES(parts_cost),
+        maintenance_count = maintenance_count + VALUES(maintenance_count),
+        updated_at = NOW()
+"""
+
+DELETE_EMPTY_SUMMARY = """
+    DELETE FROM maintenance_cost_summary
+    WHERE month = %s AND asset_id = %s AND service_provider = %s AND maintenance_count <= 0
+"""
+
+UPSERT_ENTRY = """
+    INSERT INTO maintenance_cost_entries (maintenance_id, month, asset_id, service_provider, asset_type_id,
+                                          labor_cost, parts_cost, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        month = VALUES(month),
+        asset_id = VALUES(asset_id),
+        service_provider = VALUES(service_provider),
+        asset_type_id = VALUES(asset_type_id),
+        labor_cost = VALUES(labor_cost),
+        parts_cost = VALUES(parts_cost),
+        updated_at = NOW()
+"""
+
+# Mismo resumen sin el asset: lo leen las consultas sin filtro de asset, que así no recorren una
+# fila por asset y mes. asset_type_id 0 = asset sin tipo (la clave primaria no admite NULL)
+UPSERT_TYPE_SUMMARY = """
+    INSERT INTO maintenance_cost_type_summary (month, asset_type_id, service_provider,
+                                               labor_cost, parts_cost, maintenance_count, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        labor_cost = labor_cost + VALUES(labor_cost),
+        parts_cost = parts_cost + VALUES(parts_cost),
+        maintenance_count = maintenance_count + VALUES(maintenance_count),
+        updated_at = NOW()
+"""
+
+DELETE_EMPTY_TYPE_SUMMARY = """
+    DELETE FROM maintenance_cost_type_summary
+    WHERE month = %s AND asset_type_id = %s AND service_provider = %s AND maintenance_count <= 0
+"""
+
+# Pasa las filas de un asset de su tipo actual en el resumen (sign -1) o al tipo nuevo (sign 1)
+MOVE_TYPE_SUMMARY = """
+    INSERT INTO maintenance_cost_type_summary (month, asset_type_id, service_provider,
+                                               labor_cost, parts_cost, maintenance_count, updated_at)
+    SELECT month, {asset_type}, service_provider,
+           {sign} * labor_cost, {sign} * parts_cost, {sign} * maintenance_count, NOW()
+    FROM maintenance_cost_summary
+    WHERE asset_id = %s AND NOT asset_type_id <=> %s
+    ON DUPLICATE KEY UPDATE
+        labor_cost = maintenance_cost_type_summary.labor_cost + VALUES(labor_cost),
+        parts_cost = maintenance_cost_type_summary.parts_cost + VALUES(parts_cost),
+        maintenance_count = maintenance_cost_type_summary.maintenance_count + VALUES(maintenance_count),
+        updated_at = NOW()
+"""
+
+DELETE_EMPTY_MOVED_TYPE_SUMMARY = """
+    DELETE t FROM maintenance_cost_type_summary t
+    JOIN maintenance_cost_summary s
+      ON s.month = t.month AND COALESCE(s.asset_type_id, 0) = t.asset_type_id AND s.service_provider = t.service_provider
+    WHERE s.asset_id = %s AND NOT s.asset_type_id <=> %s AND t.maintenance_count <= 0
+"""
+
+ENTRY_FIELDS = ("month", "asset_id", "service_provider", "asset_type_id", "labor_cost", "parts_cost")
+# (mes, asset, proveedor): clave de maintenance_cost_summary
+SummaryKey = Tuple[date, int, str]
+# (mes, tipo de asset o 0, proveedor): clave de maintenance_cost_type_summary
+TypeSummaryKey = Tuple[date, int, str]
+
+
+def parse_group_by(group_by: Optional[str]) -> List[str]:
+    """Dimensiones pedidas (coma-separadas); ValueError si alguna no existe."""
+    names = [name.strip() for name in group_by.split(",") if name.strip()] if group_by else list(DEFAULT_GROUP_BY)
+    unknown = [name for name in names if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {', '.join(unknown)}. Allowed: {', '.join(DIMENSIONS)}")
+    return list(dict.fromkeys(names))
+
+
+def _entry(row: Dict[str, Any]) -> Tuple:
+    return tuple(row[name] for name in ENTRY_FIELDS)
+
+
+def summary_deltas(recorded: Dict[int, Tuple], current: Dict[int, Tuple]) -> Dict[SummaryKey, list]:
+    """Deltas [asset_type_id, mano de obra, repuestos, nº] por fila del resumen entre lo registrado y lo actual."""
+    deltas: Dict[SummaryKey, list] = {}
+    for maintenance_id in recorded.keys() | current.keys():
+        before, after = recorded.get(maintenance_id), current.get(maintenance_id)
+        if before == after:
+            continue
+        for entry, sign in ((before, -1), (after, 1)):
+            if entry is None:
+                continue
+            month, asset_id, provider, asset_type_id, labor_cost, parts_cost = entry
+            delta = deltas.setdefault((month, asset_id, provider), [asset_type_id, Decimal(0), Decimal(0), 0])
+            if sign > 0:
+                delta[0] = asset_type_id
+            delta[1] += sign * Decimal(labor_cost)
+            delta[2] += sign * Decimal(parts_cost)
+            delta[3] += sign
+    return deltas
+
+
+def type_summary_deltas(recorded: Dict[int, Tuple], current: Dict[int, Tuple]) -> Dict[TypeSummaryKey, list]:
+    """Deltas [mano de obra, repuestos, nº] por fila del resumen por tipo; cada entrada cuenta en el tipo que tenía."""
+    deltas: Dict[TypeSummaryKey, list] = {}
+    for maintenance_id in recorded.keys() | current.keys():
+        before, after = recorded.get(maintenance_id), current.get(maintenance_id)
+        if before == after:
+            continue
+        for entry, sign in ((before, -1), (after, 1)):
+            if entry is None:
+                continue
+            month, _, provider, asset_type_id, labor_cost, parts_cost = entry
+            delta = deltas.setdefault((month, asset_type_id or 0, provider), [Decimal(0), Decimal(0), 0])
+            delta[0] += sign * Decimal(labor_cost)
+            delta[1] += sign * Decimal(parts_cost)
+            delta[2] += sign
+    return deltas
+
+
+async def sync_maintenance_costs(uow: UnitOfWork, maintenance_ids: Sequence[int]) -> int:
+    """
+    Lleva maintenance_cost_entries y maintenance_cost_summary al coste actual de los maintenances
+    indicados (incluidos los ya borrados). Se llama dentro de la transacción que escribe en
+    maintenances o maintenance_parts; devuelve cuántos maintenances cambiaron.
+    """
+    maintenance_ids = sorted(set(maintenance_ids))
+    if not maintenance_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(maintenance_ids))
+    rows = await uow.execute(CONTRIBUTIONS_QUERY.format(placeholders=placeholders), tuple(maintenance_ids))
+    current = {row["maintenance_id"]: _entry(row) for row in rows}
+    rows = await uow.execute(
+        f"SELECT * FROM maintenance_cost_entries WHERE maintenance_id IN ({placeholders}) FOR UPDATE",
+        tuple(maintenance_ids)
+    )
+    recorded = {row["maintenance_id"]: _entry(row) for row in rows}
+
+    changed = [maintenance_id for maintenance_id in maintenance_ids if recorded.get(maintenance_id) != current.get(maintenance_id)]
+    for maintenance_id in changed:
+        if maintenance_id in current:
+            uow.add(UPSERT_ENTRY, (maintenance_id, *current[maintenance_id]))
+    removed = [maintenance_id for maintenance_id in changed if maintenance_id not in current]
+    if removed:
+        uow.add(
+            f"DELETE FROM maintenance_cost_entries WHERE maintenance_id IN ({', '.join(['%s'] * len(removed))})",
+            tuple(removed)
+        )
+
+    # En orden de clave: dos transacciones que tocan las mismas filas del resumen las bloquean igual
+    deltas = sorted(summary_deltas(recorded, current).items())
+    for (month, asset_id, provider), (asset_type_id, labor_cost, parts_cost, count) in deltas:
+        if labor_cost or parts_cost or count:
+            uow.add(UPSERT_SUMMARY, (month, asset_id, provider, asset_type_id, labor_cost, parts_cost, count))
+    for (month, asset_id, provider), delta in deltas:
+        if delta[3] < 0:
+            uow.add(DELETE_EMPTY_SUMMARY, (month, asset_id, provider))
+
+    type_deltas = sorted(type_summary_deltas(recorded, current).items())
+    for (month, asset_type_id, provider), (labor_cost, parts_cost, count) in type_deltas:
+        if labor_cost or parts_cost or count:
+            uow.add(UPSERT_TYPE_SUMMARY, (month, asset_type_id, provider, labor_cost, parts_cost, count))
+    for (month, asset_type_id, provider), delta in type_deltas:
+        if delta[2] < 0:
+            uow.add(DELETE_EMPTY_TYPE_SUMMARY, (month, asset_type_id, provider))
+    return len(changed)
+
+
+def move_asset_costs(uow: UnitOfWork, asset_id: int, asset_type_id: Optional[int]):
+    """
+    El histórico de un asset pasa a contar para su nuevo tipo; AssetService lo llama en la misma
+    transacción que el UPDATE del asset. Es idempotente: solo toca filas con otro tipo. El resumen
+    por tipo se mueve antes de cambiar el tipo en maintenance_cost_summary, que es de donde lee.
+    """
+    uow.add(MOVE_TYPE_SUMMARY.format(asset_type="COALESCE(asset_type_id, 0)", sign=-1), (asset_id, asset_type_id))
+    uow.add(MOVE_TYPE_SUMMARY.format(asset_type="%s", sign=1), (asset_type_id or 0, asset_id, asset_type_id))
+    uow.add(DELETE_EMPTY_MOVED_TYPE_SUMMARY, (asset_id, asset_type_id))
+    for table in ("maintenance_cost_entries", "maintenance_cost_summary"):
+        uow.add(
+            f"UPDATE {table} SET asset_type_id = %s WHERE asset_id = %s AND NOT asset_type_id <=> %s",
+            (asset_type_id, asset_id, asset_type_id)
+        )
+
+
+class MaintenanceCostService:
+    """
+    Coste de mantenimiento agregado por mes, asset, tipo de asset y proveedor. Las consultas leen
+    maintenance_cost_summary (o, sin asset, maintenance_cost_type_summary), que las escrituras de
+    MaintenanceService y MaintenancePartService mantienen en la misma transacción;
+    maintenance_cost_entries guarda lo que ya se ha sumado de cada maintenance para que cada
+    cambio aplique solo su delta.
+    """
+
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def get_costs(
+            self,
+            group_by: Sequence[str],
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None,
+            asset_id: Optional[int] = None,
+            asset_type_id: Optional[int] = None,
+            service_provider: Optional[str] = None,
+            limit: int = 1000
+    ) -> MaintenanceCostResponse:
+        conditions, params = [], []
+        if date_from is not None:
+            conditions.append("month >= %s")
+            params.append(date_from.replace(day=1))
+        if date_to is not None:
+            conditions.append("month <= %s")
+            params.append(date_to.replace(day=1))
+        for column, value in (("asset_id", asset_id), ("asset_type_id", asset_type_id), ("service_provider", service_provider)):
+            if value is not None:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        # Sin asset basta el resumen por tipo, que no crece con el número de assets
+        by_type = asset_id is None and "asset" not in group_by
+        table = "maintenance_cost_type_summary" if by_type else "maintenance_cost_summary"
+        columns = ", ".join(DIMENSIONS[name] for name in group_by)
+        sums = (
+            "SUM(labor_cost) AS labor_cost, SUM(parts_cost) AS parts_cost, "
+            f"SUM(maintenance_count) AS maintenance_count FROM {table}"
+            f"{' WHERE ' + ' AND '.join(conditions) if conditions else ''}"
+        )
+        # Un grupo de más para saber si el límite ha cortado la lista
+        query = f"SELECT {columns}, {sums} GROUP BY {columns} ORDER BY {columns} LIMIT %s"
+        try:
+            await self.db_service.connect()
+            rows = await self.db_service.execute(query, (*params, limit + 1))
+            # Los totales cubren todos los grupos, no solo los devueltos
+            totals = (await self.db_service.execute(f"SELECT {sums}", tuple(params)))[0]
+        except Exception as e:
+            logging.error(f"Error retrieving maintenance costs: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+        truncated = len(rows) > limit
+        groups = []
+        for row in rows[:limit]:
+            dimensions = {name: row[DIMENSIONS[name]] for name in group_by}
+            if "provider" in dimensions:
+                dimensions["provider"] = dimensions["provider"] or None
+            if by_type and "asset_type" in dimensions:
+                dimensions["asset_type"] = dimensions["asset_type"] or None
+            labor_cost, parts_cost = Decimal(row["labor_cost"] or 0), Decimal(row["parts_cost"] or 0)
+            groups.append(MaintenanceCostGroup(
+                dimensions=dimensions,
+                labor_cost=labor_cost,
+                parts_cost=parts_cost,
+                total_cost=labor_cost + parts_cost,
+                maintenance_count=int(row["maintenance_count"] or 0)
+            ))
+        labor_cost, parts_cost = Decimal(totals["labor_cost"] or 0), Decimal(totals["parts_cost"] or 0)
+        return MaintenanceCostResponse(
+            group_by=list(group_by),
+            labor_cost=labor_cost,
+            parts_cost=parts_cost,
+            total_cost=labor_cost + parts_cost,
+            maintenance_count=int(totals["maintenance_count"] or 0),
+            truncated=truncated,
+            groups=groups
+        )
+
+    async def backfill(
+            self,
+            chunk_size: Optional[int] = None,
+            progress: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[int, int]:
+        """
+        Recalcula el histórico por bloques de id, una transacción por bloque. Es idempotente y se
+        puede lanzar con el servicio en marcha: cada bloque solo aplica la diferencia con lo ya
+        registrado, así que también corrige escrituras hechas fuera de los servicios.
+        Devuelve (maintenances revisados, maintenances corregidos).
+        """
+        chunk_size = chunk_size or MAINTENANCE_COST_BACKFILL_CHUNK_SIZE
+        scanned = changed = 0
+        last_id = 0
+        try:
+            await self.db_service.connect()
+            while True:
+                rows = await self.db_service.execute(
+                    "SELECT id FROM maintenances WHERE id > %s ORDER BY id LIMIT %s", (last_id, chunk_size)
+                )
+                ids = [row["id"] for row in rows]
+                upper = ids[-1] if len(ids) == chunk_size else None
+                # Entradas de maintenances borrados fuera del servicio dentro del mismo rango
+                condition, params = ("AND maintenance_id <= %s", (upper,)) if upper is not None else ("", ())
+                rows = await self.db_service.execute(
+                    f"SELECT maintenance_id FROM maintenance_cost_entries WHERE maintenance_id > %s {condition}",
+                    (last_id, *params)
+                )
+                ids.extend(row["maintenance_id"] for row in rows)
+                if ids:
+                    changed += await self.db_service.run_in_transaction(
+                        lambda uow, chunk=ids: sync_maintenance_costs(uow, chunk)
+                    )
+                scanned += len(set(ids))
+                if progress is not None:
+                    progress(scanned, changed)
+                if upper is None:
+                    break
+                last_id = upper
+        except Exception as e:
+            logging.error(f"Error backfilling maintenance costs: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+        return scanned, changed
@@ -1,60 +1,193 @@
 import logging
-from typing import List, Optional
-from app.services.database_service import DatabaseService
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from app.services.database_service import DatabaseService, UnitOfWork
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.maintenance_cost_service import sync_maintenance_costs
 from app.models.maintenance_part_models import (
+    MaintenanceKitCreate,
     MaintenancePartCreate,
     MaintenancePartUpdate,
     MaintenancePartResponse,
 )
 
 
+MAINTENANCE_PART_QUERY_SPEC = QuerySpec(
+    MaintenancePartResponse,
+    indexed={"maintenance_id": (), "spare_part_id": ()},
+    key=("maintenance_id", "spare_part_id"),
+)
+
+
+def insert_parts_query(maintenance_id: int, parts: List[Tuple[int, int, Optional[Decimal]]]) -> Tuple[str, tuple]:
+    """
+    Un solo INSERT ... SELECT para todos los consumos (spare_part_id, cantidad, precio); sin precio
+    se toma el unit_cost actual del repuesto.
+    """
+    rows = " UNION ALL ".join(
+        ["SELECT %s AS spare_part_id, %s AS quantity_used, CAST(%s AS DECIMAL(12, 4)) AS cost_at_consumption"] * len(parts)
+    )
+    query = (
+        "INSERT INTO maintenance_parts (maintenance_id, spare_part_id, quantity_used, cost_at_consumption, created_at) "
+        "SELECT %s, k.spare_part_id, k.quantity_used, COALESCE(k.cost_at_consumption, sp.unit_cost), NOW() "
+        f"FROM ({rows}) k JOIN spare_parts sp ON sp.id = k.spare_part_id"
+    )
+    return query, (maintenance_id, *(value for part in parts for value in part))
+
+
+class InsufficientStockError(Exception):
+    """Algún repuesto no tiene stock suficiente; no se ha descontado nada."""
+
+    def __init__(self, shortages: Dict[int, Tuple[int, int]]):
+        # spare_part_id -> (pedido, disponible)
+        self.shortages = shortages
+        super().__init__("; ".join(
+            f"Insufficient stock for spare part {part_id} (requested {requested}, available {available})"
+            for part_id, (requested, available) in sorted(shortages.items())
+        ))
+
+
+class _StockShortage(Exception):
+    """Interna: aborta la transacción; el detalle se lee después del rollback."""
+
+    def __init__(self, requested: Dict[int, int]):
+        super().__init__("Insufficient stock")
+        self.requested = requested
+
+
+async def _take_stock(uow: UnitOfWork, requested: Dict[int, int]):
+    """
+    Descuenta todos los repuestos con un único UPDATE condicional: solo toca las filas con stock
+    suficiente, así que si alguna se queda fuera se aborta la transacción entera. Dos consumos
+    concurrentes del mismo repuesto se serializan en el bloqueo de fila y el segundo ve el stock ya
+    descontado, sin carreras de leer-y-escribir.
+    """
+    part_ids = sorted(requested)
+    cases = " ".join(["WHEN %s THEN %s"] * len(part_ids))
+    case_params = [value for part_id in part_ids for value in (part_id, requested[part_id])]
+    placeholders = ", ".join(["%s"] * len(part_ids))
+    query = (
+        f"UPDATE spare_parts SET quantity = quantity - CASE id {cases} END, updated_at = NOW() "
+        f"WHERE id IN ({placeholders}) AND quantity >= CASE id {cases} END"
+    )
+    result = await uow.execute(query, (*case_params, *part_ids, *case_params))
+    if result[0]["rowcount"] != len(part_ids):
+        raise _StockShortage(requested)
+
+
+async def _return_stock(uow: UnitOfWork, spare_part_id: int, quantity: int):
+    await uow.execute(
+        "UPDATE spare_parts SET quantity = quantity + %s, updated_at = NOW() WHERE id = %s",
+        (quantity, spare_part_id)
+    )
+
+
 class MaintenancePartService:
     def __init__(self):
         self.db_service = DatabaseService()
 
-    async def create_maintenance_part(self, item: MaintenancePartCreate) -> MaintenancePartResponse:
+    async def _stock_error(self, shortage: _StockShortage) -> Exception:
+        """Tras el rollback: qué repuestos no existen o no llegan (ValueError / InsufficientStockError)."""
+        part_ids = sorted(shortage.requested)
         try:
             await self.db_service.connect()
-            query = (
-                """
-                INSERT INTO maintenance_parts (maintenance_id, spare_part_id, quantity_used, cost_at_consumption, created_at)
-                VALUES (%s, %s, %s, %s, NOW())
-                """
+            rows = await self.db_service.execute(
+                f"SELECT id, quantity FROM spare_parts WHERE id IN ({', '.join(['%s'] * len(part_ids))})",
+                tuple(part_ids)
             )
-            params = (
-                item.maintenance_id,
-                item.spare_part_id,
-                item.quantity_used,
-                item.cost_at_consumption,
+        finally:
+            await self.db_service.disconnect()
+        available = {row["id"]: row["quantity"] for row in rows}
+        missing = [str(part_id) for part_id in part_ids if part_id not in available]
+        if missing:
+            return ValueError(f"Spare parts not found: {', '.join(missing)}")
+        shortages = {
+            part_id: (requested, available[part_id])
+            for part_id, requested in shortage.requested.items()
+            if available[part_id] < requested
+        }
+        # Si entre tanto se ha repuesto stock se informa de todo lo pedido
+        return InsufficientStockError(shortages or {
+            part_id: (requested, available[part_id]) for part_id, requested in shortage.requested.items()
+        })
+
+    async def create_maintenance_part(self, item: MaintenancePartCreate) -> MaintenancePartResponse:
+        async def work(uow: UnitOfWork) -> MaintenancePartResponse:
+            await _take_stock(uow, {item.spare_part_id: item.quantity_used})
+            query, params = insert_parts_query(
+                item.maintenance_id, [(item.spare_part_id, item.quantity_used, item.cost_at_consumption)]
             )
-            await self.db_service.execute(query, params)
+            await uow.execute(query, params)
+            await sync_maintenance_costs(uow, [item.maintenance_id])
 
             select_query = (
                 "SELECT * FROM maintenance_parts WHERE maintenance_id = %s AND spare_part_id = %s"
             )
-            result = await self.db_service.execute(
+            result = await uow.execute(
                 select_query, (item.maintenance_id, item.spare_part_id)
             )
 
             if result:
                 return MaintenancePartResponse(**result[0])
             raise ValueError("Maintenance part creation failed")
+
+        try:
+            try:
+                return await self.db_service.run_in_transaction(work)
+            except _StockShortage as shortage:
+                raise await self._stock_error(shortage) from None
         except Exception as e:
             logging.error(f"Error creating maintenance part: {str(e)}")
             raise
-        finally:
-            await self.db_service.disconnect()
 
-    async def get_maintenance_part(self, maintenance_id: int, spare_part_id: int) -> Optional[MaintenancePartResponse]:
+    async def consume_kit(self, kit: MaintenanceKitCreate) -> List[MaintenancePartResponse]:
+        """
+        Registra de una vez todos los repuestos de un maintenance: un UPDATE condicional para el
+        stock, un INSERT ... SELECT para los consumos y la actualización del resumen de costes, todo
+        en la misma transacción. O se consumen todos o ninguno.
+        """
+        requested: Dict[int, int] = {}
+        costs = {}
+        for part in kit.parts:
+            if part.spare_part_id in requested:
+                raise ValueError(f"Spare part {part.spare_part_id} appears more than once in the kit")
+            requested[part.spare_part_id] = part.quantity_used
+            costs[part.spare_part_id] = part.cost_at_consumption
+
+        async def work(uow: UnitOfWork) -> List[MaintenancePartResponse]:
+            await _take_stock(uow, requested)
+            query, params = insert_parts_query(
+                kit.maintenance_id, [(part_id, quantity, costs[part_id]) for part_id, quantity in requested.items()]
+            )
+            await uow.execute(query, params)
+            await sync_maintenance_costs(uow, [kit.maintenance_id])
+            rows = await uow.execute(
+                f"SELECT * FROM maintenance_parts WHERE maintenance_id = %s "
+                f"AND spare_part_id IN ({', '.join(['%s'] * len(requested))}) ORDER BY spare_part_id",
+                (kit.maintenance_id, *requested)
+            )
+            return [MaintenancePartResponse(**row) for row in rows]
+
+        try:
+            try:
+                return await self.db_service.run_in_transaction(work)
+            except _StockShortage as shortage:
+                raise await self._stock_error(shortage) from None
+        except Exception as e:
+            logging.error(f"Error consuming maintenance kit: {str(e)}")
+            raise
+
+    async def get_maintenance_part(self, maintenance_id: int, spare_part_id: int, fields: Optional[List[str]] = None) -> Optional[MaintenancePartResponse]:
         try:
             await self.db_service.connect()
             query = (
-                "SELECT * FROM maintenance_parts WHERE maintenance_id = %s AND spare_part_id = %s"
+                f"SELECT {sql_columns(fields)} FROM maintenance_parts WHERE maintenance_id = %s AND spare_part_id = %s"
             )
             result = await self.db_service.execute(query, (maintenance_id, spare_part_id))
 
             if result:
-                return MaintenancePartResponse(**result[0])
+                return build(MaintenancePartResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving maintenance part: {str(e)}")
@@ -62,39 +195,39 @@ class MaintenancePartService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_maintenance_parts(self, limit: int = 100, offset: int = 0) -> List[MaintenancePartResponse]:
+    async def get_all_maintenance_parts(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[MaintenancePartResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenance_parts LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("maintenance_parts", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [MaintenancePartResponse(**row) for row in result]
+            return [build(MaintenancePartResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenance parts: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_maintenance_parts_by_maintenance(self, maintenance_id: int, limit: int = 100, offset: int = 0) -> List[MaintenancePartResponse]:
+    async def get_maintenance_parts_by_maintenance(self, maintenance_id: int, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[MaintenancePartResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenance_parts WHERE maintenance_id = %s LIMIT %s OFFSET %s"
+            query = f"SELECT {sql_columns(fields)} FROM maintenance_parts WHERE maintenance_id = %s LIMIT %s OFFSET %s"
             result = await self.db_service.execute(query, (maintenance_id, limit, offset))
 
-            return [MaintenancePartResponse(**row) for row in result]
+            return [build(MaintenancePartResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenance parts by maintenance: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_maintenance_parts_by_spare_part(self, spare_part_id: int, limit: int = 100, offset: int = 0) -> List[MaintenancePartResponse]:
+    async def get_maintenance_parts_by_spare_part(self, spare_part_id: int, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[MaintenancePartResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenance_parts WHERE spare_part_id = %s LIMIT %s OFFSET %s"
+            query = f"SELECT {sql_columns(fields)} FROM maintenance_parts WHERE spare_part_id = %s LIMIT %s OFFSET %s"
             result = await self.db_service.execute(query, (spare_part_id, limit, offset))
 
-            return [MaintenancePartResponse(**row) for row in result]
+            return [build(MaintenancePartResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenance parts by spare part: {str(e)}")
             raise
@@ -123,7 +256,29 @@ class MaintenancePartService:
             query = (
                 f"UPDATE maintenance_parts SET {', '.join(update_fields)} WHERE maintenance_id = %s AND spare_part_id = %s"
             )
-            await self.db_service.execute(query, tuple(params))
+
+            async def work(uow: UnitOfWork) -> bool:
+                rows = await uow.execute(
+                    "SELECT quantity_used FROM maintenance_parts WHERE maintenance_id = %s AND spare_part_id = %s FOR UPDATE",
+                    (maintenance_id, spare_part_id)
+                )
+                if not rows:
+                    return False
+                # Cambiar la cantidad consumida mueve la diferencia en el stock
+                delta = (item.quantity_used or rows[0]["quantity_used"]) - rows[0]["quantity_used"]
+                if delta > 0:
+                    await _take_stock(uow, {spare_part_id: delta})
+                elif delta < 0:
+                    await _return_stock(uow, spare_part_id, -delta)
+                await uow.execute(query, tuple(params))
+                await sync_maintenance_costs(uow, [maintenance_id])
+                return True
+
+            try:
+                if not await self.db_service.run_in_transaction(work):
+                    return None
+            except _StockShortage as shortage:
+                raise await self._stock_error(shortage) from None
 
             return await self.get_maintenance_part(maintenance_id, spare_part_id)
         except Exception as e:
@@ -136,7 +291,20 @@ class MaintenancePartService:
         try:
             await self.db_service.connect()
             query = "DELETE FROM maintenance_parts WHERE maintenance_id = %s AND spare_part_id = %s"
-            await self.db_service.execute(query, (maintenance_id, spare_part_id))
+
+            async def work(uow: UnitOfWork):
+                rows = await uow.execute(
+                    "SELECT quantity_used FROM maintenance_parts WHERE maintenance_id = %s AND spare_part_id = %s FOR UPDATE",
+                    (maintenance_id, spare_part_id)
+                )
+                if not rows:
+                    return
+                await uow.execute(query, (maintenance_id, spare_part_id))
+                # Anular un consumo devuelve las piezas al stock
+                await _return_stock(uow, spare_part_id, rows[0]["quantity_used"])
+                await sync_maintenance_costs(uow, [maintenance_id])
+
+            await self.db_service.run_in_transaction(work)
             return True
         except Exception as e:
             logging.error(f"Error deleting maintenance part: {str(e)}")
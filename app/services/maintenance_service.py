@@ -1,7 +1,19 @@
 import logging
 from typing import List, Optional
-from app.services.database_service import DatabaseService
-from app.models.maintenance_models import MaintenanceCreate, MaintenanceUpdate, MaintenanceResponse
+from app.services.database_service import DatabaseService, UnitOfWork
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.inspection_scheduler_service import reschedule_after_maintenance
+from app.services.maintenance_cost_service import sync_maintenance_costs
+from app.models.maintenance_models import MaintenanceCreate, MaintenanceUpdate, MaintenanceResponse, MaintenanceStatus
+
+
+# status y maintenance_type solo están indexados detrás de asset_id, en
+# (asset_id, status, maintenance_type, completed_at) (migrations/001)
+MAINTENANCE_QUERY_SPEC = QuerySpec(
+    MaintenanceResponse,
+    indexed={"id": (), "asset_id": (), "status": ("asset_id",), "maintenance_type": ("asset_id",)},
+)
 
 
 class MaintenanceService:
@@ -9,8 +21,7 @@ class MaintenanceService:
         self.db_service = DatabaseService()
 
     async def create_maintenance(self, maintenance: MaintenanceCreate) -> MaintenanceResponse:
-        try:
-            await self.db_service.connect()
+        async def work(uow: UnitOfWork) -> MaintenanceResponse:
             query = """
                 INSERT INTO maintenances (asset_id, maintenance_type, status, description,
                                          service_provider, cost, scheduled_at, started_at,
@@ -22,28 +33,32 @@ class MaintenanceService:
                 maintenance.description, maintenance.service_provider, maintenance.cost,
                 maintenance.scheduled_at, maintenance.started_at, maintenance.completed_at
             )
-            await self.db_service.execute(query, params)
+            await uow.execute(query, params)
 
             select_query = "SELECT * FROM maintenances WHERE id = LAST_INSERT_ID()"
-            result = await self.db_service.execute(select_query, ())
+            result = await uow.execute(select_query, ())
 
-            if result:
-                return MaintenanceResponse(**result[0])
-            raise ValueError("Maintenance creation failed")
+            if not result:
+                raise ValueError("Maintenance creation failed")
+            await sync_maintenance_costs(uow, [result[0]["id"]])
+            created = MaintenanceResponse(**result[0])
+            await reschedule_after_maintenance(uow, created.asset_id, created.status == MaintenanceStatus.completed)
+            return created
+
+        try:
+            return await self.db_service.run_in_transaction(work)
         except Exception as e:
             logging.error(f"Error creating maintenance: {str(e)}")
             raise
-        finally:
-            await self.db_service.disconnect()
 
-    async def get_maintenance_by_id(self, maintenance_id: int) -> Optional[MaintenanceResponse]:
+    async def get_maintenance_by_id(self, maintenance_id: int, fields: Optional[List[str]] = None) -> Optional[MaintenanceResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenances WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM maintenances WHERE id = %s"
             result = await self.db_service.execute(query, (maintenance_id,))
 
             if result:
-                return MaintenanceResponse(**result[0])
+                return build(MaintenanceResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving maintenance: {str(e)}")
@@ -51,52 +66,52 @@ class MaintenanceService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_maintenances(self, limit: int = 100, offset: int = 0) -> List[MaintenanceResponse]:
+    async def get_all_maintenances(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[MaintenanceResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenances LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("maintenances", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [MaintenanceResponse(**row) for row in result]
+            return [build(MaintenanceResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenances: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_maintenances_by_asset(self, asset_id: int, limit: int = 100, offset: int = 0) -> List[MaintenanceResponse]:
+    async def get_maintenances_by_asset(self, asset_id: int, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[MaintenanceResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenances WHERE asset_id = %s LIMIT %s OFFSET %s"
+            query = f"SELECT {sql_columns(fields)} FROM maintenances WHERE asset_id = %s LIMIT %s OFFSET %s"
             result = await self.db_service.execute(query, (asset_id, limit, offset))
 
-            return [MaintenanceResponse(**row) for row in result]
+            return [build(MaintenanceResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenances by asset: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_maintenances_by_status(self, status: str, limit: int = 100, offset: int = 0) -> List[MaintenanceResponse]:
+    async def get_maintenances_by_status(self, status: str, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[MaintenanceResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenances WHERE status = %s LIMIT %s OFFSET %s"
+            query = f"SELECT {sql_columns(fields)} FROM maintenances WHERE status = %s LIMIT %s OFFSET %s"
             result = await self.db_service.execute(query, (status, limit, offset))
 
-            return [MaintenanceResponse(**row) for row in result]
+            return [build(MaintenanceResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenances by status: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_maintenances_by_type(self, maintenance_type: str, limit: int = 100, offset: int = 0) -> List[MaintenanceResponse]:
+    async def get_maintenances_by_type(self, maintenance_type: str, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[MaintenanceResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM maintenances WHERE maintenance_type = %s LIMIT %s OFFSET %s"
+            query = f"SELECT {sql_columns(fields)} FROM maintenances WHERE maintenance_type = %s LIMIT %s OFFSET %s"
             result = await self.db_service.execute(query, (maintenance_type, limit, offset))
 
-            return [MaintenanceResponse(**row) for row in result]
+            return [build(MaintenanceResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving maintenances by type: {str(e)}")
             raise
@@ -145,8 +160,17 @@ class MaintenanceService:
             params.append(maintenance_id)
 
             query = f"UPDATE maintenances SET {', '.join(update_fields)} WHERE id = %s"
-            await self.db_service.execute(query, tuple(params))
 
+            async def work(uow: UnitOfWork):
+                await uow.execute(query, tuple(params))
+                await sync_maintenance_costs(uow, [maintenance_id])
+                if maintenance.status is not None or maintenance.completed_at is not None:
+                    rows = await uow.execute("SELECT asset_id, status FROM maintenances WHERE id = %s", (maintenance_id,))
+                    if rows:
+                        completed = rows[0]["status"] == MaintenanceStatus.completed.value
+                        await reschedule_after_maintenance(uow, rows[0]["asset_id"], completed)
+
+            await self.db_service.run_in_transaction(work)
             return await self.get_maintenance_by_id(maintenance_id)
         except Exception as e:
             logging.error(f"Error updating maintenance: {str(e)}")
@@ -158,7 +182,12 @@ class MaintenanceService:
         try:
             await self.db_service.connect()
             query = "DELETE FROM maintenances WHERE id = %s"
-            await self.db_service.execute(query, (maintenance_id,))
+
+            async def work(uow: UnitOfWork):
+                await uow.execute(query, (maintenance_id,))
+                await sync_maintenance_costs(uow, [maintenance_id])
+
+            await self.db_service.run_in_transaction(work)
             return True
         except Exception as e:
             logging.error(f"Error deleting maintenance: {str(e)}")
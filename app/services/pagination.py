@@ -0,0 +1,19 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Tuple
+
+
+def encode_cursor(event_time: datetime, *keys: Any) -> str:
+    """Cursor opaco de keyset: (instante, desempates...) serializado en base64 url-safe."""
+    payload = json.dumps([event_time.isoformat(), *keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, List[Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload[0]), payload[1:]
+    except (ValueError, TypeError, IndexError):
+        raise ValueError("Invalid cursor")
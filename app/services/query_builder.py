@@ -0,0 +1,218 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.services.fieldsets import sql_columns
+
+MAX_FILTERS = 8
+MAX_IN_VALUES = 100
+FILTER_DESCRIPTION = (
+    "Filter as field:op:value (repeatable). Operators: eq, ne, lt, lte, gt, gte, in (comma-separated values), "
+    "prefix, null (true/false). field:value is shorthand for eq"
+)
+SORT_DESCRIPTION = "Comma-separated sort fields, prefix with - for descending"
+
+_SQL_OPERATORS = {"eq": "=", "ne": "<>", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+_MONGO_OPERATORS = {"eq": "$eq", "ne": "$ne", "lt": "$lt", "lte": "$lte", "gt": "$gt", "gte": "$gte"}
+OPERATORS = tuple(_SQL_OPERATORS) + ("in", "prefix", "null")
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """
+    Campos por los que se puede filtrar y ordenar un listado: solo los que tienen índice.
+    `indexed` asocia cada campo con los campos que deben fijarse por igualdad para que el índice
+    sirva: () para un índice propio, ("shipment_id",) si es la segunda columna de un índice
+    compuesto (shipment_id, event_datetime). Al menos uno de ellos tiene que estar filtrado con eq.
+    """
+    model: Type[BaseModel]
+    indexed: Mapping[str, Tuple[str, ...]]
+    # Desempate para que la paginación con sort sea estable
+    key: Tuple[str, ...] = ("id",)
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    operator: str
+    value: Any
+
+
+@dataclass
+class ListQuery:
+    spec: QuerySpec
+    conditions: List[Condition] = field(default_factory=list)
+    # (campo, descendente)
+    sort: List[Tuple[str, bool]] = field(default_factory=list)
+
+    def sql(self) -> Tuple[str, list]:
+        """Cláusulas WHERE y ORDER BY parametrizadas (cadena vacía si no hay nada que aplicar)."""
+        clauses = []
+        params: list = []
+        for condition in self.conditions:
+            column = f"`{condition.field}`"
+            if condition.operator == "null":
+                clauses.append(f"{column} IS NULL" if condition.value else f"{column} IS NOT NULL")
+            elif condition.operator == "in":
+                clauses.append(f"{column} IN ({', '.join(['%s'] * len(condition.value))})")
+                params.extend(condition.value)
+            elif condition.operator == "prefix":
+                clauses.append(f"{column} LIKE %s")
+                params.append(re.sub(r"([\\%_])", r"\\\1", condition.value) + "%")
+            else:
+                clauses.append(f"{column} {_SQL_OPERATORS[condition.operator]} %s")
+                params.append(condition.value)
+        sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        if self.sort:
+            order = [f"`{name}` {'DESC' if descending else 'ASC'}" for name, descending in self._sort_with_key()]
+            sql += f" ORDER BY {', '.join(order)}"
+        return sql, params
+
+    def mongo_filter(self) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        for condition in self.conditions:
+            name = _alias(self.spec.model, condition.field)
+            if condition.operator == "null":
+                expression = {"$eq": None} if condition.value else {"$ne": None}
+            elif condition.operator == "in":
+                expression = {"$in": condition.value}
+            elif condition.operator == "prefix":
+                expression = {"$regex": f"^{re.escape(condition.value)}"}
+            else:
+                expression = {_MONGO_OPERATORS[condition.operator]: condition.value}
+            query.setdefault(name, {}).update(expression)
+        return query
+
+    def mongo_sort(self) -> Optional[List[Tuple[str, int]]]:
+        if not self.sort:
+            return None
+        return [(_alias(self.spec.model, name), -1 if descending else 1) for name, descending in self._sort_with_key()]
+
+    def _sort_with_key(self) -> List[Tuple[str, bool]]:
+        sort = list(self.sort)
+        names = {name for name, _ in sort}
+        descending = sort[-1][1]
+        sort.extend((name, descending) for name in self.spec.key if name not in names)
+        return sort
+
+
+def select_query(
+        table: str,
+        fields: Optional[Sequence[str]],
+        query: Optional[ListQuery],
+        limit: int,
+        offset: int
+) -> Tuple[str, tuple]:
+    """SELECT paginado de un listado con fieldset, filtros y orden; lo comparten todos los servicios."""
+    clauses, params = query.sql() if query is not None else ("", [])
+    sql = f"SELECT {sql_columns(fields)} FROM {table}{clauses} LIMIT %s OFFSET %s"
+    return sql, (*params, limit, offset)
+
+
+def parse_list_query(spec: QuerySpec, filters: Optional[Sequence[str]], sort: Optional[str]) -> ListQuery:
+    """Valida filtros y orden contra la lista blanca del listado; ValueError si algo no se permite."""
+    filters = [item for item in (filters or []) if item.strip()]
+    if len(filters) > MAX_FILTERS:
+        raise ValueError(f"At most {MAX_FILTERS} filters are allowed")
+    conditions = [_parse_condition(spec, item) for item in filters]
+
+    fixed = {condition.field for condition in conditions if condition.operator == "eq"}
+    for condition in conditions:
+        _check_indexed(spec, condition.field, fixed, "Filtering")
+
+    order = []
+    for item in (sort or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        descending = item.startswith("-")
+        name = _field_name(spec.model, item.lstrip("+-"))
+        _check_indexed(spec, name, fixed, "Sorting")
+        order.append((name, descending))
+    return ListQuery(spec=spec, conditions=conditions, sort=order)
+
+
+def query_params(spec: QuerySpec):
+    """Dependencia de FastAPI con los parámetros filter= y sort= (400 si no son válidos)."""
+    allowed = ", ".join(spec.indexed)
+
+    def dependency(
+        filters: Optional[List[str]] = Query(None, alias="filter", description=f"{FILTER_DESCRIPTION}. Fields: {allowed}"),
+        sort: Optional[str] = Query(None, description=f"{SORT_DESCRIPTION}. Fields: {allowed}")
+    ) -> ListQuery:
+        try:
+            return parse_list_query(spec, filters, sort)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return dependency
+
+
+def _parse_condition(spec: QuerySpec, item: str) -> Condition:
+    name, separator, rest = item.partition(":")
+    if not separator:
+        raise ValueError(f"Invalid filter '{item}', expected field:op:value")
+    operator, separator, raw = rest.partition(":")
+    operator = operator.strip().lower()
+    if not separator or operator not in OPERATORS:
+        # field:value, donde el valor puede contener ':' (fechas con hora)
+        operator, raw = "eq", rest
+    name = _field_name(spec.model, name.strip())
+    if operator == "null":
+        if raw.lower() not in ("true", "false"):
+            raise ValueError(f"Filter '{item}': null expects true or false")
+        return Condition(name, operator, raw.lower() == "true")
+    if operator == "in":
+        values = [value for value in raw.split(",") if value != ""]
+        if not values or len(values) > MAX_IN_VALUES:
+            raise ValueError(f"Filter '{item}': in expects between 1 and {MAX_IN_VALUES} values")
+        return Condition(name, operator, [_coerce(spec.model, name, value) for value in values])
+    if operator == "prefix":
+        if not raw:
+            raise ValueError(f"Filter '{item}': prefix cannot be empty")
+        return Condition(name, operator, raw)
+    return Condition(name, operator, _coerce(spec.model, name, raw))
+
+
+def _check_indexed(spec: QuerySpec, name: str, fixed: set, action: str):
+    if name not in spec.indexed:
+        raise ValueError(
+            f"{action} by '{name}' is not allowed (not indexed). Indexed fields: {', '.join(spec.indexed)}"
+        )
+    required = spec.indexed[name]
+    if required and not fixed.intersection(required):
+        raise ValueError(f"{action} by '{name}' requires an eq filter on {' or '.join(required)}")
+
+
+def _field_name(model: Type[BaseModel], name: str) -> str:
+    for field_name, info in model.model_fields.items():
+        if name == field_name or name == info.alias:
+            return field_name
+    raise ValueError(f"Unknown field '{name}'")
+
+
+def _alias(model: Type[BaseModel], name: str) -> str:
+    return model.model_fields[name].alias or name
+
+
+def _coerce(model: Type[BaseModel], name: str, raw: str) -> Any:
+    info = model.model_fields[name]
+    if info.alias == "_id":
+        try:
+            return ObjectId(raw)
+        except InvalidId:
+            raise ValueError(f"Invalid value for {name}: {raw}")
+    annotation = info.annotation
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    try:
+        value = TypeAdapter(annotation).validate_python(raw)
+    except ValidationError:
+        raise ValueError(f"Invalid value for {name}: {raw}")
+    # Los Enum se comparan por su valor en la base de datos
+    return getattr(value, "value", value)
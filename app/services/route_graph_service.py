@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from app.graph.route_graph import HOPS, METRICS, RouteGraph
+from app.models.route_models import (
+    ReachabilityResponse,
+    ReachableLocation,
+    RouteLeg,
+    RoutePathResponse,
+    RouteResponse,
+)
+from app.services.database_service import DatabaseService
+
+# Recarga completa (recoge las escrituras hechas por otros workers); las propias se aplican al momento
+ROUTE_GRAPH_REFRESH_SECONDS = float(os.getenv("ROUTE_GRAPH_REFRESH_SECONDS", "900"))
+
+# Duración media por route de los viajes ya terminados
+ROUTE_DURATIONS_QUERY = """
+    SELECT route_id, AVG(TIMESTAMPDIFF(SECOND, departure_datetime, arrival_datetime)) / 3600 AS hours
+    FROM voyages
+    WHERE departure_datetime IS NOT NULL
+      AND arrival_datetime > departure_datetime
+      AND arrival_datetime <= NOW()
+    GROUP BY route_id
+"""
+
+_graph: Optional[RouteGraph] = None
+_graph_loaded_at = 0.0
+_durations_stale = False
+_loading = False
+# Cambios de routes recibidos durante una carga: (route_id, origen, destino) o (route_id, None, None)
+_pending: List[Tuple[int, Optional[int], Optional[int]]] = []
+_graph_lock = asyncio.Lock()
+
+
+def _apply(graph: RouteGraph, route_id: int, origin: Optional[int], destination: Optional[int]):
+    if origin is None:
+        graph.remove_route(route_id)
+    else:
+        graph.add_route(route_id, origin, destination)
+
+
+def _record(route_id: int, origin: Optional[int], destination: Optional[int]):
+    if _graph is not None:
+        _apply(_graph, route_id, origin, destination)
+    if _loading:
+        _pending.append((route_id, origin, destination))
+
+
+def route_graph_upsert(route: Optional[RouteResponse]):
+    """Aplica al grafo cargado el alta o cambio de una route (llamado por RouteService)."""
+    if route is not None:
+        _record(route.id, route.origin_location_id, route.destination_location_id)
+
+
+def route_graph_remove(route_id: int):
+    _record(route_id, None, None)
+
+
+def invalidate_route_durations():
+    """Las duraciones se recalculan en la próxima consulta (llamado al escribir voyages)."""
+    global _durations_stale
+    _durations_stale = True
+
+
+class RouteGraphService:
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def _load_durations(self) -> dict:
+        rows = await self.db_service.execute(ROUTE_DURATIONS_QUERY)
+        return {row["route_id"]: float(row["hours"]) for row in rows if row["hours"] is not None}
+
+    async def _get_graph(self) -> RouteGraph:
+        global _graph, _graph_loaded_at, _durations_stale, _loading, _pending
+        async with _graph_lock:
+            expired = time.monotonic() - _graph_loaded_at > ROUTE_GRAPH_REFRESH_SECONDS
+            if _graph is not None and not expired and not _durations_stale:
+                return _graph
+            try:
+                await self.db_service.connect()
+                if _graph is None or expired:
+                    _loading = True
+                    _pending = []
+                    started = time.monotonic()
+                    rows = await self.db_service.execute(
+                        "SELECT id, origin_location_id, destination_location_id FROM routes"
+                    )
+                    durations = await self._load_durations()
+                    graph = RouteGraph(
+                        ((row["id"], row["origin_location_id"], row["destination_location_id"]) for row in rows),
+                        durations
+                    )
+                    for change in _pending:
+                        _apply(graph, *change)
+                    _graph = graph
+                    _graph_loaded_at = time.monotonic()
+                    logging.info(
+                        f"Route graph loaded: {graph.node_count} locations, {graph.edge_count} routes "
+                        f"in {time.monotonic() - started:.2f}s"
+                    )
+                else:
+                    _graph.set_durations(await self._load_durations())
+                _durations_stale = False
+                return _graph
+            finally:
+                _loading = False
+                _pending = []
+                await self.db_service.disconnect()
+
+    async def find_path(
+            self,
+            origin: int,
+            destination: int,
+            via: Optional[Sequence[int]] = None,
+            metric: str = HOPS
+    ) -> Optional[RoutePathResponse]:
+        """Itinerario más corto (por tramos o por duración histórica); None si no hay camino."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}. Allowed: {', '.join(METRICS)}")
+        via = list(via or [])
+        try:
+            graph = await self._get_graph()
+        except Exception as e:
+            logging.error(f"Error loading route graph: {str(e)}")
+            raise
+        path = graph.itinerary([origin, *via, destination], metric)
+        if path is None:
+            return None
+        legs = []
+        for route_id in path:
+            leg_origin, leg_destination = graph.route(route_id)
+            hours, estimated = graph.leg_hours(route_id)
+            legs.append(RouteLeg(
+                route_id=route_id,
+                origin_location_id=leg_origin,
+                destination_location_id=leg_destination,
+                duration_hours=round(hours, 2),
+                estimated=estimated
+            ))
+        return RoutePathResponse(
+            origin_location_id=origin,
+            destination_location_id=destination,
+            via=via,
+            metric=metric,
+            hops=len(legs),
+            duration_hours=round(sum(graph.leg_hours(route_id)[0] for route_id in path), 2),
+            estimated=any(leg.estimated for leg in legs),
+            legs=legs
+        )
+
+    async def get_reachable(self, origin: int, max_hops: Optional[int] = None) -> ReachabilityResponse:
+        try:
+            graph = await self._get_graph()
+        except Exception as e:
+            logging.error(f"Error loading route graph: {str(e)}")
+            raise
+        reachable = graph.reachable(origin, max_hops)
+        return ReachabilityResponse(
+            origin_location_id=origin,
+            max_hops=max_hops,
+            locations=[
+                ReachableLocation(location_id=location_id, hops=hops)
+                for location_id, hops in sorted(reachable.items(), key=lambda item: (item[1], item[0]))
+            ]
+        )
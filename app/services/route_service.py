@@ -1,9 +1,18 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.route_graph_service import route_graph_remove, route_graph_upsert
 from app.models.route_models import RouteCreate, RouteUpdate, RouteResponse
 
 
+ROUTE_QUERY_SPEC = QuerySpec(
+    RouteResponse,
+    indexed={"id": (), "origin_location_id": (), "destination_location_id": ()},
+)
+
+
 class RouteService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -22,7 +31,9 @@ class RouteService:
             result = await self.db_service.execute(select_query, (route.origin_location_id, route.destination_location_id))
 
             if result:
-                return RouteResponse(**result[0])
+                created = RouteResponse(**result[0])
+                route_graph_upsert(created)
+                return created
             raise ValueError("Route creation failed")
         except Exception as e:
             logging.error(f"Error creating route: {str(e)}")
@@ -30,14 +41,14 @@ class RouteService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_route_by_id(self, route_id: int) -> Optional[RouteResponse]:
+    async def get_route_by_id(self, route_id: int, fields: Optional[List[str]] = None) -> Optional[RouteResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM routes WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM routes WHERE id = %s"
             result = await self.db_service.execute(query, (route_id,))
 
             if result:
-                return RouteResponse(**result[0])
+                return build(RouteResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving route: {str(e)}")
@@ -45,13 +56,13 @@ class RouteService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_routes(self, limit: int = 100, offset: int = 0) -> List[RouteResponse]:
+    async def get_all_routes(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[RouteResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM routes LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("routes", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [RouteResponse(**row) for row in result]
+            return [build(RouteResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving routes: {str(e)}")
             raise
@@ -81,7 +92,9 @@ class RouteService:
             query = f"UPDATE routes SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
 
-            return await self.get_route_by_id(route_id)
+            updated = await self.get_route_by_id(route_id)
+            route_graph_upsert(updated)
+            return updated
         except Exception as e:
             logging.error(f"Error updating route: {str(e)}")
             raise
@@ -93,6 +106,7 @@ class RouteService:
             await self.db_service.connect()
             query = "DELETE FROM routes WHERE id = %s"
             await self.db_service.execute(query, (route_id,))
+            route_graph_remove(route_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting route: {str(e)}")
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from app.lifecycle import on_startup, on_shutdown
+from app.models.search_models import SearchResult, SearchResponse
+from app.search.inverted_index import InvertedIndex, words
+from app.search.rebuild import PeriodicRebuilder, RebuildableIndex
+from app.services.database_service import DatabaseService
+
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+# Consulta MATCH ... AGAINST mientras el índice se construye (o si está desactivado);
+# necesita los índices FULLTEXT de db.sql
+SEARCH_FULLTEXT_FALLBACK = os.getenv("SEARCH_FULLTEXT_FALLBACK", "false").lower() == "true"
+# Cada worker mantiene su índice con sus propias escrituras; la reconstrucción periódica recoge
+# las de los demás workers y procesos (0 la desactiva)
+SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "900"))
+SEARCH_BUILD_CHUNK_SIZE = int(os.getenv("SEARCH_BUILD_CHUNK_SIZE", "5000"))
+
+
+class SearchUnavailableError(Exception):
+    """El índice aún no está construido y no hay fallback FULLTEXT configurado."""
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    table: str
+    # columna -> boost
+    fields: Dict[str, float]
+    label: str
+    detail: Optional[str] = None
+
+    def columns(self) -> List[str]:
+        columns = ["id", *self.fields]
+        for column in (self.label, self.detail):
+            if column and column not in columns:
+                columns.append(column)
+        return columns
+
+
+SEARCH_SOURCES: Dict[str, SearchSource] = {
+    "shipment": SearchSource("shipments", {"tracking_code": 3.0}, label="tracking_code", detail="current_status"),
+    "customer": SearchSource(
+        "customers", {"full_name": 2.0, "identification_number": 3.0, "email": 1.0},
+        label="full_name", detail="identification_number"
+    ),
+    "vessel": SearchSource(
+        "vessels", {"vessel_name": 2.0, "imo_number": 3.0, "mmsi_number": 2.0, "call_sign": 1.5},
+        label="vessel_name", detail="imo_number"
+    ),
+    "asset": SearchSource("assets", {"asset_code": 3.0}, label="asset_code", detail="status"),
+}
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return str(getattr(value, "value", value))
+
+
+class SearchIndexState(RebuildableIndex):
+    """Índice invertido activo de /search."""
+
+    name = "Search index"
+
+    def __init__(self):
+        super().__init__()
+        self.index = InvertedIndex()
+
+    def apply(self, kind: str, document_id: Any, row: Optional[Dict[str, Any]], index: Optional[InvertedIndex] = None):
+        if index is None:
+            index = self.index
+        if row is None:
+            index.remove((kind, document_id))
+            return
+        source = SEARCH_SOURCES[kind]
+        index.add(
+            (kind, document_id),
+            {column: (_text(row.get(column)), boost) for column, boost in source.fields.items()},
+            label=_text(row.get(source.label)) or "",
+            detail=_text(row.get(source.detail)) if source.detail else None,
+        )
+
+    async def build(self) -> InvertedIndex:
+        """Lee cada tabla por bloques de id; las consultas siguen usando el índice anterior."""
+        index = InvertedIndex()
+        db_service = DatabaseService()
+        try:
+            await db_service.connect()
+            for kind, source in SEARCH_SOURCES.items():
+                column_list = ", ".join(f"`{column}`" for column in source.columns())
+                last_id = 0
+                while True:
+                    rows = await db_service.execute(
+                        f"SELECT {column_list} FROM {source.table} WHERE id > %s ORDER BY id LIMIT %s",
+                        (last_id, SEARCH_BUILD_CHUNK_SIZE)
+                    )
+                    for row in rows:
+                        self.apply(kind, row["id"], row, index)
+                    if len(rows) < SEARCH_BUILD_CHUNK_SIZE:
+                        break
+                    last_id = rows[-1]["id"]
+                    # Cede el bucle entre bloques para no bloquear las requests durante el arranque
+                    await asyncio.sleep(0)
+        finally:
+            await db_service.disconnect()
+        return index
+
+    def activate(self, index: InvertedIndex):
+        self.index = index
+
+    def describe(self, index: InvertedIndex) -> str:
+        return f"{len(index)} documents, {index.term_count} terms"
+
+
+search_state = SearchIndexState()
+
+
+def index_document(kind: str, document: BaseModel):
+    """Actualiza el índice tras crear o modificar un documento (llamado por los servicios)."""
+    if SEARCH_INDEX_ENABLED and document is not None:
+        search_state.record(kind, document.id, document.model_dump())
+
+
+def remove_document(kind: str, document_id: int):
+    if SEARCH_INDEX_ENABLED:
+        search_state.record(kind, document_id, None)
+
+
+class SearchService:
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def search(self, query: str, types: Optional[Sequence[str]] = None, limit: int = 20) -> SearchResponse:
+        """ValueError si algún tipo no existe; SearchUnavailableError si no hay índice ni fallback."""
+        unknown = [kind for kind in (types or []) if kind not in SEARCH_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown types: {', '.join(unknown)}. Allowed: {', '.join(SEARCH_SOURCES)}")
+        started = time.perf_counter()
+        if SEARCH_INDEX_ENABLED and search_state.ready:
+            hits = search_state.index.search(query, limit=limit, types=types)
+            results = [
+                SearchResult(type=hit.key[0], id=hit.key[1], label=hit.label, detail=hit.detail, score=round(hit.score, 4))
+                for hit in hits
+            ]
+            source = "index"
+        elif SEARCH_FULLTEXT_FALLBACK:
+            try:
+                results = await self._search_fulltext(query, types or list(SEARCH_SOURCES), limit)
+            except Exception as e:
+                logging.error(f"Error searching with FULLTEXT: {str(e)}")
+                raise
+            source = "fulltext"
+        else:
+            raise SearchUnavailableError("Search index is still being built")
+        return SearchResponse(
+            query=query,
+            source=source,
+            took_ms=round((time.perf_counter() - started) * 1000, 3),
+            results=results
+        )
+
+    async def _search_fulltext(self, query: str, types: Sequence[str], limit: int) -> List[SearchResult]:
+        terms = words(query)
+        if not terms:
+            return []
+        # Modo booleano: todas las palabras, cada una como prefijo
+        against = " ".join(f"+{term}*" for term in terms)
+        selects = []
+        params: list = []
+        for kind in types:
+            source = SEARCH_SOURCES[kind]
+            match = f"MATCH({', '.join(source.fields)}) AGAINST (%s IN BOOLEAN MODE)"
+            detail = source.detail or "NULL"
+            selects.append(
+                f"(SELECT '{kind}' AS type, id, {source.label} AS label, {detail} AS detail, {match} AS score "
+                f"FROM {source.table} WHERE {match} ORDER BY score DESC LIMIT %s)"
+            )
+            params.extend([against, against, limit])
+        params.append(limit)
+        try:
+            await self.db_service.connect()
+            rows = await self.db_service.execute(
+                f"{' UNION ALL '.join(selects)} ORDER BY score DESC LIMIT %s",
+                tuple(params)
+            )
+        finally:
+            await self.db_service.disconnect()
+        return [
+            SearchResult(
+                type=row["type"], id=row["id"], label=_text(row["label"]) or "",
+                detail=_text(row["detail"]), score=round(float(row["score"]), 4)
+            )
+            for row in rows
+        ]
+
+
+search_indexer = PeriodicRebuilder(search_state, SEARCH_INDEX_REFRESH_SECONDS)
+if SEARCH_INDEX_ENABLED:
+    on_startup(search_indexer.start)
+on_shutdown(search_indexer.close)
@@ -1,9 +1,17 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
 from app.models.shipment_item_models import ShipmentItemCreate, ShipmentItemUpdate, ShipmentItemResponse
 
 
+SHIPMENT_ITEM_QUERY_SPEC = QuerySpec(
+    ShipmentItemResponse,
+    indexed={"id": (), "shipment_id": (), "asset_id": ()},
+)
+
+
 class ShipmentItemService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -40,14 +48,14 @@ class ShipmentItemService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipment_item_by_id(self, item_id: int) -> Optional[ShipmentItemResponse]:
+    async def get_shipment_item_by_id(self, item_id: int, fields: Optional[List[str]] = None) -> Optional[ShipmentItemResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipment_items WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipment_items WHERE id = %s"
             result = await self.db_service.execute(query, (item_id,))
 
             if result:
-                return ShipmentItemResponse(**result[0])
+                return build(ShipmentItemResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving shipment item: {str(e)}")
@@ -55,39 +63,39 @@ class ShipmentItemService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipment_items_by_shipment(self, shipment_id: int) -> List[ShipmentItemResponse]:
+    async def get_shipment_items_by_shipment(self, shipment_id: int, fields: Optional[List[str]] = None) -> List[ShipmentItemResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipment_items WHERE shipment_id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipment_items WHERE shipment_id = %s"
             result = await self.db_service.execute(query, (shipment_id,))
 
-            return [ShipmentItemResponse(**row) for row in result]
+            return [build(ShipmentItemResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving shipment items by shipment: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipment_items_by_asset(self, asset_id: int) -> List[ShipmentItemResponse]:
+    async def get_shipment_items_by_asset(self, asset_id: int, fields: Optional[List[str]] = None) -> List[ShipmentItemResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipment_items WHERE asset_id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipment_items WHERE asset_id = %s"
             result = await self.db_service.execute(query, (asset_id,))
 
-            return [ShipmentItemResponse(**row) for row in result]
+            return [build(ShipmentItemResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving shipment items by asset: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_shipment_items(self, limit: int = 100, offset: int = 0) -> List[ShipmentItemResponse]:
+    async def get_all_shipment_items(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[ShipmentItemResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipment_items LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("shipment_items", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [ShipmentItemResponse(**row) for row in result]
+            return [build(ShipmentItemResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving shipment items: {str(e)}")
             raise
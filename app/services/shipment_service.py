@@ -1,7 +1,28 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
-from app.models.shipment_models import ShipmentCreate, ShipmentUpdate, ShipmentResponse
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.search_service import index_document, remove_document
+from app.services.shipment_timeline_service import invalidate_shipment_timeline_keys
+from app.models.shipment_models import (
+    ShipmentCreate,
+    ShipmentUpdate,
+    ShipmentResponse,
+    ShipmentCompositeCreate,
+    ShipmentCompositeResponse,
+)
+from app.models.shipment_item_models import ShipmentItemResponse
+from app.models.bill_of_lading_models import BillOfLadingResponse
+
+
+SHIPMENT_QUERY_SPEC = QuerySpec(
+    ShipmentResponse,
+    indexed={
+        "id": (), "tracking_code": (), "customer_id": (), "voyage_id": (), "origin_location_id": (),
+        "destination_location_id": (), "current_status": (), "creation_datetime": (),
+    },
+)
 
 
 class ShipmentService:
@@ -28,7 +49,9 @@ class ShipmentService:
             result = await self.db_service.execute(select_query, (shipment.tracking_code,))
 
             if result:
-                return ShipmentResponse(**result[0])
+                created = ShipmentResponse(**result[0])
+                index_document("shipment", created)
+                return created
             raise ValueError("Shipment creation failed")
         except Exception as e:
             logging.error(f"Error creating shipment: {str(e)}")
@@ -36,14 +59,88 @@ class ShipmentService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipment_by_id(self, shipment_id: int) -> Optional[ShipmentResponse]:
+    async def create_shipment_composite(self, composite: ShipmentCompositeCreate) -> ShipmentCompositeResponse:
+        """
+        Crea el envío, sus items (un único INSERT multi-fila) y el BL en una sola transacción.
+        Si cualquier escritura falla se deshace todo.
+        """
+        shipment = composite.shipment
+
+        async def work(uow):
+            result = await uow.execute(
+                """
+                INSERT INTO shipments (tracking_code, customer_id, voyage_id, origin_location_id,
+                                      destination_location_id, creation_datetime, declared_value,
+                                      current_status, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                """,
+                (
+                    shipment.tracking_code, shipment.customer_id, shipment.voyage_id,
+                    shipment.origin_location_id, shipment.destination_location_id,
+                    shipment.creation_datetime, shipment.declared_value, shipment.current_status
+                )
+            )
+            shipment_id = result[0]['last_insert_id']
+
+            for item in composite.items:
+                uow.add(
+                    """
+                    INSERT INTO shipment_items (shipment_id, asset_id, description, weight_kg, dimensions, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
+                    """,
+                    (shipment_id, item.asset_id, item.description, item.weight_kg, item.dimensions)
+                )
+
+            bill = composite.bill_of_lading
+            if bill is not None:
+                uow.add(
+                    """
+                    INSERT INTO bills_of_lading (shipment_id, bol_number, issue_date, terms_and_conditions,
+                                                shipper_details, consignee_details, is_hazardous, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                    """,
+                    (
+                        shipment_id, bill.bol_number, bill.issue_date, bill.terms_and_conditions,
+                        bill.shipper_details, bill.consignee_details, bill.is_hazardous
+                    )
+                )
+
+            shipment_rows = await uow.execute("SELECT * FROM shipments WHERE id = %s", (shipment_id,))
+            if not shipment_rows:
+                raise ValueError("Shipment creation failed")
+            item_rows = []
+            if composite.items:
+                item_rows = await uow.execute(
+                    "SELECT * FROM shipment_items WHERE shipment_id = %s ORDER BY id", (shipment_id,)
+                )
+            bill_rows = []
+            if bill is not None:
+                bill_rows = await uow.execute(
+                    "SELECT * FROM bills_of_lading WHERE shipment_id = %s", (shipment_id,)
+                )
+
+            return ShipmentCompositeResponse(
+                **shipment_rows[0],
+                items=[ShipmentItemResponse(**row) for row in item_rows],
+                bill_of_lading=BillOfLadingResponse(**bill_rows[0]) if bill_rows else None
+            )
+
+        try:
+            created = await self.db_service.run_in_transaction(work)
+            index_document("shipment", created)
+            return created
+        except Exception as e:
+            logging.error(f"Error creating composite shipment: {str(e)}")
+            raise
+
+    async def get_shipment_by_id(self, shipment_id: int, fields: Optional[List[str]] = None) -> Optional[ShipmentResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipments WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipments WHERE id = %s"
             result = await self.db_service.execute(query, (shipment_id,))
 
             if result:
-                return ShipmentResponse(**result[0])
+                return build(ShipmentResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving shipment: {str(e)}")
@@ -51,14 +148,14 @@ class ShipmentService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipment_by_tracking_code(self, tracking_code: str) -> Optional[ShipmentResponse]:
+    async def get_shipment_by_tracking_code(self, tracking_code: str, fields: Optional[List[str]] = None) -> Optional[ShipmentResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipments WHERE tracking_code = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipments WHERE tracking_code = %s"
             result = await self.db_service.execute(query, (tracking_code,))
 
             if result:
-                return ShipmentResponse(**result[0])
+                return build(ShipmentResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving shipment by tracking code: {str(e)}")
@@ -66,39 +163,39 @@ class ShipmentService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_shipments(self, limit: int = 100, offset: int = 0) -> List[ShipmentResponse]:
+    async def get_all_shipments(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[ShipmentResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipments LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("shipments", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [ShipmentResponse(**row) for row in result]
+            return [build(ShipmentResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving shipments: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipments_by_customer(self, customer_id: int) -> List[ShipmentResponse]:
+    async def get_shipments_by_customer(self, customer_id: int, fields: Optional[List[str]] = None) -> List[ShipmentResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipments WHERE customer_id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipments WHERE customer_id = %s"
             result = await self.db_service.execute(query, (customer_id,))
 
-            return [ShipmentResponse(**row) for row in result]
+            return [build(ShipmentResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving shipments by customer: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_shipments_by_voyage(self, voyage_id: int) -> List[ShipmentResponse]:
+    async def get_shipments_by_voyage(self, voyage_id: int, fields: Optional[List[str]] = None) -> List[ShipmentResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM shipments WHERE voyage_id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM shipments WHERE voyage_id = %s"
             result = await self.db_service.execute(query, (voyage_id,))
 
-            return [ShipmentResponse(**row) for row in result]
+            return [build(ShipmentResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving shipments by voyage: {str(e)}")
             raise
@@ -145,8 +242,11 @@ class ShipmentService:
 
             query = f"UPDATE shipments SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
+            invalidate_shipment_timeline_keys(shipment_id)
 
-            return await self.get_shipment_by_id(shipment_id)
+            updated = await self.get_shipment_by_id(shipment_id)
+            index_document("shipment", updated)
+            return updated
         except Exception as e:
             logging.error(f"Error updating shipment: {str(e)}")
             raise
@@ -158,6 +258,8 @@ class ShipmentService:
             await self.db_service.connect()
             query = "DELETE FROM shipments WHERE id = %s"
             await self.db_service.execute(query, (shipment_id,))
+            remove_document("shipment", shipment_id)
+            invalidate_shipment_timeline_keys(shipment_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting shipment: {str(e)}")
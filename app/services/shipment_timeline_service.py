@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.database.mongo_manager import MongoManager
+from app.models.shipment_models import ShipmentTimelineEntry, ShipmentTimelinePage
+from app.services.database_service import DatabaseService
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION
+
+TIMELINE_KEYS_CACHE_SECONDS = float(os.getenv("SHIPMENT_TIMELINE_KEYS_CACHE_SECONDS", "300"))
+TIMELINE_KEYS_CACHE_SIZE = int(os.getenv("SHIPMENT_TIMELINE_KEYS_CACHE_SIZE", "10000"))
+
+SOURCE_TRACKING_EVENT = "tracking_event"
+SOURCE_TRACKER_EVENT = "tracker_event"
+# Desempate a igual instante: primero los eventos de MySQL, luego los de los trackers
+_SOURCE_RANK = {SOURCE_TRACKING_EVENT: 0, SOURCE_TRACKER_EVENT: 1}
+TRACKER_PROJECTION = {
+    "TrackerId": 1, "EventTime": 1, "Alert": 1, "Event.EventType": 1,
+    "Location.LocationName": 1, "Location.Latitude": 1, "Location.Longitude": 1,
+}
+
+# shipment_id -> (expira, bol_number, tracking_code)
+_timeline_keys: Dict[int, Tuple[float, Optional[str], str]] = {}
+_timeline_indexes_ready = False
+
+
+def invalidate_shipment_timeline_keys(*shipment_ids: Optional[int]):
+    """Olvida el BL/Booking resuelto de esos shipments (llamado al escribir shipments o bills of lading)."""
+    for shipment_id in shipment_ids:
+        _timeline_keys.pop(shipment_id, None)
+
+
+class ShipmentTimelineService:
+    """
+    Línea de tiempo unificada de un shipment: tracking_events de MySQL y HoopoMessages de Mongo
+    (por BL o Booking), consultados en paralelo y mezclados por instante con heapq. Cada fuente
+    devuelve a lo sumo limit + 1 filas desde el cursor, así que una página cuesta lo mismo que
+    leer cualquiera de las dos fuentes por separado.
+    """
+
+    def __init__(self):
+        self.db_service = DatabaseService()
+        self.mongo_manager = MongoManager()
+        self.collection_name = TRACKER_EVENTS_COLLECTION
+
+    async def _resolve_keys(self, shipment_id: int) -> Optional[Tuple[Optional[str], str]]:
+        cached = _timeline_keys.get(shipment_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+        try:
+            await self.db_service.connect()
+            rows = await self.db_service.execute(
+                """
+                SELECT s.tracking_code, b.bol_number FROM shipments s
+                LEFT JOIN bills_of_lading b ON b.shipment_id = s.id
+                WHERE s.id = %s
+                """,
+                (shipment_id,)
+            )
+        finally:
+            await self.db_service.disconnect()
+        if not rows:
+            return None
+        if len(_timeline_keys) >= TIMELINE_KEYS_CACHE_SIZE:
+            _timeline_keys.clear()
+        bol_number, tracking_code = rows[0]["bol_number"], rows[0]["tracking_code"]
+        _timeline_keys[shipment_id] = (time.monotonic() + TIMELINE_KEYS_CACHE_SECONDS, bol_number, tracking_code)
+        return bol_number, tracking_code
+
+    async def _fetch_tracking_events(
+            self,
+            shipment_id: int,
+            after: Optional[Tuple[datetime, int, str]],
+            limit: int
+    ) -> List[ShipmentTimelineEntry]:
+        conditions = ["t.shipment_id = %s"]
+        params: list = [shipment_id]
+        if after is not None:
+            after_time, after_rank, after_id = after
+            if after_rank == _SOURCE_RANK[SOURCE_TRACKING_EVENT]:
+                conditions.append("(t.event_datetime > %s OR (t.event_datetime = %s AND t.id > %s))")
+                params.extend([after_time, after_time, int(after_id)])
+            else:
+                conditions.append("t.event_datetime > %s")
+                params.append(after_time)
+        params.append(limit)
+        db_service = DatabaseService()
+        try:
+            await db_service.connect()
+            rows = await db_service.execute(
+                f"""
+                SELECT t.id, t.event_datetime, t.event_type, t.location_id, t.notes, l.location_name,
+                       l.latitude, l.longitude
+                FROM tracking_events t
+                LEFT JOIN locations l ON l.id = t.location_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY t.event_datetime, t.id
+                LIMIT %s
+                """,
+                tuple(params)
+            )
+        finally:
+            await db_service.disconnect()
+        return [
+            ShipmentTimelineEntry(
+                source=SOURCE_TRACKING_EVENT,
+                id=str(row["id"]),
+                event_time=row["event_datetime"],
+                event_type=row["event_type"],
+                location_id=row["location_id"],
+                location_name=row["location_name"],
+                latitude=float(row["latitude"]) if row["latitude"] is not None else None,
+                longitude=float(row["longitude"]) if row["longitude"] is not None else None,
+                notes=row["notes"],
+            )
+            for row in rows
+        ]
+
+    async def _fetch_tracker_events(
+            self,
+            bol_number: Optional[str],
+            tracking_code: Optional[str],
+            after: Optional[Tuple[datetime, int, str]],
+            limit: int
+    ) -> List[ShipmentTimelineEntry]:
+        global _timeline_indexes_ready
+        keys = []
+        if bol_number:
+            keys.append({"BL": bol_number})
+        if tracking_code:
+            keys.append({"Booking": tracking_code})
+        if not keys:
+            return []
+        conditions = [{"$or": keys}]
+        if after is not None:
+            after_time, after_rank, after_id = after
+            if after_rank == _SOURCE_RANK[SOURCE_TRACKER_EVENT]:
+                conditions.append({"$or": [
+                    {"EventTime": {"$gt": after_time}},
+                    {"EventTime": after_time, "_id": {"$gt": ObjectId(after_id)}},
+                ]})
+            else:
+                conditions.append({"EventTime": {"$gte": after_time}})
+        try:
+            await self.mongo_manager.create_connection()
+            collection = await self.mongo_manager.get_collection(self.collection_name)
+            if not _timeline_indexes_ready:
+                # Cada rama del $or usa su índice ya ordenado por EventTime y Mongo las mezcla sin ordenar en memoria
+                await collection.create_index([("BL", 1), ("EventTime", 1), ("_id", 1)], name="BL_EventTime")
+                await collection.create_index([("Booking", 1), ("EventTime", 1), ("_id", 1)], name="Booking_EventTime")
+                _timeline_indexes_ready = True
+            cursor = collection.find({"$and": conditions}, TRACKER_PROJECTION).sort([("EventTime", 1), ("_id", 1)]).limit(limit)
+            documents = await cursor.to_list(length=limit)
+        finally:
+            await self.mongo_manager.close_connection()
+        entries = []
+        for document in documents:
+            location = document.get("Location") or {}
+            entries.append(ShipmentTimelineEntry(
+                source=SOURCE_TRACKER_EVENT,
+                id=str(document["_id"]),
+                event_time=document["EventTime"],
+                event_type=(document.get("Event") or {}).get("EventType"),
+                location_name=location.get("LocationName"),
+                latitude=location.get("Latitude"),
+                longitude=location.get("Longitude"),
+                tracker_id=document.get("TrackerId"),
+                alert=document.get("Alert"),
+            ))
+        return entries
+
+    @staticmethod
+    def _sort_key(entry: ShipmentTimelineEntry):
+        rank = _SOURCE_RANK[entry.source]
+        # Los ids de MySQL se comparan como números; los ObjectId en hex ya ordenan como texto
+        return entry.event_time, rank, int(entry.id) if rank == 0 else 0, entry.id
+
+    async def get_timeline(self, shipment_id: int, limit: int = 100, cursor: Optional[str] = None) -> Optional[ShipmentTimelinePage]:
+        """Devuelve None si el shipment no existe; ValueError si el cursor no es válido."""
+        after = None
+        if cursor:
+            after_time, keys = decode_cursor(cursor)
+            if len(keys) != 2 or keys[0] not in (0, 1) or not isinstance(keys[1], str):
+                raise ValueError("Invalid cursor")
+            try:
+                if keys[0] == 0:
+                    int(keys[1])
+                else:
+                    ObjectId(keys[1])
+            except (ValueError, InvalidId):
+                raise ValueError("Invalid cursor")
+            after = (after_time, keys[0], keys[1])
+
+        try:
+            resolved = await self._resolve_keys(shipment_id)
+            if resolved is None:
+                return None
+            bol_number, tracking_code = resolved
+            tracking_events, tracker_events = await asyncio.gather(
+                self._fetch_tracking_events(shipment_id, after, limit + 1),
+                self._fetch_tracker_events(bol_number, tracking_code, after, limit + 1),
+            )
+            merged = list(itertools.islice(
+                heapq.merge(tracking_events, tracker_events, key=self._sort_key),
+                limit + 1
+            ))
+            items = merged[:limit]
+            next_cursor = None
+            if len(merged) > limit:
+                last = items[-1]
+                next_cursor = encode_cursor(last.event_time, _SOURCE_RANK[last.source], last.id)
+            return ShipmentTimelinePage(shipment_id=shipment_id, items=items, next_cursor=next_cursor)
+        except Exception as e:
+            logging.error(f"Error retrieving shipment timeline: {str(e)}")
+            raise
@@ -1,9 +1,14 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
 from app.models.spare_part_models import SparePartCreate, SparePartUpdate, SparePartResponse
 
 
+SPARE_PART_QUERY_SPEC = QuerySpec(SparePartResponse, indexed={"id": (), "part_number": (), "quantity": ()})
+
+
 class SparePartService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -34,14 +39,14 @@ class SparePartService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_spare_part_by_id(self, part_id: int) -> Optional[SparePartResponse]:
+    async def get_spare_part_by_id(self, part_id: int, fields: Optional[List[str]] = None) -> Optional[SparePartResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM spare_parts WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM spare_parts WHERE id = %s"
             result = await self.db_service.execute(query, (part_id,))
 
             if result:
-                return SparePartResponse(**result[0])
+                return build(SparePartResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving spare part: {str(e)}")
@@ -49,19 +54,36 @@ class SparePartService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_spare_parts(self, limit: int = 100, offset: int = 0) -> List[SparePartResponse]:
+    async def get_all_spare_parts(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[SparePartResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM spare_parts LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("spare_parts", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [SparePartResponse(**row) for row in result]
+            return [build(SparePartResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving spare parts: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
+    async def get_low_stock_spare_parts(self, threshold: int, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None) -> List[SparePartResponse]:
+        """Repuestos con quantity <= threshold, de menos a más stock (rango sobre spare_parts_quantity_index)."""
+        try:
+            await self.db_service.connect()
+            query = (
+                f"SELECT {sql_columns(fields)} FROM spare_parts WHERE quantity <= %s "
+                f"ORDER BY quantity, id LIMIT %s OFFSET %s"
+            )
+            result = await self.db_service.execute(query, (threshold, limit, offset))
+
+            return [build(SparePartResponse, row, fields) for row in result]
+        except Exception as e:
+            logging.error(f"Error retrieving low stock spare parts: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
     async def update_spare_part(self, part_id: int, part: SparePartUpdate) -> Optional[SparePartResponse]:
         try:
             await self.db_service.connect()
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.database.mongo_manager import MongoManager
+from app.lifecycle import on_shutdown
+from app.models.tracker_event_models import TrackerEventResponse
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION, is_timeseries
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("TRACKER_STREAM_QUEUE_SIZE", "1000"))
+POLL_INTERVAL_SECONDS = float(os.getenv("TRACKER_STREAM_POLL_SECONDS", "1"))
+POLL_BATCH_SIZE = int(os.getenv("TRACKER_STREAM_POLL_BATCH", "1000"))
+RETRY_SECONDS = 5.0
+
+
+class Subscription:
+    """
+    Cola acotada de un cliente SSE. Si el cliente no consume a tiempo se descartan los
+    eventos más antiguos (nunca se bloquea al resto de suscriptores) y se lleva la cuenta
+    para avisarle de que perdió eventos.
+    """
+
+    def __init__(self, tracker_ids: Optional[Set[str]], max_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.tracker_ids = tracker_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def offer(self, item: Tuple[str, str]):
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(item)
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class TrackerEventBroadcaster:
+    """
+    Un único watcher de HoopoMessages por worker que reparte los eventos nuevos a todos
+    los suscriptores. Usa un change stream cuando Mongo es replica set y, si no está
+    disponible, consulta periódicamente por _id mayor que la última marca de agua.
+    """
+
+    def __init__(self, collection_name: str = TRACKER_EVENTS_COLLECTION):
+        self.collection_name = collection_name
+        self.mongo_manager = MongoManager()
+        self._by_tracker: Dict[str, Set[Subscription]] = {}
+        self._fleet: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.mode: Optional[str] = None
+        # Posición del último evento repartido: al reintentar tras un error se sigue desde aquí
+        # en lugar de desde "ahora", para no perder lo insertado mientras tanto
+        self._resume_token: Optional[dict] = None
+        self._watermark = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._fleet) + len({s for subs in self._by_tracker.values() for s in subs})
+
+    def subscribe(self, tracker_ids: Optional[Iterable[str]] = None) -> Subscription:
+        ids = set(tracker_ids) if tracker_ids else None
+        subscription = Subscription(ids)
+        if ids is None:
+            self._fleet.add(subscription)
+        else:
+            for tracker_id in ids:
+                self._by_tracker.setdefault(tracker_id, set()).add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription.tracker_ids is None:
+            self._fleet.discard(subscription)
+        else:
+            for tracker_id in subscription.tracker_ids:
+                subs = self._by_tracker.get(tracker_id)
+                if subs is not None:
+                    subs.discard(subscription)
+                    if not subs:
+                        del self._by_tracker[tracker_id]
+        if not self._fleet and not self._by_tracker and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            # Sin suscriptores no hay nada que retomar; el próximo watcher empieza desde ahora
+            self._resume_token = None
+            self._watermark = None
+
+    def _deliver(self, document: dict):
+        """Reparte un evento y avanza la posición; un documento que no se puede serializar se salta."""
+        event_id = document["_id"]
+        try:
+            self.publish(document)
+        except Exception as e:
+            logging.error(f"Error publishing tracker event {event_id}: {str(e)}")
+        self._watermark = event_id
+
+    def publish(self, document: dict):
+        tracker_id = document.get("TrackerId")
+        targets = self._fleet | self._by_tracker.get(tracker_id, set())
+        if not targets:
+            return
+        document["_id"] = str(document["_id"])
+        # Se serializa una sola vez por evento, no por suscriptor
+        payload = TrackerEventResponse(**document).model_dump_json(by_alias=True)
+        for subscription in targets:
+            subscription.offer((document["_id"], payload))
+
+    async def _watch(self):
+        while True:
+            try:
+                await self.mongo_manager.create_connection()
+                collection = await self.mongo_manager.get_collection(self.collection_name)
+                if is_timeseries():
+                    # Las colecciones time-series no admiten change streams
+                    await self._poll(collection)
+                    continue
+                try:
+                    await self._watch_change_stream(collection)
+                except Exception as e:
+                    if "replica set" not in str(e).lower() and getattr(e, "code", None) not in (40573, 40324):
+                        raise
+                    logging.info("Change streams unavailable, falling back to polling")
+                    await self._poll(collection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error watching tracker events: {str(e)}")
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def _watch_change_stream(self, collection):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        try:
+            async with collection.watch(pipeline, resume_after=self._resume_token) as stream:
+                self.mode = "change_stream"
+                # Posición de apertura: un error antes del primer evento también retoma desde aquí
+                self._resume_token = stream.resume_token or self._resume_token
+                async for change in stream:
+                    self._deliver(change["fullDocument"])
+                    self._resume_token = change["_id"]
+        except Exception as e:
+            # El token ya no está en el oplog: se sigue desde ahora y se avisa del hueco
+            if self._resume_token is not None and getattr(e, "code", None) in (260, 280, 286):
+                logging.warning(f"Tracker event resume token expired, events may have been missed: {str(e)}")
+                self._resume_token = None
+            raise
+
+    async def _poll(self, collection):
+        self.mode = "polling"
+        if self._watermark is None:
+            latest = await collection.find({}, {"_id": 1}).sort("_id", -1).limit(1).to_list(length=1)
+            self._watermark = latest[0]["_id"] if latest else None
+        while True:
+            query = {"_id": {"$gt": self._watermark}} if self._watermark is not None else {}
+            documents = await collection.find(query).sort("_id", 1).limit(POLL_BATCH_SIZE).to_list(length=POLL_BATCH_SIZE)
+            for document in documents:
+                self._deliver(document)
+            if len(documents) < POLL_BATCH_SIZE:
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+tracker_event_broadcaster = TrackerEventBroadcaster()
+on_shutdown(tracker_event_broadcaster.close)
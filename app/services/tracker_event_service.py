@@ -1,15 +1,59 @@
+import asyncio
 import logging
-from typing import List, Optional
+import os
+import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 from app.database.mongo_manager import MongoManager
-from app.models.tracker_event_models import TrackerEventResponse
+from app.models.tracker_event_models import (
+    TrackerEventResponse,
+    TrackerEventIngest,
+    TrackerEventBatchResult,
+    TrackerTrackResponse,
+    TrackerEventPosition,
+)
+from app.services.tracker_event_writer import tracker_event_writer
+from app.services.tracker_event_broadcaster import tracker_event_broadcaster
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION
+from app.services.fieldsets import build, mongo_projection
+from app.services.query_builder import ListQuery, QuerySpec
+from app.lifecycle import tracker as request_tracker
+from app.geo.simplify import douglas_peucker, visvalingam_whyatt
+from app.geo.polyline import encode_polyline
+from app.geo.geojson import GEO_FIELD, bbox_location_filter, bbox_polygons, point_from_location
+
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("TRACKER_STREAM_HEARTBEAT_SECONDS", "15"))
+# Vida máxima de un stream (0: sin límite). El apagado no la necesita, porque el stream cierra con
+# shutting_down; cada cierre obliga al cliente a reconectar y repetir lo perdido desde Mongo
+STREAM_MAX_SECONDS = float(os.getenv("TRACKER_STREAM_MAX_SECONDS", "0"))
+STREAM_REPLAY_LIMIT = int(os.getenv("TRACKER_STREAM_REPLAY_LIMIT", "1000"))
+TRACK_MAX_RAW_POINTS = int(os.getenv("TRACKER_TRACK_MAX_RAW_POINTS", "200000"))
+POSITION_PROJECTION = {"TrackerId": 1, "AssetName": 1, "EventTime": 1, "Location.Latitude": 1, "Location.Longitude": 1}
+
+# EventTime solo tiene índice como segunda clave de (TrackerId|BL|Booking, EventTime)
+TRACKER_EVENT_QUERY_SPEC = QuerySpec(
+    TrackerEventResponse,
+    indexed={
+        "id": (), "TrackerId": (), "BL": (), "Booking": (),
+        "EventTime": ("TrackerId", "BL", "Booking"),
+    },
+)
+
+_geo_index_ready = False
 
 
 class TrackerEventService:
     def __init__(self):
         self.mongo_manager = MongoManager()
-        self.collection_name = "HoopoMessages"
+        self.collection_name = TRACKER_EVENTS_COLLECTION
 
-    async def get_all_tracker_events(self, limit: int = 100, offset: int = 0) -> List[TrackerEventResponse]:
+    async def get_all_tracker_events(
+            self,
+            limit: int = 100,
+            offset: int = 0,
+            fields: Optional[List[str]] = None,
+            list_query: Optional[ListQuery] = None
+    ) -> List[TrackerEventResponse]:
         """
         Retrieves all tracker events with pagination
         """
@@ -18,14 +62,19 @@ class TrackerEventService:
             collection = await self.mongo_manager.get_collection(self.collection_name)
 
 
-            cursor = collection.find().skip(offset).limit(limit)
+            query = list_query.mongo_filter() if list_query else {}
+            cursor = collection.find(query, mongo_projection(fields, TrackerEventResponse))
+            sort = list_query.mongo_sort() if list_query else None
+            if sort:
+                cursor = cursor.sort(sort)
+            cursor = cursor.skip(offset).limit(limit)
             events = await cursor.to_list(length=limit)
 
             # Convert ObjectId to string for response
             result = []
             for event in events:
                 event['_id'] = str(event['_id'])
-                result.append(TrackerEventResponse(**event))
+                result.append(build(TrackerEventResponse, event, fields))
 
             return result
         except Exception as e:
@@ -34,32 +83,339 @@ class TrackerEventService:
         finally:
             await self.mongo_manager.close_connection()
 
+    async def ingest_tracker_events(self, events: List[TrackerEventIngest], wait: bool = True) -> TrackerEventBatchResult:
+        """
+        Encola eventos en el buffer write-behind; los duplicados por (TrackerId, EventTime) se ignoran
+        """
+        try:
+            documents = [event.model_dump(exclude_none=True) for event in events]
+            for document in documents:
+                point = point_from_location(document.get("Location"))
+                if point is not None:
+                    document[GEO_FIELD] = point
+            accepted, duplicates = await tracker_event_writer.submit(documents, wait=wait)
+            return TrackerEventBatchResult(
+                received=len(documents),
+                accepted=accepted,
+                duplicates=duplicates,
+                queued=not wait,
+                warning=tracker_event_writer.degraded
+            )
+        except Exception as e:
+            logging.error(f"Error ingesting tracker events: {str(e)}")
+            raise
+
+    async def stream_tracker_events(
+            self,
+            tracker_ids: Optional[List[str]] = None,
+            last_event_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Genera un stream Server-Sent Events con los eventos nuevos de los trackers indicados
+        (o de toda la flota). Si el cliente reconecta con Last-Event-ID se reenvía lo perdido.
+        """
+        subscription = tracker_event_broadcaster.subscribe(tracker_ids)
+        try:
+            yield f"retry: 3000\n: subscribed mode={tracker_event_broadcaster.mode or 'starting'}\n\n"
+
+            last_sent = None
+            if last_event_id:
+                async for event_id, payload in self._replay_tracker_events(tracker_ids, last_event_id):
+                    last_sent = event_id
+                    yield f"id: {event_id}\nevent: tracker_event\ndata: {payload}\n\n"
+
+            started = time.monotonic()
+            last_message = started
+            # shutting_down se activa con la señal de apagado: el stream cierra antes de que uvicorn
+            # espere a las conexiones abiertas y el cliente reconecta contra otro worker
+            while not request_tracker.shutting_down.is_set() and (
+                    STREAM_MAX_SECONDS <= 0 or time.monotonic() - started < STREAM_MAX_SECONDS):
+                try:
+                    event_id, payload = await asyncio.wait_for(subscription.queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_message >= STREAM_HEARTBEAT_SECONDS:
+                        last_message = time.monotonic()
+                        yield ": keepalive\n\n"
+                    continue
+                if last_sent is not None and event_id <= last_sent:
+                    continue
+                dropped = subscription.take_dropped()
+                if dropped:
+                    yield f"event: dropped\ndata: {{\"dropped\": {dropped}}}\n\n"
+                last_message = time.monotonic()
+                yield f"id: {event_id}\nevent: tracker_event\ndata: {payload}\n\n"
+        finally:
+            tracker_event_broadcaster.unsubscribe(subscription)
+
+    async def _replay_tracker_events(self, tracker_ids: Optional[List[str]], last_event_id: str):
+        from bson import ObjectId
+        from bson.errors import InvalidId
+        try:
+            query = {"_id": {"$gt": ObjectId(last_event_id)}}
+        except InvalidId:
+            return
+        if tracker_ids:
+            query["TrackerId"] = {"$in": list(tracker_ids)}
+        await self.mongo_manager.create_connection()
+        collection = await self.mongo_manager.get_collection(self.collection_name)
+        cursor = collection.find(query).sort("_id", 1).limit(STREAM_REPLAY_LIMIT)
+        async for event in cursor:
+            event['_id'] = str(event['_id'])
+            yield event['_id'], TrackerEventResponse(**event).model_dump_json(by_alias=True)
+
+    @staticmethod
+    def _date_bounds(start_date: Optional[str], end_date: Optional[str]):
+        """
+        Convierte fechas YYYY-MM-DD (hoy por defecto) en el rango [inicio del primer día, fin del último]
+        """
+        from datetime import datetime, timezone
+
+        # Set default dates to today if not provided
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        start_date = start_date or today
+        end_date = end_date or today
+
+        # Parse dates and create datetime objects
+        start_datetime = datetime.strptime(start_date, "%Y-%m-%d").replace(
+            hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc
+        )
+        end_datetime = datetime.strptime(end_date, "%Y-%m-%d").replace(
+            hour=23, minute=59, second=59, microsecond=999999, tzinfo=timezone.utc
+        )
+        return start_datetime, end_datetime
+
+    async def get_tracker_track(
+            self,
+            tracker_id: str,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+            tolerance_m: Optional[float] = None,
+            max_points: Optional[int] = None,
+            encoding: str = "polyline",
+            include_timestamps: bool = False
+    ) -> TrackerTrackResponse:
+        """
+        Devuelve la trayectoria de un tracker simplificada en el servidor: Douglas-Peucker con
+        `tolerance_m` y, si se pide `max_points`, Visvalingam-Whyatt hasta ese número de puntos.
+        Solo se leen EventTime y las coordenadas de Mongo.
+        """
+        try:
+            start_datetime, end_datetime = self._date_bounds(start_date, end_date)
+        except ValueError as e:
+            logging.error(f"Date parsing error: {str(e)}")
+            raise ValueError("Invalid date format. Use YYYY-MM-DD format.")
+
+        try:
+            await self.mongo_manager.create_connection()
+            collection = await self.mongo_manager.get_collection(self.collection_name)
+
+            query = {
+                "TrackerId": tracker_id,
+                "EventTime": {"$gte": start_datetime, "$lte": end_datetime},
+                "Location.Latitude": {"$ne": None},
+                "Location.Longitude": {"$ne": None},
+            }
+            projection = {"_id": 0, "EventTime": 1, "Location.Latitude": 1, "Location.Longitude": 1}
+            cursor = collection.find(query, projection).sort("EventTime", 1).batch_size(5000).limit(TRACK_MAX_RAW_POINTS)
+
+            coords = []
+            times = []
+            async for event in cursor:
+                location = event["Location"]
+                coords.append((location["Latitude"], location["Longitude"]))
+                times.append(event.get("EventTime"))
+        except Exception as e:
+            logging.error(f"Error retrieving tracker track: {str(e)}")
+            raise
+        finally:
+            await self.mongo_manager.close_connection()
+
+        # Simplificar y codificar hasta TRACK_MAX_RAW_POINTS puntos es CPU puro: fuera del event loop
+        keep, algorithms = await asyncio.to_thread(self._simplify_track, coords, tolerance_m, max_points)
+
+        path = [coords[i] for i in keep]
+        response = TrackerTrackResponse(
+            tracker_id=tracker_id,
+            start=start_datetime,
+            end=end_datetime,
+            algorithm="+".join(algorithms) or "none",
+            raw_points=len(coords),
+            points=len(path),
+            encoding=encoding,
+            timestamps=[times[i] for i in keep] if include_timestamps else None
+        )
+        if encoding == "geojson":
+            # GeoJSON usa [longitud, latitud]
+            response.geometry = {"type": "LineString", "coordinates": [[lon, lat] for lat, lon in path]}
+        else:
+            response.polyline = await asyncio.to_thread(encode_polyline, path)
+        return response
+
+    @staticmethod
+    def _simplify_track(coords: List[tuple], tolerance_m: Optional[float], max_points: Optional[int]):
+        algorithms = []
+        keep = list(range(len(coords)))
+        if tolerance_m:
+            keep = douglas_peucker(coords, tolerance_m)
+            algorithms.append("douglas_peucker")
+        if max_points and len(keep) > max_points:
+            subset = visvalingam_whyatt([coords[i] for i in keep], max_points)
+            keep = [keep[i] for i in subset]
+            algorithms.append("visvalingam_whyatt")
+        return keep, algorithms
+
+    async def get_geo_collection(self):
+        global _geo_index_ready
+        await self.mongo_manager.create_connection()
+        collection = await self.mongo_manager.get_collection(self.collection_name)
+        if not _geo_index_ready:
+            # El índice compuesto permite combinar la búsqueda espacial con el rango de fechas
+            await collection.create_index([(GEO_FIELD, "2dsphere"), ("EventTime", 1)], name="GeoPoint_2dsphere_EventTime")
+            _geo_index_ready = True
+        return collection
+
+    @staticmethod
+    def _time_filter(start_time: Optional[datetime], end_time: Optional[datetime], tracker_ids: Optional[List[str]] = None) -> dict:
+        query = {}
+        if start_time or end_time:
+            query["EventTime"] = {}
+            if start_time:
+                query["EventTime"]["$gte"] = start_time
+            if end_time:
+                query["EventTime"]["$lte"] = end_time
+        if tracker_ids:
+            query["TrackerId"] = {"$in": tracker_ids}
+        return query
+
+    @staticmethod
+    def _to_position(event: dict) -> TrackerEventPosition:
+        location = event.get("Location") or {}
+        return TrackerEventPosition(
+            _id=str(event["_id"]),
+            TrackerId=event.get("TrackerId"),
+            AssetName=event.get("AssetName"),
+            EventTime=event.get("EventTime"),
+            Latitude=location.get("Latitude"),
+            Longitude=location.get("Longitude"),
+            distance_m=event.get("distance_m")
+        )
+
+    async def find_events_near(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            start_time: Optional[datetime] = None,
+            end_time: Optional[datetime] = None,
+            tracker_ids: Optional[List[str]] = None,
+            limit: int = 1000,
+            latest_per_tracker: bool = False
+    ) -> List[TrackerEventPosition]:
+        """
+        Posiciones a menos de `radius_km` del punto, ordenadas por distancia. Con
+        latest_per_tracker=True devuelve solo la última posición de cada tracker dentro del radio.
+        """
+        try:
+            collection = await self.get_geo_collection()
+            pipeline = [
+                {"$geoNear": {
+                    "near": {"type": "Point", "coordinates": [longitude, latitude]},
+                    "key": GEO_FIELD,
+                    "distanceField": "distance_m",
+                    "maxDistance": radius_km * 1000.0,
+                    "spherical": True,
+                    "query": self._time_filter(start_time, end_time, tracker_ids),
+                }},
+                {"$project": {**POSITION_PROJECTION, "distance_m": 1}},
+            ]
+            if latest_per_tracker:
+                pipeline += [
+                    {"$sort": {"EventTime": -1}},
+                    {"$group": {"_id": "$TrackerId", "event": {"$first": "$$ROOT"}}},
+                    {"$replaceRoot": {"newRoot": "$event"}},
+                    {"$sort": {"distance_m": 1}},
+                ]
+            pipeline.append({"$limit": limit})
+            events = await collection.aggregate(pipeline).to_list(length=limit)
+            return [self._to_position(event) for event in events]
+        except Exception as e:
+            logging.error(f"Error retrieving tracker events near point: {str(e)}")
+            raise
+        finally:
+            await self.mongo_manager.close_connection()
+
+    async def find_events_within(
+            self,
+            geometry: dict,
+            start_time: Optional[datetime] = None,
+            end_time: Optional[datetime] = None,
+            tracker_ids: Optional[List[str]] = None,
+            limit: int = 1000
+    ) -> List[TrackerEventPosition]:
+        """
+        Posiciones dentro de un Polygon GeoJSON (viewport o zona), las más recientes primero
+        """
+        try:
+            query = self._time_filter(start_time, end_time, tracker_ids)
+            query[GEO_FIELD] = {"$geoWithin": {"$geometry": geometry}}
+            return await self._find_positions(query, limit)
+        except Exception as e:
+            logging.error(f"Error retrieving tracker events within area: {str(e)}")
+            raise
+        finally:
+            await self.mongo_manager.close_connection()
+
+    async def find_events_in_bbox(
+            self,
+            min_lat: float,
+            min_lon: float,
+            max_lat: float,
+            max_lon: float,
+            start_time: Optional[datetime] = None,
+            end_time: Optional[datetime] = None,
+            tracker_ids: Optional[List[str]] = None,
+            limit: int = 1000
+    ) -> List[TrackerEventPosition]:
+        """
+        Posiciones dentro del rectángulo lat/lon (viewport), las más recientes primero. El índice
+        2dsphere acota con polígonos densificados y el rectángulo exacto se aplica sobre Location.
+        """
+        try:
+            query = self._time_filter(start_time, end_time, tracker_ids)
+            query["$and"] = [
+                {"$or": [
+                    {GEO_FIELD: {"$geoWithin": {"$geometry": polygon}}}
+                    for polygon in bbox_polygons(min_lat, min_lon, max_lat, max_lon)
+                ]},
+                bbox_location_filter(min_lat, min_lon, max_lat, max_lon),
+            ]
+            return await self._find_positions(query, limit)
+        except Exception as e:
+            logging.error(f"Error retrieving tracker events in bbox: {str(e)}")
+            raise
+        finally:
+            await self.mongo_manager.close_connection()
+
+    async def _find_positions(self, query: dict, limit: int) -> List[TrackerEventPosition]:
+        collection = await self.get_geo_collection()
+        cursor = collection.find(query, POSITION_PROJECTION).sort("EventTime", -1).limit(limit)
+        events = await cursor.to_list(length=limit)
+        return [self._to_position(event) for event in events]
+
     async def get_tracker_events_by_date_range(
             self,
             tracker_id: str,
             start_date: Optional[str] = None,
             end_date: Optional[str] = None,
             limit: int = 100,
-            offset: int = 0
+            offset: int = 0,
+            fields: Optional[List[str]] = None
     ) -> List[TrackerEventResponse]:
         """
         Retrieves tracker events for a specific TrackerId within a date range
         """
         try:
-            from datetime import datetime, timezone
-
-            # Set default dates to today if not provided
-            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-            start_date = start_date or today
-            end_date = end_date or today
-
-            # Parse dates and create datetime objects
-            start_datetime = datetime.strptime(start_date, "%Y-%m-%d").replace(
-                hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc
-            )
-            end_datetime = datetime.strptime(end_date, "%Y-%m-%d").replace(
-                hour=23, minute=59, second=59, microsecond=999999, tzinfo=timezone.utc
-            )
+            start_datetime, end_datetime = self._date_bounds(start_date, end_date)
 
             await self.mongo_manager.create_connection()
             collection = await self.mongo_manager.get_collection(self.collection_name)
@@ -73,14 +429,14 @@ class TrackerEventService:
                 }
             }
 
-            cursor = collection.find(query).sort("EventTime", -1).skip(offset).limit(limit)
+            cursor = collection.find(query, mongo_projection(fields, TrackerEventResponse)).sort("EventTime", -1).skip(offset).limit(limit)
             events = await cursor.to_list(length=limit)
 
             # Convert ObjectId to string for response
             result = []
             for event in events:
                 event['_id'] = str(event['_id'])
-                result.append(TrackerEventResponse(**event))
+                result.append(build(TrackerEventResponse, event, fields))
 
             return result
         except ValueError as e:
@@ -92,8 +448,13 @@ class TrackerEventService:
         finally:
             await self.mongo_manager.close_connection()
 
-    async def get_tracker_events_by_tracker_id(self, tracker_id: str, limit: int = 100, offset: int = 0) -> List[
-        TrackerEventResponse]:
+    async def get_tracker_events_by_tracker_id(
+            self,
+            tracker_id: str,
+            limit: int = 100,
+            offset: int = 0,
+            fields: Optional[List[str]] = None
+    ) -> List[TrackerEventResponse]:
         """
         Retrieves tracker events for a specific TrackerId with pagination
         """
@@ -101,14 +462,14 @@ class TrackerEventService:
             await self.mongo_manager.create_connection()
             collection = await self.mongo_manager.get_collection(self.collection_name)
 
-            cursor = collection.find({"AssetName": tracker_id}).sort("EventTime", -1).skip(offset).limit(limit)
+            cursor = collection.find({"AssetName": tracker_id}, mongo_projection(fields, TrackerEventResponse)).sort("EventTime", -1).skip(offset).limit(limit)
             events = await cursor.to_list(length=limit)
 
             # Convert ObjectId to string for response
             result = []
             for event in events:
                 event['_id'] = str(event['_id'])
-                result.append(TrackerEventResponse(**event))
+                result.append(build(TrackerEventResponse, event, fields))
 
             return result
         except Exception as e:
@@ -117,7 +478,7 @@ class TrackerEventService:
         finally:
             await self.mongo_manager.close_connection()
 
-    async def get_tracker_event_by_id(self, event_id: str) -> Optional[TrackerEventResponse]:
+    async def get_tracker_event_by_id(self, event_id: str, fields: Optional[List[str]] = None) -> Optional[TrackerEventResponse]:
         """
         Retrieves a specific tracker event by its MongoDB _id
         """
@@ -126,11 +487,11 @@ class TrackerEventService:
             await self.mongo_manager.create_connection()
             collection = await self.mongo_manager.get_collection(self.collection_name)
 
-            event = await collection.find_one({"_id": ObjectId(event_id)})
+            event = await collection.find_one({"_id": ObjectId(event_id)}, mongo_projection(fields, TrackerEventResponse))
 
             if event:
                 event['_id'] = str(event['_id'])
-                return TrackerEventResponse(**event)
+                return build(TrackerEventResponse, event, fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving tracker event by id: {str(e)}")
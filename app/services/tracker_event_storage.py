@@ -0,0 +1,93 @@
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterable, Set, Tuple
+
+# Backend de almacenamiento de los eventos de trackers:
+#   flat       -> colección normal HoopoMessages (por defecto)
+#   timeseries -> colección time-series de Mongo (>= 7.0, la primera que admite update_many con
+#                 filtros y campos arbitrarios, que usa el motor de GeoPoint): TrackerId como
+#                 metaField y EventTime como timeField. Mongo agrupa los eventos de cada tracker en
+#                 buckets comprimidos y las lecturas devuelven documentos individuales, así que el
+#                 resto del código lee igual
+TRACKER_EVENTS_STORAGE = os.getenv("TRACKER_EVENTS_STORAGE", "flat").lower()
+FLAT_COLLECTION = "HoopoMessages"
+TIMESERIES_COLLECTION = os.getenv("TRACKER_EVENTS_TIMESERIES_COLLECTION", "HoopoMessagesTS")
+TIMESERIES_OPTIONS = {
+    "timeField": "EventTime",
+    "metaField": "TrackerId",
+    "granularity": os.getenv("TRACKER_EVENTS_TIMESERIES_GRANULARITY", "minutes"),
+}
+
+TIMESERIES_MIN_MONGO_VERSION = (7, 0)
+# Colección en la que inserta el relay de Hoopo (fuera de esta API)
+TRACKER_RELAY_COLLECTION = os.getenv("TRACKER_RELAY_COLLECTION", FLAT_COLLECTION)
+
+TRACKER_EVENTS_COLLECTION = TIMESERIES_COLLECTION if TRACKER_EVENTS_STORAGE == "timeseries" else FLAT_COLLECTION
+
+# Todos los lectores (stream, geocercas, rollups, timeline, ETA, GeoPoint) usan la colección del
+# backend: si el relay siguiera escribiendo en otra, sus eventos desaparecerían de todas las lecturas
+if TRACKER_RELAY_COLLECTION != TRACKER_EVENTS_COLLECTION:
+    raise RuntimeError(
+        f"TRACKER_EVENTS_STORAGE={TRACKER_EVENTS_STORAGE} reads {TRACKER_EVENTS_COLLECTION} but the Hoopo relay "
+        f"writes to {TRACKER_RELAY_COLLECTION}; repoint the relay and set TRACKER_RELAY_COLLECTION to match"
+    )
+
+
+def is_timeseries() -> bool:
+    return TRACKER_EVENTS_STORAGE == "timeseries"
+
+
+async def check_timeseries_support(db) -> None:
+    """RuntimeError si el servidor no llega a TIMESERIES_MIN_MONGO_VERSION."""
+    version = (await db.command("buildInfo")).get("versionArray", [0])
+    if tuple(version[:2]) < TIMESERIES_MIN_MONGO_VERSION:
+        raise RuntimeError(
+            f"Time-series tracker storage requires MongoDB "
+            f"{'.'.join(map(str, TIMESERIES_MIN_MONGO_VERSION))}+, server is {'.'.join(map(str, version))}"
+        )
+
+
+async def ensure_timeseries_collection(db, name: str = TIMESERIES_COLLECTION) -> bool:
+    """Crea la colección time-series y sus índices si no existen; devuelve True si la creó."""
+    created = False
+    if not await db.list_collection_names(filter={"name": name}):
+        await db.create_collection(name, timeseries=TIMESERIES_OPTIONS)
+        created = True
+    collection = db[name]
+    await collection.create_index([("TrackerId", 1), ("EventTime", 1)], name="TrackerId_EventTime")
+    try:
+        # Los lectores incrementales (stream, geocercas, rollups) avanzan por _id
+        await collection.create_index([("_id", 1)], name="Id_watermark")
+    except Exception as e:
+        logging.warning(f"Could not index _id on {name}, watermark readers will scan: {str(e)}")
+    return created
+
+
+def event_key(document: dict) -> Tuple[str, datetime]:
+    """(TrackerId, EventTime) con la precisión de milisegundos con la que Mongo guarda las fechas."""
+    event_time = document["EventTime"]
+    if event_time.tzinfo is not None:
+        event_time = event_time.astimezone(timezone.utc).replace(tzinfo=None)
+    event_time = event_time.replace(microsecond=event_time.microsecond // 1000 * 1000)
+    return document["TrackerId"], event_time
+
+
+async def find_existing_keys(collection, documents: Iterable[dict]) -> Set[Tuple[str, datetime]]:
+    """
+    Las colecciones time-series no admiten índices únicos: la idempotencia de la ingesta se
+    comprueba con una consulta por lote sobre el índice (TrackerId, EventTime).
+    """
+    times_by_tracker = defaultdict(set)
+    for document in documents:
+        tracker_id, event_time = event_key(document)
+        times_by_tracker[tracker_id].add(event_time)
+    if not times_by_tracker:
+        return set()
+    query = {"$or": [
+        {"TrackerId": tracker_id, "EventTime": {"$in": sorted(times)}}
+        for tracker_id, times in times_by_tracker.items()
+    ]}
+    cursor = collection.find(query, {"_id": 0, "TrackerId": 1, "EventTime": 1})
+    return {event_key(document) async for document in cursor}
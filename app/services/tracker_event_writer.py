@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from app.database.mongo_manager import MongoManager
+from app.lifecycle import on_shutdown
+from app.services.tracker_event_storage import (
+    TRACKER_EVENTS_COLLECTION,
+    is_timeseries,
+    ensure_timeseries_collection,
+    event_key,
+    find_existing_keys,
+)
+
+INGEST_MAX_BATCH = int(os.getenv("TRACKER_INGEST_MAX_BATCH", "2000"))
+INGEST_FLUSH_MS = float(os.getenv("TRACKER_INGEST_FLUSH_MS", "50"))
+INGEST_MAX_PENDING = int(os.getenv("TRACKER_INGEST_MAX_PENDING", "100000"))
+DUPLICATE_KEY_ERROR = 11000
+
+
+class IngestOverloadedError(Exception):
+    pass
+
+
+class _PendingBatch:
+    def __init__(self, documents: List[dict], future: Optional[asyncio.Future]):
+        self.documents = documents
+        self.future = future
+        self.duplicates = 0
+
+
+class TrackerEventWriter:
+    """
+    Buffer write-behind para HoopoMessages. Las requests encolan sus eventos y un único
+    flusher por worker los agrupa en `insert_many(ordered=False)` cuando se alcanza
+    INGEST_MAX_BATCH documentos o pasan INGEST_FLUSH_MS desde el primero pendiente.
+    El índice único (TrackerId, EventTime) hace la ingesta idempotente: los duplicados
+    fallan con E11000 y se cuentan por request en lugar de abortar el lote. Con el backend
+    time-series (sin índices únicos, y tampoco sobre _id) los duplicados se descartan antes de
+    insertar consultando los ya guardados: la garantía es más débil, porque dos workers que
+    reciben el mismo evento a la vez pueden insertarlo ambos (la API lo documenta como
+    deduplicación best-effort).
+    """
+
+    def __init__(self, collection_name: str = TRACKER_EVENTS_COLLECTION):
+        self.collection_name = collection_name
+        self.mongo_manager = MongoManager()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self._pending_documents = 0
+        self._indexes_ready = False
+        # Motivo por el que la ingesta no es idempotente (sin índice único); None si todo va bien
+        self.degraded: Optional[str] = None
+
+    async def _collection(self):
+        await self.mongo_manager.create_connection()
+        collection = await self.mongo_manager.get_collection(self.collection_name)
+        if not self._indexes_ready:
+            await self._ensure_indexes(collection)
+        return collection
+
+    async def _ensure_indexes(self, collection):
+        if is_timeseries():
+            await ensure_timeseries_collection(collection.database, self.collection_name)
+            self._indexes_ready = True
+            return
+        try:
+            await collection.create_index(
+                [("TrackerId", 1), ("EventTime", 1)],
+                unique=True,
+                name="TrackerId_EventTime_unique"
+            )
+        except Exception as e:
+            # Datos históricos con duplicados impiden crear el índice; la ingesta sigue, sin
+            # idempotencia, y cada respuesta de /batch lo avisa hasta que se corrija y reinicie
+            logging.error(f"Could not create unique (TrackerId, EventTime) index, ingestion is not idempotent: {str(e)}")
+            self.degraded = f"Unique (TrackerId, EventTime) index unavailable, duplicates are not detected: {str(e)}"
+        self._indexes_ready = True
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._pending_documents = 0
+            self._task = loop.create_task(self._flush_loop())
+
+    async def submit(self, documents: List[dict], wait: bool = True) -> Tuple[int, int]:
+        """Encola documentos; con wait=True espera al flush y devuelve (aceptados, duplicados)."""
+        if not documents:
+            return 0, 0
+        self._ensure_started()
+        if self._pending_documents + len(documents) > INGEST_MAX_PENDING:
+            raise IngestOverloadedError("Tracker event ingestion queue is full, retry later")
+
+        future = asyncio.get_running_loop().create_future() if wait else None
+        batch = _PendingBatch(documents, future)
+        self._pending_documents += len(documents)
+        self._queue.put_nowait(batch)
+        if future is None:
+            return len(documents), 0
+        duplicates = await future
+        return len(documents) - duplicates, duplicates
+
+    async def _flush_loop(self):
+        batches: List[_PendingBatch] = []
+        try:
+            await self._flush_batches(batches)
+        except BaseException as e:
+            # Si el flusher muere nadie resolvería los futures: se fallan todos los pendientes
+            # y el siguiente submit arranca otro flusher. El error ya queda registrado aquí;
+            # solo se propagan cancelaciones
+            self._fail_pending(batches, e)
+            if not isinstance(e, Exception):
+                raise
+
+    def _fail_pending(self, batches: List[_PendingBatch], cause: BaseException):
+        logging.error(f"Tracker event writer stopped: {cause!r}")
+        while not self._queue.empty():
+            batch = self._queue.get_nowait()
+            if batch is not None:
+                batches.append(batch)
+        error = RuntimeError(f"Tracker event writer stopped: {cause!r}")
+        for batch in batches:
+            if batch.future is not None and not batch.future.done():
+                batch.future.set_exception(error)
+        self._pending_documents = 0
+
+    async def _flush_batches(self, batches: List[_PendingBatch]):
+        """Bucle del flusher; `batches` es el lote en curso, para poder fallarlo si algo escapa."""
+        closing = False
+        while not closing:
+            batches.clear()
+            first = await self._queue.get()
+            if first is None:
+                return
+            batches.append(first)
+            size = len(first.documents)
+            deadline = self._loop.time() + INGEST_FLUSH_MS / 1000.0
+            while size < INGEST_MAX_BATCH:
+                if not self._queue.empty():
+                    batch = self._queue.get_nowait()
+                else:
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if batch is None:
+                    # Apagado: se escribe lo acumulado y se termina
+                    closing = True
+                    break
+                batches.append(batch)
+                size += len(batch.documents)
+            await self._write(batches)
+
+    async def _write(self, batches: List[_PendingBatch]):
+        documents = []
+        owners = []
+        for batch in batches:
+            documents.extend(batch.documents)
+            owners.extend([batch] * len(batch.documents))
+
+        error = None
+        try:
+            collection = await self._collection()
+            if is_timeseries():
+                documents, owners = await self._drop_duplicates(collection, documents, owners)
+            if documents:
+                await collection.insert_many(documents, ordered=False)
+        except Exception as e:
+            write_errors = getattr(e, "details", None) or {}
+            other_errors = False
+            for write_error in write_errors.get("writeErrors", []):
+                if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                    owners[write_error["index"]].duplicates += 1
+                else:
+                    other_errors = True
+            if other_errors or not write_errors.get("writeErrors"):
+                logging.error(f"Error writing tracker events: {str(e)}")
+                error = e
+        finally:
+            self._pending_documents -= sum(len(batch.documents) for batch in batches)
+
+        for batch in batches:
+            if batch.future is None or batch.future.done():
+                continue
+            if error is not None:
+                batch.future.set_exception(error)
+            else:
+                batch.future.set_result(batch.duplicates)
+
+    @staticmethod
+    async def _drop_duplicates(collection, documents: List[dict], owners: List[_PendingBatch]):
+        # Comprobar y luego insertar no es atómico entre workers: solo evita los reenvíos habituales
+        existing = await find_existing_keys(collection, documents)
+        kept, kept_owners = [], []
+        for document, owner in zip(documents, owners):
+            key = event_key(document)
+            if key in existing:
+                owner.duplicates += 1
+                continue
+            # También los repetidos dentro del mismo lote
+            existing.add(key)
+            kept.append(document)
+            kept_owners.append(owner)
+        return kept, kept_owners
+
+    async def close(self):
+        """Escribe lo pendiente y detiene el flusher (se llama en el apagado del worker)."""
+        if self._task is None or self._task.done():
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+
+tracker_event_writer = TrackerEventWriter()
+on_shutdown(tracker_event_writer.close)
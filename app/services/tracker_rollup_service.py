@@ -0,0 +1,378 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.database.mongo_manager import MongoManager
+from app.lifecycle import on_startup, on_shutdown
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION
+from app.models.tracker_event_models import (
+    TrackerRollupRunResult,
+    RollupHistogram,
+    RollupHistogramPoint,
+)
+
+TRACKER_ROLLUPS_ENABLED = os.getenv("TRACKER_ROLLUPS_ENABLED", "false").lower() == "true"
+ROLLUP_BATCH_SIZE = int(os.getenv("TRACKER_ROLLUP_BATCH_SIZE", "10000"))
+ROLLUP_INTERVAL_SECONDS = float(os.getenv("TRACKER_ROLLUP_INTERVAL_SECONDS", "10"))
+# Igual que en el motor de geocercas: margen para documentos con _id menor que llegan tarde
+ROLLUP_SETTLE_SECONDS = float(os.getenv("TRACKER_ROLLUP_SETTLE_SECONDS", "10"))
+ROLLUP_LEASE_SECONDS = float(os.getenv("TRACKER_ROLLUP_LEASE_SECONDS", "120"))
+RETRY_SECONDS = 5.0
+
+SOURCE_COLLECTION = TRACKER_EVENTS_COLLECTION
+STATE_COLLECTION = "HoopoRollupState"
+STATE_ID = "tracker_rollups"
+# Colección por granularidad; cada documento es (TrackerId, EventType, BucketStart) con
+# Count, Alerts {alerta: n} y LastId (último lote aplicado, ver _apply)
+ROLLUP_COLLECTIONS = {"hour": "HoopoRollupsHourly", "day": "HoopoRollupsDaily"}
+ROLLUP_KEY = ["TrackerId", "EventType", "BucketStart"]
+# $merge no admite claves nulas, así que los eventos sin Event.EventType van a este tipo
+UNKNOWN_EVENT_TYPE = "unknown"
+# Tipo de evento del bucket, común al proceso incremental y al backfill: un Event.EventType que
+# no sea texto o esté vacío cuenta como UNKNOWN_EVENT_TYPE
+EVENT_TYPE_EXPRESSION = {"$cond": [
+    {"$and": [{"$eq": [{"$type": "$Event.EventType"}, "string"]}, {"$ne": ["$Event.EventType", ""]}]},
+    "$Event.EventType",
+    UNKNOWN_EVENT_TYPE,
+]}
+GROUP_FIELDS = {"tracker": "$TrackerId", "event_type": "$EventType"}
+DUPLICATE_KEY = 11000
+
+_rollup_indexes_ready = False
+
+
+def bucket_start(value: datetime, interval: str) -> datetime:
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if interval == "day" else value
+
+
+def _alert_key(alert: str) -> str:
+    # Los nombres de campo con '.' o '$' no se pueden usar en rutas de $inc
+    return alert.replace(".", "_").replace("$", "_")
+
+
+class TrackerRollupService:
+    """
+    Mantiene buckets horarios y diarios de HoopoMessages por tracker y tipo de evento para que
+    los histogramas no tengan que recorrer los mensajes en bruto. Avanza por lotes de _id desde
+    una marca de agua; un lote interrumpido se repite exactamente sobre el mismo rango y cada
+    bucket guarda el último lote aplicado, así que repetirlo nunca cuenta dos veces.
+    """
+
+    def __init__(self):
+        self.mongo_manager = MongoManager()
+        self.owner = uuid.uuid4().hex
+
+    async def _collections(self):
+        global _rollup_indexes_ready
+        await self.mongo_manager.create_connection()
+        source = await self.mongo_manager.get_collection(SOURCE_COLLECTION)
+        state = await self.mongo_manager.get_collection(STATE_COLLECTION)
+        rollups = {interval: await self.mongo_manager.get_collection(name) for interval, name in ROLLUP_COLLECTIONS.items()}
+        if not _rollup_indexes_ready:
+            for collection in rollups.values():
+                await collection.create_index([(field, 1) for field in ROLLUP_KEY], unique=True, name="TrackerId_EventType_BucketStart_unique")
+                await collection.create_index([("BucketStart", 1)], name="BucketStart")
+            _rollup_indexes_ready = True
+        return source, state, rollups
+
+    async def _acquire_lease(self, state, seconds: float) -> Optional[dict]:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        await state.update_one({"_id": STATE_ID}, {"$setOnInsert": {"LastId": None, "LeaseUntil": now}}, upsert=True)
+        return await state.find_one_and_update(
+            {"_id": STATE_ID, "$or": [{"LeaseUntil": {"$lte": now}}, {"LeaseOwner": self.owner}]},
+            {"$set": {"LeaseOwner": self.owner, "LeaseUntil": now + timedelta(seconds=seconds)}},
+            return_document=True
+        )
+
+    async def _release_lease(self, state):
+        await state.update_one(
+            {"_id": STATE_ID, "LeaseOwner": self.owner},
+            {"$set": {"LeaseUntil": datetime.now(timezone.utc).replace(tzinfo=None)}, "$unset": {"LeaseOwner": ""}}
+        )
+
+    @staticmethod
+    async def _apply(collection, buckets: Dict[Tuple[str, str, datetime], list], batch_end: ObjectId) -> int:
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        operations = []
+        for (tracker_id, event_type, start), (count, alerts) in buckets.items():
+            increments = {"Count": count}
+            increments.update({f"Alerts.{_alert_key(alert)}": n for alert, n in alerts.items()})
+            # Si el bucket ya tiene este lote (LastId >= batch_end) el filtro no casa, el upsert
+            # choca con el índice único y el error de duplicado se descarta: aplicar es idempotente
+            operations.append(UpdateOne(
+                {"TrackerId": tracker_id, "EventType": event_type, "BucketStart": start, "LastId": {"$lt": batch_end}},
+                {"$inc": increments, "$set": {"LastId": batch_end}},
+                upsert=True
+            ))
+        if not operations:
+            return 0
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+        return len(operations)
+
+    async def process_new_events(self, batch_size: Optional[int] = None) -> TrackerRollupRunResult:
+        """Aplica el siguiente lote de mensajes a los buckets y avanza la marca de agua."""
+        batch_size = batch_size or ROLLUP_BATCH_SIZE
+        try:
+            source, state, rollups = await self._collections()
+            lease = await self._acquire_lease(state, ROLLUP_LEASE_SECONDS)
+            if lease is None:
+                return TrackerRollupRunResult(events=0, hourly_buckets=0, daily_buckets=0, skipped=True)
+            try:
+                last_id = lease.get("LastId")
+                batch_end = lease.get("PendingEnd")
+                replayed = batch_end is not None
+                settled = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=ROLLUP_SETTLE_SECONDS))
+                id_range = {"$lt": settled}
+                if last_id is not None:
+                    id_range["$gt"] = last_id
+                if replayed:
+                    # Mismo rango y mismo límite que la lectura original del lote
+                    id_range["$lte"] = batch_end
+                    batch_size = lease.get("PendingCount") or batch_size
+                documents = await source.aggregate([
+                    {"$match": {"TrackerId": {"$type": "string"}, "EventTime": {"$type": "date"}, "_id": id_range}},
+                    {"$sort": {"_id": 1}},
+                    {"$limit": batch_size},
+                    {"$project": {"TrackerId": 1, "EventTime": 1, "Alert": 1, "EventType": EVENT_TYPE_EXPRESSION}},
+                ]).to_list(length=batch_size)
+                if not replayed:
+                    if not documents:
+                        return TrackerRollupRunResult(
+                            events=0, hourly_buckets=0, daily_buckets=0,
+                            watermark=str(last_id) if last_id else None
+                        )
+                    batch_end = documents[-1]["_id"]
+                    # Se fija el rango del lote antes de aplicarlo para poder repetirlo tal cual
+                    await state.update_one(
+                        {"_id": STATE_ID}, {"$set": {"PendingEnd": batch_end, "PendingCount": len(documents)}}
+                    )
+
+                applied = {}
+                for interval, collection in rollups.items():
+                    buckets: Dict[Tuple[str, str, datetime], list] = {}
+                    for document in documents:
+                        key = (document["TrackerId"], document["EventType"], bucket_start(document["EventTime"], interval))
+                        bucket = buckets.setdefault(key, [0, Counter()])
+                        bucket[0] += 1
+                        alert = document.get("Alert")
+                        if isinstance(alert, str) and alert:
+                            bucket[1][alert] += 1
+                    applied[interval] = await self._apply(collection, buckets, batch_end)
+
+                await state.update_one(
+                    {"_id": STATE_ID},
+                    {"$set": {"LastId": batch_end, "UpdatedAt": datetime.now(timezone.utc).replace(tzinfo=None)}, "$unset": {"PendingEnd": "", "PendingCount": ""}}
+                )
+                return TrackerRollupRunResult(
+                    events=len(documents),
+                    hourly_buckets=applied["hour"],
+                    daily_buckets=applied["day"],
+                    replayed=replayed,
+                    watermark=str(batch_end)
+                )
+            finally:
+                await self._release_lease(state)
+        except Exception as e:
+            logging.error(f"Error updating tracker rollups: {str(e)}")
+            raise
+        finally:
+            await self.mongo_manager.close_connection()
+
+    async def get_histogram(
+            self,
+            start: datetime,
+            end: datetime,
+            interval: str = "day",
+            group_by: Optional[str] = None,
+            tracker_ids: Optional[List[str]] = None,
+            event_types: Optional[List[str]] = None
+    ) -> RollupHistogram:
+        """
+        Histograma de eventos (o de alertas con group_by="alert") entre start y end, leído de
+        los buckets. El rango se amplía a los límites de bucket del intervalo pedido.
+        """
+        start = bucket_start(start, interval)
+        match: dict = {"BucketStart": {"$gte": start, "$lt": end}}
+        if tracker_ids:
+            match["TrackerId"] = {"$in": tracker_ids}
+        if event_types:
+            match["EventType"] = {"$in": event_types}
+        pipeline: List[dict] = [{"$match": match}]
+        if group_by == "alert":
+            pipeline += [
+                {"$project": {"BucketStart": 1, "Alert": {"$objectToArray": {"$ifNull": ["$Alerts", {}]}}}},
+                {"$unwind": "$Alert"},
+                {"$group": {"_id": {"b": "$BucketStart", "k": "$Alert.k"}, "count": {"$sum": "$Alert.v"}}},
+            ]
+        else:
+            pipeline.append({"$group": {
+                "_id": {"b": "$BucketStart", "k": GROUP_FIELDS[group_by] if group_by else None},
+                "count": {"$sum": "$Count"},
+            }})
+        pipeline.append({"$sort": {"_id.b": 1, "_id.k": 1}})
+        try:
+            _, _, rollups = await self._collections()
+            rows = await rollups[interval].aggregate(pipeline).to_list(length=None)
+            points = [
+                RollupHistogramPoint(bucket_start=row["_id"]["b"], key=row["_id"]["k"], count=row["count"])
+                for row in rows
+            ]
+            return RollupHistogram(
+                interval=interval,
+                group_by=group_by,
+                start=start,
+                end=end,
+                total=sum(point.count for point in points),
+                points=points
+            )
+        except Exception as e:
+            logging.error(f"Error retrieving rollup histogram: {str(e)}")
+            raise
+        finally:
+            await self.mongo_manager.close_connection()
+
+    @staticmethod
+    def _backfill_pipeline(start: datetime, end: datetime, max_id: ObjectId, interval: str) -> List[dict]:
+        return [
+            {"$match": {
+                "EventTime": {"$gte": start, "$lt": end},
+                "TrackerId": {"$type": "string"},
+                "_id": {"$lte": max_id},
+            }},
+            {"$group": {
+                "_id": {
+                    "t": "$TrackerId",
+                    "e": EVENT_TYPE_EXPRESSION,
+                    "b": {"$dateTrunc": {"date": "$EventTime", "unit": interval}},
+                    "a": "$Alert",
+                },
+                "n": {"$sum": 1},
+            }},
+            {"$group": {
+                "_id": {"t": "$_id.t", "e": "$_id.e", "b": "$_id.b"},
+                "Count": {"$sum": "$n"},
+                "Alerts": {"$push": {"k": "$_id.a", "v": "$n"}},
+            }},
+            {"$project": {
+                "_id": 0,
+                "TrackerId": "$_id.t",
+                "EventType": "$_id.e",
+                "BucketStart": "$_id.b",
+                "Count": 1,
+                "Alerts": {"$arrayToObject": {"$map": {
+                    "input": {"$filter": {
+                        "input": "$Alerts",
+                        "cond": {"$and": [{"$eq": [{"$type": "$$this.k"}, "string"]}, {"$ne": ["$$this.k", ""]}]},
+                    }},
+                    "in": {
+                        "k": {"$replaceAll": {
+                            "input": {"$replaceAll": {"input": "$$this.k", "find": ".", "replacement": "_"}},
+                            "find": {"$literal": "$"}, "replacement": "_",
+                        }},
+                        "v": "$$this.v",
+                    },
+                }}},
+                "LastId": {"$literal": max_id},
+            }},
+            {"$merge": {
+                "into": ROLLUP_COLLECTIONS[interval],
+                "on": ROLLUP_KEY,
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }},
+        ]
+
+    async def begin_backfill(self, lease_seconds: float) -> Optional[ObjectId]:
+        """
+        Toma la concesión durante el backfill y devuelve el _id hasta el que se recalcula: la marca
+        de agua actual o, si nunca se ha procesado nada, el último mensaje existente. Así el backfill
+        y el proceso incremental cubren rangos disjuntos. Lanza RuntimeError si otro proceso la tiene.
+        """
+        try:
+            source, state, _ = await self._collections()
+            lease = await self._acquire_lease(state, lease_seconds)
+            if lease is None:
+                raise RuntimeError("Tracker rollups are being updated by another process")
+            if lease.get("PendingEnd") is not None:
+                await self._release_lease(state)
+                raise RuntimeError("A rollup batch is pending; run an incremental pass before backfilling")
+            max_id = lease.get("LastId")
+            if max_id is None:
+                latest = await source.find({}, {"_id": 1}).sort("_id", -1).limit(1).to_list(length=1)
+                if not latest:
+                    await self._release_lease(state)
+                    return None
+                max_id = latest[0]["_id"]
+            return max_id
+        finally:
+            await self.mongo_manager.close_connection()
+
+    async def backfill_slice(self, start: datetime, end: datetime, max_id: ObjectId):
+        """Recalcula (reemplaza) los buckets de [start, end); start y end deben caer en límite de día."""
+        try:
+            source, _, _ = await self._collections()
+            for interval in ROLLUP_COLLECTIONS:
+                await source.aggregate(self._backfill_pipeline(start, end, max_id, interval), allowDiskUse=True).to_list(length=None)
+        finally:
+            await self.mongo_manager.close_connection()
+
+    async def finish_backfill(self, max_id: Optional[ObjectId]):
+        """Fija la marca de agua (si el backfill terminó) y libera la concesión."""
+        try:
+            _, state, _ = await self._collections()
+            if max_id is not None:
+                await state.update_one(
+                    {"_id": STATE_ID, "LeaseOwner": self.owner, "LastId": None},
+                    {"$set": {"LastId": max_id}}
+                )
+            await self._release_lease(state)
+        finally:
+            await self.mongo_manager.close_connection()
+
+
+class TrackerRollupEngine:
+    """Bucle en segundo plano que mantiene los buckets al día."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        service = TrackerRollupService()
+        while True:
+            try:
+                result = await service.process_new_events()
+                if result.skipped or result.events < ROLLUP_BATCH_SIZE:
+                    await asyncio.sleep(ROLLUP_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Tracker rollup pass failed: {str(e)}")
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+tracker_rollup_engine = TrackerRollupEngine()
+if TRACKER_ROLLUPS_ENABLED:
+    on_startup(tracker_rollup_engine.start)
+on_shutdown(tracker_rollup_engine.close)
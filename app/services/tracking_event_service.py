@@ -0,0 +1,186 @@
+import logging
+from typing import List, Optional, Sequence
+from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.pagination import encode_cursor, decode_cursor
+from app.models.tracking_event_models import (
+    TrackingEventCreate,
+    TrackingEventUpdate,
+    TrackingEventResponse,
+    TrackingEventBatchResult,
+    TrackingEventPage,
+    ShipmentTimelines,
+)
+
+INSERT_TRACKING_EVENT = """
+    INSERT INTO tracking_events (shipment_id, location_id, event_datetime, event_type, notes, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
+"""
+# Filas por sentencia en las inserciones por lote (el conector las agrupa en un INSERT multi-fila)
+INSERT_CHUNK_SIZE = 1000
+
+
+class TrackingEventService:
+    def __init__(self):
+        self.db_service = DatabaseService()
+
+    async def create_tracking_event(self, event: TrackingEventCreate) -> TrackingEventResponse:
+        try:
+            await self.db_service.connect()
+            result = await self.db_service.execute(INSERT_TRACKING_EVENT, (
+                event.shipment_id, event.location_id, event.event_datetime, event.event_type, event.notes
+            ))
+            created = await self.get_tracking_event_by_id(result[0]['last_insert_id'])
+            if created:
+                return created
+            raise ValueError("Tracking event creation failed")
+        except Exception as e:
+            logging.error(f"Error creating tracking event: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+    async def create_tracking_events(self, events: Sequence[TrackingEventCreate]) -> TrackingEventBatchResult:
+        """Inserta todos los eventos en una transacción, en INSERTs multi-fila de INSERT_CHUNK_SIZE filas."""
+        rows = [
+            (e.shipment_id, e.location_id, e.event_datetime, e.event_type, e.notes)
+            for e in events
+        ]
+        try:
+            async with self.db_service.unit_of_work() as uow:
+                for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                    await uow.executemany(INSERT_TRACKING_EVENT, rows[start:start + INSERT_CHUNK_SIZE])
+            return TrackingEventBatchResult(inserted=len(rows))
+        except Exception as e:
+            logging.error(f"Error creating tracking events: {str(e)}")
+            raise
+
+    async def get_tracking_event_by_id(self, event_id: int, fields: Optional[List[str]] = None) -> Optional[TrackingEventResponse]:
+        try:
+            await self.db_service.connect()
+            query = f"SELECT {sql_columns(fields)} FROM tracking_events WHERE id = %s"
+            result = await self.db_service.execute(query, (event_id,))
+
+            if result:
+                return build(TrackingEventResponse, result[0], fields)
+            return None
+        except Exception as e:
+            logging.error(f"Error retrieving tracking event: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+    async def get_shipment_timeline(
+            self,
+            shipment_id: int,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> TrackingEventPage:
+        """
+        Eventos del shipment en orden cronológico, paginados por keyset sobre
+        (event_datetime, id) con el índice (shipment_id, event_datetime): cada página
+        cuesta lo mismo sin importar lo profunda que sea.
+        """
+        conditions = ["shipment_id = %s"]
+        params: list = [shipment_id]
+        if cursor:
+            after_time, keys = decode_cursor(cursor)
+            if len(keys) != 1 or not isinstance(keys[0], int):
+                raise ValueError("Invalid cursor")
+            conditions.append("(event_datetime > %s OR (event_datetime = %s AND id > %s))")
+            params.extend([after_time, after_time, keys[0]])
+        params.append(limit + 1)
+        try:
+            await self.db_service.connect()
+            query = (
+                f"SELECT * FROM tracking_events WHERE {' AND '.join(conditions)} "
+                f"ORDER BY event_datetime, id LIMIT %s"
+            )
+            rows = await self.db_service.execute(query, tuple(params))
+            items = [TrackingEventResponse(**row) for row in rows[:limit]]
+            next_cursor = None
+            if len(rows) > limit:
+                last = items[-1]
+                next_cursor = encode_cursor(last.event_datetime, last.id)
+            return TrackingEventPage(shipment_id=shipment_id, items=items, next_cursor=next_cursor)
+        except Exception as e:
+            logging.error(f"Error retrieving shipment timeline: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+    async def get_shipment_timelines(self, shipment_ids: Sequence[int], limit_per_shipment: int = 100) -> ShipmentTimelines:
+        """Los primeros `limit_per_shipment` eventos de cada shipment en una sola consulta."""
+        ids = sorted(set(shipment_ids))
+        timelines = {shipment_id: [] for shipment_id in ids}
+        if not ids:
+            return ShipmentTimelines(timelines=timelines, limit_per_shipment=limit_per_shipment)
+        try:
+            await self.db_service.connect()
+            query = f"""
+                SELECT * FROM (
+                    SELECT t.*, ROW_NUMBER() OVER (PARTITION BY shipment_id ORDER BY event_datetime, id) AS position
+                    FROM tracking_events t
+                    WHERE shipment_id IN ({', '.join(['%s'] * len(ids))})
+                ) ranked
+                WHERE position <= %s
+                ORDER BY shipment_id, event_datetime, id
+            """
+            rows = await self.db_service.execute(query, (*ids, limit_per_shipment))
+            for row in rows:
+                row.pop("position", None)
+                timelines[row["shipment_id"]].append(TrackingEventResponse(**row))
+            return ShipmentTimelines(timelines=timelines, limit_per_shipment=limit_per_shipment)
+        except Exception as e:
+            logging.error(f"Error retrieving shipment timelines: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+    async def update_tracking_event(self, event_id: int, event: TrackingEventUpdate) -> Optional[TrackingEventResponse]:
+        try:
+            await self.db_service.connect()
+
+            update_fields = []
+            params = []
+
+            if event.location_id is not None:
+                update_fields.append("location_id = %s")
+                params.append(event.location_id)
+            if event.event_datetime is not None:
+                update_fields.append("event_datetime = %s")
+                params.append(event.event_datetime)
+            if event.event_type is not None:
+                update_fields.append("event_type = %s")
+                params.append(event.event_type)
+            if event.notes is not None:
+                update_fields.append("notes = %s")
+                params.append(event.notes)
+
+            if not update_fields:
+                return await self.get_tracking_event_by_id(event_id)
+
+            update_fields.append("updated_at = NOW()")
+            params.append(event_id)
+
+            query = f"UPDATE tracking_events SET {', '.join(update_fields)} WHERE id = %s"
+            await self.db_service.execute(query, tuple(params))
+
+            return await self.get_tracking_event_by_id(event_id)
+        except Exception as e:
+            logging.error(f"Error updating tracking event: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+    async def delete_tracking_event(self, event_id: int) -> bool:
+        try:
+            await self.db_service.connect()
+            query = "DELETE FROM tracking_events WHERE id = %s"
+            await self.db_service.execute(query, (event_id,))
+            return True
+        except Exception as e:
+            logging.error(f"Error deleting tracking event: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
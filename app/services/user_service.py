@@ -1,13 +1,17 @@
 import logging
+from functools import lru_cache
 from typing import Optional
-from passlib.context import CryptContext
 from app.services.database_service import DatabaseService
 from app.models.user_models import UserCreate, UserResponse
 from app.models.auth_models import RegisterRequest, LoginRequest
 from app.security.crypto_utils import decrypt_text
 
-# Configuración para el hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Configuración para el hashing de contraseñas (se construye en el primer uso: passlib/bcrypt son lentos de importar)
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 class UserService:
@@ -15,10 +19,10 @@ class UserService:
         self.db_service = DatabaseService()
 
     def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+        return get_pwd_context().hash(password)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
 
     async def create_user(self, user: UserCreate) -> UserResponse:
         try:
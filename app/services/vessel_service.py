@@ -1,9 +1,19 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.autocomplete_service import refresh_autocomplete, remove_autocomplete
+from app.services.search_service import index_document, remove_document
 from app.models.vessel_models import VesselCreate, VesselUpdate, VesselResponse
 
 
+VESSEL_QUERY_SPEC = QuerySpec(
+    VesselResponse,
+    indexed={"id": (), "imo_number": (), "mmsi_number": (), "vessel_name": ()},
+)
+
+
 class VesselService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -31,7 +41,10 @@ class VesselService:
             result = await self.db_service.execute(select_query, (vessel.imo_number,))
 
             if result:
-                return VesselResponse(**result[0])
+                created = VesselResponse(**result[0])
+                index_document("vessel", created)
+                refresh_autocomplete("vessel", created)
+                return created
             raise ValueError("Vessel creation failed")
         except Exception as e:
             logging.error(f"Error creating vessel: {str(e)}")
@@ -39,14 +52,14 @@ class VesselService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_vessel_by_id(self, vessel_id: int) -> Optional[VesselResponse]:
+    async def get_vessel_by_id(self, vessel_id: int, fields: Optional[List[str]] = None) -> Optional[VesselResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM vessels WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM vessels WHERE id = %s"
             result = await self.db_service.execute(query, (vessel_id,))
 
             if result:
-                return VesselResponse(**result[0])
+                return build(VesselResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving vessel: {str(e)}")
@@ -54,13 +67,13 @@ class VesselService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_vessels(self, limit: int = 100, offset: int = 0) -> List[VesselResponse]:
+    async def get_all_vessels(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[VesselResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM vessels LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("vessels", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [VesselResponse(**row) for row in result]
+            return [build(VesselResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving vessels: {str(e)}")
             raise
@@ -132,7 +145,10 @@ class VesselService:
             query = f"UPDATE vessels SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
 
-            return await self.get_vessel_by_id(vessel_id)
+            updated = await self.get_vessel_by_id(vessel_id)
+            index_document("vessel", updated)
+            refresh_autocomplete("vessel", updated)
+            return updated
         except Exception as e:
             logging.error(f"Error updating vessel: {str(e)}")
             raise
@@ -144,6 +160,8 @@ class VesselService:
             await self.db_service.connect()
             query = "DELETE FROM vessels WHERE id = %s"
             await self.db_service.execute(query, (vessel_id,))
+            remove_document("vessel", vessel_id)
+            remove_autocomplete("vessel", vessel_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting vessel: {str(e)}")
@@ -0,0 +1,369 @@
+import asyncio
+import logging
+import os
+import statistics
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.database.mongo_manager import MongoManager
+from app.geo.distance import haversine_m
+from app.models.voyage_models import FleetEtaResponse, VoyageEta
+from app.services.database_service import DatabaseService
+from app.services.tracker_event_storage import TRACKER_EVENTS_COLLECTION
+
+# Las ETA de la flota se recalculan en una pasada cuando el resultado tiene más de esto
+VOYAGE_ETA_CACHE_SECONDS = float(os.getenv("VOYAGE_ETA_CACHE_SECONDS", "60"))
+# Recarga completa de las duraciones (recoge los borrados de otros workers y los viajes sin
+# updated_at); entre medias solo se leen los viajes modificados desde la última pasada
+VOYAGE_ETA_STATS_RELOAD_SECONDS = float(os.getenv("VOYAGE_ETA_STATS_RELOAD_SECONDS", "21600"))
+VOYAGE_ETA_CHUNK_SIZE = int(os.getenv("VOYAGE_ETA_CHUNK_SIZE", "5000"))
+# Ventana máxima hacia atrás de la búsqueda de últimas posiciones: un viaje abierto olvidado con
+# salida antigua no debe arrastrar la agregación sobre años de eventos. Sin posición en la
+# ventana, su ETA sale del historial de la route
+VOYAGE_ETA_POSITION_LOOKBACK_DAYS = float(os.getenv("VOYAGE_ETA_POSITION_LOOKBACK_DAYS", "90"))
+# Velocidad efectiva cuando ninguna route tiene historial ni coordenadas (14 nudos)
+DEFAULT_SPEED_KMH = 25.9
+
+METHOD_POSITION = "position"
+METHOD_HISTORY = "history"
+METHOD_SCHEDULED = "scheduled"
+METHOD_NONE = "none"
+
+OPEN_VOYAGES_QUERY = """
+    SELECT v.id, v.route_id, v.vessel_id, v.status, v.departure_datetime, v.arrival_datetime,
+           o.latitude AS origin_latitude, o.longitude AS origin_longitude,
+           d.latitude AS destination_latitude, d.longitude AS destination_longitude
+    FROM voyages v
+    JOIN routes r ON r.id = v.route_id
+    JOIN locations o ON o.id = r.origin_location_id
+    JOIN locations d ON d.id = r.destination_location_id
+    WHERE v.arrival_datetime IS NULL OR v.arrival_datetime > %s
+"""
+
+_MIN_DATETIME = datetime(1970, 1, 1)
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class RouteDurationStats:
+    """
+    Duración en horas de cada viaje completado, agrupada por route, con la media y la desviación
+    típica precalculadas. Se mantiene por viaje para que releer uno modificado lo reemplace sin
+    contarlo dos veces; los viajes con llegada futura esperan a que pase esa hora.
+    """
+
+    def __init__(self):
+        self._voyages: Dict[int, Tuple[int, float]] = {}
+        self._by_route: Dict[int, Dict[int, float]] = {}
+        self._upcoming: Dict[int, Tuple[int, datetime, float]] = {}
+        self._summary: Dict[int, Tuple[int, float, float]] = {}
+        # (updated_at, id) del último viaje leído
+        self.watermark: Tuple[datetime, int] = (_MIN_DATETIME, 0)
+
+    def apply(self, rows: Iterable[dict], now: datetime):
+        dirty = set()
+        for row in rows:
+            dirty.update(self._forget(row["id"]))
+            departure, arrival = row["departure_datetime"], row["arrival_datetime"]
+            if departure is None or arrival is None or arrival <= departure:
+                continue
+            hours = (arrival - departure).total_seconds() / 3600
+            if arrival > now:
+                self._upcoming[row["id"]] = (row["route_id"], arrival, hours)
+                continue
+            self._store(row["id"], row["route_id"], hours)
+            dirty.add(row["route_id"])
+        for voyage_id, (route_id, arrival, hours) in list(self._upcoming.items()):
+            if arrival <= now:
+                del self._upcoming[voyage_id]
+                self._store(voyage_id, route_id, hours)
+                dirty.add(route_id)
+        self._summarize(dirty)
+
+    def remove(self, voyage_id: int):
+        self._summarize(self._forget(voyage_id))
+
+    def _store(self, voyage_id: int, route_id: int, hours: float):
+        self._voyages[voyage_id] = (route_id, hours)
+        self._by_route.setdefault(route_id, {})[voyage_id] = hours
+
+    def _forget(self, voyage_id: int) -> List[int]:
+        self._upcoming.pop(voyage_id, None)
+        previous = self._voyages.pop(voyage_id, None)
+        if previous is None:
+            return []
+        route_id = previous[0]
+        durations = self._by_route.get(route_id, {})
+        durations.pop(voyage_id, None)
+        if not durations:
+            self._by_route.pop(route_id, None)
+        return [route_id]
+
+    def _summarize(self, route_ids: Iterable[int]):
+        for route_id in route_ids:
+            durations = self._by_route.get(route_id)
+            if not durations:
+                self._summary.pop(route_id, None)
+                continue
+            values = array("d", durations.values())
+            spread = statistics.pstdev(values) if len(values) > 1 else 0.0
+            self._summary[route_id] = (len(values), statistics.fmean(values), spread)
+
+    def get(self, route_id: int) -> Optional[Tuple[int, float, float]]:
+        """(viajes, media en horas, desviación típica) o None si la route no tiene historial."""
+        return self._summary.get(route_id)
+
+
+_stats = RouteDurationStats()
+_stats_loaded_at: Optional[float] = None
+_fleet: Optional[FleetEtaResponse] = None
+_fleet_by_id: Dict[int, VoyageEta] = {}
+_fleet_computed_at = 0.0
+_eta_lock = asyncio.Lock()
+
+
+def invalidate_voyage_etas(voyage_id: Optional[int] = None, deleted: bool = False):
+    """Fuerza a recalcular las ETA en la próxima consulta (llamado al escribir voyages)."""
+    global _fleet_computed_at
+    _fleet_computed_at = 0.0
+    if deleted and voyage_id is not None:
+        _stats.remove(voyage_id)
+
+
+class VoyageEtaService:
+    """
+    ETA de los viajes abiertos en una sola pasada: una consulta de viajes con las coordenadas de
+    su route, una de sus BL/tracking codes y una agregación por clave con la última posición.
+
+    La velocidad de cada route es la distancia de círculo máximo entre origen y destino dividida
+    por la duración media de sus viajes completados: es una velocidad "efectiva" que ya absorbe
+    rodeos y esperas, así que aplicada a la distancia restante no subestima como la real.
+    """
+
+    def __init__(self):
+        self.db_service = DatabaseService()
+        self.mongo_manager = MongoManager()
+        self.collection_name = TRACKER_EVENTS_COLLECTION
+
+    async def _refresh_stats(self, now: datetime):
+        global _stats, _stats_loaded_at
+        if _stats_loaded_at is None or time.monotonic() - _stats_loaded_at > VOYAGE_ETA_STATS_RELOAD_SECONDS:
+            _stats = await self._load_stats(now)
+            _stats_loaded_at = time.monotonic()
+            return
+        stats = _stats
+        # updated_at tiene precisión de segundos: se releen los últimos para no perder escrituras
+        # del mismo segundo con id menor (reaplicar un viaje es idempotente)
+        watermark_time = max(stats.watermark[0] - timedelta(seconds=2), _MIN_DATETIME)
+        watermark_id = 0
+        while True:
+            rows = await self.db_service.execute(
+                """
+                SELECT id, route_id, departure_datetime, arrival_datetime, updated_at FROM voyages
+                WHERE updated_at > %s OR (updated_at = %s AND id > %s)
+                ORDER BY updated_at, id LIMIT %s
+                """,
+                (watermark_time, watermark_time, watermark_id, VOYAGE_ETA_CHUNK_SIZE)
+            )
+            stats.apply(rows, now)
+            if rows:
+                last = rows[-1]
+                watermark_time, watermark_id = last["updated_at"] or _MIN_DATETIME, last["id"]
+            if len(rows) < VOYAGE_ETA_CHUNK_SIZE:
+                break
+        stats.watermark = (watermark_time, watermark_id)
+
+    async def _load_stats(self, now: datetime) -> RouteDurationStats:
+        """
+        Recarga completa recorriendo todos los viajes por id, también los que tienen updated_at
+        NULL (la lectura incremental por updated_at no los ve). La marca de agua queda en la hora
+        de la base al empezar, así que lo escrito durante la recarga lo recoge la siguiente pasada.
+        """
+        stats = RouteDurationStats()
+        started = (await self.db_service.execute("SELECT NOW() AS now"))[0]["now"]
+        last_id = 0
+        while True:
+            rows = await self.db_service.execute(
+                """
+                SELECT id, route_id, departure_datetime, arrival_datetime FROM voyages
+                WHERE id > %s ORDER BY id LIMIT %s
+                """,
+                (last_id, VOYAGE_ETA_CHUNK_SIZE)
+            )
+            stats.apply(rows, now)
+            if rows:
+                last_id = rows[-1]["id"]
+            if len(rows) < VOYAGE_ETA_CHUNK_SIZE:
+                break
+        stats.watermark = (started, 0)
+        return stats
+
+    async def _shipment_keys(self, voyage_ids: List[int]) -> Dict[str, Dict[str, int]]:
+        """BL -> voyage y tracking code -> voyage de los envíos de los viajes."""
+        by_bl: Dict[str, int] = {}
+        by_booking: Dict[str, int] = {}
+        for start in range(0, len(voyage_ids), VOYAGE_ETA_CHUNK_SIZE):
+            chunk = voyage_ids[start:start + VOYAGE_ETA_CHUNK_SIZE]
+            rows = await self.db_service.execute(
+                f"""
+                SELECT s.voyage_id, s.tracking_code, b.bol_number FROM shipments s
+                LEFT JOIN bills_of_lading b ON b.shipment_id = s.id
+                WHERE s.voyage_id IN ({', '.join(['%s'] * len(chunk))})
+                """,
+                tuple(chunk)
+            )
+            for row in rows:
+                if row["bol_number"]:
+                    by_bl[row["bol_number"]] = row["voyage_id"]
+                if row["tracking_code"]:
+                    by_booking[row["tracking_code"]] = row["voyage_id"]
+        return {"BL": by_bl, "Booking": by_booking}
+
+    async def _latest_positions(self, keys: Dict[str, Dict[str, int]], since: datetime) -> Dict[int, dict]:
+        """Última posición por voyage: una agregación por campo sobre los índices BL/Booking + EventTime."""
+        positions: Dict[int, dict] = {}
+        if not keys["BL"] and not keys["Booking"]:
+            return positions
+        try:
+            await self.mongo_manager.create_connection()
+            collection = await self.mongo_manager.get_collection(self.collection_name)
+            for field, voyages in keys.items():
+                if not voyages:
+                    continue
+                pipeline = [
+                    {"$match": {
+                        field: {"$in": list(voyages)},
+                        "EventTime": {"$gte": since},
+                        "Location.Latitude": {"$type": "number"},
+                        "Location.Longitude": {"$type": "number"},
+                    }},
+                    {"$sort": {field: 1, "EventTime": -1}},
+                    {"$group": {
+                        "_id": f"${field}",
+                        "EventTime": {"$first": "$EventTime"},
+                        "Latitude": {"$first": "$Location.Latitude"},
+                        "Longitude": {"$first": "$Location.Longitude"},
+                    }},
+                ]
+                async for document in collection.aggregate(pipeline, allowDiskUse=True):
+                    voyage_id = voyages[document["_id"]]
+                    document["EventTime"] = _naive_utc(document["EventTime"])
+                    current = positions.get(voyage_id)
+                    if current is None or document["EventTime"] > current["EventTime"]:
+                        positions[voyage_id] = document
+        finally:
+            await self.mongo_manager.close_connection()
+        return positions
+
+    def _default_speed_kmh(self, voyages: List[dict]) -> float:
+        """Mediana de las velocidades efectivas de las routes con historial y coordenadas."""
+        speeds = []
+        for route_id, distance_km in {v["route_id"]: v["distance_km"] for v in voyages if v["distance_km"]}.items():
+            summary = _stats.get(route_id)
+            if summary and summary[1] > 0:
+                speeds.append(distance_km / summary[1])
+        return statistics.median(speeds) if speeds else DEFAULT_SPEED_KMH
+
+    def _estimate(self, voyage: dict, position: Optional[dict], default_speed_kmh: float, now: datetime) -> VoyageEta:
+        summary = _stats.get(voyage["route_id"])
+        departure = voyage["departure_datetime"]
+        distance_km = voyage["distance_km"]
+        eta = VoyageEta(
+            voyage_id=voyage["id"],
+            route_id=voyage["route_id"],
+            vessel_id=voyage["vessel_id"],
+            status=voyage["status"],
+            departure_datetime=departure,
+            scheduled_arrival_datetime=voyage["arrival_datetime"],
+            method=METHOD_NONE,
+            route_voyages=summary[0] if summary else 0,
+        )
+        if summary and distance_km and summary[1] > 0:
+            speed_kmh = distance_km / summary[1]
+        else:
+            speed_kmh = default_speed_kmh
+        destination = (voyage["destination_latitude"], voyage["destination_longitude"])
+
+        if position is not None and departure is not None and position["EventTime"] >= departure and None not in destination:
+            remaining_km = haversine_m(position["Latitude"], position["Longitude"], *destination) / 1000
+            eta.method = METHOD_POSITION
+            eta.eta = max(position["EventTime"] + timedelta(hours=remaining_km / speed_kmh), now)
+            eta.remaining_distance_km = round(remaining_km, 1)
+            eta.last_position_at = position["EventTime"]
+            eta.last_latitude = position["Latitude"]
+            eta.last_longitude = position["Longitude"]
+            if summary and distance_km:
+                eta.spread_hours = round(summary[2] * min(remaining_km / distance_km, 1.0), 2)
+        elif departure is not None and (summary or distance_km):
+            hours = summary[1] if summary else distance_km / speed_kmh
+            eta.method = METHOD_HISTORY
+            eta.eta = max(departure + timedelta(hours=hours), now)
+            if summary:
+                eta.spread_hours = round(summary[2], 2)
+        elif voyage["arrival_datetime"] is not None:
+            eta.method = METHOD_SCHEDULED
+            eta.eta = voyage["arrival_datetime"]
+        return eta
+
+    async def compute_fleet_etas(self) -> FleetEtaResponse:
+        now = _utc_now()
+        try:
+            await self.db_service.connect()
+            await self._refresh_stats(now)
+            voyages = await self.db_service.execute(OPEN_VOYAGES_QUERY, (now,))
+            keys = await self._shipment_keys([voyage["id"] for voyage in voyages])
+        except Exception as e:
+            logging.error(f"Error loading voyages for ETA: {str(e)}")
+            raise
+        finally:
+            await self.db_service.disconnect()
+
+        for voyage in voyages:
+            origin = (_float(voyage["origin_latitude"]), _float(voyage["origin_longitude"]))
+            destination = (_float(voyage["destination_latitude"]), _float(voyage["destination_longitude"]))
+            voyage["destination_latitude"], voyage["destination_longitude"] = destination
+            voyage["distance_km"] = (
+                haversine_m(*origin, *destination) / 1000 if None not in origin and None not in destination else None
+            )
+
+        departures = [voyage["departure_datetime"] for voyage in voyages if voyage["departure_datetime"] is not None]
+        positions: Dict[int, dict] = {}
+        if departures:
+            since = max(min(departures), now - timedelta(days=VOYAGE_ETA_POSITION_LOOKBACK_DAYS))
+            try:
+                positions = await self._latest_positions(keys, since)
+            except Exception as e:
+                # Sin posiciones las ETA siguen saliendo del historial de la route
+                logging.error(f"Error loading tracker positions for ETA: {str(e)}")
+
+        default_speed_kmh = self._default_speed_kmh(voyages)
+        etas = [self._estimate(voyage, positions.get(voyage["id"]), default_speed_kmh, now) for voyage in voyages]
+        return FleetEtaResponse(computed_at=now, voyages=sorted(etas, key=lambda eta: eta.voyage_id))
+
+    async def get_fleet_etas(self) -> FleetEtaResponse:
+        global _fleet, _fleet_by_id, _fleet_computed_at
+        async with _eta_lock:
+            if _fleet is None or time.monotonic() - _fleet_computed_at > VOYAGE_ETA_CACHE_SECONDS:
+                _fleet = await self.compute_fleet_etas()
+                _fleet_by_id = {eta.voyage_id: eta for eta in _fleet.voyages}
+                _fleet_computed_at = time.monotonic()
+            return _fleet
+
+    async def get_voyage_eta(self, voyage_id: int) -> Optional[VoyageEta]:
+        """ETA de un viaje abierto; None si no existe o ya ha llegado."""
+        await self.get_fleet_etas()
+        return _fleet_by_id.get(voyage_id)
@@ -1,9 +1,19 @@
 import logging
 from typing import List, Optional
 from app.services.database_service import DatabaseService
+from app.services.fieldsets import build, sql_columns
+from app.services.query_builder import ListQuery, QuerySpec, select_query
+from app.services.route_graph_service import invalidate_route_durations
+from app.services.voyage_eta_service import invalidate_voyage_etas
 from app.models.voyage_models import VoyageCreate, VoyageUpdate, VoyageResponse
 
 
+VOYAGE_QUERY_SPEC = QuerySpec(
+    VoyageResponse,
+    indexed={"id": (), "route_id": (), "vessel_id": (), "status": (), "departure_datetime": ()},
+)
+
+
 class VoyageService:
     def __init__(self):
         self.db_service = DatabaseService()
@@ -21,6 +31,8 @@ class VoyageService:
                 voyage.arrival_datetime, voyage.status
             )
             await self.db_service.execute(query, params)
+            invalidate_route_durations()
+            invalidate_voyage_etas()
 
             select_query = "SELECT * FROM voyages WHERE route_id = %s AND vessel_id = %s ORDER BY id DESC LIMIT 1"
             result = await self.db_service.execute(select_query, (voyage.route_id, voyage.vessel_id))
@@ -34,14 +46,14 @@ class VoyageService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_voyage_by_id(self, voyage_id: int) -> Optional[VoyageResponse]:
+    async def get_voyage_by_id(self, voyage_id: int, fields: Optional[List[str]] = None) -> Optional[VoyageResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM voyages WHERE id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM voyages WHERE id = %s"
             result = await self.db_service.execute(query, (voyage_id,))
 
             if result:
-                return VoyageResponse(**result[0])
+                return build(VoyageResponse, result[0], fields)
             return None
         except Exception as e:
             logging.error(f"Error retrieving voyage: {str(e)}")
@@ -49,26 +61,26 @@ class VoyageService:
         finally:
             await self.db_service.disconnect()
 
-    async def get_all_voyages(self, limit: int = 100, offset: int = 0) -> List[VoyageResponse]:
+    async def get_all_voyages(self, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None, list_query: Optional[ListQuery] = None) -> List[VoyageResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM voyages LIMIT %s OFFSET %s"
-            result = await self.db_service.execute(query, (limit, offset))
+            query, params = select_query("voyages", fields, list_query, limit, offset)
+            result = await self.db_service.execute(query, params)
 
-            return [VoyageResponse(**row) for row in result]
+            return [build(VoyageResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving voyages: {str(e)}")
             raise
         finally:
             await self.db_service.disconnect()
 
-    async def get_voyages_by_vessel(self, vessel_id: int) -> List[VoyageResponse]:
+    async def get_voyages_by_vessel(self, vessel_id: int, fields: Optional[List[str]] = None) -> List[VoyageResponse]:
         try:
             await self.db_service.connect()
-            query = "SELECT * FROM voyages WHERE vessel_id = %s"
+            query = f"SELECT {sql_columns(fields)} FROM voyages WHERE vessel_id = %s"
             result = await self.db_service.execute(query, (vessel_id,))
 
-            return [VoyageResponse(**row) for row in result]
+            return [build(VoyageResponse, row, fields) for row in result]
         except Exception as e:
             logging.error(f"Error retrieving voyages by vessel: {str(e)}")
             raise
@@ -106,6 +118,8 @@ class VoyageService:
 
             query = f"UPDATE voyages SET {', '.join(update_fields)} WHERE id = %s"
             await self.db_service.execute(query, tuple(params))
+            invalidate_route_durations()
+            invalidate_voyage_etas()
 
             return await self.get_voyage_by_id(voyage_id)
         except Exception as e:
@@ -119,6 +133,8 @@ class VoyageService:
             await self.db_service.connect()
             query = "DELETE FROM voyages WHERE id = %s"
             await self.db_service.execute(query, (voyage_id,))
+            invalidate_route_durations()
+            invalidate_voyage_etas(voyage_id, deleted=True)
             return True
         except Exception as e:
             logging.error(f"Error deleting voyage: {str(e)}")
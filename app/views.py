@@ -1,7 +1,5 @@
 from . import app
 
-from fastapi import APIRouter
-
 from app.routes import (
     customer_routes,
     location_routes,
@@ -19,31 +17,39 @@ from app.routes import (
     auth_routes,
     spare_part_routes,
     maintenance_part_routes,
+    diagnostics_routes,
+    geofence_routes,
+    tracking_event_routes,
+    search_routes,
 )
 
 
-api_router = APIRouter(prefix="/antillean/api")
-
-# Register all routes
-api_router.include_router(customer_routes.router)
-api_router.include_router(location_routes.router)
-api_router.include_router(asset_type_routes.router)
-api_router.include_router(asset_routes.router)
-api_router.include_router(vessel_routes.router)
-api_router.include_router(route_routes.router)
-api_router.include_router(voyage_routes.router)
-api_router.include_router(shipment_routes.router)
-api_router.include_router(shipment_item_routes.router)
-api_router.include_router(bill_of_lading_routes.router)
-api_router.include_router(maintenance_routes.router)
-api_router.include_router(spare_part_routes.router)
-api_router.include_router(maintenance_part_routes.router)
-api_router.include_router(user_routes.router)
-api_router.include_router(auth_routes.router)
-
+API_PREFIX = "/antillean/api"
 
+# Los routers se incluyen directamente en la app: pasar por un APIRouter intermedio
+# clonaba cada ruta dos veces y duplicaba el coste de registro al arrancar
 
-api_router.include_router(tracker_event_routes.router)  # MongoDB tracker events (keep separate)
-
-
-app.include_router(api_router)
\ No newline at end of file
+# Register all routes
+app.include_router(customer_routes.router, prefix=API_PREFIX)
+app.include_router(location_routes.router, prefix=API_PREFIX)
+app.include_router(asset_type_routes.router, prefix=API_PREFIX)
+app.include_router(asset_routes.router, prefix=API_PREFIX)
+app.include_router(vessel_routes.router, prefix=API_PREFIX)
+app.include_router(route_routes.router, prefix=API_PREFIX)
+app.include_router(voyage_routes.router, prefix=API_PREFIX)
+app.include_router(shipment_routes.router, prefix=API_PREFIX)
+app.include_router(shipment_item_routes.router, prefix=API_PREFIX)
+app.include_router(tracking_event_routes.router, prefix=API_PREFIX)
+app.include_router(bill_of_lading_routes.router, prefix=API_PREFIX)
+app.include_router(maintenance_routes.router, prefix=API_PREFIX)
+app.include_router(spare_part_routes.router, prefix=API_PREFIX)
+app.include_router(maintenance_part_routes.router, prefix=API_PREFIX)
+app.include_router(user_routes.router, prefix=API_PREFIX)
+app.include_router(auth_routes.router, prefix=API_PREFIX)
+app.include_router(diagnostics_routes.router, prefix=API_PREFIX)
+app.include_router(geofence_routes.router, prefix=API_PREFIX)
+app.include_router(search_routes.router, prefix=API_PREFIX)
+
+
+
+app.include_router(tracker_event_routes.router, prefix=API_PREFIX)  # MongoDB tracker events (keep separate)
@@ -1,12 +1,18 @@
 create table asset_types
 (
-    id         bigint unsigned auto_increment
+    id                         bigint unsigned auto_increment
         primary key,
-    type_name  varchar(100) not null,
-    created_at timestamp    null,
-    updated_at timestamp    null
+    type_name                  varchar(100)      not null,
+    -- Meses entre inspecciones; NULL usa el intervalo por defecto del programador de inspecciones
+    inspection_interval_months smallint unsigned null,
+    created_at                 timestamp         null,
+    updated_at                 timestamp         null
 );
 
+-- Filtros de los listados (filter=/sort=); también lo usa la búsqueda por nombre al crear
+create index asset_types_type_name_index
+    on asset_types (type_name);
+
 create table trackers
 (
     id           bigint unsigned auto_increment primary key,
@@ -41,6 +47,21 @@ create table assets
             on delete set null
 );
 
+-- Filtros de los listados (filter=/sort=)
+create index assets_status_index
+    on assets (status);
+create index assets_condition_index
+    on assets (`condition`);
+-- También sirve /assets/inspections/due (rango next_inspection_due_at <= fecha, ordenado por fecha)
+create index assets_next_inspection_due_at_index
+    on assets (next_inspection_due_at);
+-- Cubo de /assets/utilization: el GROUP BY recorre solo este índice (cubre todas las dimensiones)
+create index assets_analytics_index
+    on assets (size, status, `condition`, ownership, category, asset_type_id);
+-- Fallback de /search (SEARCH_FULLTEXT_FALLBACK); las columnas en el mismo orden que MATCH()
+create fulltext index assets_asset_code_fulltext
+    on assets (asset_code);
+
 create table customers
 (
     id                    bigint unsigned auto_increment
@@ -57,19 +78,33 @@ create table customers
         unique (identification_number)
 );
 
+create index customers_full_name_index
+    on customers (full_name);
+create fulltext index customers_search_fulltext
+    on customers (full_name, identification_number, email);
+
 create table locations
 (
-    id            bigint unsigned auto_increment
+    id                bigint unsigned auto_increment
         primary key,
-    location_name varchar(255)                                    not null,
-    address       varchar(255)                                    null,
-    city          varchar(100)                                    null,
-    country       varchar(100)                                    null,
-    location_type enum ('port', 'warehouse', 'customer_facility') not null,
-    created_at    timestamp                                       null,
-    updated_at    timestamp                                       null
+    location_name     varchar(255)                                    not null,
+    address           varchar(255)                                    null,
+    city              varchar(100)                                    null,
+    country           varchar(100)                                    null,
+    location_type     enum ('port', 'warehouse', 'customer_facility') not null,
+    latitude          decimal(9, 6)                                   null,
+    longitude         decimal(9, 6)                                   null,
+    geofence_radius_m decimal(10, 2)                                  null,
+    geofence_polygon  json                                            null,
+    created_at        timestamp                                       null,
+    updated_at        timestamp                                       null
 );
 
+create index locations_location_name_index
+    on locations (location_name);
+create index locations_location_type_index
+    on locations (location_type);
+
 create table routes
 (
     id                      bigint unsigned auto_increment
@@ -129,6 +164,11 @@ create table vessels
         unique (mmsi_number)
 );
 
+create index vessels_vessel_name_index
+    on vessels (vessel_name);
+create fulltext index vessels_search_fulltext
+    on vessels (vessel_name, imo_number, mmsi_number, call_sign);
+
 create table voyages
 (
     id                 bigint unsigned auto_increment
@@ -148,6 +188,16 @@ create table voyages
             on delete cascade
 );
 
+create index voyages_status_index
+    on voyages (status);
+create index voyages_departure_datetime_index
+    on voyages (departure_datetime);
+-- Viajes abiertos (motor de ETA) y lectura incremental de los modificados (estadísticas por route)
+create index voyages_arrival_datetime_index
+    on voyages (arrival_datetime);
+create index voyages_updated_at_index
+    on voyages (updated_at);
+
 create table shipments
 (
     id                      bigint unsigned auto_increment
@@ -178,6 +228,13 @@ create table shipments
             on delete set null
 );
 
+create index shipments_current_status_index
+    on shipments (current_status);
+create index shipments_creation_datetime_index
+    on shipments (creation_datetime);
+create fulltext index shipments_tracking_code_fulltext
+    on shipments (tracking_code);
+
 create table bills_of_lading
 (
     id                   bigint unsigned auto_increment
@@ -200,6 +257,9 @@ create table bills_of_lading
             on delete cascade
 );
 
+create index bills_of_lading_issue_date_index
+    on bills_of_lading (issue_date);
+
 create table shipment_items
 (
     id          bigint unsigned auto_increment
@@ -238,3 +298,85 @@ create table tracking_events
             on delete cascade
 );
 
+-- Timeline por shipment (keyset sobre event_datetime, id); también cubre la FK de shipment_id
+create index tracking_events_shipment_id_event_datetime_index
+    on tracking_events (shipment_id, event_datetime);
+
+-- Estado del motor de geocercas: geocercas en las que está cada tracker y último EventTime procesado
+create table geofence_tracker_states
+(
+    tracker_id          varchar(50) not null
+        primary key,
+    inside_location_ids json        not null,
+    last_event_time     datetime(3) null,
+    updated_at          timestamp   null
+);
+
+-- Marca de agua (_id de HoopoMessages) hasta la que se han procesado posiciones
+create table geofence_watermarks
+(
+    name           varchar(50) not null
+        primary key,
+    last_object_id char(24)    null,
+    updated_at     timestamp   null
+);
+
+-- Los índices sobre tablas que se crean fuera de este script (maintenances, spare_parts) están en migrations/
+
+-- Coste de mantenimiento ya sumado al resumen por cada maintenance (mano de obra + repuestos);
+-- las escrituras comparan con esta fila para aplicar solo el delta
+create table maintenance_cost_entries
+(
+    maintenance_id   bigint unsigned not null
+        primary key,
+    month            date            not null,
+    asset_id         bigint unsigned not null,
+    service_provider varchar(255)    not null,
+    asset_type_id    bigint unsigned null,
+    labor_cost       decimal(16, 4)  not null,
+    parts_cost       decimal(16, 4)  not null,
+    updated_at       timestamp       null
+);
+
+create index maintenance_cost_entries_asset_id_index
+    on maintenance_cost_entries (asset_id);
+
+-- Resumen de /maintenances/costs por mes, asset y proveedor ('' = sin proveedor)
+create table maintenance_cost_summary
+(
+    month             date            not null,
+    asset_id          bigint unsigned not null,
+    service_provider  varchar(255)    not null,
+    asset_type_id     bigint unsigned null,
+    labor_cost        decimal(18, 4)  not null default 0,
+    parts_cost        decimal(18, 4)  not null default 0,
+    maintenance_count int             not null default 0,
+    updated_at        timestamp       null,
+    primary key (month, asset_id, service_provider)
+);
+
+-- Filtros asset_id / asset_type_id / service_provider con rango de meses
+create index maintenance_cost_summary_asset_id_month_index
+    on maintenance_cost_summary (asset_id, month);
+create index maintenance_cost_summary_asset_type_id_month_index
+    on maintenance_cost_summary (asset_type_id, month);
+create index maintenance_cost_summary_service_provider_month_index
+    on maintenance_cost_summary (service_provider, month);
+
+-- Resumen por mes, tipo de asset (0 = sin tipo) y proveedor: /maintenances/costs sin filtro de asset
+create table maintenance_cost_type_summary
+(
+    month             date            not null,
+    asset_type_id     bigint unsigned not null,
+    service_provider  varchar(255)    not null,
+    labor_cost        decimal(18, 4)  not null default 0,
+    parts_cost        decimal(18, 4)  not null default 0,
+    maintenance_count int             not null default 0,
+    updated_at        timestamp       null,
+    primary key (month, asset_type_id, service_provider)
+);
+
+create index maintenance_cost_type_summary_asset_type_id_month_index
+    on maintenance_cost_type_summary (asset_type_id, month);
+create index maintenance_cost_type_summary_service_provider_month_index
+    on maintenance_cost_type_summary (service_provider, month);
@@ -0,0 +1,6 @@
+-- maintenances se crea fuera de db.sql, así que este índice no puede ir en la carga inicial:
+-- aplicar sobre una base que ya tenga la tabla (mysql <base> < migrations/001_maintenances_inspection_index.sql)
+
+-- Programador de inspecciones: última inspección y último mantenimiento completados por rango de asset_id
+create index maintenances_asset_id_status_type_completed_at_index
+    on maintenances (asset_id, status, maintenance_type, completed_at);
@@ -0,0 +1,6 @@
+-- spare_parts se crea fuera de db.sql, así que este índice no puede ir en la carga inicial:
+-- aplicar sobre una base que ya tenga la tabla (mysql <base> < migrations/002_spare_parts_quantity_index.sql)
+
+-- /spare-parts/low-stock (quantity <= umbral, ordenado por quantity) y el filtro por quantity de los listados
+create index spare_parts_quantity_index
+    on spare_parts (quantity);
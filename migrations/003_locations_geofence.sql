@@ -0,0 +1,10 @@
+-- Bases creadas antes de las geocercas: db.sql ya incluye estas columnas en create table locations.
+-- Aplicar sobre una base existente (mysql <base> < migrations/003_locations_geofence.sql)
+
+-- Geocerca de cada ubicación: círculo de radio geofence_radius_m alrededor de (latitude, longitude)
+-- o anillo de polígono GeoJSON [longitud, latitud]
+alter table locations
+    add column latitude          decimal(9, 6)  null after location_type,
+    add column longitude         decimal(9, 6)  null after latitude,
+    add column geofence_radius_m decimal(10, 2) null after longitude,
+    add column geofence_polygon  json           null after geofence_radius_m;
@@ -0,0 +1,7 @@
+-- Bases creadas antes del programador de inspecciones: db.sql ya incluye la columna en
+-- create table asset_types. Aplicar sobre una base existente
+-- (mysql <base> < migrations/004_asset_types_inspection_interval.sql)
+
+-- Meses entre inspecciones; NULL usa el intervalo por defecto del programador de inspecciones
+alter table asset_types
+    add column inspection_interval_months smallint unsigned null after type_name;
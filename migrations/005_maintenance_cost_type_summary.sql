@@ -0,0 +1,28 @@
+-- Resumen de costes por tipo de asset para bases que ya tienen maintenance_cost_summary.
+-- Aplicar sobre una base existente (mysql <base> < migrations/005_maintenance_cost_type_summary.sql);
+-- se puede repetir: el resumen por tipo se recalcula entero desde maintenance_cost_summary
+
+create table if not exists maintenance_cost_type_summary
+(
+    month             date            not null,
+    asset_type_id     bigint unsigned not null,
+    service_provider  varchar(255)    not null,
+    labor_cost        decimal(18, 4)  not null default 0,
+    parts_cost        decimal(18, 4)  not null default 0,
+    maintenance_count int             not null default 0,
+    updated_at        timestamp       null,
+    primary key (month, asset_type_id, service_provider),
+    index maintenance_cost_type_summary_asset_type_id_month_index (asset_type_id, month),
+    index maintenance_cost_type_summary_service_provider_month_index (service_provider, month)
+);
+
+-- Con la API parada: las escrituras de costes mantienen las dos tablas en la misma transacción
+start transaction;
+delete from maintenance_cost_type_summary;
+insert into maintenance_cost_type_summary (month, asset_type_id, service_provider,
+                                           labor_cost, parts_cost, maintenance_count, updated_at)
+select month, coalesce(asset_type_id, 0), service_provider,
+       sum(labor_cost), sum(parts_cost), sum(maintenance_count), now()
+from maintenance_cost_summary
+group by month, coalesce(asset_type_id, 0), service_provider;
+commit;
@@ -0,0 +1,109 @@
+"""
+Memoria y latencia de los índices de autocompletado (PrefixIndex) con datos sintéticos, sin
+base de datos: nombres de buque, números IMO y nombres de ubicación.
+
+Uso: python scripts/autocomplete_memory_report.py [--entries 100000] [--queries 20000] [--limit 10]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.search.prefix_index import PrefixIndex  # noqa: E402
+
+PREFIXES = ["MSC", "MAERSK", "CMA CGM", "EVER", "COSCO", "HMM", "ONE", "SEABOARD", "CROWLEY", "KING"]
+NAMES = [
+    "Oscar", "Gülsün", "Antilla", "Caribe", "Santo Domingo", "Bonaire", "Curaçao", "Aruba", "Trinidad",
+    "Jamaica", "Barbados", "Martinica", "Guadalupe", "Tortuga", "Navassa", "Margarita", "Cozumel",
+]
+LOCATION_TYPES = ["Port", "Terminal", "Depot", "Warehouse", "Yard"]
+
+
+def synthetic_entries(entries: int, seed: int):
+    rng = random.Random(seed)
+    vessels, imos, locations = [], [], []
+    for doc_id in range(1, entries + 1):
+        name = f"{rng.choice(PREFIXES)} {rng.choice(NAMES)} {rng.choice(string.ascii_uppercase)}{rng.randint(1, 999)}"
+        imo = f"IMO {9000000 + doc_id}"
+        vessels.append((doc_id, name, imo))
+        imos.append((doc_id, imo, name))
+        location = f"{rng.choice(NAMES)} {rng.choice(LOCATION_TYPES)} {doc_id}"
+        locations.append((doc_id, location, rng.choice(NAMES)))
+    return {"vessel_name": vessels, "imo_number": imos, "location_name": locations}
+
+
+def measure_build(entries):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    index = PrefixIndex()
+    index.load(entries)
+    build_seconds = time.perf_counter() - started
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return index, size, build_seconds
+
+
+def measure_queries(index: PrefixIndex, entries, queries: int, limit: int, seed: int):
+    rng = random.Random(seed)
+    values = [value for _, value, _ in entries]
+    prefixes = []
+    for _ in range(queries):
+        value = rng.choice(values)
+        prefixes.append(value[:rng.randint(1, min(len(value), 8))])
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.complete(prefix, limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p99": timings[int(len(timings) * 0.99) - 1],
+        "max": timings[-1],
+    }
+
+
+def measure_updates(index: PrefixIndex, entries, updates: int, seed: int) -> float:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    for _ in range(updates):
+        doc_id, value, detail = rng.choice(entries)
+        index.add(doc_id, value + " II", detail)
+    return (time.perf_counter() - started) * 1000 / updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Autocomplete index memory and latency report")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    datasets = synthetic_entries(args.entries, args.seed)
+    print(f"{'field':<15}{'entries':>9}{'memory MB':>11}{'B/entry':>9}{'build s':>9}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'update ms':>11}")
+    for field, entries in datasets.items():
+        index, size, build_seconds = measure_build(entries)
+        latency = measure_queries(index, entries, args.queries, args.limit, args.seed)
+        update_ms = measure_updates(index, entries, args.updates, args.seed)
+        print(
+            f"{field:<15}{len(index):>9}{size / 1e6:>11.1f}{size / len(index):>9.0f}{build_seconds:>9.2f}"
+            f"{latency['p50']:>9.4f}{latency['p99']:>9.4f}{latency['max']:>9.4f}{update_ms:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
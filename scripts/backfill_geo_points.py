@@ -0,0 +1,46 @@
+"""
+Rellena el campo GeoJSON `GeoPoint` en los HoopoMessages históricos y crea el índice 2dsphere.
+Los nuevos lo reciben al ingerirse o, si los escribe el relay, del motor de GeoPoint
+(GEO_POINT_ENGINE_ENABLED), que solo mira la última hora al arrancar. Trabaja por lotes de _id
+para no bloquear la colección y se puede relanzar: solo toca documentos que aún no tienen GeoPoint.
+
+Uso: python scripts/backfill_geo_points.py [--batch-size 5000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongo_manager import MongoManager  # noqa: E402
+from app.services.geo_point_service import fill_geo_points  # noqa: E402
+from app.services.tracker_event_service import TrackerEventService  # noqa: E402
+
+
+async def backfill(batch_size: int):
+    service = TrackerEventService()
+    collection = await service.get_geo_collection()
+    updated = 0
+    started = time.monotonic()
+    last_id = None
+    while True:
+        count, last_id = await fill_geo_points(collection, batch_size, last_id)
+        if last_id is None:
+            break
+        updated += count
+        print(f"{updated} documents updated ({updated / (time.monotonic() - started):.0f}/s)")
+    await MongoManager.close_shared_client()
+    print(f"Done: {updated} documents updated")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
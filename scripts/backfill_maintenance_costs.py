@@ -0,0 +1,38 @@
+"""
+Calcula el histórico de maintenance_cost_summary y maintenance_cost_type_summary (coste de mano
+de obra + repuestos por mes, asset, tipo y proveedor) recorriendo maintenances por bloques de id, una transacción por bloque.
+Es idempotente y se puede lanzar con la API en marcha: cada bloque solo aplica la diferencia con
+lo ya registrado, así que también sirve para corregir escrituras hechas fuera de los servicios.
+
+Uso: python scripts/backfill_maintenance_costs.py [--chunk-size 2000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.maintenance_cost_service import MaintenanceCostService  # noqa: E402
+
+
+async def backfill(chunk_size: int):
+    started = time.monotonic()
+
+    def report(scanned: int, changed: int):
+        print(f"{scanned} maintenances scanned, {changed} updated ({scanned / (time.monotonic() - started):.0f}/s)")
+
+    scanned, changed = await MaintenanceCostService().backfill(chunk_size, progress=report)
+    print(f"Done: {scanned} maintenances scanned, {changed} updated in {time.monotonic() - started:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Construye los buckets horarios y diarios de HoopoMessages para datos históricos. Divide el
+rango en porciones de días completos y las recalcula en paralelo con una agregación $merge por
+porción; se puede relanzar (reemplaza los buckets de cada porción). Recalcula hasta la marca de
+agua del proceso incremental, o hasta el último mensaje si nunca se ha ejecutado, y la deja
+fijada para que el incremental continúe desde ahí sin contar nada dos veces.
+
+Uso: python scripts/backfill_tracker_rollups.py --start 2024-01-01 [--end 2024-06-01]
+                                                [--slice-days 1] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongo_manager import MongoManager  # noqa: E402
+from app.services.tracker_rollup_service import TrackerRollupService  # noqa: E402
+
+
+async def backfill(start: datetime, end: datetime, slice_days: int, concurrency: int, lease_seconds: float):
+    coordinator = TrackerRollupService()
+    try:
+        max_id = await coordinator.begin_backfill(lease_seconds)
+        if max_id is None:
+            print("No tracker events to backfill")
+            return
+        slices = []
+        cursor = start
+        while cursor < end:
+            slices.append((cursor, min(cursor + timedelta(days=slice_days), end)))
+            cursor += timedelta(days=slice_days)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        done = 0
+        started = time.monotonic()
+
+        async def run_slice(slice_start: datetime, slice_end: datetime):
+            nonlocal done
+            async with semaphore:
+                await TrackerRollupService().backfill_slice(slice_start, slice_end, max_id)
+            done += 1
+            print(f"[{done}/{len(slices)}] {slice_start:%Y-%m-%d} - {slice_end:%Y-%m-%d} ({time.monotonic() - started:.1f}s)")
+
+        try:
+            await asyncio.gather(*(run_slice(s, e) for s, e in slices))
+        except BaseException:
+            # Sin fijar la marca de agua: el incremental retoma y el backfill se puede relanzar
+            await coordinator.finish_backfill(None)
+            raise
+        await coordinator.finish_backfill(max_id)
+        print(f"Done: {len(slices)} slices up to _id {max_id} in {time.monotonic() - started:.1f}s")
+    finally:
+        await MongoManager.close_shared_client()
+
+
+def _day(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=_day, required=True, help="first day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", type=_day, default=None, help="day after the last one (default: tomorrow)")
+    parser.add_argument("--slice-days", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--lease-seconds", type=float, default=6 * 3600,
+                        help="how long the incremental engine stays paused at most")
+    args = parser.parse_args()
+    end = args.end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    asyncio.run(backfill(args.start, end, args.slice_days, args.concurrency, args.lease_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compara el throughput del arranque anterior (uvicorn --reload, un proceso) con el launcher
+de producción (server.py). Lanza cada configuración en un puerto libre, genera carga HTTP/1.1
+keep-alive contra /health y reporta requests/s y latencias.
+
+Uso: python scripts/bench_server.py [--seconds 10] [--connections 64] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH = "/health"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5) as s:
+                s.sendall(f"GET {PATH} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+                if s.recv(16).startswith(b"HTTP/1.1 200"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+async def _connection(port: int, stop_at: float, latencies: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {PATH} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    try:
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            writer.write(request)
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def load(port: int, seconds: float, connections: int) -> dict:
+    latencies: list = []
+    stop_at = time.monotonic() + seconds
+    await asyncio.gather(*[_connection(port, stop_at, latencies) for _ in range(connections)])
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def run_case(name: str, command: list, env: dict, port: int, args) -> dict:
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        result = asyncio.run(load(port, args.seconds, args.connections))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    print(
+        f"{name:<12} {result['requests']:>9} req  {result['rps']:>10.1f} req/s  "
+        f"p50 {result['p50_ms']:>7.2f} ms  p99 {result['p99_ms']:>7.2f} ms"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    baseline_port = free_port()
+    baseline = run_case(
+        "baseline",
+        [sys.executable, "-m", "uvicorn", "main:app", "--reload", "--host", "127.0.0.1", "--port", str(baseline_port)],
+        dict(os.environ),
+        baseline_port,
+        args,
+    )
+
+    production_port = free_port()
+    env = dict(os.environ, HOST="127.0.0.1", PORT=str(production_port), WEB_CONCURRENCY=str(args.workers))
+    production = run_case("production", [sys.executable, "server.py"], env, production_port, args)
+
+    print(f"speedup      {production['rps'] / baseline['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
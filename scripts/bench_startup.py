@@ -0,0 +1,101 @@
+"""
+Mide el arranque en frío de la API.
+
+1. Perfil de importación: ejecuta `python -X importtime -c "import main"` y lista los módulos
+   con mayor tiempo acumulado.
+2. Time-to-first-request: lanza uvicorn en un proceso nuevo y mide cuánto tarda /health en
+   responder 200 desde que se creó el proceso.
+
+Sale con código 1 si alguna medición supera su presupuesto, para poder usarlo como gate en CI.
+
+Uso: python scripts/bench_startup.py [--runs 3] [--import-budget-ms 1500] [--ttfr-budget-ms 3000]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_profile(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        modules.append((int(cumulative_us), int(self_us), name))
+    total_ms = next(c for c, _, n in modules if n == "main") / 1000.0
+    heaviest = sorted((m for m in modules if m[2] != "main"), reverse=True)[:top]
+    return total_ms, heaviest
+
+
+def time_to_first_request(timeout: float = 60.0) -> float:
+    port = free_port()
+    request = "GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.5) as s:
+                    s.sendall(request)
+                    if s.recv(16).startswith(b"HTTP/1.1 200"):
+                        return (time.perf_counter() - started) * 1000.0
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("Server did not answer /health in time")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--import-budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--ttfr-budget-ms", type=float, default=float(os.getenv("TTFR_BUDGET_MS", "3000")))
+    args = parser.parse_args()
+
+    import_times = []
+    heaviest = []
+    for _ in range(args.runs):
+        total_ms, heaviest = import_profile(args.top)
+        import_times.append(total_ms)
+
+    print("Heaviest imports (cumulative ms | self ms | module):")
+    for cumulative_us, self_us, name in heaviest:
+        print(f"  {cumulative_us / 1000:9.1f} | {self_us / 1000:8.1f} | {name}")
+
+    ttfr_times = [time_to_first_request() for _ in range(args.runs)]
+
+    import_ms = statistics.median(import_times)
+    ttfr_ms = statistics.median(ttfr_times)
+    print(f"import main            {import_ms:8.1f} ms  (budget {args.import_budget_ms:.0f} ms)")
+    print(f"time to first request  {ttfr_ms:8.1f} ms  (budget {args.ttfr_budget_ms:.0f} ms)")
+
+    over_budget = import_ms > args.import_budget_ms or ttfr_ms > args.ttfr_budget_ms
+    if over_budget:
+        print("Startup budget exceeded")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
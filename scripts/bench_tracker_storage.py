@@ -0,0 +1,101 @@
+"""
+Compara la colección plana HoopoMessages con la time-series (tras migrar con
+migrate_tracker_events_timeseries.py): tamaño en disco, tamaño de índices y latencia de
+consultas por rango (TrackerId, EventTime), que es el patrón de lectura dominante.
+
+Uso: python scripts/bench_tracker_storage.py [--queries 200] [--window-hours 24]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongo_manager import MongoManager  # noqa: E402
+from app.services.tracker_event_storage import FLAT_COLLECTION, TIMESERIES_COLLECTION  # noqa: E402
+
+
+async def storage_stats(db, name: str) -> dict:
+    stats = await db.command("collStats", name)
+    # En las time-series los datos viven en system.buckets.<nombre>; collStats los reporta igual
+    return {
+        "documents": await db[name].count_documents({}),
+        "storage_mb": stats.get("storageSize", 0) / 1e6,
+        "index_mb": stats.get("totalIndexSize", 0) / 1e6,
+    }
+
+
+async def timed_range(collection, tracker_id: str, start, end) -> tuple:
+    began = time.perf_counter()
+    documents = await collection.find({"TrackerId": tracker_id, "EventTime": {"$gte": start, "$lt": end}}).to_list(length=None)
+    return (time.perf_counter() - began) * 1000, len(documents)
+
+
+def summary(latencies: list) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+    return f"p50 {statistics.median(ordered):7.2f} ms  p95 {p95:7.2f} ms  mean {statistics.mean(ordered):7.2f} ms"
+
+
+async def run(queries: int, window_hours: float):
+    manager = MongoManager()
+    await manager.create_connection()
+    db = manager.db
+    try:
+        flat = db[FLAT_COLLECTION]
+        timeseries = db[TIMESERIES_COLLECTION]
+        samples = await flat.aggregate([
+            {"$match": {"TrackerId": {"$type": "string"}, "EventTime": {"$type": "date"}}},
+            {"$sample": {"size": queries}},
+            {"$project": {"_id": 0, "TrackerId": 1, "EventTime": 1}},
+        ]).to_list(length=queries)
+        if not samples:
+            print("No tracker events to benchmark")
+            return
+        window = timedelta(hours=window_hours)
+        ranges = [(s["TrackerId"], s["EventTime"] - window / 2, s["EventTime"] + window / 2) for s in samples]
+
+        for name in (FLAT_COLLECTION, TIMESERIES_COLLECTION):
+            stats = await storage_stats(db, name)
+            print(f"{name:<20} documents {stats['documents']:>10}  storage {stats['storage_mb']:9.1f} MB  indexes {stats['index_mb']:8.1f} MB")
+
+        # Calentamiento para no medir la primera carga de índices en caché
+        for tracker_id, start, end in ranges[:10]:
+            await timed_range(flat, tracker_id, start, end)
+            await timed_range(timeseries, tracker_id, start, end)
+
+        results = {FLAT_COLLECTION: [], TIMESERIES_COLLECTION: []}
+        returned = {FLAT_COLLECTION: 0, TIMESERIES_COLLECTION: 0}
+        for tracker_id, start, end in ranges:
+            # Orden alterno para repartir el efecto de la caché entre ambas colecciones
+            pair = [(FLAT_COLLECTION, flat), (TIMESERIES_COLLECTION, timeseries)]
+            random.shuffle(pair)
+            for name, collection in pair:
+                elapsed, count = await timed_range(collection, tracker_id, start, end)
+                results[name].append(elapsed)
+                returned[name] += count
+
+        print(f"\n{len(ranges)} range queries of {window_hours:g} h per tracker")
+        for name, latencies in results.items():
+            print(f"{name:<20} {summary(latencies)}  ({returned[name]} documents)")
+        if returned[FLAT_COLLECTION] != returned[TIMESERIES_COLLECTION]:
+            print("warning: collections returned different documents; is the migration complete?")
+    finally:
+        await MongoManager.close_shared_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--window-hours", type=float, default=24.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.queries, args.window_hours))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Copia HoopoMessages a la colección time-series (TRACKER_EVENTS_TIMESERIES_COLLECTION, por
+defecto HoopoMessagesTS) conservando los _id, de modo que las marcas de agua del stream, las
+geocercas y los rollups siguen siendo válidas tras el cambio. Añade GeoPoint a los documentos
+que aún no lo tienen. Guarda el progreso y se puede relanzar: un lote repetido no se duplica.
+
+Requiere MongoDB 7.0 o superior. Después de migrar (y de una última pasada para lo que llegó
+mientras tanto) apuntar el relay de Hoopo a la colección time-series y arrancar la API con
+TRACKER_EVENTS_STORAGE=timeseries y TRACKER_RELAY_COLLECTION con esa misma colección; si no
+coinciden la API no arranca.
+
+Uso: python scripts/migrate_tracker_events_timeseries.py [--batch-size 5000] [--verify]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongo_manager import MongoManager  # noqa: E402
+from app.geo.geojson import GEO_FIELD, point_from_location  # noqa: E402
+from app.services.tracker_event_storage import (  # noqa: E402
+    FLAT_COLLECTION,
+    TIMESERIES_COLLECTION,
+    check_timeseries_support,
+    ensure_timeseries_collection,
+)
+
+STATE_COLLECTION = "HoopoStorageMigration"
+# Las colecciones time-series exigen un timeField de tipo fecha
+MIGRATABLE = {"EventTime": {"$type": "date"}}
+
+
+async def migrate(batch_size: int):
+    manager = MongoManager()
+    await manager.create_connection()
+    db = manager.db
+    await check_timeseries_support(db)
+    if await ensure_timeseries_collection(db):
+        print(f"Created time-series collection {TIMESERIES_COLLECTION}")
+    source = db[FLAT_COLLECTION]
+    target = db[TIMESERIES_COLLECTION]
+    state = db[STATE_COLLECTION]
+
+    progress = await state.find_one({"_id": TIMESERIES_COLLECTION}) or {}
+    last_id = progress.get("LastId")
+    copied = skipped = 0
+    started = time.monotonic()
+    try:
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            documents = await source.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not documents:
+                break
+            batch = [d for d in documents if isinstance(d.get("EventTime"), datetime)]
+            skipped += len(documents) - len(batch)
+            # Un lote interrumpido antes de guardar el progreso puede estar ya copiado en parte
+            ids = [d["_id"] for d in batch]
+            present = {d["_id"] async for d in target.find({"_id": {"$in": ids}}, {"_id": 1})}
+            batch = [d for d in batch if d["_id"] not in present]
+            for document in batch:
+                if GEO_FIELD not in document:
+                    point = point_from_location(document.get("Location"))
+                    if point is not None:
+                        document[GEO_FIELD] = point
+            if batch:
+                await target.insert_many(batch, ordered=False)
+            copied += len(batch)
+            last_id = documents[-1]["_id"]
+            await state.update_one({"_id": TIMESERIES_COLLECTION}, {"$set": {"LastId": last_id}}, upsert=True)
+            print(f"{copied} copied, {skipped} skipped ({copied / (time.monotonic() - started):.0f}/s)")
+    finally:
+        await MongoManager.close_shared_client()
+    print(f"Done: {copied} copied, {skipped} skipped without a valid EventTime")
+
+
+async def verify():
+    manager = MongoManager()
+    await manager.create_connection()
+    db = manager.db
+    try:
+        expected = await db[FLAT_COLLECTION].count_documents(MIGRATABLE)
+        actual = await db[TIMESERIES_COLLECTION].count_documents({})
+    finally:
+        await MongoManager.close_shared_client()
+    print(f"{FLAT_COLLECTION}: {expected} documents with EventTime, {TIMESERIES_COLLECTION}: {actual}")
+    return expected == actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--verify", action="store_true", help="only compare document counts")
+    args = parser.parse_args()
+    if args.verify:
+        sys.exit(0 if asyncio.run(verify()) else 1)
+    asyncio.run(migrate(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
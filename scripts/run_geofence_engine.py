@@ -0,0 +1,56 @@
+"""
+Ejecuta el motor de geocercas fuera del servidor web: procesa las posiciones pendientes de
+HoopoMessages y sale (--once), o se queda en bucle como proceso dedicado. Es seguro lanzarlo
+junto a workers con GEOFENCE_ENGINE_ENABLED: las pasadas se serializan por la marca de agua.
+
+Uso: python scripts/run_geofence_engine.py [--once] [--batch-size 5000] [--interval 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongo_manager import MongoManager  # noqa: E402
+from app.services.geofence_service import GeofenceService  # noqa: E402
+
+
+async def run(once: bool, batch_size: int, interval: float):
+    service = GeofenceService()
+    processed = 0
+    started = time.monotonic()
+    try:
+        while True:
+            result = await service.process_new_positions(batch_size)
+            processed += result.positions
+            if result.positions:
+                print(
+                    f"{result.positions} positions, {result.enters} enters, {result.exits} exits, "
+                    f"{result.unmatched} unmatched, {result.stale} stale "
+                    f"({processed / (time.monotonic() - started):.0f} positions/s)"
+                )
+            if result.positions < batch_size:
+                if once:
+                    break
+                await asyncio.sleep(interval)
+    finally:
+        await MongoManager.close_shared_client()
+    print(f"Done: {processed} positions processed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="exit when there are no pending positions")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--interval", type=float, default=5.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.once, args.batch_size, args.interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Recalcula assets.next_inspection_due_at de todo el parque (o de un tipo de asset) a partir de la
+fabricación, la última inspección y los mantenimientos completados. Recorre los assets por bloques
+de id y solo escribe las filas que cambian, así que se puede lanzar a diario desde cron.
+
+Uso: python scripts/schedule_inspections.py [--chunk-size 5000] [--asset-type-id 3] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.asset_models import InspectionScheduleResult  # noqa: E402
+from app.services.inspection_scheduler_service import InspectionSchedulerService  # noqa: E402
+
+
+def report(result: InspectionScheduleResult):
+    rate = result.scanned / result.seconds if result.seconds else 0
+    print(f"{result.scanned} assets scanned, {result.updated} to update ({rate:.0f}/s)")
+
+
+async def schedule(chunk_size: int, asset_type_id, dry_run: bool):
+    result = await InspectionSchedulerService().run(
+        asset_type_id=asset_type_id, chunk_size=chunk_size, dry_run=dry_run, progress=report
+    )
+    action = "would be updated" if dry_run else "updated"
+    print(f"Done: {result.scanned} assets scanned, {result.updated} {action} in {result.seconds:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--asset-type-id", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Compute changes without writing them")
+    args = parser.parse_args()
+    asyncio.run(schedule(args.chunk_size, args.asset_type_id, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
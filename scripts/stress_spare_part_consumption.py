@@ -0,0 +1,102 @@
+"""
+Prueba de concurrencia del consumo de repuestos: crea un repuesto con --stock unidades y lanza
+--tasks consumos simultáneos del mismo repuesto (cada uno en su propio maintenance y su propia
+conexión). Comprueba que se aceptan exactamente los que caben en el stock, que el resto se
+rechaza por falta de stock y que el stock final cuadra. Al terminar borra lo creado.
+
+Uso: python scripts/stress_spare_part_consumption.py --asset-id 1 [--stock 50] [--tasks 200]
+     [--quantity 1] [--concurrency 50] [--keep]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.maintenance_models import MaintenanceCreate, MaintenanceType  # noqa: E402
+from app.models.maintenance_part_models import MaintenancePartCreate  # noqa: E402
+from app.models.spare_part_models import SparePartCreate  # noqa: E402
+from app.services.maintenance_part_service import InsufficientStockError, MaintenancePartService  # noqa: E402
+from app.services.maintenance_service import MaintenanceService  # noqa: E402
+from app.services.spare_part_service import SparePartService  # noqa: E402
+
+
+async def consume(semaphore: asyncio.Semaphore, maintenance_id: int, spare_part_id: int, quantity: int) -> str:
+    async with semaphore:
+        try:
+            await MaintenancePartService().create_maintenance_part(MaintenancePartCreate(
+                maintenance_id=maintenance_id,
+                spare_part_id=spare_part_id,
+                quantity_used=quantity,
+                cost_at_consumption=Decimal("1.00")
+            ))
+            return "consumed"
+        except InsufficientStockError:
+            return "rejected"
+        except Exception as e:
+            print(f"Unexpected error for maintenance {maintenance_id}: {e}")
+            return "failed"
+
+
+async def stress(asset_id: int, stock: int, tasks: int, quantity: int, concurrency: int, keep: bool) -> bool:
+    part = await SparePartService().create_spare_part(SparePartCreate(
+        name="Stress test part",
+        part_number=f"STRESS-{time.time_ns()}",
+        quantity=stock,
+        unit_cost=Decimal("1.00")
+    ))
+    maintenances = []
+    for index in range(tasks):
+        maintenances.append(await MaintenanceService().create_maintenance(MaintenanceCreate(
+            asset_id=asset_id,
+            maintenance_type=MaintenanceType.corrective,
+            description=f"Stress test consumption {index}"
+        )))
+    print(f"Spare part {part.id} with stock {stock}; {tasks} tasks consuming {quantity} each")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.monotonic()
+    results = await asyncio.gather(*(
+        consume(semaphore, maintenance.id, part.id, quantity) for maintenance in maintenances
+    ))
+    elapsed = time.monotonic() - started
+
+    consumed, rejected, failed = (results.count(outcome) for outcome in ("consumed", "rejected", "failed"))
+    final = (await SparePartService().get_spare_part_by_id(part.id)).quantity
+    expected_consumed = min(tasks, stock // quantity)
+    ok = failed == 0 and consumed == expected_consumed and final == stock - consumed * quantity
+    print(
+        f"{consumed} consumed, {rejected} rejected, {failed} failed in {elapsed:.2f}s; "
+        f"final stock {final} (expected {stock - expected_consumed * quantity})"
+    )
+
+    if not keep:
+        part_service = MaintenancePartService()
+        for maintenance, outcome in zip(maintenances, results):
+            if outcome == "consumed":
+                await part_service.delete_maintenance_part(maintenance.id, part.id)
+        for maintenance in maintenances:
+            await MaintenanceService().delete_maintenance(maintenance.id)
+        await SparePartService().delete_spare_part(part.id)
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--asset-id", type=int, required=True, help="Existing asset for the test maintenances")
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=50, help="Simultaneous MySQL connections")
+    parser.add_argument("--keep", action="store_true", help="Keep the test rows")
+    args = parser.parse_args()
+    ok = asyncio.run(stress(args.asset_id, args.stock, args.tasks, args.quantity, args.concurrency, args.keep))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Launcher de producción.
+
+Arranca la API con varios workers. Si gunicorn está instalado se usa como gestor de procesos
+(con el UvicornWorker del paquete uvicorn-worker, que elige uvloop/httptools automáticamente); si
+no, se usa el supervisor multiproceso de uvicorn. Toda la configuración se toma de variables de entorno:
+
+    HOST, PORT                 dirección de escucha (0.0.0.0:5000)
+    WEB_CONCURRENCY            número de workers (por defecto, núcleos disponibles)
+    KEEPALIVE                  segundos de keep-alive HTTP (5)
+    BACKLOG                    conexiones pendientes en el socket (2048)
+    MAX_REQUESTS               reciclar un worker tras N requests, 0 = nunca (10000)
+    MAX_REQUESTS_JITTER        aleatoriedad del reciclado para no reiniciar todos a la vez (1000)
+    GRACEFUL_TIMEOUT           segundos para terminar requests en curso al reiniciar (30)
+    TIMEOUT                    segundos sin respuesta antes de matar un worker (60)
+    PRELOAD                    importar la app en el master antes de hacer fork (false)
+    SERVER_BACKEND             gunicorn | uvicorn (por defecto gunicorn si está disponible)
+
+Uso: python server.py
+"""
+import importlib.util
+import logging
+import os
+import random
+import sys
+from typing import List, Optional
+
+from uvicorn import Config, Server
+
+APP_PATH = "main:app"
+# uvicorn.workers.UvicornWorker está obsoleto; se mantiene solo si falta uvicorn-worker
+WORKER_CLASS = "uvicorn_worker.UvicornWorker"
+LEGACY_WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def load_settings() -> dict:
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": _env_int("PORT", 5000),
+        "workers": _env_int("WEB_CONCURRENCY", os.cpu_count() or 1),
+        "keepalive": _env_int("KEEPALIVE", 5),
+        "backlog": _env_int("BACKLOG", 2048),
+        "max_requests": _env_int("MAX_REQUESTS", 10000),
+        "max_requests_jitter": _env_int("MAX_REQUESTS_JITTER", 1000),
+        "graceful_timeout": _env_int("GRACEFUL_TIMEOUT", 30),
+        "timeout": _env_int("TIMEOUT", 60),
+        "preload": _env_bool("PRELOAD", False),
+        "loop": "uvloop" if _has_module("uvloop") else "asyncio",
+        "http": "httptools" if _has_module("httptools") else "h11",
+    }
+
+
+class JitteredServer(Server):
+    """
+    Servidor de uvicorn que sortea su límite de requests al arrancar. El supervisor multiproceso
+    copia la configuración en cada worker (y en cada reemplazo), así que cada uno tiene el suyo y
+    no se reciclan todos a la vez.
+    """
+
+    def __init__(self, config: Config, max_requests_jitter: int):
+        super().__init__(config=config)
+        self.max_requests_jitter = max_requests_jitter
+
+    def run(self, sockets: Optional[List] = None) -> None:
+        if self.config.limit_max_requests and self.max_requests_jitter:
+            self.config.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        return super().run(sockets=sockets)
+
+
+def run_gunicorn(settings: dict):
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+    ProductionApplication({
+        "bind": f"{settings['host']}:{settings['port']}",
+        "workers": settings["workers"],
+        # gunicorn sortea max_requests_jitter en cada worker
+        "worker_class": WORKER_CLASS if _has_module("uvicorn_worker") else LEGACY_WORKER_CLASS,
+        "keepalive": settings["keepalive"],
+        "backlog": settings["backlog"],
+        "max_requests": settings["max_requests"],
+        "max_requests_jitter": settings["max_requests_jitter"],
+        "graceful_timeout": settings["graceful_timeout"],
+        "timeout": settings["timeout"],
+        "preload_app": settings["preload"],
+        "accesslog": None,
+    }).run()
+
+
+def run_uvicorn(settings: dict):
+    from uvicorn.main import STARTUP_FAILURE
+    from uvicorn.supervisors import Multiprocess
+
+    if settings["preload"]:
+        logging.warning("PRELOAD is only supported with gunicorn; ignoring it")
+
+    config = Config(
+        APP_PATH,
+        host=settings["host"],
+        port=settings["port"],
+        workers=settings["workers"],
+        loop=settings["loop"],
+        http=settings["http"],
+        backlog=settings["backlog"],
+        timeout_keep_alive=settings["keepalive"],
+        timeout_graceful_shutdown=settings["graceful_timeout"],
+        limit_max_requests=settings["max_requests"] or None,
+        access_log=False,
+        proxy_headers=True,
+    )
+    server = JitteredServer(config, settings["max_requests_jitter"])
+    # Con workers > 1 el supervisor de uvicorn reemplaza los workers que terminan por limit_max_requests
+    try:
+        if config.workers > 1:
+            Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+        else:
+            server.run()
+    except KeyboardInterrupt:
+        pass
+    if config.workers == 1 and not server.started:
+        sys.exit(STARTUP_FAILURE)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    settings = load_settings()
+    backend = os.getenv("SERVER_BACKEND", "gunicorn" if _has_module("gunicorn") else "uvicorn")
+    logging.info(
+        f"Starting {backend} | workers={settings['workers']} loop={settings['loop']} "
+        f"http={settings['http']} preload={settings['preload']}"
+    )
+    if backend == "gunicorn":
+        run_gunicorn(settings)
+    else:
+        run_uvicorn(settings)
+
+
+if __name__ == "__main__":
+    main()
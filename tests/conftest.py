@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+MYSQL_CONNECT_TIMEOUT_SECONDS = 5
+
+
+async def _first_asset_id():
+    from app.services.database_service import DatabaseService
+
+    db_service = DatabaseService()
+    try:
+        await asyncio.wait_for(db_service.connect(), MYSQL_CONNECT_TIMEOUT_SECONDS)
+        rows = await db_service.execute("SELECT id FROM assets ORDER BY id LIMIT 1")
+    finally:
+        await db_service.disconnect()
+    return rows[0]["id"] if rows else None
+
+
+@pytest.fixture(scope="session")
+def mysql_asset_id():
+    """
+    Asset existente en la base de datos de MYSQL_URL (o TEST_ASSET_ID) para los tests que
+    necesitan MySQL; se saltan si no hay base de datos accesible.
+    """
+    try:
+        asset_id = asyncio.run(_first_asset_id())
+    except Exception as e:
+        pytest.skip(f"MySQL not available: {e}")
+    asset_id = int(os.getenv("TEST_ASSET_ID", "0")) or asset_id
+    if asset_id is None:
+        pytest.skip("No asset in the database; set TEST_ASSET_ID")
+    return asset_id
@@ -0,0 +1,69 @@
+"""
+Aritmética de los resúmenes de costes (summary_deltas / type_summary_deltas): qué se resta y qué
+se suma en cada fila cuando una entrada de maintenance_cost_entries cambia. Sin base de datos.
+"""
+from datetime import date
+from decimal import Decimal
+
+from app.services.maintenance_cost_service import summary_deltas, type_summary_deltas
+
+JAN = date(2026, 1, 1)
+FEB = date(2026, 2, 1)
+
+
+def entry(month=JAN, asset_id=1, provider="acme", asset_type_id=10, labor="100", parts="20"):
+    return month, asset_id, provider, asset_type_id, Decimal(labor), Decimal(parts)
+
+
+def test_unchanged_entry_has_no_delta():
+    assert summary_deltas({1: entry()}, {1: entry()}) == {}
+    assert type_summary_deltas({1: entry()}, {1: entry()}) == {}
+
+
+def test_new_entry_adds_to_its_row():
+    assert summary_deltas({}, {1: entry()}) == {(JAN, 1, "acme"): [10, Decimal("100"), Decimal("20"), 1]}
+    assert type_summary_deltas({}, {1: entry()}) == {(JAN, 10, "acme"): [Decimal("100"), Decimal("20"), 1]}
+
+
+def test_cost_change_applies_only_the_difference():
+    deltas = summary_deltas({1: entry()}, {1: entry(labor="150", parts="5")})
+    assert deltas == {(JAN, 1, "acme"): [10, Decimal("50"), Decimal("-15"), 0]}
+
+
+def test_moving_an_entry_between_months_and_providers():
+    deltas = summary_deltas({1: entry()}, {1: entry(month=FEB, provider="")})
+    assert deltas == {
+        (JAN, 1, "acme"): [10, Decimal("-100"), Decimal("-20"), -1],
+        (FEB, 1, ""): [10, Decimal("100"), Decimal("20"), 1],
+    }
+    type_deltas = type_summary_deltas({1: entry()}, {1: entry(month=FEB, provider="")})
+    assert type_deltas == {
+        (JAN, 10, "acme"): [Decimal("-100"), Decimal("-20"), -1],
+        (FEB, 10, ""): [Decimal("100"), Decimal("20"), 1],
+    }
+
+
+def test_deleted_entry_subtracts_everything():
+    assert summary_deltas({1: entry()}, {}) == {(JAN, 1, "acme"): [10, Decimal("-100"), Decimal("-20"), -1]}
+    assert type_summary_deltas({1: entry()}, {}) == {(JAN, 10, "acme"): [Decimal("-100"), Decimal("-20"), -1]}
+
+
+def test_asset_type_change_keeps_the_asset_row_and_moves_the_type_row():
+    recorded, current = {1: entry(asset_type_id=10)}, {1: entry(asset_type_id=20)}
+    # La fila por asset no cambia de importe, solo pasa a registrar el tipo nuevo
+    assert summary_deltas(recorded, current) == {(JAN, 1, "acme"): [20, Decimal("0"), Decimal("0"), 0]}
+    assert type_summary_deltas(recorded, current) == {
+        (JAN, 10, "acme"): [Decimal("-100"), Decimal("-20"), -1],
+        (JAN, 20, "acme"): [Decimal("100"), Decimal("20"), 1],
+    }
+
+
+def test_asset_without_type_counts_as_type_zero():
+    assert type_summary_deltas({}, {1: entry(asset_type_id=None)}) == {(JAN, 0, "acme"): [Decimal("100"), Decimal("20"), 1]}
+
+
+def test_several_maintenances_on_the_same_row_net_out():
+    recorded = {1: entry(labor="100"), 2: entry(labor="40", parts="0")}
+    current = {1: entry(labor="100", parts="0"), 3: entry(labor="5", parts="5")}
+    assert summary_deltas(recorded, current) == {(JAN, 1, "acme"): [10, Decimal("-35"), Decimal("-15"), 0]}
+    assert type_summary_deltas(recorded, current) == {(JAN, 10, "acme"): [Decimal("-35"), Decimal("-15"), 0]}
@@ -0,0 +1,16 @@
+"""
+Consumo concurrente del mismo repuesto (scripts/stress_spare_part_consumption.py) contra MySQL:
+se aceptan exactamente los consumos que caben en el stock, el resto falla con
+InsufficientStockError y el stock final cuadra. Necesita MYSQL_URL; sin base de datos se salta.
+"""
+import asyncio
+
+import pytest
+
+from scripts.stress_spare_part_consumption import stress
+
+
+@pytest.mark.parametrize("stock, tasks, quantity", [(20, 60, 1), (10, 30, 3)])
+def test_concurrent_consumption_never_oversells(mysql_asset_id, stock, tasks, quantity):
+    ok = asyncio.run(stress(mysql_asset_id, stock, tasks, quantity, concurrency=20, keep=False))
+    assert ok, "stock race: see the captured output for consumed/rejected counts and the final stock"
@@ -0,0 +1,32 @@
+"""
+Presupuesto de arranque en frío (scripts/bench_startup.py) como test: cada medición se hace en
+un proceso nuevo y no necesita MySQL ni Mongo, porque importar la app y responder /health no
+abren conexiones.
+"""
+import importlib.util
+import os
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 3
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+TTFR_BUDGET_MS = float(os.getenv("TTFR_BUDGET_MS", "3000"))
+
+
+def load_bench():
+    spec = importlib.util.spec_from_file_location("bench_startup", os.path.join(ROOT, "scripts", "bench_startup.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_import_main_within_budget():
+    bench = load_bench()
+    import_ms = statistics.median(bench.import_profile(top=0)[0] for _ in range(RUNS))
+    assert import_ms <= IMPORT_BUDGET_MS, f"import main took {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+def test_time_to_first_request_within_budget():
+    bench = load_bench()
+    ttfr_ms = statistics.median(bench.time_to_first_request() for _ in range(RUNS))
+    assert ttfr_ms <= TTFR_BUDGET_MS, f"first request took {ttfr_ms:.1f} ms (budget {TTFR_BUDGET_MS:.0f} ms)"